@@ -0,0 +1,118 @@
+"""Timing of the multi-band likelihood with the bands evaluated sequentially and in a
+pool of threads (band_parallel).
+
+Usage (from the root of the repository): ``python benchmarks/bench_band_parallel.py
+[--num_bands N] [--num_pix N] [--num_threads N] [--num_eval N]``
+"""
+
+import argparse
+import os
+import timeit
+
+import numpy as np
+
+from lenstronomy.Data.imaging_data import ImageData
+from lenstronomy.Data.psf import PSF
+from lenstronomy.ImSim.image_model import ImageModel
+from lenstronomy.ImSim.MultiBand.multi_linear import MultiLinear
+from lenstronomy.LensModel.lens_model import LensModel
+from lenstronomy.LightModel.light_model import LightModel
+import lenstronomy.Util.kernel_util as kernel_util
+import lenstronomy.Util.simulation_util as sim_util
+
+
+def _multi_band(num_bands, num_pix):
+    """Simulated bands with Gaussian PSFs of different widths (as pixelized kernels) and
+    supersampling.
+
+    :return: multi_band_list, kwargs_model and the keyword arguments of the models
+    """
+    delta_pix = 0.05
+    kwargs_model = {
+        "lens_model_list": ["SIE", "SHEAR"],
+        "source_light_model_list": ["SERSIC_ELLIPSE"],
+        "lens_light_model_list": ["SERSIC"],
+    }
+    kwargs_lens = [
+        {"theta_E": 1.0, "e1": 0.1, "e2": -0.05, "center_x": 0, "center_y": 0},
+        {"gamma1": 0.02, "gamma2": 0.01},
+    ]
+    kwargs_source = [
+        {
+            "amp": 10,
+            "R_sersic": 0.3,
+            "n_sersic": 2,
+            "e1": 0.1,
+            "e2": 0.1,
+            "center_x": 0.05,
+            "center_y": 0,
+        }
+    ]
+    kwargs_lens_light = [
+        {"amp": 20, "R_sersic": 0.5, "n_sersic": 3, "center_x": 0, "center_y": 0}
+    ]
+    kwargs_numerics = {"supersampling_factor": 2}
+    multi_band_list = []
+    for i in range(num_bands):
+        kwargs_data = sim_util.data_configure_simple(num_pix, delta_pix, 100, 0.05)
+        kernel = kernel_util.kernel_gaussian(41, delta_pix, fwhm=0.1 + 0.05 * i)
+        kwargs_psf = {"psf_type": "PIXEL", "kernel_point_source": kernel}
+        image_model = ImageModel(
+            ImageData(**kwargs_data),
+            PSF(**kwargs_psf),
+            LensModel(kwargs_model["lens_model_list"]),
+            LightModel(kwargs_model["source_light_model_list"]),
+            LightModel(kwargs_model["lens_light_model_list"]),
+            kwargs_numerics=kwargs_numerics,
+        )
+        image = image_model.image(kwargs_lens, kwargs_source, kwargs_lens_light)
+        kwargs_data["image_data"] = image + np.random.normal(0, 0.05, image.shape)
+        multi_band_list.append([kwargs_data, kwargs_psf, kwargs_numerics])
+    return multi_band_list, kwargs_model, kwargs_lens, kwargs_source, kwargs_lens_light
+
+
+def main(num_bands, num_pix, num_threads, num_eval):
+    np.random.seed(42)
+    (
+        multi_band_list,
+        kwargs_model,
+        kwargs_lens,
+        kwargs_source,
+        kwargs_lens_light,
+    ) = _multi_band(num_bands, num_pix)
+    print(
+        "%s bands of %s x %s pixels, %s CPUs"
+        % (num_bands, num_pix, num_pix, os.cpu_count())
+    )
+    logL_list = []
+    for band_parallel in [False, True]:
+        image_model = MultiLinear(
+            multi_band_list,
+            kwargs_model,
+            band_parallel=band_parallel,
+            num_threads=num_threads,
+        )
+
+        def likelihood():
+            return image_model.likelihood_data_given_model(
+                kwargs_lens, kwargs_source, kwargs_lens_light, source_marg=True
+            )[0]
+
+        logL_list.append(likelihood())
+        time = min(timeit.repeat(likelihood, number=num_eval, repeat=3)) / num_eval
+        print(
+            "band_parallel=%s: %.1f ms per likelihood call"
+            % (band_parallel, time * 1e3)
+        )
+        image_model.close()
+    np.testing.assert_almost_equal(logL_list[1], logL_list[0], decimal=6)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--num_bands", type=int, default=4)
+    parser.add_argument("--num_pix", type=int, default=100)
+    parser.add_argument("--num_threads", type=int, default=None)
+    parser.add_argument("--num_eval", type=int, default=10)
+    args = parser.parse_args()
+    main(args.num_bands, args.num_pix, args.num_threads, args.num_eval)
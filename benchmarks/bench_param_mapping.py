@@ -0,0 +1,64 @@
+"""Timing of Param.args2kwargs with and without the precompiled ParamMappingPlan.
+
+Usage (from the root of the repository): ``python
+benchmarks/bench_param_mapping.py [--num_eval N]``
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from lenstronomy.Sampling.parameters import Param
+
+
+def _param():
+    """Parameter configuration with lens, light and point source models, log sampling,
+    joint parameters and time-delay distance sampling."""
+    kwargs_model = {
+        "lens_model_list": ["SIE", "SHEAR", "NFW"],
+        "source_light_model_list": ["SERSIC_ELLIPSE", "SHAPELETS"],
+        "lens_light_model_list": ["SERSIC", "MULTI_GAUSSIAN"],
+        "point_source_model_list": ["LENSED_POSITION", "SOURCE_POSITION"],
+    }
+    return Param(
+        kwargs_model,
+        kwargs_fixed_lens=[{"center_x": 0}, {"ra_0": 0, "dec_0": 0}, {"Rs": 2}],
+        kwargs_fixed_source=[{"n_sersic": 1}, {"n_max": 2, "beta": 0.2}],
+        kwargs_fixed_lens_light=[{}, {"sigma": [0.1, 0.5, 1.0]}],
+        kwargs_fixed_ps=[{}, {}],
+        kwargs_fixed_special={},
+        num_point_source_list=[4, 1],
+        log_sampling_lens=[[0, ["theta_E"]], [2, ["alpha_Rs"]]],
+        Ddt_sampling=True,
+        point_source_offset=True,
+        joint_lens_with_light=[[0, 0, ["center_y"]]],
+        joint_source_with_source=[[0, 1, ["center_x", "center_y"]]],
+    )
+
+
+def main(num_eval):
+    param = _param()
+    num_param, _ = param.num_param()
+    args = np.random.uniform(-0.5, 0.5, num_param)
+    param.args2kwargs(args)
+    assert param.mapping_plan is not None
+    time_plan = min(
+        timeit.repeat(lambda: param.args2kwargs(args), number=num_eval, repeat=3)
+    )
+    # read-out of the individual parameter classes
+    param._mapping_plan = False
+    time_ref = min(
+        timeit.repeat(lambda: param.args2kwargs(args), number=num_eval, repeat=3)
+    )
+    print("number of parameters: %s" % num_param)
+    print(
+        "args2kwargs: %.1f mus with mapping plan, %.1f mus without"
+        % (time_plan / num_eval * 1e6, time_ref / num_eval * 1e6)
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--num_eval", type=int, default=10000)
+    main(parser.parse_args().num_eval)
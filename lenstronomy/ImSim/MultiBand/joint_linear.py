@@ -21,6 +21,9 @@ class JointLinear(MultiLinear):
         kwargs_model,
         compute_bool=None,
         likelihood_mask_list=None,
+        band_parallel=False,
+        num_threads=None,
+        share_ray_shooting=True,
     ):
         # TODO: make this raise statement valid
         # if kwargs_model.get('index_source_light_model_list', None) is not None or \
@@ -33,8 +36,14 @@ class JointLinear(MultiLinear):
             kwargs_model=kwargs_model,
             compute_bool=compute_bool,
             likelihood_mask_list=likelihood_mask_list,
+            band_parallel=band_parallel,
+            num_threads=num_threads,
+            share_ray_shooting=share_ray_shooting,
         )
         self.type = "joint-linear"
+        # covariance matrix of the last linear solve and its log determinant from the
+        # Cholesky factorization, used for the marginalization
+        self._log_det_cache = (None, None)
 
     def image_linear_solve(
         self,
@@ -63,7 +72,9 @@ class JointLinear(MultiLinear):
         :return: 1d array of surface brightness pixels of the optimal solution of the
             linear parameters to match the data
         """
-        A = self.linear_response_matrix(
+        # the normal equations of the joint inversion are the sums of those of the
+        # bands, such that the response matrix of all bands is not formed
+        band_list = self._band_normal_equations(
             kwargs_lens,
             kwargs_source,
             kwargs_lens_light,
@@ -71,14 +82,31 @@ class JointLinear(MultiLinear):
             kwargs_extinction,
             kwargs_special,
         )
-        C_D_response, model_error_list = self.error_response(kwargs_lens, kwargs_ps)
-        d = self.data_response
-        param, cov_param, wls_model = de_lens.get_param_WLS(
-            A.T, 1 / C_D_response, d, inv_bool=inv_bool
+        M = sum(M_i for _, _, M_i, _, _ in band_list)
+        R = sum(R_i for _, _, _, R_i, _ in band_list)
+        param, cov_param, log_det = de_lens.get_param_normal(
+            M, R, inv_bool=inv_bool, return_log_det=True
         )
-        wls_list = self._array2image_list(wls_model)
+        self._log_det_cache = (cov_param, log_det)
+        wls_list = self._model_image_list(
+            [np.dot(A_i.T, param) for A_i, _, _, _, _ in band_list]
+        )
+        model_error_list = [model_error_i for _, _, _, _, model_error_i in band_list]
         return wls_list, model_error_list, cov_param, param
 
+    def _cov_param_log_det(self, cov_param):
+        """Log determinant of the covariance matrix of the last linear solve, kept from
+        its Cholesky factorization.
+
+        :param cov_param: covariance matrix of the linear parameters
+        :return: log determinant of cov_param, or None if cov_param is not the
+            covariance matrix of the last linear solve
+        """
+        cov_param_last, log_det = self._log_det_cache
+        if cov_param is not None and cov_param is cov_param_last:
+            return log_det
+        return None
+
     def linear_response_matrix(
         self,
         kwargs_lens=None,
@@ -215,7 +243,11 @@ class JointLinear(MultiLinear):
                 )
                 index += 1
         if cov_matrix is not None and source_marg:
-            marg_const = de_lens.marginalization_new(cov_matrix, d_prior=linear_prior)
+            marg_const = de_lens.marginalization_new(
+                cov_matrix,
+                d_prior=linear_prior,
+                log_det=self._cov_param_log_det(cov_matrix),
+            )
             logL += marg_const
         if check_positive_flux is True and self._num_bands > 0:
             bool_ = self._image_model_list[0].check_positive_flux(
@@ -50,6 +50,9 @@ class JointLinear_VaryBG(MultiLinear):
         kwargs_model,
         compute_bool=None,
         likelihood_mask_list=None,
+        band_parallel=False,
+        num_threads=None,
+        share_ray_shooting=True,
     ):
         # TODO: make this raise statement valid
         # if kwargs_model.get('index_source_light_model_list', None) is not None or \
@@ -62,8 +65,14 @@ class JointLinear_VaryBG(MultiLinear):
             kwargs_model=kwargs_model,
             compute_bool=compute_bool,
             likelihood_mask_list=likelihood_mask_list,
+            band_parallel=band_parallel,
+            num_threads=num_threads,
+            share_ray_shooting=share_ray_shooting,
         )
         self.type = "joint-linear"
+        # covariance matrix of the last linear solve and its log determinant from the
+        # Cholesky factorization, used for the marginalization
+        self._log_det_cache = (None, None)
 
     def image_linear_solve(
         self,
@@ -94,7 +103,9 @@ class JointLinear_VaryBG(MultiLinear):
             None if inv_bool is False, and 1D parameter array of length N_params +
             N_bands (last N_bands entries are the per-band background levels)
         """
-        A = self.linear_response_matrix(
+        # the background levels are local to the bands and eliminated with the Schur
+        # complement of the normal equations
+        band_list = self._band_normal_equations(
             kwargs_lens,
             kwargs_source,
             kwargs_lens_light,
@@ -102,14 +113,59 @@ class JointLinear_VaryBG(MultiLinear):
             kwargs_extinction,
             kwargs_special,
         )
-        C_D_response, model_error_list = self.error_response(kwargs_lens, kwargs_ps)
-        d = self.data_response
-        param, cov_param, wls_model = de_lens.get_param_WLS(
-            A.T, 1 / C_D_response, d, inv_bool=inv_bool
+        band_index_list = [
+            i for i in range(self._num_bands) if self._compute_bool[i] is True
+        ]
+        M_cross_list, M_local_list, R_local_list = [], [], []
+        for i, (A_i, weights_i, _, _, _) in zip(band_index_list, band_list):
+            d_i = self._image_model_list[i].data_response
+            M_cross_list.append(np.dot(A_i, weights_i)[:, np.newaxis])
+            M_local_list.append(np.array([[np.sum(weights_i)]]))
+            R_local_list.append(np.array([np.sum(weights_i * d_i)]))
+        param_computed, cov_computed, log_det = de_lens.get_param_block_normal(
+            sum(M_i for _, _, M_i, _, _ in band_list),
+            sum(R_i for _, _, _, R_i, _ in band_list),
+            M_cross_list,
+            M_local_list,
+            R_local_list,
+            inv_bool=inv_bool,
+            return_log_det=True,
         )
-        wls_list = self._array2image_list(wls_model)
+        num_shared = len(param_computed) - len(band_index_list)
+        background_list = param_computed[num_shared:]
+        wls_list = self._model_image_list(
+            [
+                np.dot(A_i.T, param_computed[:num_shared]) + background_i
+                for (A_i, _, _, _, _), background_i in zip(band_list, background_list)
+            ]
+        )
+        model_error_list = [model_error_i for _, _, _, _, model_error_i in band_list]
+        if len(band_index_list) == self._num_bands:
+            self._log_det_cache = (cov_computed, log_det)
+            return wls_list, model_error_list, cov_computed, param_computed
+        # zero background levels (and covariances) of the bands not computed
+        index = np.append(np.arange(num_shared), num_shared + np.array(band_index_list))
+        param = np.zeros(num_shared + self._num_bands)
+        param[index] = param_computed
+        cov_param = None
+        if cov_computed is not None:
+            cov_param = np.zeros((len(param), len(param)))
+            cov_param[np.ix_(index, index)] = cov_computed
         return wls_list, model_error_list, cov_param, param
 
+    def _cov_param_log_det(self, cov_param):
+        """Log determinant of the covariance matrix of the last linear solve, kept from
+        its Cholesky factorization.
+
+        :param cov_param: covariance matrix of the linear parameters
+        :return: log determinant of cov_param, or None if cov_param is not the
+            covariance matrix of the last linear solve
+        """
+        cov_param_last, log_det = self._log_det_cache
+        if cov_param is not None and cov_param is cov_param_last:
+            return log_det
+        return None
+
     def linear_response_matrix(
         self,
         kwargs_lens=None,
@@ -252,7 +308,11 @@ class JointLinear_VaryBG(MultiLinear):
                 )
                 index += 1
         if cov_matrix is not None and source_marg:
-            marg_const = de_lens.marginalization_new(cov_matrix, d_prior=linear_prior)
+            marg_const = de_lens.marginalization_new(
+                cov_matrix,
+                d_prior=linear_prior,
+                log_det=self._cov_param_log_det(cov_matrix),
+            )
             logL += marg_const
         if check_positive_flux is True and self._num_bands > 0:
             bool_ = self._image_model_list[0].check_positive_flux(
@@ -1,17 +1,33 @@
 __all__ = ["MultiDataBase"]
 
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
+from lenstronomy.ImSim.image2source_mapping import RayShootingCache
+
 
 class MultiDataBase(object):
     """Base class with definitions that are shared among all variations of modelling
     multiple data sets."""
 
-    def __init__(self, image_model_list, compute_bool=None):
+    def __init__(
+        self,
+        image_model_list,
+        compute_bool=None,
+        band_parallel=False,
+        num_threads=None,
+        share_ray_shooting=True,
+    ):
         """
 
         :param image_model_list: list of ImageModel instances (supporting linear inversions)
         :param compute_bool: list of booleans for each imaging band indicating whether to model it or not.
+        :param band_parallel: bool, if True, the bands are evaluated in a pool of threads (NumPy FFTs and
+         BLAS release the GIL)
+        :param num_threads: number of threads of the pool (default: number of bands)
+        :param share_ray_shooting: bool, if True, the ray-shooting of the evaluation grid is
+         performed once for all bands with identical grids and lens models
         """
         self._num_bands = len(image_model_list)
         if compute_bool is None:
@@ -26,6 +42,180 @@ class MultiDataBase(object):
         self._num_response_list = []
         for imageModel in image_model_list:
             self._num_response_list.append(imageModel.num_data_evaluate)
+        self._band_parallel = band_parallel
+        self._num_threads = num_threads
+        self._executor = None
+        if share_ray_shooting is True:
+            self.ray_shooting_cache = self._set_shared_ray_shooting()
+        else:
+            self.ray_shooting_cache = None
+
+    def close(self):
+        """Shuts down the thread pool of the band-parallel evaluation (if any). A new
+        pool is created if the bands are evaluated again.
+
+        :return: None
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __del__(self):
+        # the attribute is missing if __init__ did not complete
+        executor = getattr(self, "_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def __getstate__(self):
+        # the thread pool is not pickled (e.g. for a pool of processes)
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        return state
+
+    def _set_shared_ray_shooting(self):
+        """Assigns a shared RayShootingCache to the bands, with the same grid key for
+        the bands with identical evaluation grids (pixel grid and supersampling) and
+        lens models. Bands evaluating different subsets of the lens models share a grid
+        key only if the types of the subsets agree; the look-up is then keyed on the
+        lens keyword arguments of the subsets.
+
+        :return: RayShootingCache instance, or None if no two bands share a grid
+        """
+        representative_list = []
+        grid_key_list = []
+        for i, image_model in enumerate(self._image_model_list):
+            if self._compute_bool[i] is not True or image_model.source_mapping is None:
+                grid_key_list.append(None)
+                continue
+            x_grid, y_grid = image_model.ImageNumerics.coordinates_evaluate
+            lens_model = image_model.LensModel
+            signature = (
+                lens_model.lens_model_list,
+                lens_model.redshift_list,
+                lens_model.z_source,
+                lens_model.multi_plane,
+            )
+            grid_key = None
+            for key, (signature_j, x_j, y_j) in enumerate(representative_list):
+                if (
+                    signature_j == signature
+                    and np.array_equal(x_j, x_grid)
+                    and np.array_equal(y_j, y_grid)
+                ):
+                    grid_key = key
+                    break
+            if grid_key is None:
+                grid_key = len(representative_list)
+                representative_list.append((signature, x_grid, y_grid))
+            grid_key_list.append(grid_key)
+        if len(representative_list) == len(
+            [key for key in grid_key_list if key is not None]
+        ):
+            return None
+        cache = RayShootingCache()
+        for image_model, grid_key in zip(self._image_model_list, grid_key_list):
+            if grid_key is not None:
+                image_model.set_ray_shooting_cache(cache, grid_key=grid_key)
+        return cache
+
+    def _map_bands(self, function):
+        """Evaluates a function for all bands to be computed, in the thread pool if
+        band_parallel is True.
+
+        :param function: function of the band index
+        :return: list of the results for the computed bands (in the order of the bands)
+        """
+        band_index_list = [
+            i for i in range(self._num_bands) if self._compute_bool[i] is True
+        ]
+        if self._band_parallel is not True or len(band_index_list) < 2:
+            return [function(i) for i in band_index_list]
+        if self._executor is None:
+            num_threads = self._num_threads or len(band_index_list)
+            self._executor = ThreadPoolExecutor(max_workers=num_threads)
+        return list(self._executor.map(function, band_index_list))
+
+    @property
+    def _parallel(self):
+        """
+
+        :return: bool, whether the computed bands are evaluated in parallel threads
+        """
+        return self._band_parallel is True and sum(self._compute_bool) > 1
+
+    def _band_kwargs(self, kwargs_source, kwargs_lens_light, kwargs_ps):
+        """Keyword arguments of the light and point source models for the evaluation of
+        a band. The linear solver writes the linear amplitudes into them, such that
+        bands evaluated in parallel threads receive copies of the keyword arguments.
+
+        :param kwargs_source: list of keyword arguments for the source light profiles
+        :param kwargs_lens_light: list of keyword arguments for the lens light profiles
+        :param kwargs_ps: list of keyword arguments for point sources
+        :return: kwargs_source, kwargs_lens_light, kwargs_ps (copied if the bands are
+            evaluated in parallel)
+        """
+        if self._parallel is False:
+            return kwargs_source, kwargs_lens_light, kwargs_ps
+        return tuple(
+            None if kwargs_list is None else [dict(kwargs) for kwargs in kwargs_list]
+            for kwargs_list in [kwargs_source, kwargs_lens_light, kwargs_ps]
+        )
+
+    def _band_normal_equations(
+        self,
+        kwargs_lens=None,
+        kwargs_source=None,
+        kwargs_lens_light=None,
+        kwargs_ps=None,
+        kwargs_extinction=None,
+        kwargs_special=None,
+    ):
+        """Response matrices and weighted least square normal equations of the
+        individual bands (assembled in parallel threads if band_parallel is True), from
+        which the normal equations of a joint linear inversion are combined without
+        forming the response matrix of all bands.
+
+        :param kwargs_lens: list of keyword arguments for the mass profiles
+        :param kwargs_source: list of keyword arguments for the source light profiles
+        :param kwargs_lens_light: list of keyword arguments for the lens light profiles
+        :param kwargs_ps: list of keyword arguments for point sources
+        :return: list of (response matrix A_i, data weights, A_i C_D^-1 A_i^T, A_i
+            C_D^-1 d_i, model error map) of the computed bands
+        """
+
+        def normal_equations(i):
+            image_model = self._image_model_list[i]
+            A_i = image_model.linear_response_matrix(
+                kwargs_lens,
+                kwargs_source,
+                kwargs_lens_light,
+                kwargs_ps,
+                kwargs_extinction,
+                kwargs_special,
+            )
+            C_D_response_i, model_error_i = image_model.error_response(
+                kwargs_lens, kwargs_ps, kwargs_special=None
+            )
+            weights_i = 1 / C_D_response_i
+            M_i = np.dot(A_i, (A_i * weights_i).T)
+            R_i = np.dot(A_i, weights_i * image_model.data_response)
+            return A_i, weights_i, M_i, R_i, model_error_i
+
+        return self._map_bands(normal_equations)
+
+    def _model_image_list(self, model_list):
+        """Maps the 1d model vectors of the computed bands into 2d images.
+
+        :param model_list: list of 1d numpy arrays (one per computed band)
+        :return: list of 2d numpy arrays
+        """
+        band_index_list = [
+            i for i in range(self._num_bands) if self._compute_bool[i] is True
+        ]
+        return [
+            self._image_model_list[i].array_masked2image(model_i)
+            for i, model_i in zip(band_index_list, model_list)
+        ]
 
     @property
     def num_bands(self):
@@ -47,6 +237,16 @@ class MultiDataBase(object):
         for imageModel in self._image_model_list:
             imageModel.reset_point_source_cache(cache=cache)
 
+    def set_point_source_memo(self, memo):
+        """Sets a (potentially shared) memoization instance of the point source
+        quantities in all bands.
+
+        :param memo: PointSourceMemo instance or None
+        :return: None
+        """
+        for imageModel in self._image_model_list:
+            imageModel.set_point_source_memo(memo)
+
     @property
     def num_data_evaluate(self):
         num = 0
@@ -90,3 +290,28 @@ class MultiDataBase(object):
                 )
                 index += 1
         return residual_list
+
+    def residual_vector(self, model_list, error_map_list=None):
+        """
+
+        :param model_list: list of models (None for bands not computed)
+        :param error_map_list: list of error maps
+        :return: 1d numpy array of the reduced residuals of the pixels evaluated in the
+            likelihood of all computed bands
+        """
+        model_list = [model for model in model_list if model is not None]
+        if error_map_list is None:
+            error_map_list = np.zeros(len(model_list))
+        else:
+            error_map_list = [error for error in error_map_list if error is not None]
+        residual_list = []
+        index = 0
+        for i in range(self._num_bands):
+            if self._compute_bool[i] is True:
+                residual_list.append(
+                    self._image_model_list[i].residual_vector(
+                        model_list[index], error_map=error_map_list[index]
+                    )
+                )
+                index += 1
+        return np.concatenate(residual_list)
@@ -29,6 +29,9 @@ class MultiLinear(MultiDataBase):
         compute_bool=None,
         kwargs_pixelbased=None,
         linear_solver=True,
+        band_parallel=False,
+        num_threads=None,
+        share_ray_shooting=True,
     ):
         """
 
@@ -38,6 +41,10 @@ class MultiLinear(MultiDataBase):
         :param compute_bool: (optional), bool list to indicate which band to be included in the modeling
         :param linear_solver: bool, if True (default) fixes the linear amplitude parameters 'amp' (avoid sampling) such
          that they get overwritten by the linear solver solution.
+        :param band_parallel: bool, if True, the bands are evaluated in a pool of threads
+        :param num_threads: number of threads of the pool (default: number of bands)
+        :param share_ray_shooting: bool, if True, the ray-shooting of the evaluation grid is performed once for all
+         bands with identical grids and lens models
         """
         self.type = "multi-linear"
         image_model_list = []
@@ -55,7 +62,13 @@ class MultiLinear(MultiDataBase):
                 linear_solver=linear_solver,
             )
             image_model_list.append(image_model)
-        super(MultiLinear, self).__init__(image_model_list, compute_bool=compute_bool)
+        super(MultiLinear, self).__init__(
+            image_model_list,
+            compute_bool=compute_bool,
+            band_parallel=band_parallel,
+            num_threads=num_threads,
+            share_ray_shooting=share_ray_shooting,
+        )
 
     def image_linear_solve(
         self,
@@ -84,20 +97,34 @@ class MultiLinear(MultiDataBase):
         :return: 1d array of surface brightness pixels of the optimal solution of the
             linear parameters to match the data
         """
+
+        def linear_solve(i):
+            kwargs_source_i, kwargs_lens_light_i, kwargs_ps_i = self._band_kwargs(
+                kwargs_source, kwargs_lens_light, kwargs_ps
+            )
+            return self._image_model_list[i].image_linear_solve(
+                kwargs_lens,
+                kwargs_source_i,
+                kwargs_lens_light_i,
+                kwargs_ps_i,
+                kwargs_extinction,
+                kwargs_special,
+                inv_bool=inv_bool,
+            )
+
+        result_list = self._map_bands(linear_solve)
+        self._update_band_linear_kwargs(
+            [result[3] for result in result_list],
+            kwargs_lens,
+            kwargs_source,
+            kwargs_lens_light,
+            kwargs_ps,
+        )
+        result_list = iter(result_list)
         wls_list, error_map_list, cov_param_list, param_list = [], [], [], []
         for i in range(self._num_bands):
             if self._compute_bool[i] is True:
-                wls_model, error_map, cov_param, param = self._image_model_list[
-                    i
-                ].image_linear_solve(
-                    kwargs_lens,
-                    kwargs_source,
-                    kwargs_lens_light,
-                    kwargs_ps,
-                    kwargs_extinction,
-                    kwargs_special,
-                    inv_bool=inv_bool,
-                )
+                wls_model, error_map, cov_param, param = next(result_list)
             else:
                 wls_model, error_map, cov_param, param = None, None, None, None
             wls_list.append(wls_model)
@@ -131,30 +158,69 @@ class MultiLinear(MultiDataBase):
         :return: log likelihood (natural logarithm) (sum of the log likelihoods of the
             individual images), linear parameters
         """
-        # generate image
-        logL = 0
-        param_list = []
         if linear_prior is None:
             linear_prior = [None for i in range(self._num_bands)]
+
+        def likelihood(i):
+            kwargs_source_i, kwargs_lens_light_i, kwargs_ps_i = self._band_kwargs(
+                kwargs_source, kwargs_lens_light, kwargs_ps
+            )
+            return self._image_model_list[i].likelihood_data_given_model(
+                kwargs_lens,
+                kwargs_source_i,
+                kwargs_lens_light_i,
+                kwargs_ps_i,
+                kwargs_extinction,
+                kwargs_special,
+                source_marg=source_marg,
+                linear_prior=linear_prior[i],
+                check_positive_flux=check_positive_flux,
+            )
+
+        result_list = self._map_bands(likelihood)
+        self._update_band_linear_kwargs(
+            [result[1] for result in result_list],
+            kwargs_lens,
+            kwargs_source,
+            kwargs_lens_light,
+            kwargs_ps,
+        )
+        result_list = iter(result_list)
+        logL = 0
+        param_list = []
         for i in range(self._num_bands):
             if self._compute_bool[i] is True:
-                logL_i, param_i = self._image_model_list[i].likelihood_data_given_model(
-                    kwargs_lens,
-                    kwargs_source,
-                    kwargs_lens_light,
-                    kwargs_ps,
-                    kwargs_extinction,
-                    kwargs_special,
-                    source_marg=source_marg,
-                    linear_prior=linear_prior[i],
-                    check_positive_flux=check_positive_flux,
-                )
+                logL_i, param_i = next(result_list)
                 logL += logL_i
                 param_list.append(param_i)
             else:
                 param_list.append(None)
         return logL, param_list
 
+    def _update_band_linear_kwargs(
+        self, param_list, kwargs_lens, kwargs_source, kwargs_lens_light, kwargs_ps
+    ):
+        """Writes the linear amplitudes of the bands evaluated in parallel threads (on
+        copies of the keyword arguments) into the keyword arguments, band by band as in
+        the sequential evaluation.
+
+        :param param_list: list of the linear parameters of the computed bands
+        :param kwargs_lens: list of keyword arguments for the mass profiles
+        :param kwargs_source: list of keyword arguments for the source light profiles
+        :param kwargs_lens_light: list of keyword arguments for the lens light profiles
+        :param kwargs_ps: list of keyword arguments for point sources
+        :return: None
+        """
+        if self._parallel is False:
+            return
+        band_index_list = [
+            i for i in range(self._num_bands) if self._compute_bool[i] is True
+        ]
+        for i, param_i in zip(band_index_list, param_list):
+            self._image_model_list[i].update_linear_kwargs(
+                param_i, kwargs_lens, kwargs_source, kwargs_lens_light, kwargs_ps
+            )
+
     def update_linear_kwargs(
         self,
         param,
@@ -37,7 +37,19 @@ class PixelKernelConvolution(object):
         if convolution_type not in ["fft", "grid", "fft_static"]:
             raise ValueError("convolution_type %s not supported!" % convolution_type)
         self._type = convolution_type
-        self._pre_computed = False
+        # pre-computed Fourier transformed kernels, keyed on the image shape and dtype
+        self._static_cache = {}
+        self._static_lock = threading.Lock()
+
+    def __getstate__(self):
+        # the lock is not pickled (e.g. for a pool of processes)
+        state = self.__dict__.copy()
+        state["_static_lock"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._static_lock = threading.Lock()
 
     def pixel_kernel(self, num_pix=None):
         """Access pixelated kernel.
@@ -81,26 +93,17 @@ class PixelKernelConvolution(object):
         """
         in1 = image
         in1 = np.asarray(in1)
-        if self._pre_computed is False:
-            (
-                self._s1,
-                self._s2,
-                self._complex_result,
-                self._shape,
-                self._fshape,
-                self._fslice,
-                self._sp2,
-            ) = self._static_pre_compute(image)
-            self._pre_computed = True
-        s1, s2, complex_result, shape, fshape, fslice, sp2 = (
-            self._s1,
-            self._s2,
-            self._complex_result,
-            self._shape,
-            self._fshape,
-            self._fslice,
-            self._sp2,
-        )
+        key = (in1.shape, in1.dtype.kind == "c")
+        pre_computed = self._static_cache.get(key)
+        if pre_computed is None:
+            # thread-safe: bands or images convolved in parallel threads compute the
+            # kernel transform only once
+            with self._static_lock:
+                pre_computed = self._static_cache.get(key)
+                if pre_computed is None:
+                    pre_computed = self._static_pre_compute(in1)
+                    self._static_cache[key] = pre_computed
+        s1, s2, complex_result, shape, fshape, fslice, sp2 = pre_computed
         # if in1.ndim == in2.ndim == 0:  # scalar inputs
         #    return in1 * in2
         # elif not in1.ndim == in2.ndim:
@@ -26,6 +26,7 @@ class NumericsSubFrame(PointSourceRendering):
         convolution_kernel_size=None,
         convolution_type="fft_static",
         truncation_conv=None,
+        linear_response_threshold=None,
     ):
         """
 
@@ -54,8 +55,18 @@ class NumericsSubFrame(PointSourceRendering):
         :param truncation_conv: Truncation used for the construction of the convolution kernels (only relevant for Gaussian convolution). By default,
             the truncation from the psf class will be used. Can be overwritten so that different PSFs are used for
             convolution and point source rendering.
+        :param linear_response_threshold: None or float >= 0. If set, the linear solver represents the rows of the
+            source and point source components of the response matrix as sparse matrices, truncating each convolved
+            basis function below this fraction of its peak absolute value. None (default) keeps the dense response
+            matrix.
 
         """
+        if linear_response_threshold is not None and linear_response_threshold < 0:
+            raise ValueError(
+                "linear_response_threshold needs to be None or >= 0, not %s."
+                % linear_response_threshold
+            )
+        self._linear_response_threshold = linear_response_threshold
         # if no super sampling, turn the supersampling convolution off
 
         self._nx, self._ny = pixel_grid.num_pixel_axes
@@ -94,6 +105,14 @@ class NumericsSubFrame(PointSourceRendering):
         )
         return self._complete_frame(image_sub_frame)
 
+    @property
+    def linear_response_threshold(self):
+        """
+
+        :return: None or relative truncation threshold of the sparse response matrix of the linear solver
+        """
+        return self._linear_response_threshold
+
     @property
     def grid_supersampling_factor(self):
         """
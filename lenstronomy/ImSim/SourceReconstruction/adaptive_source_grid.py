@@ -0,0 +1,203 @@
+"""Adaptive source plane pixelization for pixelated source reconstructions.
+
+The source pixel values are defined on irregularly placed nodes and linearly
+(barycentric) interpolated within the triangles of their Delaunay triangulation. The
+nodes are placed with (magnification weighted) k-means clustering of the ray-traced
+image pixel centres, such that the source resolution follows the magnification.
+"""
+
+__author__ = "ajshajib"
+
+import numpy as np
+import scipy.sparse as sparse_matrix
+from scipy.spatial import Delaunay, cKDTree
+
+import lenstronomy.Util.util as util
+
+__all__ = ["AdaptiveSourceGrid", "ray_traced_source_grid"]
+
+
+class AdaptiveSourceGrid(object):
+    """Source plane pixelization on the nodes of a Delaunay triangulation.
+
+    The surface brightness at a source position is the barycentric interpolation of the
+    values of the three nodes of the enclosing triangle, and zero outside the convex
+    hull of the nodes. It can be used instead of a PixelGrid in
+    PixelatedSourceReconstruction, the source pixel values then being in units of the
+    flux per image pixel.
+    """
+
+    def __init__(self, x_nodes, y_nodes):
+        """
+
+        :param x_nodes: x-coordinates of the nodes (source pixels) in angular units
+        :param y_nodes: y-coordinates of the nodes (source pixels) in angular units
+        """
+        self._x_nodes = np.array(x_nodes, dtype=float)
+        self._y_nodes = np.array(y_nodes, dtype=float)
+        if len(self._x_nodes) < 3:
+            raise ValueError("At least 3 nodes are required for the triangulation.")
+        self._triangulation = Delaunay(np.column_stack([self._x_nodes, self._y_nodes]))
+
+    @property
+    def num_pixel(self):
+        """
+
+        :return: number of nodes (source pixels)
+        """
+        return len(self._x_nodes)
+
+    @property
+    def nodes(self):
+        """
+
+        :return: x- and y-coordinates of the nodes
+        """
+        return self._x_nodes, self._y_nodes
+
+    @property
+    def triangulation(self):
+        """
+
+        :return: scipy.spatial.Delaunay triangulation of the nodes
+        """
+        return self._triangulation
+
+    def interpolation_weights(self, x, y):
+        """Barycentric interpolation weights of the nodes at the positions (x, y).
+
+        :param x: x-coordinates of the positions (1d array)
+        :param y: y-coordinates of the positions (1d array)
+        :return: position indices, node indices and weights of the non-vanishing
+            contributions, ordered by position
+        """
+        points = np.column_stack([np.ravel(x), np.ravel(y)])
+        simplex = self._triangulation.find_simplex(points)
+        inside = np.nonzero(simplex >= 0)[0]
+        transform = self._triangulation.transform[simplex[inside]]
+        barycentric = np.einsum(
+            "ijk,ik->ij", transform[:, :2], points[inside] - transform[:, 2]
+        )
+        weights = np.column_stack([barycentric, 1 - np.sum(barycentric, axis=1)])
+        vertices = self._triangulation.simplices[simplex[inside]]
+        return (
+            np.repeat(inside, 3),
+            vertices.ravel(),
+            weights.ravel(),
+        )
+
+    def mapping_matrix(self, x, y):
+        """Sparse matrix mapping the node values to the interpolated surface brightness
+        at the positions (x, y).
+
+        :param x: x-coordinates of the positions (1d array)
+        :param y: y-coordinates of the positions (1d array)
+        :return: scipy.sparse csr matrix of shape (number of positions, num_pixel)
+        """
+        rows, columns, values = self.interpolation_weights(x, y)
+        return sparse_matrix.csr_matrix(
+            (values, (rows, columns)), shape=(np.size(x), self.num_pixel)
+        )
+
+    def interpolate(self, values, x, y):
+        """
+
+        :param values: values of the nodes
+        :param x: x-coordinates of the positions
+        :param y: y-coordinates of the positions
+        :return: interpolated values at the positions (zero outside the convex hull of
+            the nodes), with the shape of x
+        """
+        return np.reshape(
+            self.mapping_matrix(x, y) @ np.asarray(values, dtype=float), np.shape(x)
+        )
+
+
+def ray_traced_source_grid(
+    data_class,
+    lens_model_class,
+    kwargs_lens,
+    num_pixel,
+    mask=None,
+    magnification_power=0,
+    magnification_limit=100,
+    num_iterations=20,
+    seed=42,
+):
+    """Adaptive source grid with the nodes placed by k-means clustering of the ray-
+    traced image pixel centres.
+
+    The ray-traced pixel centres sample the source plane with a density proportional to
+    the magnification, such that the nodes are concentrated where the lensed images
+    resolve the source best. With magnification_power > 0, the pixel centres are
+    additionally weighted with |magnification|^magnification_power, which concentrates
+    the nodes further towards the caustics.
+
+    :param data_class: ImageData() class instance
+    :param lens_model_class: LensModel class instance
+    :param kwargs_lens: List of keyword arguments for the lens_model_class.
+    :param num_pixel: number of nodes (source pixels)
+    :param mask: None or 2d array (1 for the image pixels traced, e.g. the pixels
+        covering the lensed arcs, 0 otherwise)
+    :param magnification_power: power of the magnification weights of the k-means
+        clustering
+    :param magnification_limit: upper limit of the absolute magnification (close to the
+        critical curves) entering the weights
+    :param num_iterations: number of (Lloyd) k-means iterations
+    :param seed: seed of the random initial nodes
+    :return: AdaptiveSourceGrid instance
+    """
+    x_grid, y_grid = data_class.pixel_coordinates
+    x_grid, y_grid = util.image2array(x_grid), util.image2array(y_grid)
+    if mask is not None:
+        select = util.image2array(mask) > 0
+        x_grid, y_grid = x_grid[select], y_grid[select]
+    if num_pixel > len(x_grid):
+        raise ValueError(
+            "num_pixel (%s) exceeds the number of traced image pixels (%s)."
+            % (num_pixel, len(x_grid))
+        )
+    beta_x, beta_y = lens_model_class.ray_shooting(x_grid, y_grid, kwargs=kwargs_lens)
+    weights = np.ones(len(x_grid))
+    if magnification_power != 0:
+        magnification = np.abs(
+            lens_model_class.magnification(x_grid, y_grid, kwargs=kwargs_lens)
+        )
+        magnification = np.minimum(
+            np.nan_to_num(magnification, nan=magnification_limit),
+            magnification_limit,
+        )
+        weights = magnification**magnification_power
+    points = np.column_stack([beta_x, beta_y])
+    nodes = _weighted_kmeans(points, weights, num_pixel, num_iterations, seed)
+    return AdaptiveSourceGrid(nodes[:, 0], nodes[:, 1])
+
+
+def _weighted_kmeans(points, weights, num_clusters, num_iterations, seed):
+    """Weighted k-means clustering with Lloyd iterations.
+
+    :param points: array of shape (n, 2)
+    :param weights: positive weights of the points, shape (n,)
+    :param num_clusters: number of clusters
+    :param num_iterations: number of iterations
+    :param seed: seed of the random initial centres (drawn from the points with
+        probabilities proportional to the weights)
+    :return: unique cluster centres, shape (<= num_clusters, 2)
+    """
+    random = np.random.default_rng(seed)
+    centres = points[
+        random.choice(
+            len(points), num_clusters, replace=False, p=weights / np.sum(weights)
+        )
+    ]
+    for _ in range(num_iterations):
+        _, label = cKDTree(centres).query(points)
+        weight_sum = np.bincount(label, weights, minlength=num_clusters)
+        filled = weight_sum > 0
+        for axis in range(2):
+            weighted_sum = np.bincount(
+                label, weights * points[:, axis], minlength=num_clusters
+            )
+            # empty clusters keep their previous centres
+            centres[filled, axis] = weighted_sum[filled] / weight_sum[filled]
+    return np.unique(centres, axis=0)
@@ -0,0 +1,201 @@
+"""Matrix-free linear algebra for large pixelated source reconstructions.
+
+The normal equations (M + lambda U) s = b of the source pixels s are solved with a
+preconditioned conjugate gradient method and the log-determinant entering the Bayesian
+evidence is estimated with stochastic Lanczos quadrature, such that only products of
+M and U with vectors are needed. M and U can be numpy arrays, scipy.sparse matrices or
+scipy.sparse.linalg.LinearOperator instances (e.g. from
+PixelatedSourceReconstruction.generate_M_operator_b()).
+"""
+
+__author__ = "ajshajib"
+
+import warnings
+
+import numpy as np
+from scipy.linalg import eigh_tridiagonal
+from scipy.sparse.linalg import aslinearoperator
+
+__all__ = [
+    "conjugate_gradient",
+    "regularized_operator",
+    "jacobi_preconditioner",
+    "solve_regularized",
+    "stochastic_lanczos_log_det",
+]
+
+
+def conjugate_gradient(
+    A, b, preconditioner=None, tolerance=1e-8, max_iterations=None, x0=None
+):
+    """Solves A x = b for a symmetric positive definite A with the (Jacobi)
+    preconditioned conjugate gradient method. Several right-hand sides are solved at
+    once (with one product of A with a matrix per iteration).
+
+    :param A: symmetric positive definite matrix or LinearOperator of shape (n, n)
+    :param b: right-hand side, shape (n,) or (n, k)
+    :param preconditioner: None or diagonal of A (or of an approximation of A), shape
+        (n,)
+    :param tolerance: relative tolerance of the norm of the residual
+    :param max_iterations: maximum number of iterations (default: 10 n)
+    :param x0: None or initial guess of the same shape as b
+    :return: solution x of the same shape as b
+    """
+    A = aslinearoperator(A)
+    b = np.asarray(b, dtype=float)
+    vector = b.ndim == 1
+    b = b.reshape(len(b), -1)
+    n, k = b.shape
+    if max_iterations is None:
+        max_iterations = 10 * n
+    if preconditioner is None:
+        inverse_diagonal = np.ones((n, 1))
+    else:
+        inverse_diagonal = 1.0 / np.reshape(preconditioner, (n, 1))
+    if x0 is None:
+        x = np.zeros((n, k))
+        r = b.copy()
+    else:
+        x = np.array(x0, dtype=float).reshape(n, k)
+        r = b - np.reshape(A @ x, (n, k))
+    z = inverse_diagonal * r
+    p = z.copy()
+    rz = np.sum(r * z, axis=0)
+    norm_b = np.linalg.norm(b, axis=0)
+    norm_b[norm_b == 0] = 1
+    active = np.linalg.norm(r, axis=0) > tolerance * norm_b
+    for _ in range(max_iterations):
+        if not np.any(active):
+            break
+        index = np.nonzero(active)[0]
+        p_active = p[:, index]
+        Ap = np.reshape(A @ p_active, (n, len(index)))
+        alpha = rz[index] / np.sum(p_active * Ap, axis=0)
+        x[:, index] += alpha * p_active
+        r[:, index] -= alpha * Ap
+        z_active = inverse_diagonal * r[:, index]
+        rz_new = np.sum(r[:, index] * z_active, axis=0)
+        p[:, index] = z_active + rz_new / rz[index] * p_active
+        rz[index] = rz_new
+        active[index] = np.linalg.norm(r[:, index], axis=0) > tolerance * norm_b[index]
+    if np.any(active):
+        warnings.warn(
+            "conjugate gradient did not converge to a relative tolerance of %s within "
+            "%s iterations." % (tolerance, max_iterations),
+            RuntimeWarning,
+        )
+    if vector:
+        return x[:, 0]
+    return x
+
+
+def regularized_operator(M, U, regularization_strength):
+    """
+
+    :param M: matrix or LinearOperator M
+    :param U: regularization matrix or LinearOperator
+    :param regularization_strength: lambda
+    :return: LinearOperator of M + lambda U
+    """
+    return aslinearoperator(M) + regularization_strength * aslinearoperator(U)
+
+
+def jacobi_preconditioner(M, U, regularization_strength):
+    """Diagonal of M + lambda U, if M and U provide one (numpy arrays, scipy.sparse
+    matrices or operators with a diagonal() method).
+
+    :param M: matrix or LinearOperator M
+    :param U: regularization matrix or LinearOperator
+    :param regularization_strength: lambda
+    :return: diagonal of shape (n,) or None
+    """
+    if not hasattr(M, "diagonal") or not hasattr(U, "diagonal"):
+        return None
+    diagonal = np.asarray(M.diagonal()) + regularization_strength * np.asarray(
+        U.diagonal()
+    )
+    if np.any(diagonal <= 0):
+        return None
+    return diagonal
+
+
+def solve_regularized(
+    M, U, b, regularization_strength, tolerance=1e-8, max_iterations=None
+):
+    """Solves (M + lambda U) s = b with the Jacobi preconditioned conjugate gradient
+    method.
+
+    :param M: matrix or LinearOperator M
+    :param U: regularization matrix or LinearOperator
+    :param b: vector b (or several vectors, shape (n, k))
+    :param regularization_strength: lambda
+    :param tolerance: relative tolerance of the norm of the residual
+    :param max_iterations: maximum number of iterations
+    :return: source pixel values s
+    """
+    return conjugate_gradient(
+        regularized_operator(M, U, regularization_strength),
+        b,
+        preconditioner=jacobi_preconditioner(M, U, regularization_strength),
+        tolerance=tolerance,
+        max_iterations=max_iterations,
+    )
+
+
+def stochastic_lanczos_log_det(
+    A, num_probes=30, num_steps=30, preconditioner=None, seed=42
+):
+    """Estimates log det(A) of a symmetric positive definite A with stochastic Lanczos
+    quadrature: log det(A) = tr(log A) is estimated with Rademacher probe vectors z
+    (Hutchinson), the quadratic forms z^T log(A) z being evaluated with the Gaussian
+    quadrature given by num_steps Lanczos iterations started at z. All probes are
+    iterated at once.
+
+    With a preconditioner D (diagonal of A), log det(A) = log det(D) + log det(D^-1/2 A
+    D^-1/2) is estimated instead, which reduces the variance of the estimate.
+
+    :param A: symmetric positive definite matrix or LinearOperator of shape (n, n)
+    :param num_probes: number of probe vectors
+    :param num_steps: number of Lanczos iterations per probe vector
+    :param preconditioner: None or diagonal of A, shape (n,)
+    :param seed: seed of the random probe vectors (a fixed seed makes the estimate a
+        smooth function of the parameters of A)
+    :return: estimate of log det(A)
+    """
+    A = aslinearoperator(A)
+    n = A.shape[0]
+    log_det_offset = 0
+    if preconditioner is None:
+        scale = np.ones((n, 1))
+    else:
+        scale = 1 / np.sqrt(np.reshape(preconditioner, (n, 1)))
+        log_det_offset = np.sum(np.log(preconditioner))
+    random = np.random.default_rng(seed)
+    v = random.choice([-1.0, 1.0], size=(n, num_probes)) / np.sqrt(n)
+    v_previous = np.zeros_like(v)
+    beta = np.zeros(num_probes)
+    alphas, betas = [], []
+    # number of valid Lanczos coefficients of each probe (breakdown when the Krylov
+    # space is exhausted)
+    num_valid = np.full(num_probes, min(num_steps, n))
+    for step in range(min(num_steps, n)):
+        w = scale * np.reshape(A @ (scale * v), (n, num_probes)) - beta * v_previous
+        alpha = np.sum(w * v, axis=0)
+        w -= alpha * v
+        alphas.append(alpha)
+        if step == min(num_steps, n) - 1:
+            break
+        beta = np.linalg.norm(w, axis=0)
+        breakdown = (beta <= 1e-12 * np.abs(alpha)) & (num_valid > step + 1)
+        num_valid[breakdown] = step + 1
+        beta[beta == 0] = 1
+        betas.append(beta)
+        v_previous, v = v, w / beta
+    alphas = np.array(alphas)
+    betas = np.array(betas).reshape(-1, num_probes)
+    quadrature = np.zeros(num_probes)
+    for i in range(num_probes):
+        m = num_valid[i]
+        eigenvalues, eigenvectors = eigh_tridiagonal(alphas[:m, i], betas[: m - 1, i])
+        quadrature[i] = np.sum(eigenvectors[0] ** 2 * np.log(eigenvalues))
+    return log_det_offset + n * np.mean(quadrature)
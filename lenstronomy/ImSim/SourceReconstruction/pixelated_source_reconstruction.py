@@ -1,7 +1,14 @@
 import numpy as np
+import scipy.fft as sp_fft
+import scipy.sparse as sparse_matrix
+from scipy.signal import fftconvolve
+from scipy.sparse.linalg import LinearOperator
 from tqdm import tqdm
 
 import lenstronomy.Util.util as util
+from lenstronomy.ImSim.SourceReconstruction.adaptive_source_grid import (
+    AdaptiveSourceGrid,
+)
 
 __all__ = ["PixelatedSourceReconstruction"]
 
@@ -16,6 +23,8 @@ class PixelatedSourceReconstruction(object):
     All sparse matrices (sp) in this class are represented as a list of lists:
     [[y_coord, x_coord, pixel_value], ...], where [y_coord, x_coord] are
     the pixel coordinates and pixel_value is the corresponding pixel's value.
+    The lensing and convolution operators used to assemble M and b are scipy.sparse
+    matrices acting on row-major flattened images.
     """
 
     def __init__(
@@ -29,6 +38,7 @@ class PixelatedSourceReconstruction(object):
         :param psf_class: PSF() class instance (for the observed image data)
         :param lens_model_class: LensModel class instance
         :param source_pixel_grid_class: PixelGrid() class instance (defining the source plane grid)
+            or AdaptiveSourceGrid() class instance (adaptive source pixelization)
         :raises ValueError:
             - If the source pixel grid has rotational components or non-uniform pixel widths.
             - If the PSF kernel size is improperly sized for interferometric likelihood methods.
@@ -46,6 +56,35 @@ class PixelatedSourceReconstruction(object):
         self._lens_model_class = lens_model_class
 
         self._source_grid_class = source_pixel_grid_class
+        self._adaptive = isinstance(source_pixel_grid_class, AdaptiveSourceGrid)
+        if self._adaptive:
+            # source pixel values are interpolated on the nodes of the adaptive grid,
+            # in units of the flux per image pixel
+            self._num_pixel_source = source_pixel_grid_class.num_pixel
+            self._ratio_data_pixel_source_pixel = 1
+        else:
+            self._init_rectangular_grid(data_class, source_pixel_grid_class)
+
+        self._kernel = psf_class.kernel_point_source
+        self._shape_kernel = self._kernel.shape
+
+        # Validate PSF kernel size specifically for interferometric likelihood
+        if self._logL_method == "interferometry_natwt":
+            for check_dim in range(2):
+                if self._shape_kernel[check_dim] < 2 * self._num_pix - 1:
+                    raise ValueError(
+                        "PSF kernel size must be at least (2 * num_pix - 1) "
+                        "in each dimension for interferometry_natwt likelihood."
+                    )
+
+    def _init_rectangular_grid(self, data_class, source_pixel_grid_class):
+        """Sets the properties of a rectangular source pixel grid.
+
+        :param data_class: ImageData() class instance
+        :param source_pixel_grid_class: PixelGrid() class instance
+        :raises ValueError: If the source pixel grid has rotational components or non-
+            uniform pixel widths.
+        """
         # Validate source grid properties: no rotation and uniform pixel width
         transform_pix2angle_source = self._source_grid_class.transform_pix2angle
         if (
@@ -67,18 +106,6 @@ class PixelatedSourceReconstruction(object):
             data_class.pixel_area / source_pixel_grid_class.pixel_area
         )
 
-        self._kernel = psf_class.kernel_point_source
-        self._shape_kernel = self._kernel.shape
-
-        # Validate PSF kernel size specifically for interferometric likelihood
-        if self._logL_method == "interferometry_natwt":
-            for check_dim in range(2):
-                if self._shape_kernel[check_dim] < 2 * self._num_pix - 1:
-                    raise ValueError(
-                        "PSF kernel size must be at least (2 * num_pix - 1) "
-                        "in each dimension for interferometry_natwt likelihood."
-                    )
-
     def generate_M_b(self, kwargs_lens, verbose=False, show_progress=True):
         """Generates the M matrix and the b vector for source reconstruction based on
         the selected likelihood method. Definitions of the M and b is given by
@@ -91,7 +118,10 @@ class PixelatedSourceReconstruction(object):
             Defaults to True.
         :returns: (M, b) tuple, where M is the matrix and b is the vector.
         """
-        if verbose:
+        if verbose and self._adaptive:
+            print("number of source pixels:", self._num_pixel_source, "(adaptive grid)")
+            print("likelihood method:", self._logL_method)
+        elif verbose:
             # Print the total number of source pixels in the defined rectangular source region.
             print(
                 "number of source pixels:",
@@ -131,38 +161,38 @@ class PixelatedSourceReconstruction(object):
         """
         if verbose:
             print("Step 1: Lensing the source pixels")
-        lensed_sp = self.lens_pixel_source_of_a_rectangular_region(kwargs_lens)
+        lensing_operator = self.lensing_operator(kwargs_lens)
         if verbose:
             print("Step 1: Finished!")
 
         if verbose:
             print("Step 2: Convolve the lensed pixels")
-        N_lensed = len(lensed_sp)
-        lensed_pixel_conv_set = np.zeros((N_lensed, self._num_pix, self._num_pix))
-        for i in range(N_lensed):
-            lensed_pixel_conv_set[i] = self.sparse_convolution(
-                lensed_sp[i], self._kernel
-            )
+        weights = util.image2array(1 / self._C_D)
+        data = util.image2array(self._image_data)
+        if self._use_sparse_convolution(lensing_operator):
+            # sparse blurred lensing operator (PL), M = (PL)^T C_D^-1 (PL)
+            blurred = (self.convolution_operator() @ lensing_operator).tocsc()
+        else:
+            # dense (num_pixel_source, num_pix**2) rows of the blurred lensed pixels
+            blurred = np.zeros((self._num_pixel_source, self._num_pix**2))
+            for index in self._chunks(False):
+                blurred[index] = self._convolve_lensed_pixels(lensing_operator, index)
         if verbose:
             print("Step 2: Finished!")
 
         if verbose:
             print("Step 3: Compute the matrix M and vector b")
-        M = np.zeros((N_lensed, N_lensed))
-        b = np.zeros((N_lensed))
-        for i in tqdm(
-            range(N_lensed),
-            desc="Running (iteration times vary)",
-            disable=not show_progress,
-        ):
-            b[i] = np.sum(lensed_pixel_conv_set[i] * self._image_data / self._C_D)
-            for j in range(N_lensed):
-                if j < i:
-                    M[i, j] = M[j, i]  # Exploit symmetry
-                else:
-                    M[i, j] = np.sum(
-                        lensed_pixel_conv_set[i] * lensed_pixel_conv_set[j] / self._C_D
-                    )
+        M = np.zeros((self._num_pixel_source, self._num_pixel_source))
+        if sparse_matrix.issparse(blurred):
+            weighted = sparse_matrix.diags(weights) @ blurred
+            for index in self._chunks(show_progress):
+                M[:, index] = (blurred.T @ weighted[:, index]).toarray()
+            b = blurred.T @ (weights * data)
+        else:
+            weighted = blurred * weights
+            for index in self._chunks(show_progress):
+                M[:, index] = blurred.dot(weighted[index].T)
+            b = weighted.dot(data)
         if verbose:
             print("Step 3: Finished!")
 
@@ -186,7 +216,7 @@ class PixelatedSourceReconstruction(object):
         """
         if verbose:
             print("Step 1: Lensing the source pixels")
-        lensed_sp = self.lens_pixel_source_of_a_rectangular_region(kwargs_lens)
+        lensing_operator = self.lensing_operator(kwargs_lens)
         if verbose:
             print("Step 1: Finished!")
 
@@ -194,25 +224,13 @@ class PixelatedSourceReconstruction(object):
             print(
                 "Step 2: Compute the matrix M and vector b (including the convolution step)"
             )
-        N_lensed = len(lensed_sp)
-        M = np.zeros((N_lensed, N_lensed))
-        b = np.zeros((N_lensed))
-        for i in tqdm(
-            range(N_lensed),
-            desc="Running (iteration times vary)",
-            disable=not show_progress,
-        ):
-            b[i] = self.sum_sparse_elementwise_product(lensed_sp[i], self._image_data)
-            pixel_lensed_convolved = self.sparse_convolution(
-                lensed_sp[i], self._kernel
-            )  # convolution
-            for j in range(N_lensed):
-                if j < i:
-                    M[i, j] = M[j, i]  # Exploit symmetry
-                else:
-                    M[i, j] = self.sum_sparse_elementwise_product(
-                        lensed_sp[j], pixel_lensed_convolved
-                    )
+        # M = L^T P L, computed for chunks of columns of the convolved lensed pixels
+        lensing_operator_T = lensing_operator.T.tocsr()
+        M = np.zeros((self._num_pixel_source, self._num_pixel_source))
+        for index in self._chunks(show_progress):
+            convolved = self._convolve_lensed_pixels(lensing_operator, index)
+            M[:, index] = lensing_operator_T @ convolved.T
+        b = lensing_operator_T @ util.image2array(self._image_data)
         b /= self._noise_rms**2
         M /= self._noise_rms**2
         if verbose:
@@ -220,6 +238,238 @@ class PixelatedSourceReconstruction(object):
 
         return M, b
 
+    def generate_M_operator_b(self, kwargs_lens):
+        """Matrix-free version of generate_M_b(). The matrix M is not formed but
+        returned as a linear operator applying M = (PL)^T C_D^-1 (PL) (diagonal
+        likelihood) or M = L^T P L / sigma^2 (interferometry_natwt likelihood) with the
+        sparse lensing operator L and FFT (large kernels) or sparse (small kernels)
+        convolutions P. Memory and cost per application scale with the number of image
+        pixels instead of the square of the number of source pixels.
+
+        :param kwargs_lens: List of keyword arguments for the lens_model_class.
+        :returns: (M, b) tuple, where M is a scipy.sparse.linalg.LinearOperator (with a
+            diagonal() method returning an approximation of the diagonal of M for
+            preconditioning) and b is the vector.
+        """
+        lensing_operator = self.lensing_operator(kwargs_lens).tocsr()
+        lensing_operator_T = lensing_operator.T.tocsr()
+        data = util.image2array(self._image_data)
+        lensing_squared = lensing_operator_T.multiply(lensing_operator_T)
+        if self._logL_method == "interferometry_natwt":
+            convolve = self._fft_convolution(self._kernel)
+            scale = 1 / self._noise_rms**2
+
+            def apply(x):
+                return lensing_operator_T @ convolve(lensing_operator @ x) * scale
+
+            kernel_center = int(len(self._kernel) / 2)
+            # contributions of the image pixels to themselves only
+            diagonal = (
+                lensing_squared.sum(axis=1).A1
+                * self._kernel[kernel_center, kernel_center]
+                * scale
+            )
+            b = lensing_operator_T @ data * scale
+            return _MatrixFreeOperator(apply, diagonal), b
+
+        weights = util.image2array(1 / self._C_D)
+        if self._use_sparse_convolution(lensing_operator):
+            blurred = (self.convolution_operator() @ lensing_operator).tocsr()
+            blurred_T = blurred.T.tocsr()
+
+            def apply(x):
+                return blurred_T @ (weights[:, None] * (blurred @ x))
+
+            diagonal = blurred_T.multiply(blurred_T) @ weights
+            b = blurred_T @ (weights * data)
+            return _MatrixFreeOperator(apply, diagonal), b
+
+        convolve = self._fft_convolution(self._kernel)
+        convolve_T = self._fft_convolution(self._kernel[::-1, ::-1])
+
+        def apply(x):
+            return lensing_operator_T @ convolve_T(
+                weights[:, None] * convolve(lensing_operator @ x)
+            )
+
+        # neglects the overlap of the blurred images of neighbouring image pixels
+        diagonal = lensing_squared @ weights * np.sum(self._kernel**2)
+        b = lensing_operator_T @ convolve_T((weights * data)[:, None])[:, 0]
+        return _MatrixFreeOperator(apply, diagonal), b
+
+    def _fft_convolution(self, kernel):
+        """FFT convolution of images with the Fourier transform of the kernel computed
+        once, with the same boundary treatment as convolution_operator().
+
+        :param kernel: 2D kernel, with its center at the central pixel
+        :returns: function convolving an array of shape (num_pix**2, k) of k row-major
+            flattened images
+        """
+        num_pix = self._num_pix
+        kernel_center = int(len(kernel) / 2)
+        shape = [
+            sp_fft.next_fast_len(num_pix + num_kernel - 1, real=True)
+            for num_kernel in np.shape(kernel)
+        ]
+        kernel_fft = sp_fft.rfft2(kernel, shape)
+
+        def convolve(images):
+            num = images.shape[1]
+            images = images.T.reshape(num, num_pix, num_pix)
+            convolved = sp_fft.irfft2(sp_fft.rfft2(images, shape) * kernel_fft, shape)
+            convolved = convolved[
+                :,
+                kernel_center : kernel_center + num_pix,
+                kernel_center : kernel_center + num_pix,
+            ]
+            return convolved.reshape(num, num_pix**2).T
+
+        return convolve
+
+    def _lensing_weights(self, kwargs_lens):
+        """Bilinear interpolation weights of the source pixels for each image pixel,
+        with the same boundary treatment as lens_pixel_source_of_a_rectangular_region()
+        (barycentric interpolation weights of the nodes for an adaptive source grid).
+
+        :param kwargs_lens: List of keyword arguments for the lens_model_class.
+        :returns: image pixel indices (row-major), source pixel indices and weights of
+            the non-vanishing contributions, ordered by image pixel
+        """
+        beta_x_grid_2d, beta_y_grid_2d = self._lens_model_class.ray_shooting(
+            self._x_grid_data, self._y_grid_data, kwargs=kwargs_lens
+        )
+        factor = np.ones(self._num_pix**2) * self._ratio_data_pixel_source_pixel
+        if self._primary_beam is not None:
+            factor = factor * util.image2array(self._primary_beam)
+        if self._adaptive:
+            rows, columns, values = self._source_grid_class.interpolation_weights(
+                util.image2array(beta_x_grid_2d), util.image2array(beta_y_grid_2d)
+            )
+            return rows, columns, values * factor[rows]
+        x_source = (beta_x_grid_2d - self._source_min_x) / self._pixel_width_source
+        y_source = (beta_y_grid_2d - self._source_min_y) / self._pixel_width_source
+        x_floor = util.image2array(np.floor(x_source).astype(int))
+        y_floor = util.image2array(np.floor(y_source).astype(int))
+        delta_x_pixel = util.image2array(x_source) - x_floor
+        delta_y_pixel = util.image2array(y_source) - y_floor
+        corners = [
+            (0, 0, (1 - delta_x_pixel) * (1 - delta_y_pixel)),
+            (1, 0, delta_x_pixel * (1 - delta_y_pixel)),
+            (0, 1, delta_y_pixel * (1 - delta_x_pixel)),
+            (1, 1, delta_x_pixel * delta_y_pixel),
+        ]
+        image_index = np.arange(self._num_pix**2)
+        rows, columns, values = [], [], []
+        for dx, dy, weight in corners:
+            x, y = x_floor + dx, y_floor + dy
+            inside = (x >= 0) & (x < self._nx_source) & (y >= 0) & (y < self._ny_source)
+            rows.append(image_index[inside])
+            columns.append(self._nx_source * y[inside] + x[inside])
+            values.append((weight * factor)[inside])
+        rows = np.concatenate(rows)
+        order = np.argsort(rows, kind="stable")
+        return (
+            rows[order],
+            np.concatenate(columns)[order],
+            np.concatenate(values)[order],
+        )
+
+    def lensing_operator(self, kwargs_lens):
+        """Sparse lensing operator L mapping the source pixels to the (unconvolved)
+        image pixels with bilinear interpolation (barycentric interpolation for an
+        adaptive source grid), such that the lensed image of the source pixel values s
+        is L s (see lens_pixel_source_of_a_rectangular_region()).
+
+        :param kwargs_lens: List of keyword arguments for the lens_model_class.
+        :returns: scipy.sparse matrix of shape (num_pix**2, number of source pixels),
+            the image pixels being ordered row-major
+        """
+        rows, columns, values = self._lensing_weights(kwargs_lens)
+        return sparse_matrix.csc_matrix(
+            (values, (rows, columns)),
+            shape=(self._num_pix**2, self._num_pixel_source),
+        )
+
+    def convolution_operator(self, kernel=None):
+        """Sparse convolution operator P of the PSF kernel (with the same boundary
+        treatment as sparse_convolution()), such that the convolved image of an image x
+        is P x for row-major flattened images.
+
+        :param kernel: The 2D PSF kernel (NumPy array). Assumed to be square with odd dimensions,
+                       with its center at the central pixel. If None, `self._kernel` is used
+        :returns: scipy.sparse csr matrix of shape (num_pix**2, num_pix**2)
+        """
+        if kernel is None:
+            if getattr(self, "_convolution_operator", None) is None:
+                self._convolution_operator = self.convolution_operator(self._kernel)
+            return self._convolution_operator
+        kernel_center = int(len(kernel) / 2)
+        y, x = np.divmod(np.arange(self._num_pix**2), self._num_pix)
+        rows, columns, values = [], [], []
+        for k_y, k_x in zip(*np.nonzero(kernel)):
+            y_out, x_out = y + k_y - kernel_center, x + k_x - kernel_center
+            inside = (
+                (y_out >= 0)
+                & (y_out < self._num_pix)
+                & (x_out >= 0)
+                & (x_out < self._num_pix)
+            )
+            rows.append(y_out[inside] * self._num_pix + x_out[inside])
+            columns.append(y[inside] * self._num_pix + x[inside])
+            values.append(np.full(np.sum(inside), kernel[k_y, k_x]))
+        return sparse_matrix.csr_matrix(
+            (np.concatenate(values), (np.concatenate(rows), np.concatenate(columns))),
+            shape=(self._num_pix**2, self._num_pix**2),
+        )
+
+    def _use_sparse_convolution(self, lensing_operator):
+        """Whether the blurred lensing operator is formed as a sparse matrix product
+        (small kernels) or by FFT convolution of dense rows (large kernels).
+
+        :param lensing_operator: sparse lensing operator
+        :returns: bool
+        """
+        num_kernel = np.count_nonzero(self._kernel)
+        # upper bound of the non-zero entries of the blurred lensing operator
+        num_sparse = lensing_operator.nnz * num_kernel
+        num_dense = self._num_pixel_source * self._num_pix**2
+        return bool(num_kernel < self._num_pixel_source and num_sparse < num_dense)
+
+    def _convolve_lensed_pixels(self, lensing_operator, index):
+        """FFT convolution of the lensed images of a subset of the source pixels.
+
+        :param lensing_operator: sparse lensing operator (csc format)
+        :param index: slice of the source pixels
+        :returns: array of shape (number of source pixels in index, num_pix**2) of the
+            convolved lensed source pixels
+        """
+        lensed = lensing_operator[:, index].toarray().T
+        num = len(lensed)
+        lensed = lensed.reshape(num, self._num_pix, self._num_pix)
+        kernel_center = int(len(self._kernel) / 2)
+        convolved = fftconvolve(lensed, self._kernel[None], mode="full", axes=(1, 2))
+        convolved = convolved[
+            :,
+            kernel_center : kernel_center + self._num_pix,
+            kernel_center : kernel_center + self._num_pix,
+        ]
+        return convolved.reshape(num, self._num_pix**2)
+
+    def _chunks(self, show_progress, chunk_size=256):
+        """Slices of the source pixels processed at once.
+
+        :param show_progress: If True, show progress bar.
+        :param chunk_size: number of source pixels per slice
+        :returns: iterator of slices
+        """
+        starts = range(0, self._num_pixel_source, chunk_size)
+        for start in tqdm(
+            starts,
+            desc="Running (iteration times vary)",
+            disable=not show_progress,
+        ):
+            yield slice(start, min(start + chunk_size, self._num_pixel_source))
+
     def lens_pixel_source_of_a_rectangular_region(self, kwargs_lens):
         """Maps image plane pixels to source plane pixels within a specified rectangular
         source grid, considering lensing deflections and applying bilinear
@@ -234,92 +484,12 @@ class PixelatedSourceReconstruction(object):
         """
 
         lensed_pixel_sp = [[] for _ in range(self._num_pixel_source)]
-
-        beta_x_grid_2d, beta_y_grid_2d = self._lens_model_class.ray_shooting(
-            self._x_grid_data, self._y_grid_data, kwargs=kwargs_lens
-        )
-
-        # Calculate integer pixel indices (floor/ceiling) in the source plane
-        x_floor = np.floor(
-            (beta_x_grid_2d - self._source_min_x) / self._pixel_width_source
-        ).astype(int)
-        x_ceiling = x_floor + 1
-        y_floor = np.floor(
-            (beta_y_grid_2d - self._source_min_y) / self._pixel_width_source
-        ).astype(int)
-        y_ceiling = y_floor + 1
-
-        # Calculate fractional pixel offsets for bilinear interpolation
-        delta_x_pixel = (
-            beta_x_grid_2d - self._source_min_x
-        ) / self._pixel_width_source - x_floor
-        delta_y_pixel = (
-            beta_y_grid_2d - self._source_min_y
-        ) / self._pixel_width_source - y_floor
-
-        # Compute bilinear interpolation weights
-        w00 = (1 - delta_x_pixel) * (1 - delta_y_pixel)
-        w10 = delta_x_pixel * (1 - delta_y_pixel)
-        w01 = delta_y_pixel * (1 - delta_x_pixel)
-        w11 = delta_x_pixel * delta_y_pixel
-
-        # Apply the ratio (data image pixel area / source grid pixel area) to ensure the flux conservation
-        w00 *= self._ratio_data_pixel_source_pixel
-        w10 *= self._ratio_data_pixel_source_pixel
-        w01 *= self._ratio_data_pixel_source_pixel
-        w11 *= self._ratio_data_pixel_source_pixel
-
-        # Apply primary beam modulation if specified
-        if self._primary_beam is not None:
-            w00 *= self._primary_beam
-            w10 *= self._primary_beam
-            w01 *= self._primary_beam
-            w11 *= self._primary_beam
-
-        for i in range(self._num_pix):
-            for j in range(self._num_pix):
-                # Skip if the lensed image pixel falls entirely outside the source region
-                if (
-                    x_ceiling[i][j] < 0
-                    or x_floor[i][j] > (self._nx_source - 1)
-                    or y_ceiling[i][j] < 0
-                    or y_floor[i][j] > (self._ny_source - 1)
-                ):
-                    continue
-
-                # Calculate linear indices of the four potential source pixels
-                source_pixel_index00 = self._nx_source * (y_floor[i][j]) + x_floor[i][j]
-                source_pixel_index10 = source_pixel_index00 + 1
-                source_pixel_index01 = source_pixel_index00 + self._nx_source
-                source_pixel_index11 = source_pixel_index01 + 1
-
-                # Flags for boundary checking
-                check00, check01, check10, check11 = True, True, True, True
-
-                # Adjust flags for contributions near the boundary
-                if x_floor[i][j] == -1:
-                    check00 = False
-                    check01 = False
-                elif x_ceiling[i][j] == self._nx_source:
-                    check10 = False
-                    check11 = False
-
-                if y_floor[i][j] == -1:
-                    check00 = False
-                    check10 = False
-                elif y_ceiling[i][j] == self._ny_source:
-                    check11 = False
-                    check01 = False
-
-                # Append the contribution of each source pixel to the image pixel (i,j) with weight.
-                if check00:
-                    lensed_pixel_sp[source_pixel_index00].append([i, j, w00[i][j]])
-                if check10:
-                    lensed_pixel_sp[source_pixel_index10].append([i, j, w10[i][j]])
-                if check01:
-                    lensed_pixel_sp[source_pixel_index01].append([i, j, w01[i][j]])
-                if check11:
-                    lensed_pixel_sp[source_pixel_index11].append([i, j, w11[i][j]])
+        rows, columns, values = self._lensing_weights(kwargs_lens)
+        y_image, x_image = np.divmod(rows, self._num_pix)
+        for i, j, k, value in zip(
+            y_image.tolist(), x_image.tolist(), columns.tolist(), values
+        ):
+            lensed_pixel_sp[k].append([i, j, value])
         return lensed_pixel_sp
 
     def lens_an_image_by_rayshooting(self, kwargs_lens, source_image):
@@ -335,13 +505,22 @@ class PixelatedSourceReconstruction(object):
 
         :param kwargs_lens: List of keyword arguments for the lens_model_class.
         :param image: 2D NumPy array representing the pixelated source plane image. Expected to have
-                      dimensions defined by source_pixel_grid_class.
+                      dimensions defined by source_pixel_grid_class (1D array of the node values for an
+                      AdaptiveSourceGrid).
         :type image: numpy.ndarray
         :returns: 2D NumPy array representing the lensed image in the image plane.
         :rtype: numpy.ndarray
         :raises ValueError: If the input `image` dimensions do not match the dimensions of the
                             defined source pixel grid (`self._ny_source`, `self._nx_source`).
         """
+        if self._adaptive:
+            # source_image are the values of the nodes of the adaptive grid
+            beta_x_grid_2d, beta_y_grid_2d = self._lens_model_class.ray_shooting(
+                self._x_grid_data, self._y_grid_data, kwargs=kwargs_lens
+            )
+            return self._source_grid_class.interpolate(
+                source_image, beta_x_grid_2d, beta_y_grid_2d
+            )
 
         ny_source_check, nx_source_check = np.shape(source_image)
         if nx_source_check != self._nx_source or ny_source_check != self._ny_source:
@@ -591,3 +770,35 @@ class PixelatedSourceReconstruction(object):
                 val_sp * kernel[slice_y_start:slice_y_end, slice_x_start:slice_x_end]
             )
         return convolved
+
+
+class _MatrixFreeOperator(LinearOperator):
+    """Symmetric linear operator defined by its (batched) application, with an
+    approximate diagonal for preconditioning."""
+
+    def __init__(self, apply, diagonal):
+        """
+
+        :param apply: function applying the operator to an array of shape (n, k)
+        :param diagonal: approximate diagonal of the operator, shape (n,)
+        """
+        self._apply = apply
+        self._diagonal = np.asarray(diagonal)
+        num = len(self._diagonal)
+        super(_MatrixFreeOperator, self).__init__(dtype=float, shape=(num, num))
+
+    def _matvec(self, x):
+        return self._apply(np.reshape(x, (-1, 1)))[:, 0]
+
+    def _matmat(self, x):
+        return self._apply(np.asarray(x))
+
+    def _adjoint(self):
+        return self
+
+    def diagonal(self):
+        """
+
+        :return: approximate diagonal of the operator
+        """
+        return self._diagonal
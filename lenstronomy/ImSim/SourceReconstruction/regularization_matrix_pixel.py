@@ -7,14 +7,19 @@ Currently supported regularization types include:
 - Zeroth-order (L2 norm on pixel amplitudes)
 - Gradient (L2 norm on spatial gradients, promoting smoothness)
 - Curvature (L2 norm on second-order derivatives, promoting smoother variations)
+
+for rectangular source grids and for the Delaunay triangulated nodes of adaptive source
+grids.
 """
 
 import numpy as np
+import scipy.sparse as sparse_matrix
+from scipy.spatial import Delaunay
 
-__all__ = ["pixelated_regularization_matrix"]
+__all__ = ["pixelated_regularization_matrix", "adaptive_regularization_matrix"]
 
 
-def pixelated_regularization_matrix(xlen, ylen, regularization_type):
+def pixelated_regularization_matrix(xlen, ylen, regularization_type, sparse=False):
     """Constructs the regularization matrix for a rectangular pixelated source region.
 
     The regularization term for pixel amplitudes :math:`\\mathbf{a}` (flattened into a 1D vector)
@@ -30,7 +35,10 @@ def pixelated_regularization_matrix(xlen, ylen, regularization_type):
     :param ylen: int, Number of pixels in the y-direction (vertical dimension of the source grid).
     :param regularization_type: str, Type of regularization to apply.
                                 Supported options are 'zeroth_order', 'gradient', 'curvature'.
-    :return: numpy.ndarray, The regularization matrix :math:`U` with shape `(xlen * ylen, xlen * ylen)`.
+    :param sparse: bool, if True, returns the matrix in scipy.sparse csr format (e.g. for the
+                   matrix-free solvers of large source grids).
+    :return: numpy.ndarray (or scipy.sparse matrix if `sparse`), The regularization matrix :math:`U`
+             with shape `(xlen * ylen, xlen * ylen)`.
     :raises TypeError: If `xlen` or `ylen` are not integers.
     :raises ValueError: If an unsupported `regularization_type` is provided.
     """
@@ -38,6 +46,10 @@ def pixelated_regularization_matrix(xlen, ylen, regularization_type):
         raise TypeError(f"xlen must be an integer, but got {type(xlen).__name__}.")
     if not isinstance(ylen, int):
         raise TypeError(f"ylen must be an integer, but got {type(ylen).__name__}.")
+    if sparse is True and regularization_type in _STENCILS:
+        return _sparse_regularization_matrix_pixel(
+            xlen, ylen, _STENCILS[regularization_type]
+        )
     if regularization_type == "zeroth_order":
         return _zeroth_order_regularization_matrix_pixel(xlen, ylen)
     elif regularization_type == "gradient":
@@ -165,3 +177,95 @@ def _curvature_regularization_matrix_pixel(xlen, ylen):
         )
 
     return Umatrix
+
+
+# symmetric 1D stencils (diagonal, first off-diagonal, ...) of the regularization
+# matrices, U = I_y (x) S_x + S_y (x) I_x (zeroth order: U = I)
+_STENCILS = {
+    "zeroth_order": [0.5],
+    "gradient": [2, -1],
+    "curvature": [6, -4, 1],
+}
+
+
+def _sparse_regularization_matrix_pixel(xlen, ylen, stencil):
+    """Constructs a regularization matrix in scipy.sparse format as the sum of the 1D
+    regularization matrices along the x and y axes (Kronecker products with the identity
+    along the other axis), which is identical to the dense matrices of the functions
+    above.
+
+    :param xlen: int, Number of pixels in the x-direction.
+    :param ylen: int, Number of pixels in the y-direction.
+    :param stencil: list of the diagonal and upper off-diagonal values of the 1D matrix.
+    :return: scipy.sparse csr matrix with shape `(xlen * ylen, xlen * ylen)`.
+    """
+
+    def matrix_1d(length):
+        offsets = [k for k in range(1 - len(stencil), len(stencil)) if abs(k) < length]
+        return sparse_matrix.diags(
+            [stencil[abs(k)] for k in offsets],
+            offsets,
+            shape=(length, length),
+            dtype=float,
+        )
+
+    Umatrix = sparse_matrix.kron(
+        sparse_matrix.identity(ylen), matrix_1d(xlen)
+    ) + sparse_matrix.kron(matrix_1d(ylen), sparse_matrix.identity(xlen))
+    return sparse_matrix.csr_matrix(Umatrix)
+
+
+def adaptive_regularization_matrix(x_nodes, y_nodes, regularization_type, sparse=False):
+    """Constructs the regularization matrix :math:`U` of an adaptive source grid with
+    the pixel amplitudes :math:`\\mathbf{a}` defined on the nodes of a Delaunay
+    triangulation (see AdaptiveSourceGrid), the neighbours of a node being the nodes it
+    shares a triangle edge with.
+
+    - 'zeroth_order': :math:`\\sum_i a_i^2`
+    - 'gradient': :math:`\\sum_{(i, j)} (a_i - a_j)^2` over the edges of the triangulation
+    - 'curvature': :math:`\\sum_i (a_i - \\langle a_j \\rangle_{j \\in N(i)})^2` with the
+      mean amplitude of the neighbours :math:`N(i)` of node i
+
+    As for the rectangular grids, the amplitudes outside the grid are treated as zero by
+    adding :math:`a_i^2` for the nodes on the convex hull, such that :math:`U` is
+    positive definite.
+
+    :param x_nodes: x-coordinates of the nodes.
+    :param y_nodes: y-coordinates of the nodes.
+    :param regularization_type: str, Type of regularization to apply.
+                                Supported options are 'zeroth_order', 'gradient', 'curvature'.
+    :param sparse: bool, if True, returns the matrix in scipy.sparse csr format.
+    :return: numpy.ndarray (or scipy.sparse matrix if `sparse`), The regularization matrix :math:`U`
+             with shape `(number of nodes, number of nodes)`.
+    :raises ValueError: If an unsupported `regularization_type` is provided.
+    """
+    num_nodes = len(x_nodes)
+    if regularization_type == "zeroth_order":
+        Umatrix = sparse_matrix.identity(num_nodes, format="csr")
+    elif regularization_type in ["gradient", "curvature"]:
+        triangulation = Delaunay(np.column_stack([x_nodes, y_nodes]))
+        indptr, indices = triangulation.vertex_neighbor_vertices
+        num_neighbours = np.diff(indptr)
+        adjacency = sparse_matrix.csr_matrix(
+            (np.ones(len(indices)), indices, indptr), shape=(num_nodes, num_nodes)
+        )
+        hull = np.zeros(num_nodes)
+        hull[np.unique(triangulation.convex_hull)] = 1
+        if regularization_type == "gradient":
+            # graph Laplacian of the triangulation
+            Umatrix = sparse_matrix.diags(num_neighbours + hull) - adjacency
+        else:
+            curvature = (
+                sparse_matrix.identity(num_nodes)
+                - sparse_matrix.diags(1 / num_neighbours) @ adjacency
+            )
+            Umatrix = curvature.T @ curvature + sparse_matrix.diags(hull)
+        Umatrix = sparse_matrix.csr_matrix(Umatrix)
+    else:
+        raise ValueError(
+            f"Unsupported regularization_type: '{regularization_type}'. "
+            "Supported options are: 'zeroth_order', 'gradient', 'curvature'."
+        )
+    if sparse is True:
+        return Umatrix
+    return Umatrix.toarray()
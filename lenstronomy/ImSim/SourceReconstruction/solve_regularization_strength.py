@@ -1,5 +1,14 @@
 import numpy as np
 from typing import Callable
+from scipy.linalg import eigh
+from scipy.optimize import brentq
+
+from lenstronomy.ImSim.SourceReconstruction.matrix_free_solver import (
+    conjugate_gradient,
+    jacobi_preconditioner,
+    regularized_operator,
+    stochastic_lanczos_log_det,
+)
 
 
 def d_log_evi_d_lambda(l: float, U: np.ndarray, M: np.ndarray, b: np.ndarray) -> float:
@@ -44,6 +53,97 @@ def d_log_evi_d_lambda(l: float, U: np.ndarray, M: np.ndarray, b: np.ndarray) ->
     return derivative_value
 
 
+def d_log_evi_d_lambda_matrix_free(
+    l: float,
+    U,
+    M,
+    b: np.ndarray,
+    num_probes: int = 30,
+    seed: int = 42,
+    tolerance: float = 1e-8,
+) -> float:
+    """Matrix-free version of d_log_evi_d_lambda() for large source grids, with the same
+    arguments and call signature (such that it can be passed to solve_optimal_lambda()).
+
+    The products with (M+lambda*U)^-1 are computed with the preconditioned conjugate
+    gradient method and the trace term tr[(M+lambda*U)^-1 * U] is estimated from
+    num_probes Rademacher probe vectors z as the mean of z^T (M+lambda*U)^-1 U z. The
+    probes and b are solved for at once.
+
+    :param l: The current value of the regularization strength (lambda).
+    :param U: The regularization matrix (numpy.ndarray, scipy.sparse matrix or
+        LinearOperator).
+    :param M: The M matrix (numpy.ndarray, scipy.sparse matrix or LinearOperator, e.g.
+        from PixelatedSourceReconstruction.generate_M_operator_b()).
+    :param b: The b vector (numpy.ndarray).
+    :param num_probes: number of probe vectors of the trace estimate.
+    :param seed: seed of the probe vectors. A fixed seed makes the estimate a smooth
+        function of lambda, as required by the bisection of solve_optimal_lambda().
+    :param tolerance: relative tolerance of the conjugate gradient solutions.
+    :return: The estimated derivative value (float).
+    """
+    N_source = U.shape[0]
+    random = np.random.default_rng(seed)
+    probes = random.choice([-1.0, 1.0], size=(N_source, num_probes))
+    U_probes = np.reshape(U @ probes, (N_source, num_probes))
+    solution = conjugate_gradient(
+        regularized_operator(M, U, l),
+        np.column_stack([b, U_probes]),
+        preconditioner=jacobi_preconditioner(M, U, l),
+        tolerance=tolerance,
+    )
+    M_plus_lambda_U_inv_b = solution[:, 0]
+    trace_term = np.mean(np.sum(probes * solution[:, 1:], axis=0))
+    quadratic_term = np.sum(M_plus_lambda_U_inv_b * (U @ M_plus_lambda_U_inv_b))
+    return (N_source / l) - trace_term - quadratic_term
+
+
+def log_evidence_matrix_free(
+    l: float,
+    U,
+    M,
+    b: np.ndarray,
+    num_probes: int = 30,
+    num_steps: int = 30,
+    seed: int = 42,
+    tolerance: float = 1e-8,
+) -> float:
+    """Matrix-free estimate of the lambda-dependent terms of the logarithm of the
+    Bayesian evidence,
+
+    ln(Evidence) = b^T s / 2 - ln det(M+lambda*U) / 2 + N_s ln(lambda) / 2 + const,
+
+    with s = (M+lambda*U)^-1 b solved for with the preconditioned conjugate gradient
+    method and ln det(M+lambda*U) estimated with stochastic Lanczos quadrature. The
+    constant (independent of lambda) contains ln det(U) / 2 and the chi^2 of the data.
+
+    :param l: The current value of the regularization strength (lambda).
+    :param U: The regularization matrix (numpy.ndarray, scipy.sparse matrix or
+        LinearOperator).
+    :param M: The M matrix (numpy.ndarray, scipy.sparse matrix or LinearOperator).
+    :param b: The b vector (numpy.ndarray).
+    :param num_probes: number of probe vectors of the stochastic Lanczos quadrature.
+    :param num_steps: number of Lanczos iterations per probe vector.
+    :param seed: seed of the probe vectors.
+    :param tolerance: relative tolerance of the conjugate gradient solution.
+    :return: The estimated log-evidence up to a constant (float).
+    """
+    N_source = U.shape[0]
+    operator = regularized_operator(M, U, l)
+    preconditioner = jacobi_preconditioner(M, U, l)
+    source = conjugate_gradient(
+        operator, b, preconditioner=preconditioner, tolerance=tolerance
+    )
+    log_det = stochastic_lanczos_log_det(
+        operator,
+        num_probes=num_probes,
+        num_steps=num_steps,
+        preconditioner=preconditioner,
+        seed=seed,
+    )
+    return (np.sum(b * source) - log_det + N_source * np.log(l)) / 2
+
+
 def solve_optimal_lambda(
     derivative_function: Callable[[float, np.ndarray, np.ndarray, np.ndarray], float],
     U: np.ndarray,
@@ -136,3 +236,132 @@ def solve_optimal_lambda(
 
     # Return the midpoint of the final interval as the approximate optimal lambda
     return (current_lower_bound + current_upper_bound) / 2
+
+
+class RegularizationSpectrum(object):
+    """Closed-form log-evidence of the regularization strength (lambda) from a single
+    generalized eigendecomposition.
+
+    The generalized symmetric eigenproblem M v = mu U v is solved once (with a
+    Cholesky factorization of U and an eigendecomposition of the transformed M), the
+    eigenvectors being normalized such that V^T U V = I. With b_tilde = V^T b, it
+    follows for any lambda that
+
+    - ln det(M+lambda*U) = ln det(U) + sum ln(mu + lambda)
+    - tr[(M+lambda*U)^-1 * U] = sum 1 / (mu + lambda)
+    - b^T * (M+lambda*U)^-1 * b = sum b_tilde^2 / (mu + lambda)
+    - b^T * (M+lambda*U)^-1 * U * (M+lambda*U)^-1 * b = sum b_tilde^2 / (mu + lambda)^2
+
+    such that the log-evidence and its derivative cost O(N_s) per lambda (instead of
+    O(N_s^3) for d_log_evi_d_lambda()) and a whole grid of lambda values is evaluated
+    at once. U must be positive definite.
+    """
+
+    def __init__(self, U, M: np.ndarray, b: np.ndarray):
+        """
+
+        :param U: The regularization matrix (numpy.ndarray or scipy.sparse matrix).
+        :param M: The M matrix (numpy.ndarray).
+        :param b: The b vector (numpy.ndarray).
+        """
+        if hasattr(U, "toarray"):
+            U = U.toarray()
+        try:
+            self._mu, self._V = eigh(M, U)
+        except np.linalg.LinAlgError:
+            raise ValueError(
+                "The regularization matrix U must be positive definite for the "
+                "generalized eigendecomposition."
+            )
+        self._b_tilde = self._V.T.dot(b)
+        self._num_source = len(self._mu)
+
+    @property
+    def eigenvalues(self):
+        """
+
+        :return: generalized eigenvalues mu of M v = mu U v
+        """
+        return self._mu
+
+    def _inverse(self, l):
+        """
+
+        :param l: regularization strength, float or 1d array
+        :return: 1 / (mu + lambda), shape (len(l), N_s) for an array
+        """
+        return 1.0 / (self._mu + np.expand_dims(np.asarray(l, dtype=float), -1))
+
+    def d_log_evi_d_lambda(self, l):
+        """Derivative of the log-evidence with respect to lambda, with the same
+        convention as d_log_evi_d_lambda().
+
+        :param l: regularization strength, float or 1d array of values
+        :return: derivative value(s) of the shape of l
+        """
+        inverse = self._inverse(l)
+        return (
+            self._num_source / np.asarray(l, dtype=float)
+            - np.sum(inverse, axis=-1)
+            - np.sum(self._b_tilde**2 * inverse**2, axis=-1)
+        )
+
+    def log_evidence(self, l):
+        """Lambda-dependent terms of the logarithm of the Bayesian evidence, with the.
+
+        same convention as log_evidence_matrix_free() plus ln det(U) / 2 (as sum ln(mu + lambda) = ln
+        det(M+lambda*U) - ln det(U)).
+
+        :param l: regularization strength, float or 1d array of values
+        :return: log-evidence value(s) up to a constant, of the shape of l
+        """
+        inverse = self._inverse(l)
+        return (
+            np.sum(self._b_tilde**2 * inverse, axis=-1)
+            + np.sum(np.log(inverse), axis=-1)
+            + self._num_source * np.log(np.asarray(l, dtype=float))
+        ) / 2
+
+    def source(self, l: float) -> np.ndarray:
+        """
+
+        :param l: regularization strength
+        :return: source pixel values s = (M+lambda*U)^-1 b
+        """
+        return self._V.dot(self._b_tilde * self._inverse(l))
+
+    def optimal_lambda(
+        self,
+        lower_bound: float,
+        upper_bound: float,
+        num_grid: int = 100,
+        tolerance: float = 1e-7,
+    ) -> float:
+        """Regularization strength maximizing the log-evidence within the bounds.
+
+        The log-evidence is evaluated on a logarithmic grid of num_grid values between
+        the bounds and the root of its derivative next to the best grid value is refined
+        with Brent's method. If the maximum is at one of the bounds, the bound is
+        returned.
+
+        :param lower_bound: lower bound of lambda
+        :param upper_bound: upper bound of lambda
+        :param num_grid: number of grid values
+        :param tolerance: absolute tolerance of the refined lambda
+        :return: optimal regularization strength
+        """
+        if not (0 < lower_bound < upper_bound):
+            raise ValueError(
+                "The bounds must satisfy 0 < `lower_bound` < `upper_bound`."
+            )
+        grid = np.geomspace(lower_bound, upper_bound, num_grid)
+        index = int(np.argmax(self.log_evidence(grid)))
+        lower = grid[max(index - 1, 0)]
+        upper = grid[min(index + 1, num_grid - 1)]
+        derivative_lower = self.d_log_evi_d_lambda(lower)
+        derivative_upper = self.d_log_evi_d_lambda(upper)
+        if derivative_lower <= 0:
+            return lower
+        if derivative_upper >= 0:
+            return upper
+        return brentq(self.d_log_evi_d_lambda, lower, upper, xtol=tolerance)
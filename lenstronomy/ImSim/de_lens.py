@@ -2,6 +2,8 @@ __author__ = "sibirrer"
 
 import numpy as np
 import sys
+from scipy.linalg import cho_factor, cho_solve
+from scipy.linalg.lapack import dpocon
 
 from lenstronomy.Util.package_util import exporter
 
@@ -20,28 +22,169 @@ def get_param_WLS(A, C_D_inv, d, inv_bool=True):
     :return: 1-d array of parameter values
     """
     M = A.T.dot(np.multiply(C_D_inv, A.T).T)
-    cond_inv = _cond_inv(M)
+    R = A.T.dot(np.multiply(C_D_inv, d))
+    B, M_inv = get_param_normal(M, R, inv_bool=inv_bool)
+    image = A.dot(B)
+    return B, M_inv, image
+
+
+@export
+def get_param_normal(M, R, inv_bool=True, return_log_det=False):
+    """Solves the normal equations M x = R of the weighted least squares problem with a
+    Cholesky factorization of M. Ill-conditioned systems (see _cond_inv()) return zeros.
 
+    :param M: normal matrix A^T C_D^-1 A, Ns x Ns positive-semi-definite and symmetric
+        (Ns = # parameters)
+    :param R: data projection A^T C_D^-1 d, 1-d Ns
+    :param inv_bool: boolean, whether returning also the inverse matrix or just solve
+        the linear system
+    :param return_log_det: boolean, whether returning also the log determinant of the
+        inverse of M from the factorization (None if it is not available), to be passed
+        to marginalization_new()
+    :return: 1-d array of parameter values, inverse of M (or None if inv_bool=False)
+        (and its log determinant if return_log_det=True)
+    """
+    factor = _cholesky(M)
+    if factor is not None:
+        B, M_inv, log_det = _cholesky_solve(factor, R, inv_bool)
+        if return_log_det:
+            return B, M_inv, log_det
+        return B, M_inv
+    # not positive definite or ill-conditioned
+    cond_inv = _cond_inv(M)
     if inv_bool:
         if cond_inv:
             M_inv = _stable_inv(M)
         else:
             M_inv = np.zeros_like(M)
-        R = A.T.dot(np.multiply(C_D_inv, d))
         B = M_inv.dot(R)
     else:
         if cond_inv:
-            R = A.T.dot(np.multiply(C_D_inv, d))
             B = _solve_stable(M, R)
-            # try:
-            #    B = np.linalg.solve(M, R).T
-            # except:
-            #    B = np.zeros(len(A.T))
         else:
-            B = np.zeros(len(A.T))
+            B = np.zeros(np.shape(R)[0])
         M_inv = None
-    image = A.dot(B)
-    return B, M_inv, image
+    if return_log_det:
+        return B, M_inv, None
+    return B, M_inv
+
+
+@export
+def get_param_block_normal(
+    M_shared,
+    R_shared,
+    M_cross_list,
+    M_local_list,
+    R_local_list,
+    inv_bool=True,
+    return_log_det=False,
+):
+    """Solves the normal equations of a weighted least squares problem with shared
+    parameters x_s and local parameters x_i (e.g. of individual imaging bands) that are
+    only coupled to the shared ones,
+
+        [[M_s,   C_1, ..., C_n],      [x_s,     [R_s,
+         [C_1^T, M_1,   0,   0],  x    x_1,  =   R_1,
+         ...                           ...       ...
+         [C_n^T, 0,     0, M_n]]       x_n]      R_n],
+
+    with the Schur complement S = M_s - sum_i C_i M_i^-1 C_i^T of the block diagonal
+    local part, such that only the local blocks and S are factorized. Falls back to
+    get_param_normal() of the full matrix if a block is not positive definite or
+    ill-conditioned.
+
+    :param M_shared: normal matrix M_s of the shared parameters, Ns x Ns
+    :param R_shared: data projection R_s of the shared parameters, 1-d Ns
+    :param M_cross_list: list of the coupling matrices C_i, Ns x Ni
+    :param M_local_list: list of the normal matrices M_i of the local parameters,
+        Ni x Ni
+    :param R_local_list: list of the data projections R_i of the local parameters,
+        1-d Ni
+    :param inv_bool: boolean, whether returning also the inverse matrix or just solve
+        the linear system
+    :param return_log_det: boolean, whether returning also the log determinant of the
+        inverse of the full normal matrix (None if it is not available)
+    :return: 1-d array of parameter values [x_s, x_1, ..., x_n], inverse of the full
+        normal matrix (or None if inv_bool=False) (and its log determinant if
+        return_log_det=True)
+    """
+    factor_local_list = [_cholesky(M_i) for M_i in M_local_list]
+    if all(factor is not None for factor in factor_local_list):
+        # M_i^-1 C_i^T and M_i^-1 R_i
+        X_list = [
+            cho_solve(factor, np.transpose(C_i))
+            for factor, C_i in zip(factor_local_list, M_cross_list)
+        ]
+        y_list = [
+            cho_solve(factor, R_i)
+            for factor, R_i in zip(factor_local_list, R_local_list)
+        ]
+        S = np.array(M_shared, dtype=float)
+        R_schur = np.array(R_shared, dtype=float)
+        for C_i, X_i, y_i in zip(M_cross_list, X_list, y_list):
+            S -= np.dot(C_i, X_i)
+            R_schur -= np.dot(C_i, y_i)
+        factor_schur = _cholesky(S)
+        if factor_schur is not None:
+            x_shared, S_inv, log_det_S = _cholesky_solve(
+                factor_schur, R_schur, inv_bool
+            )
+            x_local_list = [
+                y_i - np.dot(X_i, x_shared) for X_i, y_i in zip(X_list, y_list)
+            ]
+            param = np.concatenate([x_shared] + x_local_list)
+            M_inv, log_det = None, None
+            if inv_bool:
+                M_inv, log_det = _block_inverse(
+                    S_inv, log_det_S, X_list, factor_local_list
+                )
+            if return_log_det:
+                return param, M_inv, log_det
+            return param, M_inv
+    # assemble the full matrix
+    M = np.block(
+        [[M_shared] + list(M_cross_list)]
+        + [
+            [np.transpose(C_i)]
+            + [
+                M_i if j == i else np.zeros((len(M_i), len(M_j)))
+                for j, M_j in enumerate(M_local_list)
+            ]
+            for i, (C_i, M_i) in enumerate(zip(M_cross_list, M_local_list))
+        ]
+    )
+    R = np.concatenate([R_shared] + list(R_local_list))
+    return get_param_normal(M, R, inv_bool=inv_bool, return_log_det=return_log_det)
+
+
+def _block_inverse(S_inv, log_det_S, X_list, factor_local_list):
+    """Inverse of the block matrix of get_param_block_normal() from the inverse of the
+    Schur complement.
+
+    :param S_inv: inverse of the Schur complement
+    :param log_det_S: log determinant of S_inv
+    :param X_list: list of M_i^-1 C_i^T
+    :param factor_local_list: list of Cholesky factorizations of M_i
+    :return: inverse of the block matrix, its log determinant
+    """
+    num_shared = len(S_inv)
+    num_local_list = [len(X_i) for X_i in X_list]
+    num = num_shared + sum(num_local_list)
+    M_inv = np.zeros((num, num))
+    M_inv[:num_shared, :num_shared] = S_inv
+    start_list = num_shared + np.cumsum([0] + num_local_list[:-1])
+    log_det = log_det_S
+    for X_i, factor_i, start_i in zip(X_list, factor_local_list, start_list):
+        index_i = slice(start_i, start_i + len(X_i))
+        cross_i = -np.dot(X_i, S_inv)
+        M_inv[index_i, :num_shared] = cross_i
+        M_inv[:num_shared, index_i] = cross_i.T
+        M_inv[index_i, index_i] = cho_solve(factor_i, np.eye(len(X_i)))
+        for X_j, start_j in zip(X_list, start_list):
+            index_j = slice(start_j, start_j + len(X_j))
+            M_inv[index_i, index_j] += np.dot(-cross_i, X_j.T)
+        log_det -= 2 * np.sum(np.log(np.diag(factor_i[0])))
+    return M_inv, log_det
 
 
 @export
@@ -58,30 +201,20 @@ def get_param_WLS_interferometry(M, b, inv_bool=True):
     :return: param_amps: 1-d array of linear parameter values,
         M_inv the covariance matrix of linear parameters
     """
-    cond_inv = _cond_inv(M)
-    if inv_bool:
-        if cond_inv:
-            M_inv = _stable_inv(M)
-        else:
-            M_inv = np.zeros_like(M)
-        param_amps = M_inv.dot(b)
-    else:
-        if cond_inv:
-            param_amps = _solve_stable(M, b)
-        else:
-            param_amps = np.zeros(b.shape[0])
-        M_inv = None
-    return param_amps, M_inv
+    return get_param_normal(M, b, inv_bool=inv_bool)
 
 
 @export
-def marginalisation_const(M_inv):
+def marginalisation_const(M_inv, log_det=None):
     """Get marginalisation constant 1/2 log(M_beta) for flat priors.
 
     :param M_inv: 2D covariance matrix
+    :param log_det: None or log determinant of M_inv (e.g. from the Cholesky
+        factorization of get_param_normal()), avoids its decomposition
     :return: float
     """
-
+    if log_det is not None:
+        return log_det / 2
     sign, log_det = np.linalg.slogdet(M_inv)
     if sign == 0:
         return -(10**15)
@@ -107,15 +240,21 @@ def _cond_inv(M):
 
 
 @export
-def marginalization_new(M_inv, d_prior=None):
+def marginalization_new(M_inv, d_prior=None, log_det=None):
     """
 
     :param M_inv: 2D covariance matrix
     :param d_prior: maximum prior length of linear parameters
+    :param log_det: None or log determinant of M_inv (e.g. from the Cholesky
+        factorization of get_param_normal()), avoids its decomposition
     :return: log determinant with eigenvalues to be smaller or equal d_prior
     """
     if d_prior is None:
-        return marginalisation_const(M_inv)
+        return marginalisation_const(M_inv, log_det=log_det)
+    m = len(M_inv)
+    if log_det is not None and np.trace(M_inv) <= d_prior**2:
+        # the largest eigenvalue is bounded by the trace, no eigenvalue is limited
+        return log_det / 2 + m / 2.0 * np.log(np.pi / 2.0) - m * np.log(d_prior)
     v, w = np.linalg.eig(M_inv)
     sign_v = np.sign(v)
     v_abs = np.abs(v)
@@ -124,10 +263,47 @@ def marginalization_new(M_inv, d_prior=None):
     log_det = np.sum(np.log(v_abs)) * np.prod(sign_v)
     if np.isnan(log_det):
         return -(10**15)
-    m = len(v)
     return log_det / 2 + m / 2.0 * np.log(np.pi / 2.0) - m * np.log(d_prior)
 
 
+def _cholesky(m):
+    """Cholesky factorization of a symmetric positive definite matrix, with the ill-
+    conditioning criterion of _cond_inv() applied to the reciprocal condition number (in
+    the 1-norm) estimated from the factor by LAPACK (dpocon).
+
+    :param m: symmetric matrix
+    :return: factorization (see scipy.linalg.cho_factor) or None if the matrix is not
+        positive definite or ill-conditioned
+    """
+    if len(m) == 0:
+        return None
+    try:
+        factor = cho_factor(m, lower=True)
+    except (np.linalg.LinAlgError, ValueError):
+        return None
+    rcond, info = dpocon(factor[0], np.linalg.norm(m, 1), uplo="L")
+    if info != 0 or not rcond > sys.float_info.epsilon / 5:
+        return None
+    return factor
+
+
+def _cholesky_solve(factor, r, inv_bool):
+    """
+
+    :param factor: Cholesky factorization of M, see _cholesky()
+    :param r: vector
+    :param inv_bool: bool, whether to return the inverse of M
+    :return: solution of M x = r, inverse of M (or None), log determinant of the
+        inverse of M
+    """
+    x = cho_solve(factor, r)
+    log_det = -2 * np.sum(np.log(np.diag(factor[0])))
+    if not inv_bool:
+        return x, None, log_det
+    M_inv = cho_solve(factor, np.eye(len(r)))
+    return x, M_inv, log_det
+
+
 def _stable_inv(m):
     """Stable linear inversion.
 
@@ -1,9 +1,11 @@
+import threading
+
 import numpy as np
 from lenstronomy.Cosmo.background import Background
 from lenstronomy.ImSim.multiplane_organizer import MultiPlaneOrganizer
 from lenstronomy.Util.cosmo_util import get_astropy_cosmology
 
-__all__ = ["Image2SourceMapping"]
+__all__ = ["Image2SourceMapping", "RayShootingCache"]
 
 
 class Image2SourceMapping(object):
@@ -38,6 +40,8 @@ class Image2SourceMapping(object):
         self._lens_model = lens_model
         light_model_list = source_model.profile_type_list
         self._multi_lens_plane = lens_model.multi_plane
+        self._ray_shooting_cache = None
+        self._grid_key = None
         self._distance_ratio_sampling = False
         self._cosmology_sampling = False
 
@@ -178,6 +182,44 @@ class Image2SourceMapping(object):
         plane."""
         self._T_ij_end_list = T_ij_end_list
 
+    def set_ray_shooting_cache(self, cache, grid_key=None):
+        """Sets a (potentially shared) cache of the ray-traced coordinates of the
+        evaluation grid of the image numerics, e.g. shared among imaging bands with
+        identical grids and lens models.
+
+        :param cache: RayShootingCache instance or None to disable the cache
+        :param grid_key: hashable key identifying the evaluation grid and lens model;
+            mappings sharing a cache must only have identical keys if their grids and
+            lens models are identical
+        :return: None
+        """
+        self._ray_shooting_cache = cache
+        self._grid_key = grid_key
+
+    def _ray_shooting(self, x, y, kwargs_lens, kwargs_special=None, shared_grid=False):
+        """Ray-shooting of the single source plane, looked up in the ray-shooting cache
+        if (x, y) is the evaluation grid.
+
+        :param x: coordinate in image plane
+        :param y: coordinate in image plane
+        :param kwargs_lens: lens model kwargs list
+        :param kwargs_special: special parameter keyword arguments
+        :param shared_grid: bool, if True, (x, y) are the coordinates evaluated by the
+            image numerics
+        :return: source plane coordinates
+        """
+        if shared_grid is False or self._ray_shooting_cache is None:
+            return self._lens_model.ray_shooting(x, y, kwargs_lens)
+        if self._distance_ratio_sampling or self._cosmology_sampling:
+            kwargs_key = (kwargs_lens, kwargs_special)
+        else:
+            kwargs_key = kwargs_lens
+        return self._ray_shooting_cache.ray_shooting(
+            self._grid_key,
+            kwargs_key,
+            lambda: self._lens_model.ray_shooting(x, y, kwargs_lens),
+        )
+
     def image2source(self, x, y, kwargs_lens, index_source, kwargs_special=None):
         """
         mapping of image plane to source plane coordinates
@@ -241,7 +283,14 @@ class Image2SourceMapping(object):
             self.set_background_cosmo(cosmo)
 
     def image_flux_joint(
-        self, x, y, kwargs_lens, kwargs_source, kwargs_special=None, k=None
+        self,
+        x,
+        y,
+        kwargs_lens,
+        kwargs_source,
+        kwargs_special=None,
+        k=None,
+        shared_grid=False,
     ):
         """Computes the surface brightness of all light components at image position (x,
         y)
@@ -251,13 +300,17 @@ class Image2SourceMapping(object):
         :param kwargs_lens: lens model kwargs list
         :param kwargs_source: source model kwargs list
         :param k: None or int or list of int for partial evaluation of light models
+        :param shared_grid: bool, if True, (x, y) are the coordinates evaluated by the
+            image numerics and their ray-tracing is looked up in the ray-shooting cache
         :return: surface brightness of all joint light components at image position (x,
             y)
         """
         self.update_distances(kwargs_special)
 
         if self._multi_source_plane is False:
-            x_source, y_source = self._lens_model.ray_shooting(x, y, kwargs_lens)
+            x_source, y_source = self._ray_shooting(
+                x, y, kwargs_lens, kwargs_special, shared_grid=shared_grid
+            )
             return self._light_model.surface_brightness(
                 x_source, y_source, kwargs_source, k=k
             )
@@ -308,7 +361,9 @@ class Image2SourceMapping(object):
                     z_start = z_stop
             return flux
 
-    def image_flux_split(self, x, y, kwargs_lens, kwargs_source, kwargs_special=None):
+    def image_flux_split(
+        self, x, y, kwargs_lens, kwargs_source, kwargs_special=None, shared_grid=False
+    ):
         """Computes the surface brightness of all light components at image position (x,
         y)
 
@@ -316,13 +371,17 @@ class Image2SourceMapping(object):
         :param y: coordinate in image plane
         :param kwargs_lens: lens model kwargs list
         :param kwargs_source: source model kwargs list
+        :param shared_grid: bool, if True, (x, y) are the coordinates evaluated by the
+            image numerics and their ray-tracing is looked up in the ray-shooting cache
         :return: list of responses of every single basis component with default
             amplitude amp=1, in the same order as the light_model_list
         """
         self.update_distances(kwargs_special)
 
         if self._multi_source_plane is False:
-            x_source, y_source = self._lens_model.ray_shooting(x, y, kwargs_lens)
+            x_source, y_source = self._ray_shooting(
+                x, y, kwargs_lens, kwargs_special, shared_grid=shared_grid
+            )
             return self._light_model.functions_split(x_source, y_source, kwargs_source)
         else:
             response = []
@@ -416,3 +475,89 @@ class Image2SourceMapping(object):
             ]
             n_sum_sorted += n_i
         return reshuffled
+
+
+class RayShootingCache(object):
+    """Cache of the ray-traced coordinates of evaluation grids, shared among the
+    Image2SourceMapping instances of several imaging bands.
+
+    Bands with identical evaluation grids (pixel grid, supersampling) and lens models
+    are assigned the same grid key, such that the ray-shooting is only performed once
+    per grid for a given set of lens parameters (e.g. once per likelihood call in a
+    multi-band fit). Only the ray-traced coordinates of the most recent lens parameters
+    are kept for each grid. The look-ups are thread-safe; bands of the same grid
+    evaluated in parallel threads wait for the ray-shooting of the first one.
+    """
+
+    def __init__(self):
+        self._store = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        # the locks are not pickled (e.g. for a pool of processes) and the cached
+        # coordinates are not copied
+        state = self.__dict__.copy()
+        state["_store"] = {}
+        state["_lock"] = None
+        state["_key_locks"] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def ray_shooting(self, grid_key, kwargs_lens, function):
+        """Look-up of the ray-traced coordinates of a grid, computed with function() if
+        not cached for the lens parameters.
+
+        :param grid_key: hashable key of the evaluation grid and lens model
+        :param kwargs_lens: lens model keyword arguments (nested lists and dictionaries
+            of floats, arrays, strings or None)
+        :param function: function without arguments returning the ray-traced coordinates
+        :return: ray-traced coordinates as returned by function()
+        """
+        kwargs_key = _kwargs_key(kwargs_lens)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(grid_key, threading.Lock())
+        with key_lock:
+            cached = self._store.get(grid_key)
+            if cached is not None and cached[0] == kwargs_key:
+                self.hits += 1
+                return cached[1]
+            value = function()
+            self._store[grid_key] = (kwargs_key, value)
+            self.misses += 1
+            return value
+
+    def clear(self):
+        """Deletes all cached coordinates and resets the hit and miss counters.
+
+        :return: None
+        """
+        self._store.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._store)
+
+
+def _kwargs_key(obj):
+    """Hashable key of (nested lists and dictionaries of) keyword arguments.
+
+    :param obj: object to convert
+    :return: hashable object
+    """
+    if isinstance(obj, dict):
+        return tuple((k, _kwargs_key(obj[k])) for k in sorted(obj))
+    if isinstance(obj, (list, tuple)):
+        return tuple(_kwargs_key(o) for o in obj)
+    if obj is None or isinstance(obj, (str, bool)):
+        return obj
+    array = np.asarray(obj)
+    if array.dtype.kind in "iuf":
+        return array.shape, array.astype(float).tobytes()
+    return repr(obj)
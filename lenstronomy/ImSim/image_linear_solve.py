@@ -4,6 +4,7 @@ from lenstronomy.Util import util
 from lenstronomy.Util import primary_beam_util
 from lenstronomy.ImSim.Numerics.convolution import PixelKernelConvolution
 import numpy as np
+import scipy.sparse as sparse
 
 __all__ = ["ImageLinearFit"]
 
@@ -61,6 +62,12 @@ class ImageLinearFit(ImageModel):
             kwargs_pixelbased=kwargs_pixelbased,
         )
 
+        # lens light rows of the response matrix and their blocks of the normal
+        # equations, re-used while the lens light model does not change
+        self._lens_light_block = None
+        # covariance matrix of the last linear solve and its log determinant from the
+        # Cholesky factorization, used for the marginalization
+        self._log_det_cache = (None, None)
         # prepare to use fft convolution for the natwt linear solver
         if self.Data.likelihood_method() == "interferometry_natwt":
             self._convolution = PixelKernelConvolution(
@@ -111,21 +118,18 @@ class ImageLinearFit(ImageModel):
                 kwargs_special,
             )
         elif self.Data.likelihood_method() == "diagonal":
-            A = ImageLinearFit.linear_response_matrix(
-                self,
+            C_D_response, model_error = ImageModel.error_response(
+                self, kwargs_lens, kwargs_ps, kwargs_special=kwargs_special
+            )
+            param, cov_param, wls_model = self._linear_solve_diagonal(
                 kwargs_lens,
                 kwargs_source,
                 kwargs_lens_light,
                 kwargs_ps,
                 kwargs_extinction,
                 kwargs_special,
-            )
-            C_D_response, model_error = ImageModel.error_response(
-                self, kwargs_lens, kwargs_ps, kwargs_special=kwargs_special
-            )
-            d = self.data_response
-            param, cov_param, wls_model = de_lens.get_param_WLS(
-                A.T, 1 / C_D_response, d, inv_bool=inv_bool
+                1 / C_D_response,
+                inv_bool=inv_bool,
             )
             model = self.array_masked2image(wls_model)
             _, _, _, _ = ImageLinearFit.update_linear_kwargs(
@@ -295,7 +299,9 @@ class ImageLinearFit(ImageModel):
         if self._pixelbased_bool is False:
             if cov_matrix is not None and source_marg:
                 marg_const = de_lens.marginalization_new(
-                    cov_matrix, d_prior=linear_prior
+                    cov_matrix,
+                    d_prior=linear_prior,
+                    log_det=self._cov_param_log_det(cov_matrix),
                 )
                 logL += marg_const
         if check_positive_flux is True:
@@ -356,10 +362,49 @@ class ImageLinearFit(ImageModel):
         :param unconvolved: bool, if True, computes components without convolution kernel (will not work for point sources)
         :return: response matrix (m x n)
         """
-        x_grid, y_grid = self.ImageNumerics.coordinates_evaluate
+        A_source = self._source_response(
+            kwargs_lens, kwargs_source, kwargs_extinction, kwargs_special, unconvolved
+        )
+        A_lens_light = self._lens_light_response(kwargs_lens_light, unconvolved)
+        A_point_source = self._point_source_response(
+            kwargs_ps, kwargs_lens, kwargs_special
+        )
+        return np.append(
+            np.append(A_source, A_lens_light, axis=0), A_point_source, axis=0
+        )
+
+    def _source_response(
+        self,
+        kwargs_lens,
+        kwargs_source,
+        kwargs_extinction=None,
+        kwargs_special=None,
+        unconvolved=False,
+        threshold=None,
+    ):
+        """Rows of the linear response matrix of the lensed source profiles.
 
+        :param kwargs_lens: list of keyword arguments corresponding to the superposition
+            of different lens profiles
+        :param kwargs_source: list of keyword arguments corresponding to the
+            superposition of different source light profiles
+        :param kwargs_extinction: list of keyword arguments for extinction model
+        :param kwargs_special: list of special keyword arguments
+        :param unconvolved: bool, if True, computes components without convolution
+            kernel
+        :param threshold: None or relative truncation threshold of a sparse response
+            matrix
+        :return: response matrix of the source components (n_source x n), a scipy.sparse
+            csr matrix if threshold is not None
+        """
+        x_grid, y_grid = self.ImageNumerics.coordinates_evaluate
         source_light_response, n_source = self.source_mapping.image_flux_split(
-            x_grid, y_grid, kwargs_lens, kwargs_source, kwargs_special
+            x_grid,
+            y_grid,
+            kwargs_lens,
+            kwargs_source,
+            kwargs_special,
+            shared_grid=True,
         )
         extinction = self._extinction.extinction(
             x_grid,
@@ -367,40 +412,226 @@ class ImageLinearFit(ImageModel):
             kwargs_extinction=kwargs_extinction,
             kwargs_special=kwargs_special,
         )
+
+        def rows():
+            for i in range(0, n_source):
+                image = source_light_response[i]
+                image *= extinction
+                image = self.ImageNumerics.re_size_convolve(
+                    image, unconvolved=unconvolved
+                )
+                yield np.nan_to_num(self.image2array_masked(image), copy=False)
+
+        A = _response_matrix(rows(), n_source, self.num_data_evaluate, threshold)
+        return A * self._flux_scaling
+
+    def _lens_light_response(self, kwargs_lens_light, unconvolved=False):
+        """Rows of the linear response matrix of the deflector light profiles (or any
+        other un-lensed extended components).
+
+        :param kwargs_lens_light: list of keyword arguments corresponding to different
+            lens light surface brightness profiles
+        :param unconvolved: bool, if True, computes components without convolution
+            kernel
+        :return: response matrix of the lens light components (n_lens_light x n)
+        """
+        x_grid, y_grid = self.ImageNumerics.coordinates_evaluate
         lens_light_response, n_lens_light = self.LensLightModel.functions_split(
             x_grid, y_grid, kwargs_lens_light
         )
+        A = np.zeros((n_lens_light, self.num_data_evaluate))
+        for i in range(0, n_lens_light):
+            image = lens_light_response[i]
+            image = self.ImageNumerics.re_size_convolve(image, unconvolved=unconvolved)
+            A[i, :] = np.nan_to_num(self.image2array_masked(image), copy=False)
+        return A * self._flux_scaling
 
+    def _point_source_response(
+        self, kwargs_ps, kwargs_lens, kwargs_special=None, threshold=None
+    ):
+        """Rows of the linear response matrix of the point sources.
+
+        :param kwargs_ps: keyword arguments corresponding to "other" parameters, such as
+            external shear and point source image positions
+        :param kwargs_lens: list of keyword arguments corresponding to the superposition
+            of different lens profiles
+        :param kwargs_special: list of special keyword arguments
+        :param threshold: None or relative truncation threshold of a sparse response
+            matrix
+        :return: response matrix of the point source components (n_points x n), a
+            scipy.sparse csr matrix if threshold is not None
+        """
         ra_pos, dec_pos, amp, n_points = self.point_source_linear_response_set(
             kwargs_ps, kwargs_lens, kwargs_special, with_amp=False
         )
-        num_param = n_points + n_lens_light + n_source
 
-        num_response = self.num_data_evaluate
-        A = np.zeros((num_param, num_response))
-        n = 0
-        # response of lensed source profile
-        for i in range(0, n_source):
-            image = source_light_response[i]
-            image *= extinction
-            image = self.ImageNumerics.re_size_convolve(image, unconvolved=unconvolved)
-            A[n, :] = np.nan_to_num(self.image2array_masked(image), copy=False)
-            n += 1
-        # response of deflector light profile (or any other un-lensed extended components)
-        for i in range(0, n_lens_light):
-            image = lens_light_response[i]
-            image = self.ImageNumerics.re_size_convolve(image, unconvolved=unconvolved)
-            A[n, :] = np.nan_to_num(self.image2array_masked(image), copy=False)
-            n += 1
-        # response of point sources
-        for i in range(0, n_points):
-            image = self.ImageNumerics.point_source_rendering(
-                ra_pos[i], dec_pos[i], amp[i]
-            )
-            A[n, :] = np.nan_to_num(self.image2array_masked(image), copy=False)
-            n += 1
+        def rows():
+            for i in range(0, n_points):
+                image = self.ImageNumerics.point_source_rendering(
+                    ra_pos[i], dec_pos[i], amp[i]
+                )
+                yield np.nan_to_num(self.image2array_masked(image), copy=False)
+
+        A = _response_matrix(rows(), n_points, self.num_data_evaluate, threshold)
         return A * self._flux_scaling
 
+    def _linear_solve_diagonal(
+        self,
+        kwargs_lens,
+        kwargs_source,
+        kwargs_lens_light,
+        kwargs_ps,
+        kwargs_extinction,
+        kwargs_special,
+        C_D_inv,
+        inv_bool=True,
+    ):
+        """Weighted least squares solution of the linear amplitudes for a diagonal data
+        covariance. The normal equations are assembled block-wise: the lens light rows
+        of the response matrix and their blocks of the normal matrix M = A C_D^-1 A^T
+        and of the data projection R = A C_D^-1 d are re-used as long as the lens light
+        model, the data, the noise and the PSF do not change, and only the blocks of the
+        source and point source rows are recomputed.
+
+        With a linear_response_threshold set in kwargs_numerics, the source and point
+        source rows are truncated sparse matrices and their blocks of the normal
+        equations are computed with sparse products (e.g. for large shapelet bases and
+        point sources, whose convolved basis functions cover few pixels).
+
+        :param kwargs_lens: list of keyword arguments corresponding to the superposition
+            of different lens profiles
+        :param kwargs_source: list of keyword arguments corresponding to the
+            superposition of different source light profiles
+        :param kwargs_lens_light: list of keyword arguments corresponding to different
+            lens light surface brightness profiles
+        :param kwargs_ps: keyword arguments corresponding to "other" parameters, such as
+            external shear and point source image positions
+        :param kwargs_extinction: list of keyword arguments for extinction model
+        :param kwargs_special: list of special keyword arguments
+        :param C_D_inv: 1d array of the inverse variances of the evaluated pixels
+        :param inv_bool: boolean, whether returning also the covariance matrix
+        :return: linear parameters, covariance matrix (or None), 1d array of the model
+            of the evaluated pixels
+        """
+        d = self.data_response
+        threshold = getattr(self.ImageNumerics, "linear_response_threshold", None)
+        A_source = self._source_response(
+            kwargs_lens,
+            kwargs_source,
+            kwargs_extinction,
+            kwargs_special,
+            threshold=threshold,
+        )
+        A_point_source = self._point_source_response(
+            kwargs_ps, kwargs_lens, kwargs_special, threshold=threshold
+        )
+        A_lens_light, M_lens_light, R_lens_light = self._lens_light_normal_block(
+            kwargs_lens_light, C_D_inv, d
+        )
+        n_source, n_lens_light = A_source.shape[0], len(A_lens_light)
+        if threshold is None:
+            A_var = np.append(A_source, A_point_source, axis=0)
+            WA_var = A_var * C_D_inv
+            M_var = WA_var.dot(A_var.T)
+        else:
+            A_var = sparse.vstack([A_source, A_point_source], format="csr")
+            WA_var = sparse.csr_matrix(A_var.multiply(C_D_inv))
+            M_var = (WA_var @ A_var.T).toarray()
+        num_param = A_var.shape[0] + n_lens_light
+        # indices of the source and point source rows in the full response matrix
+        index_var = np.append(
+            np.arange(n_source), np.arange(n_source + n_lens_light, num_param)
+        )
+        index_lens_light = np.arange(n_source, n_source + n_lens_light)
+        M = np.zeros((num_param, num_param))
+        R = np.zeros(num_param)
+        M[np.ix_(index_var, index_var)] = M_var
+        M_cross = WA_var @ A_lens_light.T
+        M[np.ix_(index_var, index_lens_light)] = M_cross
+        M[np.ix_(index_lens_light, index_var)] = M_cross.T
+        M[np.ix_(index_lens_light, index_lens_light)] = M_lens_light
+        R[index_var] = WA_var @ d
+        R[index_lens_light] = R_lens_light
+        param, cov_param, log_det = de_lens.get_param_normal(
+            M, R, inv_bool=inv_bool, return_log_det=True
+        )
+        self._log_det_cache = (cov_param, log_det)
+        wls_model = A_var.T @ param[index_var] + param[index_lens_light].dot(
+            A_lens_light
+        )
+        return param, cov_param, wls_model
+
+    def _cov_param_log_det(self, cov_param):
+        """Log determinant of the covariance matrix of the last linear solve, kept from
+        its Cholesky factorization.
+
+        :param cov_param: covariance matrix of the linear parameters
+        :return: log determinant of cov_param, or None if cov_param is not the
+            covariance matrix of the last linear solve
+        """
+        cov_param_last, log_det = self._log_det_cache
+        if cov_param is not None and cov_param is cov_param_last:
+            return log_det
+        return None
+
+    def _lens_light_normal_block(self, kwargs_lens_light, C_D_inv, d):
+        """Lens light rows of the response matrix with their blocks of the normal
+        equations, re-used from the previous call if the non-linear lens light
+        parameters, the data, the noise, the mask and the PSF did not change.
+
+        :param kwargs_lens_light: list of keyword arguments corresponding to different
+            lens light surface brightness profiles
+        :param C_D_inv: 1d array of the inverse variances of the evaluated pixels
+        :param d: 1d array of the data of the evaluated pixels
+        :return: response matrix of the lens light components, their block of the normal
+            matrix, their block of the data projection
+        """
+        key = _light_kwargs_key(kwargs_lens_light)
+        # (instances of subclasses initialized as ImageModel do not hold the attribute)
+        block = getattr(self, "_lens_light_block", None)
+        if (
+            block is not None
+            and block["key"] == key
+            and block["numerics"] is self.ImageNumerics
+            and block["mask"] is self.likelihood_mask
+            and np.array_equal(block["C_D_inv"], C_D_inv)
+            and np.array_equal(block["d"], d)
+        ):
+            return block["A"], block["M"], block["R"]
+        A = self._lens_light_response(kwargs_lens_light)
+        WA = A * C_D_inv
+        M, R = WA.dot(A.T), WA.dot(d)
+        self._lens_light_block = {
+            "key": key,
+            "numerics": self.ImageNumerics,
+            "mask": self.likelihood_mask,
+            "C_D_inv": np.array(C_D_inv),
+            "d": np.array(d),
+            "A": A,
+            "M": M,
+            "R": R,
+        }
+        return A, M, R
+
+    def update_psf(self, psf_class):
+        """Update the instance of the class with a new instance of PSF() with a
+        potentially different point spread function.
+
+        :param psf_class: instance of lenstronomy.Data.psf.PSF class
+        :return: no return. Class is updated.
+        """
+        super(ImageLinearFit, self).update_psf(psf_class)
+        self._lens_light_block = None
+
+    def update_data(self, data_class):
+        """
+
+        :param data_class: instance of Data() class
+        :return: no return. Class is updated.
+        """
+        super(ImageLinearFit, self).update_data(data_class)
+        self._lens_light_block = None
+
     def update_linear_kwargs(
         self, param, kwargs_lens, kwargs_source, kwargs_lens_light, kwargs_ps
     ):
@@ -638,7 +869,12 @@ class ImageLinearFit(ImageModel):
         x_grid, y_grid = self.ImageNumerics.coordinates_evaluate
 
         source_light_response, n_source = self.source_mapping.image_flux_split(
-            x_grid, y_grid, kwargs_lens, kwargs_source, kwargs_special
+            x_grid,
+            y_grid,
+            kwargs_lens,
+            kwargs_source,
+            kwargs_special,
+            shared_grid=True,
         )
         extinction = self._extinction.extinction(
             x_grid,
@@ -784,3 +1020,61 @@ class ImageLinearFit(ImageModel):
         model = [unconvolved_model, dirty_model]
 
         return model, M_inv, param_amps
+
+
+def _response_matrix(rows, num_rows, num_columns, threshold=None):
+    """Assembles rows of a linear response matrix.
+
+    :param rows: iterable of the rows (1d arrays of length num_columns)
+    :param num_rows: number of rows
+    :param num_columns: number of columns (evaluated pixels)
+    :param threshold: None or float >= 0. If None, returns a dense matrix. Otherwise,
+        entries with an absolute value below threshold times the peak absolute value of
+        their row are truncated and a scipy.sparse csr matrix is returned.
+    :return: response matrix of shape (num_rows, num_columns)
+    """
+    if threshold is None:
+        A = np.zeros((num_rows, num_columns))
+        for i, row in enumerate(rows):
+            A[i, :] = row
+        return A
+    index_list, value_list, indptr = [], [], [0]
+    for row in rows:
+        abs_row = np.abs(row)
+        if len(row) > 0:
+            index = np.nonzero(abs_row > threshold * np.max(abs_row))[0]
+        else:
+            index = np.zeros(0, dtype=int)
+        index_list.append(index)
+        value_list.append(row[index])
+        indptr.append(indptr[-1] + len(index))
+    if num_rows == 0:
+        return sparse.csr_matrix((0, num_columns))
+    return sparse.csr_matrix(
+        (np.concatenate(value_list), np.concatenate(index_list), np.array(indptr)),
+        shape=(num_rows, num_columns),
+    )
+
+
+def _light_kwargs_key(kwargs_list):
+    """Hashable key of the non-linear parameters of a list of light profile keyword
+    arguments (the linear amplitudes 'amp' are ignored).
+
+    :param kwargs_list: list of keyword arguments
+    :return: tuple
+    """
+    if kwargs_list is None:
+        return None
+    key = []
+    for kwargs in kwargs_list:
+        items = []
+        for name in sorted(kwargs):
+            if name == "amp":
+                continue
+            value = kwargs[name]
+            if isinstance(value, (list, tuple, np.ndarray)):
+                value = np.asarray(value)
+                value = (value.shape, value.tobytes())
+            items.append((name, value))
+        key.append(tuple(items))
+    return tuple(key)
@@ -330,6 +330,7 @@ class ImageModel(object):
                 kwargs_source,
                 kwargs_special=kwargs_special,
                 k=k,
+                shared_grid=True,
             )
             source_light *= self._extinction.extinction(
                 ra_grid,
@@ -638,6 +639,26 @@ class ImageModel(object):
         self.PointSource.delete_lens_model_cache()
         self.PointSource.set_save_cache(cache)
 
+    def set_point_source_memo(self, memo):
+        """Sets a (potentially shared) memoization instance of the point source
+        quantities.
+
+        :param memo: PointSourceMemo instance or None
+        :return: None
+        """
+        self.PointSource.set_memo(memo)
+
+    def set_ray_shooting_cache(self, cache, grid_key=None):
+        """Sets a (potentially shared) cache of the ray-traced coordinates of the
+        evaluation grid of the image numerics.
+
+        :param cache: RayShootingCache instance or None
+        :param grid_key: hashable key identifying the evaluation grid and lens model
+        :return: None
+        """
+        if self.source_mapping is not None:
+            self.source_mapping.set_ray_shooting_cache(cache, grid_key=grid_key)
+
     def update_psf(self, psf_class):
         """Update the instance of the class with a new instance of PSF() with a
         potentially different point spread function.
@@ -681,6 +702,17 @@ class ImageModel(object):
         residual = (self.Data.data - model) / np.sqrt(C_D + np.abs(error_map)) * mask
         return residual
 
+    def residual_vector(self, model, error_map=0):
+        """
+
+        :param model: 2d numpy array of the modeled image
+        :param error_map: 2d numpy array of additional noise/error terms from model
+            components (such as PSF model uncertainties)
+        :return: 1d numpy array of the reduced residuals of the pixels evaluated in the
+            likelihood, such that -1/2 of their squared sum is the log likelihood
+        """
+        return self.image2array_masked(self.reduced_residuals(model, error_map))
+
     def reduced_chi2(self, model, error_map=0):
         """Returns reduced chi2.
 
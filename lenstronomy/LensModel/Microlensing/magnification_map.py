@@ -0,0 +1,374 @@
+import hashlib
+import os
+
+import numpy as np
+from lenstronomy.LensModel.lens_model import LensModel
+
+__all__ = ["MicrolensingMagnificationMap"]
+
+
+class MicrolensingMagnificationMap(object):
+    """Computes microlensing magnification maps on a source plane grid for large star
+    fields with inverse ray shooting.
+
+    The deflection of the star field is computed with a cell-based multipole (tree)
+    scheme: the stars are sorted into a regular grid of cells, stars in cells close to a
+    ray are summed directly, while the contribution of all other cells is evaluated
+    with a complex multipole expansion around the cell centers. The smooth matter
+    (convergence kappa_smooth) and external shear are added with the 'CONVERGENCE'
+    and 'SHEAR' profiles of LensModel.
+
+    The rays are shot in chunks of image plane rows to bound the memory usage. The
+    chunks can be distributed over a pool (e.g. from choose_pool) and the
+    accumulated ray counts are optionally stored on disk after every batch of chunks,
+    such that an interrupted computation can be resumed.
+
+    Example::
+
+        >>> magmap = MicrolensingMagnificationMap(x_stars, y_stars, theta_E_stars, kappa_smooth=0.3, gamma1=0.4)
+        >>> mag = magmap.magnification_map(source_half_width=5, num_pix_source=500)
+    """
+
+    def __init__(
+        self,
+        x_stars,
+        y_stars,
+        theta_E_stars,
+        kappa_smooth=0,
+        gamma1=0,
+        gamma2=0,
+        num_cells=None,
+        near_field_cells=2,
+        multipole_order=6,
+        kappa_star=None,
+    ):
+        """
+
+        :param x_stars: x-coordinates of the point masses (stars)
+        :param y_stars: y-coordinates of the point masses (stars)
+        :param theta_E_stars: Einstein radii of the stars (float or array of the same
+            length as x_stars)
+        :param kappa_smooth: convergence of the smooth (non-stellar) matter component
+        :param gamma1: external shear component
+        :param gamma2: external shear component
+        :param num_cells: number of cells per axis of the tree grid; if None, chosen
+            such that there are on average ~16 stars per cell
+        :param near_field_cells: rays in cells within this distance (in cells) of a star
+            cell receive the exact deflection of the stars in that cell
+        :param multipole_order: order of the multipole expansion of the far-field cells
+        :param kappa_star: mean convergence of the stars, entering the size of the
+            image plane region of the rays; if None, estimated as sum(pi
+            theta_E_stars^2) over the area of the bounding box of the stars
+        """
+        self._x_stars = np.array(x_stars, dtype=float)
+        self._y_stars = np.array(y_stars, dtype=float)
+        self._mass = np.array(theta_E_stars, dtype=float) ** 2 * np.ones_like(
+            self._x_stars
+        )
+        self._kappa_smooth = kappa_smooth
+        if kappa_star is None:
+            kappa_star = self._mean_kappa_stars()
+        self._kappa_star = kappa_star
+        self._gamma1 = gamma1
+        self._gamma2 = gamma2
+        self._smooth_model = LensModel(lens_model_list=["CONVERGENCE", "SHEAR"])
+        self._kwargs_smooth = [
+            {"kappa": kappa_smooth, "ra_0": 0, "dec_0": 0},
+            {"gamma1": gamma1, "gamma2": gamma2, "ra_0": 0, "dec_0": 0},
+        ]
+        if num_cells is None:
+            num_cells = max(int(np.sqrt(len(self._x_stars) / 16.0)), 1)
+        self._num_cells = int(num_cells)
+        self._near_field_cells = int(near_field_cells)
+        self._multipole_order = int(multipole_order)
+        self._build_tree()
+
+    def _mean_kappa_stars(self):
+        """Mean convergence of the stars within the bounding box of their positions.
+
+        :return: sum(pi theta_E^2) / area of the bounding box (0 for less than two stars
+            or a degenerate box)
+        """
+        if len(self._x_stars) < 2:
+            return 0.0
+        area = np.ptp(self._x_stars) * np.ptp(self._y_stars)
+        if area <= 0:
+            return 0.0
+        return np.pi * np.sum(self._mass) / area
+
+    @property
+    def kappa_star(self):
+        """
+
+        :return: mean convergence of the stars
+        """
+        return self._kappa_star
+
+    @property
+    def lens_hash(self):
+        """Hash of the lens configuration (stars, smooth matter, shear and the multipole
+        tree settings) identifying the ray counts stored by magnification_map().
+
+        :return: hexadecimal sha256 digest
+        """
+        digest = hashlib.sha256()
+        for array in [self._x_stars, self._y_stars, self._mass]:
+            digest.update(np.ascontiguousarray(array, dtype=float).tobytes())
+        digest.update(repr(self._kwargs_smooth).encode())
+        digest.update(
+            repr(
+                (self._num_cells, self._near_field_cells, self._multipole_order)
+            ).encode()
+        )
+        return digest.hexdigest()
+
+    def _build_tree(self):
+        """Sorts the stars into cells and computes the multipole moments of each
+        occupied cell."""
+        n = self._num_cells
+        if len(self._x_stars) > 0:
+            x_min, x_max = np.min(self._x_stars), np.max(self._x_stars)
+            y_min, y_max = np.min(self._y_stars), np.max(self._y_stars)
+        else:
+            x_min, x_max, y_min, y_max = -1.0, 1.0, -1.0, 1.0
+        width = max(x_max - x_min, y_max - y_min) * (1 + 1e-8) + 1e-10
+        self._cell_size = width / n
+        self._x_0 = (x_min + x_max) / 2.0 - width / 2.0
+        self._y_0 = (y_min + y_max) / 2.0 - width / 2.0
+        ix, iy = self._cell_index(self._x_stars, self._y_stars)
+        cell_id = iy * n + ix
+        self._cells = []
+        z_stars = self._x_stars + 1j * self._y_stars
+        for c in np.unique(cell_id):
+            inds = np.where(cell_id == c)[0]
+            ix_c, iy_c = c % n, c // n
+            z_c = (
+                self._x_0
+                + (ix_c + 0.5) * self._cell_size
+                + 1j * (self._y_0 + (iy_c + 0.5) * self._cell_size)
+            )
+            dz = z_stars[inds] - z_c
+            moments = np.array(
+                [
+                    np.sum(self._mass[inds] * dz**k)
+                    for k in range(self._multipole_order + 1)
+                ]
+            )
+            self._cells.append((ix_c, iy_c, z_c, moments, inds))
+
+    def _cell_index(self, x, y):
+        """Cell indices of coordinates, clipped to the tree grid.
+
+        :param x: x-coordinates
+        :param y: y-coordinates
+        :return: cell index along x and y
+        """
+        ix = np.floor((x - self._x_0) / self._cell_size).astype(int)
+        iy = np.floor((y - self._y_0) / self._cell_size).astype(int)
+        ix = np.clip(ix, 0, self._num_cells - 1)
+        iy = np.clip(iy, 0, self._num_cells - 1)
+        return ix, iy
+
+    def alpha_stars(self, x, y):
+        """Deflection of the star field with the cell-based multipole approximation.
+
+        :param x: x-coordinates of the rays (1d array)
+        :param y: y-coordinates of the rays (1d array)
+        :return: deflection angles alpha_x, alpha_y
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        z = x + 1j * y
+        ix, iy = self._cell_index(x, y)
+        # the conjugate of the complex point mass deflection is sum_i m_i / (z - z_i)
+        alpha_conj = np.zeros_like(z)
+        for ix_c, iy_c, z_c, moments, inds in self._cells:
+            near = (np.abs(ix - ix_c) <= self._near_field_cells) & (
+                np.abs(iy - iy_c) <= self._near_field_cells
+            )
+            if np.any(near):
+                dz = z[near][:, np.newaxis] - (
+                    self._x_stars[inds] + 1j * self._y_stars[inds]
+                )
+                alpha_conj[near] += np.sum(self._mass[inds] / dz, axis=1)
+            far = ~near
+            if np.any(far):
+                w = 1.0 / (z[far] - z_c)
+                w_k = w.copy()
+                alpha_far = np.zeros_like(w)
+                for moment in moments:
+                    alpha_far += moment * w_k
+                    w_k *= w
+                alpha_conj[far] += alpha_far
+        return np.real(alpha_conj), -np.imag(alpha_conj)
+
+    def alpha_stars_direct(self, x, y):
+        """Exact deflection of the star field by direct summation (for validation and
+        small star fields).
+
+        :param x: x-coordinates of the rays (1d array)
+        :param y: y-coordinates of the rays (1d array)
+        :return: deflection angles alpha_x, alpha_y
+        """
+        dx = np.asarray(x, dtype=float)[:, np.newaxis] - self._x_stars
+        dy = np.asarray(y, dtype=float)[:, np.newaxis] - self._y_stars
+        r2 = dx**2 + dy**2
+        return np.sum(self._mass * dx / r2, axis=1), np.sum(
+            self._mass * dy / r2, axis=1
+        )
+
+    def ray_shooting(self, x, y):
+        """Maps image plane coordinates to the source plane.
+
+        :param x: x-coordinates of the rays (1d array)
+        :param y: y-coordinates of the rays (1d array)
+        :return: source plane coordinates beta_x, beta_y
+        """
+        beta_x, beta_y = self._smooth_model.ray_shooting(x, y, self._kwargs_smooth)
+        alpha_x, alpha_y = self.alpha_stars(x, y)
+        return beta_x - alpha_x, beta_y - alpha_y
+
+    def image_plane_half_widths(self, source_half_width, margin=1.5):
+        """Half widths of the image plane region that covers the source plane region
+        under the mean lens mapping (with the total convergence kappa_smooth +
+        kappa_star and the external shear), enlarged by a margin factor.
+
+        :param source_half_width: half width of the (square) source plane region
+        :param margin: factor by which the region is enlarged
+        :return: half widths along x and y of the image plane region
+        """
+        kappa = self._kappa_smooth + self._kappa_star
+        a = np.array(
+            [
+                [1 - kappa - self._gamma1, -self._gamma2],
+                [-self._gamma2, 1 - kappa + self._gamma1],
+            ]
+        )
+        a_inv = np.linalg.inv(a)
+        corners = np.array([[1, 1], [1, -1], [-1, 1], [-1, -1]]) * source_half_width
+        image_corners = corners @ a_inv.T
+        half_x, half_y = np.max(np.abs(image_corners), axis=0) * margin
+        return half_x, half_y
+
+    def magnification_map(
+        self,
+        source_half_width,
+        num_pix_source,
+        rays_per_pixel=10,
+        image_half_widths=None,
+        chunk_rows=50,
+        pool=None,
+        output_file=None,
+        checkpoint_every=10,
+    ):
+        """Computes the magnification map on a square source plane grid centered on the
+        origin by inverse ray shooting.
+
+        :param source_half_width: half width of the source plane region
+        :param num_pix_source: number of source pixels per axis
+        :param rays_per_pixel: number of rays per axis per (unlensed) source pixel area,
+            i.e. the image plane ray spacing is 2 * source_half_width / num_pix_source /
+            rays_per_pixel
+        :param image_half_widths: tuple (half_x, half_y) of the image plane region to
+            shoot rays in; if None, it is estimated with image_plane_half_widths()
+        :param chunk_rows: number of image plane rows shot per chunk
+        :param pool: None or a pool instance with a map() function (e.g. from
+            choose_pool) to distribute the chunks
+        :param output_file: None or path to a .npz file in which the ray counts and the
+            completed chunks are stored; an existing file is resumed. A ValueError is
+            raised if it was computed for a different lens configuration or grid
+        :param checkpoint_every: number of chunks computed between writes of output_file
+        :return: 2d array of the magnification map of shape (num_pix_source,
+            num_pix_source)
+        """
+        if image_half_widths is None:
+            image_half_widths = self.image_plane_half_widths(source_half_width)
+        half_x, half_y = image_half_widths
+        delta_ray = 2.0 * source_half_width / num_pix_source / rays_per_pixel
+        num_x = int(np.ceil(2 * half_x / delta_ray))
+        num_y = int(np.ceil(2 * half_y / delta_ray))
+        x_rays = -half_x + (np.arange(num_x) + 0.5) * delta_ray
+        y_rays = -half_y + (np.arange(num_y) + 0.5) * delta_ray
+        row_chunks = [
+            (y_rays[i : i + chunk_rows], x_rays, source_half_width, num_pix_source)
+            for i in range(0, num_y, chunk_rows)
+        ]
+        settings = {
+            "grid": np.array(
+                [source_half_width, num_pix_source, delta_ray, num_x, num_y, chunk_rows]
+            ),
+            "lens_hash": self.lens_hash,
+        }
+
+        counts = np.zeros((num_pix_source, num_pix_source))
+        done = np.zeros(len(row_chunks), dtype=bool)
+        if output_file is not None and os.path.exists(output_file):
+            stored = np.load(output_file)
+            if (
+                "lens_hash" not in stored
+                or str(stored["lens_hash"]) != settings["lens_hash"]
+                or np.shape(stored["settings"]) != np.shape(settings["grid"])
+                or not np.allclose(stored["settings"], settings["grid"])
+            ):
+                raise ValueError(
+                    "%s was computed for a different lens configuration or grid; "
+                    "remove it or choose a different output_file." % output_file
+                )
+            counts = stored["counts"]
+            done = stored["done"]
+        todo = np.where(~done)[0]
+
+        map_func = map if pool is None else pool.map
+        for i in range(0, len(todo), checkpoint_every):
+            batch = todo[i : i + checkpoint_every]
+            for counts_chunk in map_func(
+                self._ray_counts_chunk, [row_chunks[j] for j in batch]
+            ):
+                counts += counts_chunk
+            done[batch] = True
+            if output_file is not None:
+                self._save(output_file, counts, done, settings)
+
+        pixel_area_source = (2.0 * source_half_width / num_pix_source) ** 2
+        return counts * delta_ray**2 / pixel_area_source
+
+    def _ray_counts_chunk(self, args):
+        """Shoots the rays of a chunk of image plane rows and bins them on the source
+        plane grid.
+
+        :param args: tuple (y_rows, x_rays, source_half_width, num_pix_source)
+        :return: 2d array of ray counts per source pixel
+        """
+        y_rows, x_rays, source_half_width, num_pix_source = args
+        x, y = np.meshgrid(x_rays, y_rows)
+        beta_x, beta_y = self.ray_shooting(x.ravel(), y.ravel())
+        counts, _, _ = np.histogram2d(
+            beta_y,
+            beta_x,
+            bins=num_pix_source,
+            range=[
+                [-source_half_width, source_half_width],
+                [-source_half_width, source_half_width],
+            ],
+        )
+        return counts
+
+    @staticmethod
+    def _save(output_file, counts, done, settings):
+        """Writes the accumulated ray counts atomically to disk.
+
+        :param output_file: path to the .npz file
+        :param counts: accumulated ray counts
+        :param done: boolean array of the completed chunks
+        :param settings: dictionary of the grid settings ('grid') and the lens
+            configuration hash ('lens_hash') used to validate a resume
+        """
+        tmp_file = output_file + ".tmp.npz"
+        np.savez(
+            tmp_file,
+            counts=counts,
+            done=done,
+            settings=settings["grid"],
+            lens_hash=settings["lens_hash"],
+        )
+        os.replace(tmp_file, output_file)
@@ -35,6 +35,7 @@ class LensModelExtensions(object):
         step_size=0.05,
         use_largest_eigenvalue=True,
         fixed_aperture_size=False,
+        ray_tracing_cache=None,
     ):
         """This method computes image magnifications with a finite-size background
         source.
@@ -79,6 +80,11 @@ class LensModelExtensions(object):
          will be aligned with the eigenvector corresponding to the largest eigenvalue of the hessian matrix
         :param fixed_aperture_size: bool, if True the flux is computed inside a fixed aperture size with radius
          grid_radius_arcsec
+        :param ray_tracing_cache: None or a dictionary. If a dictionary is provided, the source plane coordinates of
+         all ray-traced pixels are stored in it for each image and are re-used in subsequent calls with the same
+         dictionary, such that only pixels outside the previously traced aperture are ray-traced. The cache is only
+         valid for identical image positions, lens model and kwargs_lens, e.g. when only kwargs_source changes
+         between calls.
         :return: an array of image magnifications
         """
 
@@ -99,7 +105,13 @@ class LensModelExtensions(object):
 
         magnifications = []
 
-        for xi, yi in zip(x_image, y_image):
+        for i, (xi, yi) in enumerate(zip(x_image, y_image)):
+            if ray_tracing_cache is None:
+                image_cache = None
+            else:
+                image_cache = self._adaptive_ray_tracing_cache(
+                    ray_tracing_cache, i, xi, yi, grid_x_0, grid_resolution
+                )
             if axis_ratio == 1:
                 grid_r = np.hypot(grid_x_0, grid_y_0)
             else:
@@ -148,6 +160,7 @@ class LensModelExtensions(object):
                     kwargs_lens,
                     source_model,
                     kwargs_source,
+                    ray_tracing_cache=image_cache,
                 )
                 new_magnification = np.sum(flux_array) * grid_resolution**2
                 diff = (
@@ -167,6 +180,33 @@ class LensModelExtensions(object):
 
         return np.array(magnifications)
 
+    @staticmethod
+    def _adaptive_ray_tracing_cache(
+        ray_tracing_cache, index, x_image, y_image, grid_x, grid_resolution
+    ):
+        """Returns the ray tracing cache of a single image, (re-)initializing it if the
+        image position or the ray tracing grid differ from the cached ones.
+
+        :param ray_tracing_cache: dictionary holding the per-image caches
+        :param index: index of the image
+        :param x_image: image x coordinate
+        :param y_image: image y coordinate
+        :param grid_x: (flattened) x coordinates of the ray tracing grid
+        :param grid_resolution: the grid resolution in units arcsec/pixel
+        :return: dictionary with keys 'beta_x', 'beta_y' and 'traced'
+        """
+        key = (x_image, y_image, len(grid_x), grid_resolution)
+        image_cache = ray_tracing_cache.get(index, None)
+        if image_cache is None or image_cache["key"] != key:
+            image_cache = {
+                "key": key,
+                "beta_x": np.zeros_like(grid_x),
+                "beta_y": np.zeros_like(grid_x),
+                "traced": np.zeros(len(grid_x), dtype=bool),
+            }
+            ray_tracing_cache[index] = image_cache
+        return image_cache
+
     @staticmethod
     def _magnification_adaptive_iteration(
         flux_array,
@@ -181,6 +221,7 @@ class LensModelExtensions(object):
         kwargs_lens,
         source_model,
         kwargs_source,
+        ray_tracing_cache=None,
     ):
         """This function computes the surface brightness of coordinates in 'flux_array'
         that satisfy r_min < grid_r < r_max, where each coordinate in grid_r corresponds
@@ -198,6 +239,10 @@ class LensModelExtensions(object):
         :param kwargs_lens: keywords for the lens model
         :param source_model: an instance of LightModel
         :param kwargs_source: keywords for the light model
+        :param ray_tracing_cache: None or dictionary with keys 'beta_x', 'beta_y' and
+            'traced' (see _adaptive_ray_tracing_cache) holding the source plane
+            coordinates of already ray-traced pixels; only pixels not yet traced are
+            ray-traced and the cache is updated in place
         :return: the flux array where the surface brightness has been computed for all
             pixels with r_min < grid_r < r_max.
         """
@@ -208,9 +253,24 @@ class LensModelExtensions(object):
 
         inds = np.where(condition)[0]
 
-        xcoords = grid_x[inds] + x_image
-        ycoords = grid_y[inds] + y_image
-        beta_x, beta_y = lensModel.ray_shooting(xcoords, ycoords, kwargs_lens)
+        if ray_tracing_cache is None:
+            xcoords = grid_x[inds] + x_image
+            ycoords = grid_y[inds] + y_image
+            beta_x, beta_y = lensModel.ray_shooting(xcoords, ycoords, kwargs_lens)
+        else:
+            traced = ray_tracing_cache["traced"]
+            inds_new = inds[~traced[inds]]
+            if len(inds_new) > 0:
+                xcoords = grid_x[inds_new] + x_image
+                ycoords = grid_y[inds_new] + y_image
+                beta_x_new, beta_y_new = lensModel.ray_shooting(
+                    xcoords, ycoords, kwargs_lens
+                )
+                ray_tracing_cache["beta_x"][inds_new] = beta_x_new
+                ray_tracing_cache["beta_y"][inds_new] = beta_y_new
+                traced[inds_new] = True
+            beta_x = ray_tracing_cache["beta_x"][inds]
+            beta_y = ray_tracing_cache["beta_y"][inds]
         flux_in_pixels = source_model.surface_brightness(beta_x, beta_y, kwargs_source)
         flux_array[inds] = flux_in_pixels
 
@@ -523,6 +583,243 @@ class LensModelExtensions(object):
             dec_caustic_list.append(dec_caustics)
         return ra_crit_list, dec_crit_list, ra_caustic_list, dec_caustic_list
 
+    def critical_curve_caustics_adaptive(
+        self,
+        kwargs_lens,
+        compute_window=5,
+        start_scale=0.1,
+        max_order=5,
+        center_x=0,
+        center_y=0,
+    ):
+        """Computes critical curves and caustics with an adaptive quadtree grid and
+        marching squares.
+
+        The determinant of the lensing Jacobian is evaluated on a coarse grid with
+        spacing start_scale. Only cells with a sign change among their corners are
+        successively split in four (max_order times), with one batched hessian call per
+        refinement level. The critical curves are extracted from the final cells with
+        vectorized marching squares and linked into connected curves. All critical curve
+        points are mapped to the caustics with a single ray-shooting call.
+
+        As for critical_curve_tiling(), closed curves that fit within a single coarse
+        cell without crossing any of its corners' sign pattern might be missed.
+
+        :param kwargs_lens: lens model keyword argument list
+        :param compute_window: window size in arcsec where the critical curve is
+            computed
+        :param start_scale: grid spacing of the initial coarse grid
+        :param max_order: number of refinement levels; the final grid spacing is
+            start_scale / 2**max_order
+        :param center_x: float, center of the window to compute critical curves and
+            caustics
+        :param center_y: float, center of the window to compute critical curves and
+            caustics
+        :return: lists of ra and dec arrays corresponding to different disconnected
+            critical curves and their caustic counterparts
+        """
+        max_order = int(max_order)
+        # all nodes are labeled by integer indices on the finest grid
+        scale = 2**max_order
+        delta_fine = start_scale / scale
+        num_cells = max(int(compute_window / start_scale), 1)
+        origin_x = center_x - num_cells * start_scale / 2.0
+        origin_y = center_y - num_cells * start_scale / 2.0
+
+        def _det(i, j):
+            x = origin_x + i * delta_fine
+            y = origin_y + j * delta_fine
+            f_xx, f_xy, f_yx, f_yy = self._lensModel.hessian(x, y, kwargs_lens)
+            return (1 - f_xx) * (1 - f_yy) - f_xy * f_yx
+
+        # coarse grid
+        nodes = np.arange(num_cells + 1) * scale
+        i_nodes, j_nodes = np.meshgrid(nodes, nodes, indexing="ij")
+        det_nodes = _det(i_nodes.ravel(), j_nodes.ravel()).reshape(i_nodes.shape)
+        i_cell, j_cell = np.meshgrid(nodes[:-1], nodes[:-1], indexing="ij")
+        i_cell, j_cell = i_cell.ravel(), j_cell.ravel()
+        # corner values ordered as (i, j), (i + 1, j), (i + 1, j + 1), (i, j + 1)
+        corners = np.array(
+            [
+                det_nodes[:-1, :-1].ravel(),
+                det_nodes[1:, :-1].ravel(),
+                det_nodes[1:, 1:].ravel(),
+                det_nodes[:-1, 1:].ravel(),
+            ]
+        ).T
+        size = scale
+
+        def _sign_change(corners):
+            # cells touching singular (non-finite) points are discarded
+            positive = corners > 0
+            return (
+                np.any(positive, axis=1)
+                & ~np.all(positive, axis=1)
+                & np.all(np.isfinite(corners), axis=1)
+            )
+
+        select = _sign_change(corners)
+        i_cell, j_cell, corners = i_cell[select], j_cell[select], corners[select]
+
+        # quadtree refinement of the cells with a sign change
+        for _ in range(max_order):
+            half = size // 2
+            # values at the edge midpoints and the cell center
+            i_new = np.concatenate(
+                [i_cell + half, i_cell + size, i_cell + half, i_cell, i_cell + half]
+            )
+            j_new = np.concatenate(
+                [j_cell, j_cell + half, j_cell + size, j_cell + half, j_cell + half]
+            )
+            det_new = _det(i_new, j_new).reshape(5, -1)
+            bottom, right, top, left, center = det_new
+            c0, c1, c2, c3 = corners.T
+            i_child = np.concatenate([i_cell, i_cell + half, i_cell + half, i_cell])
+            j_child = np.concatenate([j_cell, j_cell, j_cell + half, j_cell + half])
+            corners_child = np.concatenate(
+                [
+                    np.array([c0, bottom, center, left]).T,
+                    np.array([bottom, c1, right, center]).T,
+                    np.array([center, right, c2, top]).T,
+                    np.array([left, center, top, c3]).T,
+                ]
+            )
+            size = half
+            select = _sign_change(corners_child)
+            i_cell, j_cell = i_child[select], j_child[select]
+            corners = corners_child[select]
+
+        ra_crit_list, dec_crit_list = self._marching_squares(
+            i_cell, j_cell, corners, size
+        )
+        ra_crit_list = [origin_x + ra * delta_fine for ra in ra_crit_list]
+        dec_crit_list = [origin_y + dec * delta_fine for dec in dec_crit_list]
+
+        if len(ra_crit_list) == 0:
+            return [], [], [], []
+        # one batched ray-shooting call for all critical curves
+        split = np.cumsum([len(ra) for ra in ra_crit_list])[:-1]
+        ra_caustics, dec_caustics = self._lensModel.ray_shooting(
+            np.concatenate(ra_crit_list), np.concatenate(dec_crit_list), kwargs_lens
+        )
+        ra_caustic_list = np.split(ra_caustics, split)
+        dec_caustic_list = np.split(dec_caustics, split)
+        return ra_crit_list, dec_crit_list, ra_caustic_list, dec_caustic_list
+
+    @staticmethod
+    def _marching_squares(i_cell, j_cell, corners, size):
+        """Extracts the zero-level contours from cells of equal size with vectorized
+        marching squares and links the segments into connected curves.
+
+        :param i_cell: x-index of the lower left corner of the cells
+        :param j_cell: y-index of the lower left corner of the cells
+        :param corners: array (n, 4) of the values at the corners (i, j), (i + size, j),
+            (i + size, j + size), (i, j + size)
+        :param size: integer size of the cells
+        :return: lists of x and y arrays (in index units) of the connected curves
+        """
+        if len(i_cell) == 0:
+            return [], []
+        n = len(i_cell)
+        c = [corners[:, k] for k in range(4)]
+        # edges: 0 bottom (0-1), 1 right (1-2), 2 top (3-2), 3 left (0-3)
+        edge_nodes = [(0, 1), (1, 2), (3, 2), (0, 3)]
+        offsets = np.array([[0, 0], [1, 0], [1, 1], [0, 1]])
+        crossing = np.zeros((n, 4), dtype=bool)
+        x_edge = np.zeros((n, 4))
+        y_edge = np.zeros((n, 4))
+        key_edge = np.zeros((n, 4), dtype=np.int64)
+        # unique integer keys of the grid edges (horizontal: even, vertical: odd)
+        num = int(np.max(i_cell) + np.max(j_cell) + 2 * size + 2)
+        for e, (a, b) in enumerate(edge_nodes):
+            crossing[:, e] = (c[a] > 0) != (c[b] > 0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t = np.where(crossing[:, e], c[a] / (c[a] - c[b]), 0.5)
+            x_a = i_cell + offsets[a][0] * size
+            y_a = j_cell + offsets[a][1] * size
+            x_edge[:, e] = x_a + t * (offsets[b][0] - offsets[a][0]) * size
+            y_edge[:, e] = y_a + t * (offsets[b][1] - offsets[a][1]) * size
+            vertical = offsets[b][0] == offsets[a][0]
+            key_edge[:, e] = 2 * (x_a.astype(np.int64) * num + y_a) + int(vertical)
+
+        # pair the crossed edges of each cell into segments
+        num_crossing = np.sum(crossing, axis=1)
+        center_positive = np.mean(corners, axis=1) > 0
+        segments = []
+        two = num_crossing == 2
+        edges_two = np.argsort(~crossing[two], axis=1, kind="stable")[:, :2]
+        cells_two = np.where(two)[0]
+        segments.append(
+            np.array([cells_two, edges_two[:, 0], cells_two, edges_two[:, 1]]).T
+        )
+        saddle = np.where(num_crossing == 4)[0]
+        # the center connects corners 0 and 2 if it has their sign
+        connect_02 = center_positive[saddle] == (c[0][saddle] > 0)
+        for pair_a, pair_b in [((0, 1), (2, 3)), ((0, 3), (1, 2))]:
+            cells = saddle[connect_02] if pair_a == (0, 1) else saddle[~connect_02]
+            for e1, e2 in [pair_a, pair_b]:
+                segments.append(
+                    np.array(
+                        [cells, np.full_like(cells, e1), cells, np.full_like(cells, e2)]
+                    ).T
+                )
+        segments = np.concatenate(segments)
+        seg_keys = np.array(
+            [
+                key_edge[segments[:, 0], segments[:, 1]],
+                key_edge[segments[:, 2], segments[:, 3]],
+            ]
+        ).T
+        seg_x = np.array(
+            [
+                x_edge[segments[:, 0], segments[:, 1]],
+                x_edge[segments[:, 2], segments[:, 3]],
+            ]
+        ).T
+        seg_y = np.array(
+            [
+                y_edge[segments[:, 0], segments[:, 1]],
+                y_edge[segments[:, 2], segments[:, 3]],
+            ]
+        ).T
+
+        # link segments sharing a grid edge into connected curves
+        key_to_segments = {}
+        for s, (k1, k2) in enumerate(seg_keys):
+            key_to_segments.setdefault(k1, []).append(s)
+            key_to_segments.setdefault(k2, []).append(s)
+        visited = np.zeros(len(segments), dtype=bool)
+        x_list, y_list = [], []
+        for s_start in range(len(segments)):
+            if visited[s_start]:
+                continue
+            visited[s_start] = True
+            chain = [(s_start, 0, 1)]
+            # walk forward from the end point, then backward from the start point
+            for direction in [1, 0]:
+                s, end = s_start, direction
+                while True:
+                    neighbors = [
+                        s_
+                        for s_ in key_to_segments[seg_keys[s, end]]
+                        if not visited[s_]
+                    ]
+                    if len(neighbors) == 0:
+                        break
+                    s_next = neighbors[0]
+                    visited[s_next] = True
+                    start_next = 0 if seg_keys[s_next, 0] == seg_keys[s, end] else 1
+                    if direction == 1:
+                        chain.append((s_next, start_next, 1 - start_next))
+                    else:
+                        chain.insert(0, (s_next, 1 - start_next, start_next))
+                    s, end = s_next, 1 - start_next
+            x = [seg_x[chain[0][0], chain[0][1]]] + [seg_x[s, b] for s, a, b in chain]
+            y = [seg_y[chain[0][0], chain[0][1]]] + [seg_y[s, b] for s, a, b in chain]
+            x_list.append(np.array(x))
+            y_list.append(np.array(y))
+        return x_list, y_list
+
     def hessian_eigenvectors(self, x, y, kwargs_lens, diff=None):
         """Computes magnification eigenvectors at position (x, y)
 
@@ -100,7 +100,8 @@ def plot_mcmc_behaviour(ax, samples_mcmc, param_mcmc, dist_mcmc=None, num_averag
     :param ax: Matplotlib axes instance
     :type ax: matplotlib.axes.Axes
     :param samples_mcmc: sampled parameters
-    :type samples_mcmc: numpy.ndarray
+    :type samples_mcmc: numpy.ndarray (or lazy array, e.g. of a SampleSink, read
+        parameter by parameter)
     :param param_mcmc: Parameters
     :type param_mcmc: list
     :param dist_mcmc: log likelihood of the chain
@@ -110,11 +111,11 @@ def plot_mcmc_behaviour(ax, samples_mcmc, param_mcmc, dist_mcmc=None, num_averag
     :type num_average: int
     :return:
     """
-    num_samples = len(samples_mcmc[:, 0])
+    num_samples = len(samples_mcmc)
     num_average = int(num_average)
     n_points = int((num_samples - num_samples % num_average) / num_average)
     for i, param_name in enumerate(param_mcmc):
-        samples = samples_mcmc[:, i]
+        samples = np.asarray(samples_mcmc[:, i])
         samples_averaged = np.average(
             samples[: int(n_points * num_average)].reshape(n_points, num_average),
             axis=1,
@@ -125,7 +126,9 @@ def plot_mcmc_behaviour(ax, samples_mcmc, param_mcmc, dist_mcmc=None, num_averag
 
     if dist_mcmc is not None:
         dist_averaged = -np.max(
-            dist_mcmc[: int(n_points * num_average)].reshape(n_points, num_average),
+            np.asarray(dist_mcmc[: int(n_points * num_average)]).reshape(
+                n_points, num_average
+            ),
             axis=1,
         )
         dist_normed = (dist_averaged - np.max(dist_averaged)) / (
@@ -182,6 +182,31 @@ class PointSource(object):
         for model in self._point_source_list:
             model.update_lens_model(lens_model_class=lens_model_class)
 
+    def set_memo(self, memo):
+        """Sets a (potentially shared) memoization instance for the image positions,
+        source positions and image amplitudes of all point source models.
+
+        :param memo: PointSourceMemo instance, or None to disable the memoization
+        :return: None
+        """
+        lens_model_list = getattr(self._lens_model, "lens_model_list", None)
+        redshift_list = getattr(self._lens_model, "redshift_list", None)
+        for i, model in enumerate(self._point_source_list):
+            signature = repr(
+                (
+                    self.point_source_type_list[i],
+                    lens_model_list,
+                    redshift_list,
+                    self._fixed_magnification_list[i],
+                    getattr(model._model, "additional_images", None),
+                    self._redshift_list[i],
+                    self._magnification_limit,
+                    self._index_lens_model_list,
+                    self._point_source_frame_list,
+                )
+            )
+            model.set_memo(memo, signature=signature)
+
     def delete_lens_model_cache(self):
         """Deletes the variables saved for a specific lens model.
 
@@ -1,4 +1,8 @@
-__all__ = ["PointSourceCached"]
+__all__ = ["PointSourceCached", "PointSourceMemo"]
+
+import threading
+from collections import OrderedDict
+import numpy as np
 
 
 class PointSourceCached(object):
@@ -12,6 +16,45 @@ class PointSourceCached(object):
     def __init__(self, point_source_model, save_cache=False):
         self._model = point_source_model
         self._save_cache = save_cache
+        self._memo = None
+        self._memo_signature = None
+
+    def set_memo(self, memo, signature=None):
+        """Sets a (potentially shared) memoization instance that is used whenever the
+        quantities are not available in the save_cache.
+
+        :param memo: PointSourceMemo instance or None to disable the memoization
+        :param signature: hashable identifier of the model settings of this instance;
+            instances sharing a memo must only have identical signatures if they compute
+            identical quantities for identical keyword arguments
+        :return: None
+        """
+        self._memo = memo
+        self._memo_signature = signature
+
+    def _memoized(self, name, func, kwargs_ps, kwargs_lens, ignore_keys=(), **kwargs):
+        """Evaluates func(kwargs_ps, kwargs_lens=kwargs_lens, **kwargs) or returns the
+        memoized value.
+
+        :param name: name of the quantity
+        :param func: function to evaluate
+        :param kwargs_ps: keyword arguments of the point source model
+        :param kwargs_lens: keyword argument list of the lens model(s)
+        :param ignore_keys: keys of kwargs_ps not affecting the quantity
+        :param kwargs: additional keyword arguments of func
+        :return: return of func
+        """
+        if self._memo is None:
+            return func(kwargs_ps, kwargs_lens=kwargs_lens, **kwargs)
+        kwargs_ps_key = {k: v for k, v in kwargs_ps.items() if k not in ignore_keys}
+        key = self._memo.key(
+            name, self._memo_signature, kwargs_ps_key, kwargs_lens, kwargs
+        )
+        found, value = self._memo.get(key)
+        if not found:
+            value = func(kwargs_ps, kwargs_lens=kwargs_lens, **kwargs)
+            self._memo.set(key, value)
+        return value
 
     def delete_lens_model_cache(self):
         if hasattr(self, "_x_image"):
@@ -64,9 +107,12 @@ class PointSourceCached(object):
                 or not hasattr(self, "_x_image_add")
                 or not hasattr(self, "_y_image_add")
             ):
-                self._x_image_add, self._y_image_add = self._model.image_position(
+                self._x_image_add, self._y_image_add = self._memoized(
+                    "image_position",
+                    self._model.image_position,
                     kwargs_ps,
-                    kwargs_lens=kwargs_lens,
+                    kwargs_lens,
+                    ignore_keys=_AMPLITUDE_KEYS,
                     magnification_limit=magnification_limit,
                     kwargs_lens_eqn_solver=kwargs_lens_eqn_solver,
                     additional_images=additional_images,
@@ -77,9 +123,12 @@ class PointSourceCached(object):
             or not hasattr(self, "_x_image")
             or not hasattr(self, "_y_image")
         ):
-            self._x_image, self._y_image = self._model.image_position(
+            self._x_image, self._y_image = self._memoized(
+                "image_position",
+                self._model.image_position,
                 kwargs_ps,
-                kwargs_lens=kwargs_lens,
+                kwargs_lens,
+                ignore_keys=_AMPLITUDE_KEYS,
                 magnification_limit=magnification_limit,
                 kwargs_lens_eqn_solver=kwargs_lens_eqn_solver,
                 additional_images=additional_images,
@@ -98,8 +147,12 @@ class PointSourceCached(object):
             or not hasattr(self, "_x_source")
             or not hasattr(self, "_y_source")
         ):
-            self._x_source, self._y_source = self._model.source_position(
-                kwargs_ps, kwargs_lens=kwargs_lens
+            self._x_source, self._y_source = self._memoized(
+                "source_position",
+                self._model.source_position,
+                kwargs_ps,
+                kwargs_lens,
+                ignore_keys=_AMPLITUDE_KEYS,
             )
         return self._x_source, self._y_source
 
@@ -129,8 +182,13 @@ class PointSourceCached(object):
             magnification_limit=magnification_limit,
             kwargs_lens_eqn_solver=kwargs_lens_eqn_solver,
         )
-        return self._model.image_amplitude(
-            kwargs_ps, kwargs_lens=kwargs_lens, x_pos=x_pos, y_pos=y_pos
+        return self._memoized(
+            "image_amplitude",
+            self._model.image_amplitude,
+            kwargs_ps,
+            kwargs_lens,
+            x_pos=x_pos,
+            y_pos=y_pos,
         )
 
     def source_amplitude(self, kwargs_ps, kwargs_lens=None):
@@ -142,3 +200,124 @@ class PointSourceCached(object):
         :return: brightness amplitude (as numpy array)
         """
         return self._model.source_amplitude(kwargs_ps, kwargs_lens=kwargs_lens)
+
+
+# keyword arguments of the point source models that do not affect positions
+_AMPLITUDE_KEYS = ("point_amp", "source_amp")
+
+
+class PointSourceMemo(object):
+    """Least-recently-used (LRU) memoization of point source quantities (image
+    positions, source positions and image amplitudes), keyed on the lens and point
+    source keyword arguments rounded to a tolerance.
+
+    A single instance can be shared among several PointSource instances (e.g. the ones
+    used by the different likelihood terms) such that the lens equation is solved only
+    once for a given set of parameters. With a tolerance > 0, parameters that agree
+    within the tolerance share the memoized quantities. Attention: this is an
+    approximation that is only appropriate if the quantities vary little on the scale of
+    the tolerance. The look-ups are thread-safe (e.g. for imaging bands evaluated in
+    parallel threads).
+    """
+
+    def __init__(self, tolerance=0, max_size=100):
+        """
+
+        :param tolerance: float >= 0, absolute tolerance to which the keyword argument
+            values are rounded for the look-up. If 0, the values need to match exactly.
+        :param max_size: int, maximum number of memoized entries; the least recently
+            used entries are discarded first
+        """
+        self._tolerance = tolerance
+        self._max_size = max_size
+        self._store = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        # the lock is not pickled (e.g. for a pool of processes)
+        state = self.__dict__.copy()
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def key(self, *args):
+        """Hashable key of the (rounded) arguments.
+
+        :param args: nested lists, tuples and dictionaries of floats, arrays, strings,
+            bools or None
+        :return: hashable tuple
+        """
+        return self._hashable(args)
+
+    def _hashable(self, obj):
+        """Recursively converts obj into a hashable object with numerical values rounded
+        to the tolerance.
+
+        :param obj: object to convert
+        :return: hashable object
+        """
+        if isinstance(obj, dict):
+            return tuple((k, self._hashable(obj[k])) for k in sorted(obj))
+        if isinstance(obj, (list, tuple)):
+            if len(obj) == 0 or not all(
+                isinstance(o, (int, float, np.number)) and not isinstance(o, bool)
+                for o in obj
+            ):
+                return tuple(self._hashable(o) for o in obj)
+        if obj is None or isinstance(obj, (str, bool)):
+            return obj
+        array = np.asarray(obj)
+        if array.dtype.kind in "iuf":
+            array = array.astype(float)
+            if self._tolerance > 0:
+                array = np.round(array / self._tolerance)
+            # adding 0. maps -0. to 0.
+            array = array + 0.0
+            return array.shape, array.tobytes()
+        return repr(obj)
+
+    def get(self, key):
+        """Look-up of a memoized value.
+
+        :param key: key as returned by key()
+        :return: bool whether the key is memoized, memoized value (or None)
+        """
+        with self._lock:
+            if key in self._store:
+                self._store.move_to_end(key)
+                self.hits += 1
+                return True, self._store[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value):
+        """Memoizes a value and discards the least recently used values if the maximum
+        size is exceeded.
+
+        :param key: key as returned by key()
+        :param value: value to memoize
+        :return: None
+        """
+        with self._lock:
+            self._store[key] = value
+            self._store.move_to_end(key)
+            while len(self._store) > self._max_size:
+                self._store.popitem(last=False)
+
+    def clear(self):
+        """Deletes all memoized values and resets the hit and miss counters.
+
+        :return: None
+        """
+        with self._lock:
+            self._store.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._store)
@@ -1,4 +1,5 @@
 from lenstronomy.LensModel.lens_model_extensions import LensModelExtensions
+from lenstronomy.Sampling.Likelihoods.likelihood_context import LikelihoodContext
 import numpy as np
 
 __all__ = ["FluxRatioLikelihood"]
@@ -65,23 +66,30 @@ class FluxRatioLikelihood(object):
             point_source_redshift_list = [None] * num_point_sources
         self._point_source_redshift_list = point_source_redshift_list
 
-    def logL(self, ra_image_list, dec_image_list, kwargs_lens, kwargs_special):
+    def logL(
+        self, ra_image_list, dec_image_list, kwargs_lens, kwargs_special, context=None
+    ):
         """
 
         :param kwargs_lens: lens model keyword argument list
         :param kwargs_special: dictionary of 'special' keyword parameters
+        :param context: LikelihoodContext instance of the current likelihood evaluation
+            sharing lens quantities among likelihood terms (optional)
         :return: log likelihood of the measured flux ratios given a model
         """
+        if context is None:
+            context = LikelihoodContext(kwargs_lens, None, kwargs_special)
         log_l = 0
         for k in range(len(ra_image_list)):
             if self._flux_ratio_measurement_bool[k] is True:
                 x_pos, y_pos = ra_image_list[k], dec_image_list[k]
-                self._lens_model_class.change_source_redshift(
-                    z_source=self._point_source_redshift_list[k]
-                )
+                z_source = self._point_source_redshift_list[k]
+                self._lens_model_class.change_source_redshift(z_source=z_source)
                 if self._source_type == "INF":
                     mag = np.abs(
-                        self._lens_model_class.magnification(x_pos, y_pos, kwargs_lens)
+                        context.magnification(
+                            self._lens_model_class, x_pos, y_pos, z_source=z_source
+                        )
                     )
                 else:
                     source_sigma = kwargs_special["source_size"]
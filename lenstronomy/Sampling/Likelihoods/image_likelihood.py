@@ -19,6 +19,8 @@ class ImageLikelihood(object):
         check_positive_flux=False,
         kwargs_pixelbased=None,
         linear_solver=True,
+        band_parallel=False,
+        num_threads=None,
     ):
         """
 
@@ -36,6 +38,8 @@ class ImageLikelihood(object):
          (see SLITronomy documentation)
         :param linear_solver: bool, if True (default) fixes the linear amplitude parameters 'amp' (avoid sampling) such
          that they get overwritten by the linear solver solution.
+        :param band_parallel: bool, if True, the imaging bands are evaluated in a pool of threads
+        :param num_threads: number of threads of the pool (default: number of bands)
         """
         self.imSim = class_creator.create_im_sim(
             multi_band_list,
@@ -45,11 +49,14 @@ class ImageLikelihood(object):
             image_likelihood_mask_list=image_likelihood_mask_list,
             kwargs_pixelbased=kwargs_pixelbased,
             linear_solver=linear_solver,
+            band_parallel=band_parallel,
+            num_threads=num_threads,
         )
         self._model_type = self.imSim.type
         self._source_marg = source_marg
         self._linear_prior = linear_prior
         self._check_positive_flux = check_positive_flux
+        self._residuals_supported = linear_solver is True and kwargs_pixelbased is None
 
     def logL(
         self,
@@ -86,6 +93,43 @@ class ImageLikelihood(object):
             return -(10**15), param
         return logL, param
 
+    def residuals(
+        self,
+        kwargs_lens=None,
+        kwargs_source=None,
+        kwargs_lens_light=None,
+        kwargs_ps=None,
+        kwargs_special=None,
+        kwargs_extinction=None,
+        **kwargs,
+    ):
+        """Reduced residuals of the imaging data after the linear inversion, such that
+        -1/2 of their squared sum is the imaging log likelihood (without the
+        marginalization and positive flux terms).
+
+        :param kwargs_lens: lens model keyword argument list according to LensModel module
+        :param kwargs_source: source light keyword argument list according to LightModel module
+        :param kwargs_lens_light: deflector light (not lensed) keyword argument list according to LightModel module
+        :param kwargs_ps: point source keyword argument list according to PointSource module
+        :param kwargs_special: special keyword argument list as part of the Param module
+        :param kwargs_extinction: extinction parameter keyword argument list according to LightModel module
+        :return: 1d numpy array of the reduced residuals of the evaluated pixels of all bands
+        """
+        if self._residuals_supported is False:
+            raise ValueError(
+                "residuals are only available with the linear solver and without "
+                "pixel-based modelling."
+            )
+        model, error_map, _, _ = self.imSim.image_linear_solve(
+            kwargs_lens,
+            kwargs_source,
+            kwargs_lens_light,
+            kwargs_ps,
+            kwargs_extinction=kwargs_extinction,
+            kwargs_special=kwargs_special,
+        )
+        return self.imSim.residual_vector(model, error_map)
+
     @property
     def num_data(self):
         """
@@ -119,3 +163,11 @@ class ImageLikelihood(object):
         :return: None
         """
         self.imSim.reset_point_source_cache(cache=cache)
+
+    def set_point_source_memo(self, memo):
+        """
+
+        :param memo: PointSourceMemo instance or None
+        :return: None
+        """
+        self.imSim.set_point_source_memo(memo)
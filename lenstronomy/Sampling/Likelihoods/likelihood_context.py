@@ -0,0 +1,188 @@
+import numpy as np
+
+__all__ = ["LikelihoodContext"]
+
+
+class LikelihoodContext(object):
+    """Container of the lens quantities of a single likelihood evaluation.
+
+    An instance is created once per Likelihood.log_likelihood() call and passed to the
+    individual likelihood terms. Image positions, source positions, ray-shooting,
+    hessians, magnifications and Fermat potentials are computed lazily on first request
+    and memoized, such that subsequent likelihood terms requesting the same quantity
+    (for the same lens model instance, coordinates, sub-set of lens models and source
+    redshift) re-use it. The number of re-used and computed quantities is recorded in
+    statistics.
+    """
+
+    def __init__(self, kwargs_lens, kwargs_ps, kwargs_special, point_source=None):
+        """
+
+        :param kwargs_lens: lens model keyword argument list
+        :param kwargs_ps: point source keyword argument list
+        :param kwargs_special: special keyword arguments (kept for reference)
+        :param point_source: PointSource() instance (only required for image and
+            source positions)
+        """
+        self._kwargs_lens = kwargs_lens
+        self._kwargs_ps = kwargs_ps
+        self._kwargs_special = kwargs_special
+        self._point_source = point_source
+        self._store = {}
+        self.statistics = {}
+
+    def _get(self, quantity, key, func):
+        """Returns the memoized quantity or computes and memoizes it.
+
+        :param quantity: name of the quantity
+        :param key: hashable key
+        :param func: function without arguments computing the quantity
+        :return: quantity
+        """
+        stats = self.statistics.setdefault(quantity, {"hits": 0, "misses": 0})
+        key = (quantity, key)
+        if key in self._store:
+            stats["hits"] += 1
+            return self._store[key]
+        stats["misses"] += 1
+        value = func()
+        self._store[key] = value
+        return value
+
+    @property
+    def num_hits(self):
+        """
+
+        :return: total number of quantities re-used in this evaluation
+        """
+        return sum(stats["hits"] for stats in self.statistics.values())
+
+    def image_position(
+        self, original_position=False, additional_images=False, width_search_factor=1
+    ):
+        """Image positions of the point sources (see PointSource.image_position()).
+
+        :param original_position: boolean (only applies to 'LENSED_POSITION' models),
+            returns the image positions in the model parameters and does not re-compute
+            images (which might be differently ordered) in case of the lens equation
+            solver
+        :param additional_images: if True, solves the lens equation for additional
+            images
+        :param width_search_factor: searches on wider area than default setting
+        :return: list of image positions per point source model component
+        """
+        key = (original_position, additional_images, width_search_factor)
+        return self._get(
+            "image_position",
+            key,
+            lambda: self._point_source.image_position(
+                kwargs_ps=self._kwargs_ps,
+                kwargs_lens=self._kwargs_lens,
+                original_position=original_position,
+                additional_images=additional_images,
+                width_search_factor=width_search_factor,
+            ),
+        )
+
+    def source_position(self):
+        """Source positions of the point sources (see PointSource.source_position())
+
+        :return: list of source positions for each point source model
+        """
+        return self._get(
+            "source_position",
+            None,
+            lambda: self._point_source.source_position(
+                self._kwargs_ps, self._kwargs_lens
+            ),
+        )
+
+    def _lens_key(self, lens_model, x, y, k, z_source):
+        """Prepares the lens model for the source redshift and returns the key of the
+        lens quantities. The cosmology of the lens model is expected to be updated by
+        the caller and to stay fixed within a single likelihood evaluation.
+
+        :param lens_model: LensModel() instance
+        :param x: x-coordinates
+        :param y: y-coordinates
+        :param k: None or sub-set of lens models
+        :param z_source: None or source redshift
+        :return: hashable key
+        """
+        lens_model.change_source_redshift(z_source=z_source)
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if k is not None:
+            k = tuple(np.atleast_1d(k).tolist())
+        return (
+            id(lens_model),
+            x.shape,
+            x.tobytes(),
+            y.tobytes(),
+            k,
+            getattr(lens_model, "z_source", None),
+        )
+
+    def ray_shooting(self, lens_model, x, y, k=None, z_source=None):
+        """
+
+        :param lens_model: LensModel() instance
+        :param x: x-coordinates
+        :param y: y-coordinates
+        :param k: None or sub-set of lens models
+        :param z_source: None or source redshift
+        :return: source plane coordinates
+        """
+        key = self._lens_key(lens_model, x, y, k, z_source)
+        return self._get(
+            "ray_shooting",
+            key,
+            lambda: lens_model.ray_shooting(x, y, self._kwargs_lens, k=k),
+        )
+
+    def hessian(self, lens_model, x, y, k=None, z_source=None):
+        """
+
+        :param lens_model: LensModel() instance
+        :param x: x-coordinates
+        :param y: y-coordinates
+        :param k: None or sub-set of lens models
+        :param z_source: None or source redshift
+        :return: f_xx, f_xy, f_yx, f_yy
+        """
+        key = self._lens_key(lens_model, x, y, k, z_source)
+        return self._get(
+            "hessian",
+            key,
+            lambda: lens_model.hessian(x, y, self._kwargs_lens, k=k),
+        )
+
+    def magnification(self, lens_model, x, y, k=None, z_source=None):
+        """Magnification computed from the (memoized) hessian.
+
+        :param lens_model: LensModel() instance
+        :param x: x-coordinates
+        :param y: y-coordinates
+        :param k: None or sub-set of lens models
+        :param z_source: None or source redshift
+        :return: signed magnification
+        """
+        f_xx, f_xy, f_yx, f_yy = self.hessian(lens_model, x, y, k=k, z_source=z_source)
+        det_A = (1 - f_xx) * (1 - f_yy) - f_xy * f_yx
+        return 1.0 / det_A
+
+    def fermat_potential(self, lens_model, x, y, z_source=None):
+        """
+
+        :param lens_model: LensModel() instance
+        :param x: x-coordinates
+        :param y: y-coordinates
+        :param z_source: None or source redshift
+        :return: Fermat potential
+        """
+        key = self._lens_key(lens_model, x, y, None, z_source)
+        return self._get(
+            "fermat_potential",
+            key,
+            lambda: lens_model.fermat_potential(x, y, self._kwargs_lens),
+        )
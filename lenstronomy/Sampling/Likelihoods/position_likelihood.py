@@ -1,6 +1,7 @@
 import numpy as np
 from numpy.linalg import inv
 from lenstronomy.Util.cosmo_util import get_astropy_cosmology
+from lenstronomy.Sampling.Likelihoods.likelihood_context import LikelihoodContext
 
 import warnings
 
@@ -89,16 +90,21 @@ class PositionLikelihood(object):
             dec_image_list = []
         self._ra_image_list, self._dec_image_list = ra_image_list, dec_image_list
 
-    def logL(self, kwargs_lens, kwargs_ps, kwargs_special, verbose=False):
+    def logL(self, kwargs_lens, kwargs_ps, kwargs_special, verbose=False, context=None):
         """
 
         :param kwargs_lens: lens model parameter keyword argument list
         :param kwargs_ps: point source model parameter keyword argument list
         :param kwargs_special: special keyword arguments
         :param verbose: bool
+        :param context: LikelihoodContext instance of the current likelihood evaluation
+            sharing lens quantities among likelihood terms (optional)
         :return: log likelihood of the optional likelihoods being computed
         """
-
+        if context is None:
+            context = LikelihoodContext(
+                kwargs_lens, kwargs_ps, kwargs_special, point_source=self._pointSource
+            )
         logL = 0
         if self._lensModel.cosmology_sampling:
             cosmo = get_astropy_cosmology(
@@ -115,7 +121,9 @@ class PositionLikelihood(object):
             if verbose is True:
                 print("Astrometric likelihood = %s" % logL_astrometry)
         if self._force_no_add_image:
-            additional_image_bool = self.check_additional_images(kwargs_ps, kwargs_lens)
+            additional_image_bool = self.check_additional_images(
+                kwargs_ps, kwargs_lens, context=context
+            )
             if additional_image_bool is True:
                 logL -= 10.0**5
                 if verbose is True:
@@ -123,9 +131,7 @@ class PositionLikelihood(object):
                         "force no additional image penalty as additional images are found!"
                     )
         if self._restrict_number_images is True:
-            ra_image_list, dec_image_list = self._pointSource.image_position(
-                kwargs_ps=kwargs_ps, kwargs_lens=kwargs_lens
-            )
+            ra_image_list, dec_image_list = context.image_position()
             if len(ra_image_list[0]) > self._max_num_images:
                 logL -= 10.0**5
                 if verbose is True:
@@ -140,6 +146,7 @@ class PositionLikelihood(object):
                 self._source_position_sigma,
                 hard_bound_rms=self._bound_source_position_tolerance,
                 verbose=verbose,
+                context=context,
             )
             logL += logL_source_pos
             if verbose is True:
@@ -149,25 +156,28 @@ class PositionLikelihood(object):
                 kwargs_ps=kwargs_ps,
                 kwargs_lens=kwargs_lens,
                 sigma=self._image_position_sigma,
+                context=context,
             )
             logL += logL_image_pos
             if verbose is True:
                 print("image position likelihood %s" % logL_image_pos)
         return logL
 
-    def check_additional_images(self, kwargs_ps, kwargs_lens):
+    def check_additional_images(self, kwargs_ps, kwargs_lens, context=None):
         """Checks whether additional images have been found and placed in kwargs_ps.
 
         :param kwargs_ps: point source kwargs
         :param kwargs_lens: lens model keyword arguments
+        :param context: LikelihoodContext instance (optional)
         :return: bool, True if more image positions are found than originally been
             assigned
         """
-        ra_image_list, dec_image_list = self._pointSource.image_position(
-            kwargs_ps=kwargs_ps,
-            kwargs_lens=kwargs_lens,
-            additional_images=True,
-            width_search_factor=1.5,
+        if context is None:
+            context = LikelihoodContext(
+                kwargs_lens, kwargs_ps, None, point_source=self._pointSource
+            )
+        ra_image_list, dec_image_list = context.image_position(
+            additional_images=True, width_search_factor=1.5
         )
         for i in range(len(ra_image_list)):
             if "ra_image" in kwargs_ps[i]:
@@ -210,6 +220,7 @@ class PositionLikelihood(object):
         kwargs_ps,
         kwargs_lens,
         sigma,
+        context=None,
     ):
         """Computes the likelihood of the model predicted image position relative to
         measured image positions with an astrometric error. This routine requires the
@@ -219,13 +230,15 @@ class PositionLikelihood(object):
         :param kwargs_ps: point source keyword argument list
         :param kwargs_lens: lens model keyword argument list
         :param sigma: 1-sigma uncertainty in the measured position of the images
+        :param context: LikelihoodContext instance (optional)
         :return: log likelihood of the model predicted image positions given the
             data/measured image positions.
         """
-
-        ra_image_list, dec_image_list = self._pointSource.image_position(
-            kwargs_ps=kwargs_ps, kwargs_lens=kwargs_lens, original_position=True
-        )
+        if context is None:
+            context = LikelihoodContext(
+                kwargs_lens, kwargs_ps, None, point_source=self._pointSource
+            )
+        ra_image_list, dec_image_list = context.image_position(original_position=True)
         logL = 0
         for i in range(
             len(ra_image_list)
@@ -248,6 +261,7 @@ class PositionLikelihood(object):
         sigma,
         hard_bound_rms=None,
         verbose=False,
+        context=None,
     ):
         """Computes a likelihood/punishing factor of how well the source positions of
         multiple images match given the image position and a lens model. The likelihood
@@ -260,13 +274,18 @@ class PositionLikelihood(object):
         :param hard_bound_rms: hard bound deviation between the mapping of the images
             back to the source plane (in source frame)
         :param verbose: bool, if True provides print statements with useful information.
+        :param context: LikelihoodContext instance (optional)
         :return: log likelihood of the model reproducing the correct image positions
             given an image position uncertainty
         """
         if len(kwargs_ps) < 1:
             return 0
+        if context is None:
+            context = LikelihoodContext(
+                kwargs_lens, kwargs_ps, None, point_source=self._pointSource
+            )
         logL = 0
-        source_x, source_y = self._pointSource.source_position(kwargs_ps, kwargs_lens)
+        source_x, source_y = context.source_position()
         redshift_list = self._pointSource._redshift_list
 
         for k in range(len(kwargs_ps)):
@@ -279,17 +298,26 @@ class PositionLikelihood(object):
                 self._lensModel.change_source_redshift(redshift_list[k])
                 # calculating the individual source positions from the image positions
                 k_list = self._pointSource.k_list(k)
+                if k_list is None:
+                    # all images are evaluated with the same lens models at once
+                    x_source, y_source = context.ray_shooting(
+                        self._lensModel, x_image, y_image, z_source=redshift_list[k]
+                    )
+                    hessian = context.hessian(
+                        self._lensModel, x_image, y_image, z_source=redshift_list[k]
+                    )
                 for i in range(len(x_image)):
                     if k_list is not None:
                         k_lens = k_list[i]
+                        x_source_i, y_source_i = self._lensModel.ray_shooting(
+                            x_image[i], y_image[i], kwargs_lens, k=k_lens
+                        )
+                        f_xx, f_xy, f_yx, f_yy = self._lensModel.hessian(
+                            x_image[i], y_image[i], kwargs_lens, k=k_lens
+                        )
                     else:
-                        k_lens = None
-                    x_source_i, y_source_i = self._lensModel.ray_shooting(
-                        x_image[i], y_image[i], kwargs_lens, k=k_lens
-                    )
-                    f_xx, f_xy, f_yx, f_yy = self._lensModel.hessian(
-                        x_image[i], y_image[i], kwargs_lens, k=k_lens
-                    )
+                        x_source_i, y_source_i = x_source[i], y_source[i]
+                        f_xx, f_xy, f_yx, f_yy = [f[i] for f in hessian]
                     A = np.array([[1 - f_xx, -f_xy], [-f_yx, 1 - f_yy]])
                     Sigma_theta = np.array([[1, 0], [0, 1]]) * sigma**2
                     Sigma_beta = image2source_covariance(A, Sigma_theta)
@@ -1,6 +1,7 @@
 import numpy as np
 import lenstronomy.Util.constants as const
 from lenstronomy.Util.cosmo_util import get_astropy_cosmology
+from lenstronomy.Sampling.Likelihoods.likelihood_context import LikelihoodContext
 
 __all__ = ["TimeDelayLikelihood"]
 
@@ -116,7 +117,7 @@ class TimeDelayLikelihood(object):
 
         self._measurement_bool_list = time_delay_measurement_bool_list
 
-    def logL(self, kwargs_lens, kwargs_ps, kwargs_cosmo, lambda_mst=1):
+    def logL(self, kwargs_lens, kwargs_ps, kwargs_cosmo, lambda_mst=1, context=None):
         """Routine to compute the log likelihood of the time-delay distance.
 
         :param kwargs_lens: lens model kwargs list
@@ -125,11 +126,15 @@ class TimeDelayLikelihood(object):
         :param lambda_mst: mass-sheet transform of the input lens model that is not
             accounted for in the lens model parameters
         :type lambda_mst: float or int
+        :param context: LikelihoodContext instance of the current likelihood evaluation
+            sharing lens quantities among likelihood terms (optional)
         :return: log likelihood of the model given the time delay data.
         """
-        x_pos, y_pos = self._pointSource.image_position(
-            kwargs_ps=kwargs_ps, kwargs_lens=kwargs_lens, original_position=True
-        )
+        if context is None:
+            context = LikelihoodContext(
+                kwargs_lens, kwargs_ps, kwargs_cosmo, point_source=self._pointSource
+            )
+        x_pos, y_pos = context.image_position(original_position=True)
         if self._lensModel.cosmology_sampling:
             cosmo = get_astropy_cosmology(
                 cosmology_model=self._lensModel.cosmology_model,
@@ -142,16 +147,15 @@ class TimeDelayLikelihood(object):
             mask = np.array(self._measurement_bool_list[i])
             if np.any(mask):
                 x_pos_, y_pos_ = x_pos[i], y_pos[i]
-                self._lensModel.change_source_redshift(
-                    z_source=self._pointSource._redshift_list[i]
-                )
+                z_source = self._pointSource._redshift_list[i]
+                self._lensModel.change_source_redshift(z_source=z_source)
                 if self._lensModel.cosmology_sampling:
                     delay_days = self._lensModel.arrival_time(
                         x_pos_, y_pos_, kwargs_lens
                     )
                 else:
-                    delay_arcsec = self._lensModel.fermat_potential(
-                        x_pos_, y_pos_, kwargs_lens
+                    delay_arcsec = context.fermat_potential(
+                        self._lensModel, x_pos_, y_pos_, z_source=z_source
                     )
                     D_dt_model = kwargs_cosmo["D_dt"]
                     Ddt_scaled = self._lensModel.ddt_scaling * D_dt_model
@@ -19,6 +19,19 @@ def set_sampler_likelihood_module(likelihood_module):
     _SAMPLER_LIKELIHOOD_MODULE = likelihood_module
 
 
+def set_sampler_likelihood_module_shared(payload):
+    """Set the likelihood module used by worker log-likelihood evaluations from a
+    payload of SharedMemoryExport, attaching the large arrays of the likelihood module
+    to shared memory instead of holding a copy in every worker.
+
+    :param payload: bytes, SharedMemoryExport(likelihood_module).payload
+    :return: None
+    """
+    from lenstronomy.Sampling.Pool.shared_memory import load_shared_memory_payload
+
+    set_sampler_likelihood_module(load_shared_memory_payload(payload))
+
+
 def sampler_logl_worker(args):
     """Evaluate the log-likelihood from worker-local sampler state.
 
@@ -33,6 +46,20 @@ def sampler_logl_worker(args):
     return _SAMPLER_LIKELIHOOD_MODULE.logL(args)
 
 
+def sampler_residuals_worker(args):
+    """Evaluate the reduced imaging residuals from worker-local sampler state.
+
+    :param args: parameter vector for which to evaluate the residuals
+    :return: 1d array of reduced residuals
+    """
+    if _SAMPLER_LIKELIHOOD_MODULE is None:
+        raise RuntimeError(
+            "Worker likelihood module is not initialized. "
+            "Call set_sampler_likelihood_module before evaluating residuals."
+        )
+    return _SAMPLER_LIKELIHOOD_MODULE.residuals(args)
+
+
 def set_nested_likelihood_module(likelihood_module, n_dims):
     """Set the nested-sampler likelihood and dimensionality on each worker.
 
@@ -0,0 +1,198 @@
+__author__ = "ajshajib"
+
+import hashlib
+from multiprocessing.shared_memory import SharedMemory
+
+import dill
+
+from lenstronomy.Sampling.Pool.pool import choose_pool
+from lenstronomy.Sampling.Pool.shared_memory import (
+    SharedMemoryExport,
+    load_shared_memory_payload,
+    _attach_segment,
+    _ATTACHED_SEGMENTS,
+)
+
+__all__ = ["PersistentLikelihoodPool", "likelihood_signature"]
+
+# worker-local likelihood state of the persistent pool
+_WORKER_LIKELIHOOD = None
+_WORKER_VERSION = None
+_WORKER_FULL_VERSION = None
+
+
+def likelihood_signature(*args):
+    """Signature of the settings a likelihood module is built from. Two likelihood
+    modules with the same signature only differ in their Param() instance (i.e. fixed
+    parameters and bounds).
+
+    :param args: objects the likelihood module is built from (e.g. kwargs_data_joint,
+        kwargs_model, kwargs_constraints, kwargs_likelihood)
+    :return: string, hash of the pickled arguments
+    """
+    return hashlib.sha1(dill.dumps(args)).hexdigest()
+
+
+class _WorkerState(object):
+    """Lightweight description of the current likelihood state of a
+    PersistentLikelihoodPool, sent along with the tasks to the workers."""
+
+    def __init__(self, version, full_version, full_name, full_size, param_bytes):
+        """
+
+        :param version: version of the state
+        :param full_version: version of the last full likelihood export
+        :param full_name: name of the shared memory segment holding the payload of the
+            last full likelihood export
+        :param full_size: size of the payload in bytes
+        :param param_bytes: None or pickled Param() instance replacing the one of the
+            last full likelihood export
+        """
+        self.version = version
+        self.full_version = full_version
+        self.full_name = full_name
+        self.full_size = full_size
+        self.param_bytes = param_bytes
+
+    def likelihood(self):
+        """Synchronizes the likelihood module of this (worker) process with the state.
+
+        :return: likelihood module of the state
+        """
+        global _WORKER_LIKELIHOOD, _WORKER_VERSION, _WORKER_FULL_VERSION
+        if _WORKER_VERSION == self.version:
+            return _WORKER_LIKELIHOOD
+        if _WORKER_FULL_VERSION != self.full_version:
+            # release the arrays and segments of the previous likelihood module
+            _WORKER_LIKELIHOOD = None
+            _ATTACHED_SEGMENTS.clear()
+            segment = _attach_segment(self.full_name)
+            payload = bytes(segment.buf[: self.full_size])
+            _WORKER_LIKELIHOOD = load_shared_memory_payload(payload)
+            _WORKER_FULL_VERSION = self.full_version
+        if self.param_bytes is not None:
+            _WORKER_LIKELIHOOD.update_param_class(dill.loads(self.param_bytes))
+        _WORKER_VERSION = self.version
+        return _WORKER_LIKELIHOOD
+
+
+class _PersistentLogL(object):
+    """Log-likelihood callable evaluated on the workers of a
+    PersistentLikelihoodPool."""
+
+    def __init__(self, state):
+        """
+
+        :param state: _WorkerState instance
+        """
+        self._state = state
+
+    def __call__(self, args):
+        return self._state.likelihood().logL(args)
+
+
+class _PersistentResiduals(_PersistentLogL):
+    """Reduced imaging residuals callable evaluated on the workers of a
+    PersistentLikelihoodPool."""
+
+    def __call__(self, args):
+        return self._state.likelihood().residuals(args)
+
+
+class PersistentLikelihoodPool(object):
+    """Multiprocessing pool whose workers are kept alive across several sampling steps
+    (e.g. of a FittingSequence).
+
+    Instead of re-spawning the workers and re-sending the likelihood module for every
+    step, the workers receive updates of the likelihood state. If only the Param()
+    instance changed (fixed parameters, bounds), the update consists of the pickled
+    Param() instance only. Otherwise, the likelihood module is exported once through
+    shared memory (see SharedMemoryExport). The workers synchronize lazily with the
+    state sent along with their tasks.
+    """
+
+    def __init__(self, processes):
+        """
+
+        :param processes: number of worker processes
+        """
+        self.processes = processes
+        self.pool = choose_pool(mpi=False, processes=processes)
+        self._version = 0
+        self._signature = None
+        self._export = None
+        self._segment = None
+        self._state = None
+        self.num_full_updates = 0
+
+    def update(self, likelihood_module, signature=None):
+        """Sets the likelihood module evaluated by the workers.
+
+        :param likelihood_module: instance of the Likelihood class
+        :param signature: signature of the settings the likelihood module is built from
+            (see likelihood_signature()). If it matches the one of the previous update,
+            only the Param() instance is sent to the workers. If None, the likelihood
+            module is always sent in full.
+        :return: None
+        """
+        self._version += 1
+        if signature is None or signature != self._signature or self._state is None:
+            self._release()
+            self._export = SharedMemoryExport(likelihood_module)
+            payload = self._export.payload
+            self._segment = SharedMemory(create=True, size=max(len(payload), 1))
+            self._segment.buf[: len(payload)] = payload
+            self._signature = signature
+            self.num_full_updates += 1
+            self._state = _WorkerState(
+                self._version, self._version, self._segment.name, len(payload), None
+            )
+        else:
+            self._state = _WorkerState(
+                self._version,
+                self._state.full_version,
+                self._state.full_name,
+                self._state.full_size,
+                dill.dumps(likelihood_module.param),
+            )
+
+    @property
+    def logl_function(self):
+        """
+
+        :return: log-likelihood callable to be mapped over the pool
+        """
+        return _PersistentLogL(self._state)
+
+    @property
+    def residuals_function(self):
+        """
+
+        :return: reduced imaging residuals callable to be mapped over the pool
+        """
+        return _PersistentResiduals(self._state)
+
+    def _release(self):
+        """Releases the shared memory of the last full export.
+
+        :return: None
+        """
+        if self._export is not None:
+            self._export.close()
+            self._export = None
+        if self._segment is not None:
+            self._segment.close()
+            self._segment.unlink()
+            self._segment = None
+
+    def close(self):
+        """Terminates the workers and releases the shared memory.
+
+        :return: None
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        self._release()
+        self._state = None
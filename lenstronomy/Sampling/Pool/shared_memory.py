@@ -0,0 +1,183 @@
+"""Transfer of objects holding large read-only numpy arrays (image data, noise maps, PSF
+kernels, numerics grids, pixel indices, ...) to the workers of a multiprocessing pool
+through shared memory.
+
+The object is pickled once on the master process. Every numpy array above a size
+threshold is copied into a multiprocessing.shared_memory segment and only a reference to
+the segment is stored in the pickle. When the workers unpickle the payload, the arrays
+are re-created as read-only views of the shared segments without copying the data, such
+that the memory of the arrays is held once independent of the number of workers.
+"""
+
+__author__ = "ajshajib"
+
+import io
+import pickle
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+try:
+    import dill
+
+    _Pickler = dill.Pickler
+    _Unpickler = dill.Unpickler
+except ImportError:  # pragma: no cover
+    _Pickler = pickle.Pickler
+    _Unpickler = pickle.Unpickler
+
+__all__ = ["SharedMemoryExport", "load_shared_memory_payload"]
+
+# arrays smaller than this number of bytes are pickled as usual
+MIN_SHARED_BYTES = 2**16
+
+# shared memory segments attached in this (worker) process, kept alive with the arrays
+_ATTACHED_SEGMENTS = {}
+
+
+class _SharedMemoryPickler(_Pickler):
+    """Pickler storing large numpy arrays as references to shared memory segments."""
+
+    def __init__(self, file, export, min_bytes):
+        """
+
+        :param file: file-like object to write the pickle to
+        :param export: SharedMemoryExport() instance owning the segments
+        :param min_bytes: minimum size (in bytes) of arrays to place in shared memory
+        """
+        super(_SharedMemoryPickler, self).__init__(
+            file, protocol=pickle.HIGHEST_PROTOCOL
+        )
+        self._export = export
+        self._min_bytes = min_bytes
+
+    def persistent_id(self, obj):
+        if (
+            type(obj) is np.ndarray
+            and obj.nbytes >= self._min_bytes
+            and not obj.dtype.hasobject
+        ):
+            return self._export.share(obj)
+        return None
+
+
+class _SharedMemoryUnpickler(_Unpickler):
+    """Unpickler re-creating the shared arrays as views of the shared memory
+    segments."""
+
+    def persistent_load(self, pid):
+        tag, name, shape, dtype = pid
+        if tag != "lenstronomy_shared_array":
+            raise pickle.UnpicklingError("unsupported persistent id %s" % str(tag))
+        segment = _attach_segment(name)
+        array = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+        array.flags.writeable = False
+        return array
+
+
+def _attach_segment(name):
+    """Attaches to an existing shared memory segment without registering it with the
+    resource tracker of this process (the segment is owned and unlinked by the master
+    process).
+
+    :param name: name of the shared memory segment
+    :return: SharedMemory instance
+    """
+    if name in _ATTACHED_SEGMENTS:
+        return _ATTACHED_SEGMENTS[name]
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        segment = SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+    _ATTACHED_SEGMENTS[name] = segment
+    return segment
+
+
+def load_shared_memory_payload(payload):
+    """Re-creates the object from a payload of SharedMemoryExport. Has to be called in
+    the process using the object, e.g. in the initializer of the pool workers.
+
+    :param payload: bytes, SharedMemoryExport.payload
+    :return: object with the large arrays being read-only views of shared memory
+    """
+    return _SharedMemoryUnpickler(io.BytesIO(payload)).load()
+
+
+class SharedMemoryExport(object):
+    """Places the large numpy arrays of an object in shared memory and provides a
+    lightweight pickled payload of the object to be sent to the pool workers.
+
+    The shared memory segments are owned by this instance and released with close().
+    """
+
+    def __init__(self, obj, min_bytes=None):
+        """
+
+        :param obj: object to export (e.g. a Likelihood instance)
+        :param min_bytes: minimum size (in bytes) of arrays to place in shared memory,
+            default MIN_SHARED_BYTES
+        """
+        if min_bytes is None:
+            min_bytes = MIN_SHARED_BYTES
+        self._segments = []
+        self._shared = {}
+        self.shared_bytes = 0
+        buffer = io.BytesIO()
+        try:
+            _SharedMemoryPickler(buffer, self, min_bytes).dump(obj)
+        except Exception:
+            self.close()
+            raise
+        self.payload = buffer.getvalue()
+
+    def share(self, array):
+        """Copies an array into a new shared memory segment (once per array).
+
+        :param array: numpy array
+        :return: persistent id of the shared array
+        """
+        key = id(array)
+        if key not in self._shared:
+            segment = SharedMemory(create=True, size=max(array.nbytes, 1))
+            self._segments.append(segment)
+            shared = np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)
+            shared[...] = array
+            self.shared_bytes += array.nbytes
+            # the array is kept referenced such that its id() remains unique
+            self._shared[key] = (
+                array,
+                ("lenstronomy_shared_array", segment.name, array.shape, array.dtype),
+            )
+        return self._shared[key][1]
+
+    @property
+    def num_segments(self):
+        """
+
+        :return: number of shared memory segments
+        """
+        return len(self._segments)
+
+    def close(self):
+        """Releases and unlinks the shared memory segments. Workers that have already
+        attached to the segments keep their views valid.
+
+        :return: None
+        """
+        for segment in self._segments:
+            try:
+                segment.close()
+                segment.unlink()
+            except FileNotFoundError:  # pragma: no cover
+                pass
+        self._segments = []
+        self._shared = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,174 @@
+__author__ = "ajshajib"
+
+import numpy as np
+
+__all__ = ["LevenbergMarquardt"]
+
+
+class LevenbergMarquardt(object):
+    """Levenberg-Marquardt (damped Gauss-Newton) optimizer of a least-squares problem
+    with box constraints.
+
+    The log likelihood is assumed to be dominated by -1/2 of the squared sum of a
+    residual vector r(x) (e.g. the reduced residuals of the imaging data after the
+    linear inversion of the amplitudes). Each iteration solves the damped normal
+    equations
+
+    (J^T J + lambda diag(J^T J)) delta = -J^T r
+
+    with the Jacobian J of the residuals. A step is accepted if it increases the full
+    log likelihood (including priors and the other likelihood terms), in which case the
+    damping lambda is decreased, otherwise the damping is increased and the step is
+    repeated.
+
+    The Jacobian is computed with forward finite differences, the num_param + 1 residual
+    vectors of an iteration being evaluated in a single map over the pool, or with an
+    analytic Jacobian function if provided.
+    """
+
+    def __init__(
+        self,
+        residual_function,
+        logl_function,
+        lower_limit,
+        upper_limit,
+        pool=None,
+        step_size=1e-4,
+        jacobian=None,
+    ):
+        """
+
+        :param residual_function: function returning the 1d residual vector of a
+            parameter vector (must be picklable when mapped over a pool of processes)
+        :param logl_function: function returning the log likelihood of a parameter
+            vector
+        :param lower_limit: lower limits of the parameters
+        :param upper_limit: upper limits of the parameters
+        :param pool: None or pool with a map() method to evaluate the finite
+            differences in parallel
+        :param step_size: finite difference step relative to the width of the
+            parameter limits (relative to max(|x|, 1) for unbounded parameters)
+        :param jacobian: None or function returning the Jacobian of the residuals of a
+            parameter vector, shape (num_residuals, num_param); replaces the finite
+            differences
+        """
+        self._residual_function = residual_function
+        self._logl_function = logl_function
+        self._lower = np.array(lower_limit, dtype=float)
+        self._upper = np.array(upper_limit, dtype=float)
+        self._pool = pool
+        self._step_size = step_size
+        self._jacobian = jacobian
+        self.num_residual_calls = 0
+        self.num_logl_calls = 0
+
+    def _map(self, function, points):
+        if self._pool is None:
+            return list(map(function, points))
+        return list(self._pool.map(function, points))
+
+    def _steps(self, x):
+        """Finite difference steps of the parameters, pointing inwards at the upper
+        limits.
+
+        :param x: parameter vector
+        :return: numpy array of the steps (zero for parameters with equal lower and
+            upper limits)
+        """
+        width = self._upper - self._lower
+        h = self._step_size * width
+        unbounded = ~np.isfinite(width)
+        h[unbounded] = self._step_size * np.maximum(np.abs(x[unbounded]), 1)
+        h[x + h > self._upper] *= -1
+        return h
+
+    def residuals_and_jacobian(self, x):
+        """
+
+        :param x: parameter vector
+        :return: residual vector, Jacobian of shape (num_residuals, num_param)
+        """
+        if self._jacobian is not None:
+            self.num_residual_calls += 1
+            return np.asarray(self._residual_function(x)), np.asarray(self._jacobian(x))
+        h = self._steps(x)
+        free = h != 0
+        points = [x] + list(x + np.diag(h)[free])
+        residuals = self._map(self._residual_function, points)
+        self.num_residual_calls += len(points)
+        r = np.asarray(residuals[0])
+        jacobian = np.zeros((len(r), len(x)))
+        jacobian[:, free] = (np.array(residuals[1:]) - r).T / h[free]
+        return r, jacobian
+
+    def _logl(self, x):
+        self.num_logl_calls += 1
+        return self._logl_function(x)
+
+    @staticmethod
+    def _solve(jtj, jtr, damping):
+        """Solves the damped normal equations.
+
+        :param jtj: J^T J
+        :param jtr: J^T r
+        :param damping: damping parameter lambda
+        :return: step delta
+        """
+        diagonal = np.diag(jtj).copy()
+        diagonal[diagonal <= 0] = 1
+        matrix = jtj + damping * np.diag(diagonal)
+        try:
+            return np.linalg.solve(matrix, -jtr)
+        except np.linalg.LinAlgError:
+            return np.linalg.lstsq(matrix, -jtr, rcond=None)[0]
+
+    def optimize(
+        self,
+        init_pos,
+        n_iterations=100,
+        tolerance=1e-6,
+        damping=1e-3,
+        max_damping=1e10,
+        verbose=False,
+    ):
+        """Runs the optimization.
+
+        :param init_pos: starting point of the optimization
+        :param n_iterations: maximum number of (Jacobian) iterations
+        :param tolerance: stops when the log likelihood improves by less than tolerance
+            * (|logL| + tolerance) in an iteration
+        :param damping: initial damping parameter lambda
+        :param max_damping: stops when the damping exceeds max_damping without an
+            accepted step
+        :param verbose: bool, if True, prints the progress
+        :return: best parameter vector, list of the log likelihoods of the iterations
+        """
+        x = np.minimum(
+            np.maximum(np.array(init_pos, dtype=float), self._lower), self._upper
+        )
+        logL = self._logl(x)
+        logL_list = [logL]
+        for i in range(n_iterations):
+            r, jacobian = self.residuals_and_jacobian(x)
+            jtj = jacobian.T.dot(jacobian)
+            jtr = jacobian.T.dot(r)
+            accepted = False
+            while damping <= max_damping:
+                delta = self._solve(jtj, jtr, damping)
+                x_new = np.minimum(np.maximum(x + delta, self._lower), self._upper)
+                logL_new = self._logl(x_new)
+                if np.isfinite(logL_new) and logL_new > logL:
+                    accepted = True
+                    damping = max(damping / 10, 1e-12)
+                    break
+                damping *= 10
+            if accepted is False:
+                break
+            improvement = logL_new - logL
+            x, logL = x_new, logL_new
+            logL_list.append(logL)
+            if verbose:
+                print("iteration %s: log likelihood %s" % (i, logL))
+            if improvement < tolerance * (abs(logL) + tolerance):
+                break
+        return x, logL_list
@@ -6,6 +6,7 @@
 from copy import copy
 from math import floor
 import math
+import queue
 import numpy as np
 from tqdm import tqdm
 
@@ -32,7 +33,15 @@ class ParticleSwarmOptimizer(object):
     """
 
     def __init__(
-        self, func, low, high, particle_count=25, pool=None, args=None, kwargs=None
+        self,
+        func,
+        low,
+        high,
+        particle_count=25,
+        pool=None,
+        args=None,
+        kwargs=None,
+        vectorize=False,
     ):
         """
 
@@ -52,11 +61,17 @@ class ParticleSwarmOptimizer(object):
         :param kwargs: keyword arguments to send to `func`. The function
             will be called as `func(x, *args, **kwargs)`
         :type kwargs: `dict`
+        :param vectorize: if True, `func` is called once per iteration with the 2d array
+            of all particle positions and returns the array of their log likelihoods.
+            Any parallelization is then up to `func` and the pool is only used to
+            identify the master process.
+        :type vectorize: bool
         """
         self.low = [l for l in low]
         self.high = [h for h in high]
         self.particleCount = particle_count
         self.pool = pool
+        self._vectorize = vectorize
 
         self.param_count = len(self.low)
 
@@ -94,19 +109,14 @@ class ParticleSwarmOptimizer(object):
     def _init_swarm(self):
         """Initiate the swarm.
 
-        :return:
-        :rtype:
+        :return: swarm with uniformly drawn positions within the bounds and zero
+            velocities
+        :rtype: Swarm
         """
-        swarm = []
-        for _ in range(self.particleCount):
-            swarm.append(
-                Particle(
-                    np.random.uniform(self.low, self.high, size=self.param_count),
-                    np.zeros(self.param_count),
-                )
-            )
-
-        return swarm
+        position = np.random.uniform(
+            self.low, self.high, size=(self.particleCount, self.param_count)
+        )
+        return Swarm(position, np.zeros((self.particleCount, self.param_count)))
 
     def sample(
         self,
@@ -118,6 +128,7 @@ class ParticleSwarmOptimizer(object):
         n=1e-2,
         early_stop_tolerance=None,
         verbose=True,
+        asynchronous=False,
     ):
         """Launches the PSO. Yields the complete swarm per iteration.
 
@@ -132,20 +143,27 @@ class ParticleSwarmOptimizer(object):
             specified as a chi^2)
         :param verbose: prints when it stopped
         :type verbose: boolean
+        :param asynchronous: if True, each particle is updated and re-submitted as soon
+            as its own fitness is returned instead of waiting for the whole swarm (see
+            _sample_async()). An iteration then corresponds to as many likelihood
+            evaluations as there are particles.
+        :type asynchronous: boolean
         """
+        if asynchronous is True:
+            if self._vectorize is True:
+                raise ValueError(
+                    "The asynchronous PSO evaluates single particles and can not be "
+                    "used with a vectorized likelihood function."
+                )
+            yield from self._sample_async(
+                max_iter, c1, c2, p, m, n, early_stop_tolerance, verbose
+            )
+            return
 
         self._get_fitness(self.swarm)
         i = 0
         while True:
-            for particle in self.swarm:
-                if self.global_best.fitness < particle.fitness:
-                    self.global_best = particle.copy()
-                    # if(self.isMaster()):
-                    # print("new global best found %i %s"%(i,
-                    # self.global_best.__str__()))
-
-                if particle.fitness > particle.personal_best.fitness:
-                    particle.update_personal_best()
+            self._update_best()
 
             if i >= max_iter:
                 if self.is_master():
@@ -168,40 +186,177 @@ class ParticleSwarmOptimizer(object):
                 if self._acceptable_convergence(early_stop_tolerance):
                     return
 
-            for particle in self.swarm:
-                w = 0.5 + np.random.uniform(0, 1, size=self.param_count) / 2
-                # w=0.72
-                part_vel = w * np.array(particle.velocity)
-                cog_vel = (
-                    c1
-                    * np.random.uniform(0, 1, size=self.param_count)
-                    * (
-                        np.array(particle.personal_best.position)
-                        - np.array(particle.position)
-                    )
-                )
-                soc_vel = (
-                    c2
-                    * np.random.uniform(0, 1, size=self.param_count)
-                    * (
-                        np.array(self.global_best.position)
-                        - np.array(particle.position)
-                    )
-                )
-                particle.velocity = (part_vel + cog_vel + soc_vel).tolist()
-                particle.position = (
-                    np.array(particle.position) + np.array(particle.velocity)
-                ).tolist()
+            self._update_velocity(c1, c2)
 
             self._get_fitness(self.swarm)
 
-            swarm = []
-            for particle in self.swarm:
-                swarm.append(particle.copy())
-            yield swarm
+            yield self.swarm.copy()
 
             i += 1
 
+    def _sample_async(self, max_iter, c1, c2, p, m, n, early_stop_tolerance, verbose):
+        """Asynchronous (non-generational) PSO. The velocity and position of a particle
+        are updated with the current global best as soon as its fitness is returned, and
+        the particle is re-submitted right away, such that fast likelihood evaluations
+        do not wait for the slowest particle of the swarm. The stopping criteria are
+        checked (and the swarm is yielded) after every particle_count completed
+        evaluations.
+
+        The likelihood evaluations are submitted to the pool through its ``submit``
+        (concurrent.futures executors, e.g. mpi4py.futures.MPIPoolExecutor) or
+        ``apply_async`` (multiprocessing pools) method. Pools providing neither are
+        evaluated one particle at a time through their ``map`` method.
+
+        :param max_iter: maximum iterations
+        :param c1: cognitive weight
+        :param c2: social weight
+        :param p: stop criterion, percentage of particles to use
+        :param m: stop criterion, difference between mean fitness and global best
+        :param n: stop criterion, difference between norm of the particle vector and
+            norm of the global best
+        :param early_stop_tolerance: will terminate at the given value (should be
+            specified as a chi^2)
+        :param verbose: prints when it stopped
+        """
+        swarm = self.swarm
+        num_particles = len(swarm)
+        num_evaluations = num_particles * (max_iter + 1)
+        results = queue.Queue()
+        submit = self._async_submit(results)
+        for index in range(num_particles):
+            submit(index, swarm.position[index])
+        num_submitted = num_particles
+        num_completed = 0
+        try:
+            while True:
+                index, fitness, error = results.get()
+                num_completed += 1
+                if error is not None:
+                    raise error
+                swarm.fitness[index] = np.reshape(np.asarray(fitness, dtype=float), ())
+                self._update_best(index=[index])
+
+                if num_completed % num_particles == 0:
+                    i = num_completed // num_particles - 1
+                    if i > 0:
+                        yield swarm.copy()
+                    if i >= max_iter:
+                        if self.is_master():
+                            if verbose:
+                                print("Max iteration reached! Stopping.")
+                        return
+                    if self._converged(i, p=p, m=m, n=n):
+                        if self.is_master():
+                            if verbose:
+                                print("Converged after {} iterations!".format(i))
+                                print(
+                                    "Best fit found: ",
+                                    self.global_best.fitness,
+                                    self.global_best.position,
+                                )
+                        return
+                    if early_stop_tolerance is not None:
+                        if self._acceptable_convergence(early_stop_tolerance):
+                            return
+
+                if num_submitted < num_evaluations:
+                    self._update_velocity(c1, c2, index=[index])
+                    submit(index, swarm.position[index])
+                    num_submitted += 1
+        finally:
+            # wait for the evaluations still in flight such that the pool is idle
+            for _ in range(num_submitted - num_completed):
+                results.get()
+
+    def _async_submit(self, results):
+        """Function submitting a single likelihood evaluation without blocking.
+
+        :param results: queue.Queue() receiving (index, fitness, error) tuples of the
+            completed evaluations
+        :return: function submit(index, position)
+        """
+        pool = self.pool
+        if hasattr(pool, "submit"):
+
+            def submit(index, position):
+                def _done(future):
+                    try:
+                        results.put((index, future.result(), None))
+                    except Exception as error:
+                        results.put((index, None, error))
+
+                pool.submit(self.func, position).add_done_callback(_done)
+
+        elif hasattr(pool, "apply_async"):
+
+            def submit(index, position):
+                pool.apply_async(
+                    self.func,
+                    (position,),
+                    callback=lambda fitness: results.put((index, fitness, None)),
+                    error_callback=lambda error: results.put((index, None, error)),
+                )
+
+        else:
+            map_func = map if pool is None else pool.map
+
+            def submit(index, position):
+                results.put((index, list(map_func(self.func, [position]))[0], None))
+
+        return submit
+
+    def _update_best(self, index=None):
+        """Updates the global best and the personal bests of the swarm with the current
+        fitness of the particles.
+
+        :param index: list of particle indices to update, all particles if None
+        :return: None
+        """
+        swarm = self.swarm
+        if index is None:
+            index = np.arange(len(swarm))
+        index = np.asarray(index)
+        fitness = swarm.fitness[index]
+        fitness = np.where(np.isnan(fitness), -np.inf, fitness)
+        best = index[int(np.argmax(fitness))]
+        if self.global_best.fitness < swarm.fitness[best]:
+            self.global_best = Particle(
+                swarm.position[best], swarm.velocity[best], swarm.fitness[best]
+            )
+        improved = index[fitness > swarm.personal_best_fitness[index]]
+        swarm.personal_best_position[improved] = swarm.position[improved]
+        swarm.personal_best_velocity[improved] = swarm.velocity[improved]
+        swarm.personal_best_fitness[improved] = swarm.fitness[improved]
+
+    def _update_velocity(self, c1, c2, index=None):
+        """Vectorized velocity and position update of the particles of the swarm.
+
+        :param c1: cognitive weight
+        :param c2: social weight
+        :param index: list of particle indices to update, all particles if None
+        :return: None
+        """
+        swarm = self.swarm
+        if index is None:
+            index = slice(None)
+        position = swarm.position[index]
+        shape = position.shape
+        w = 0.5 + np.random.uniform(0, 1, size=shape) / 2
+        part_vel = w * swarm.velocity[index]
+        cog_vel = (
+            c1
+            * np.random.uniform(0, 1, size=shape)
+            * (swarm.personal_best_position[index] - position)
+        )
+        soc_vel = (
+            c2
+            * np.random.uniform(0, 1, size=shape)
+            * (np.asarray(self.global_best.position, dtype=float) - position)
+        )
+        velocity = part_vel + cog_vel + soc_vel
+        swarm.velocity[index] = velocity
+        swarm.position[index] = position + velocity
+
     def optimize(
         self,
         max_iter=1000,
@@ -212,6 +367,10 @@ class ParticleSwarmOptimizer(object):
         m=1e-3,
         n=1e-2,
         early_stop_tolerance=None,
+        asynchronous=False,
+        checkpoint=None,
+        checkpoint_key="pso",
+        resume=False,
     ):
         """Run the optimization and return a full list of optimization outputs.
 
@@ -224,48 +383,134 @@ class ParticleSwarmOptimizer(object):
         :param n: stop criterion, difference between norm of the particle
          vector and norm of the global best
         :param early_stop_tolerance: will terminate at the given value (should be specified as a chi^2)
+        :param asynchronous: if True, runs the asynchronous (non-generational) PSO
+            where each particle is updated as soon as its fitness is returned
+        :param checkpoint: None or Checkpoint instance, the state of the swarm and the
+            chain are saved after each iteration
+        :param checkpoint_key: path of the PSO entries in the checkpoint
+        :param resume: bool, if True, continues from the state saved in the checkpoint
+            (if present), otherwise previously saved entries are removed
         """
         log_likelihood_list = []
         vel_list = []
         pos_list = []
 
         num_iter = 0
+        if checkpoint is not None:
+            if resume is True:
+                num_iter = self.load_checkpoint(checkpoint, checkpoint_key)
+                if num_iter > 0:
+                    log_likelihood_list = list(
+                        checkpoint.get(checkpoint_key + "/chain_log_likelihood")
+                    )
+                    pos_list = [
+                        list(pos)
+                        for pos in checkpoint.get(checkpoint_key + "/chain_position")
+                    ]
+                    vel_list = [
+                        list(vel)
+                        for vel in checkpoint.get(checkpoint_key + "/chain_velocity")
+                    ]
+            else:
+                checkpoint.remove(checkpoint_key)
         if verbose:
             disable_tqdm = False
         else:
             disable_tqdm = True
-        with tqdm(total=max_iter, disable=disable_tqdm) as pbar:
+        with tqdm(total=max_iter, initial=num_iter, disable=disable_tqdm) as pbar:
             for _ in self.sample(
-                max_iter, c1, c2, p, m, n, early_stop_tolerance, verbose
+                max_iter - num_iter,
+                c1,
+                c2,
+                p,
+                m,
+                n,
+                early_stop_tolerance,
+                verbose,
+                asynchronous=asynchronous,
             ):
                 log_likelihood_list.append(self.global_best.fitness)
                 vel_list.append(self.global_best.velocity)
                 pos_list.append(self.global_best.position)
                 num_iter += 1
+                if checkpoint is not None and self.is_master():
+                    self.save_checkpoint(checkpoint, checkpoint_key)
 
                 if verbose and self.is_master():
                     pbar.update(1)
 
         return self.global_best.position, [log_likelihood_list, pos_list, vel_list]
 
+    def save_checkpoint(self, checkpoint, key="pso"):
+        """Saves the state of the swarm and the global best, and appends the global best
+        to the chain saved in the checkpoint.
+
+        :param checkpoint: Checkpoint instance
+        :param key: path of the PSO entries in the checkpoint
+        :return: None
+        """
+        swarm = self.swarm
+        checkpoint.set(key + "/position", swarm.position)
+        checkpoint.set(key + "/velocity", swarm.velocity)
+        checkpoint.set(key + "/fitness", swarm.fitness)
+        checkpoint.set(key + "/personal_best_position", swarm.personal_best_position)
+        checkpoint.set(key + "/personal_best_velocity", swarm.personal_best_velocity)
+        checkpoint.set(key + "/personal_best_fitness", swarm.personal_best_fitness)
+        checkpoint.append(key + "/chain_log_likelihood", [self.global_best.fitness])
+        checkpoint.append(key + "/chain_position", [self.global_best.position])
+        checkpoint.append(key + "/chain_velocity", [self.global_best.velocity])
+
+    def load_checkpoint(self, checkpoint, key="pso"):
+        """Restores the state of the swarm and the global best from a checkpoint.
+
+        :param checkpoint: Checkpoint instance
+        :param key: path of the PSO entries in the checkpoint
+        :return: number of iterations performed when the checkpoint was saved (0 if
+            there is no state in the checkpoint)
+        """
+        log_likelihood = checkpoint.get(key + "/chain_log_likelihood")
+        if log_likelihood is None or len(log_likelihood) == 0:
+            return 0
+        position = checkpoint.get(key + "/position")
+        if np.shape(position) != np.shape(self.swarm.position):
+            raise ValueError(
+                "The PSO state in the checkpoint has %s particles and %s parameters, "
+                "while %s particles and %s parameters are requested."
+                % (np.shape(position) + np.shape(self.swarm.position))
+            )
+        swarm = Swarm(
+            position,
+            checkpoint.get(key + "/velocity"),
+            checkpoint.get(key + "/fitness"),
+        )
+        swarm.personal_best_position = checkpoint.get(key + "/personal_best_position")
+        swarm.personal_best_velocity = checkpoint.get(key + "/personal_best_velocity")
+        swarm.personal_best_fitness = checkpoint.get(key + "/personal_best_fitness")
+        self.swarm = swarm
+        self.set_global_best(
+            checkpoint.get(key + "/chain_position")[-1],
+            checkpoint.get(key + "/chain_velocity")[-1],
+            log_likelihood[-1],
+        )
+        return len(log_likelihood)
+
     def _get_fitness(self, swarm):
         """Set fitness (probability) of the particles in swarm.
 
         :param swarm: PSO state
-        :type swarm: list of Particle() instances of the swarm
+        :type swarm: Swarm instance
         :return:
         :rtype:
         """
-        position = [particle.position for particle in swarm]
-        if self.pool is None:
-            map_func = map
+        if self._vectorize is True:
+            ln_probability = self.func(swarm.position)
         else:
-            map_func = self.pool.map
-        ln_probability = list(map_func(self.func, position))
-
-        for i, particle in enumerate(swarm):
-            particle.fitness = ln_probability[i]
-            particle.position = position[i]
+            if self.pool is None:
+                map_func = map
+            else:
+                map_func = self.pool.map
+            ln_probability = list(map_func(self.func, swarm.position))
+        swarm.fitness = np.reshape(np.asarray(ln_probability, dtype=float), len(swarm))
 
     def _converged(self, it, p, m, n):
         """Check for convergence.
@@ -302,14 +547,21 @@ class ParticleSwarmOptimizer(object):
         :return:
         :rtype:
         """
-        best_sort = np.sort(
-            [particle.personal_best.fitness for particle in self.swarm]
-        )[::-1]
+        best_sort = np.sort(self.swarm.personal_best_fitness)[::-1]
         mean_fit = np.mean(best_sort[1 : int(math.floor(self.particleCount * p))])
         # print( "best %f, mean_fit %f, ration %f"%( self.global_best[0],
         # mean_fit, abs((self.global_best[0]-mean_fit))))
         return abs(self.global_best.fitness - mean_fit) < m
 
+    def _best_of_best(self, p):
+        """Positions of the fraction p of particles with the highest current fitness.
+
+        :param p: fraction of particles
+        :return: array of positions
+        """
+        order = np.argsort(-self.swarm.fitness, kind="stable")
+        return self.swarm.position[order[0 : int(floor(self.particleCount * p))]]
+
     def _converged_space(self, it, p, m):
         """
 
@@ -322,17 +574,9 @@ class ParticleSwarmOptimizer(object):
         :return:
         :rtype:
         """
-        sorted_swarm = [particle for particle in self.swarm]
-        sorted_swarm.sort()
-        best_of_best = sorted_swarm[0 : int(floor(self.particleCount * p))]
-
-        diffs = []
-        for particle in best_of_best:
-            diffs.append(
-                np.array(self.global_best.position) - np.array(particle.position)
-            )
-
-        max_norm = max(list(map(np.linalg.norm, diffs)))
+        best_of_best = self._best_of_best(p)
+        diffs = np.asarray(self.global_best.position, dtype=float) - best_of_best
+        max_norm = np.max(np.linalg.norm(diffs, axis=1))
         return abs(max_norm) < m
 
     def _converged_space2(self, p):
@@ -344,16 +588,9 @@ class ParticleSwarmOptimizer(object):
         :rtype:
         """
         # Andres N. Ruiz et al.
-        sorted_swarm = [particle for particle in self.swarm]
-        sorted_swarm.sort()
-        best_of_best = sorted_swarm[0 : int(floor(self.particleCount * p))]
-
-        positions = [particle.position for particle in best_of_best]
-        means = np.mean(positions, axis=0)
-        delta = np.mean(
-            (means - np.array(self.global_best.position))
-            / np.array(self.global_best.position)
-        )
+        means = np.mean(self._best_of_best(p), axis=0)
+        global_best_position = np.asarray(self.global_best.position, dtype=float)
+        delta = np.mean((means - global_best_position) / global_best_position)
         return np.log10(delta) < -3.0
 
     def is_master(self):
@@ -376,6 +613,61 @@ class ParticleSwarmOptimizer(object):
             return False
 
 
+class Swarm(object):
+    """State of the particle swarm held in contiguous (n_particles x n_param) arrays.
+
+    Iterating or indexing returns Particle() instances of the individual particles.
+    """
+
+    def __init__(self, position, velocity, fitness=None):
+        """
+
+        :param position: particle positions, shape (n_particles, n_param)
+        :param velocity: particle velocities, shape (n_particles, n_param)
+        :param fitness: fitness of the particles, shape (n_particles,); zero if None
+        """
+        self.position = np.array(position, dtype=float)
+        self.velocity = np.array(velocity, dtype=float)
+        if fitness is None:
+            fitness = np.zeros(len(self.position))
+        self.fitness = np.array(fitness, dtype=float)
+        self.personal_best_position = np.array(self.position)
+        self.personal_best_velocity = np.array(self.velocity)
+        self.personal_best_fitness = np.full(len(self.position), -np.inf)
+
+    def __len__(self):
+        return len(self.position)
+
+    def __getitem__(self, index):
+        """
+
+        :param index: index of the particle
+        :return: Particle() instance of the particle, including its personal best
+        """
+        particle = Particle(
+            self.position[index], self.velocity[index], self.fitness[index]
+        )
+        if self.personal_best_fitness[index] > -np.inf:
+            particle._personal_best = Particle(
+                self.personal_best_position[index],
+                self.personal_best_velocity[index],
+                self.personal_best_fitness[index],
+            )
+        return particle
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def copy(self):
+        """Creates a copy of itself."""
+        swarm = Swarm(self.position, self.velocity, self.fitness)
+        swarm.personal_best_position = np.array(self.personal_best_position)
+        swarm.personal_best_velocity = np.array(self.personal_best_velocity)
+        swarm.personal_best_fitness = np.array(self.personal_best_fitness)
+        return swarm
+
+
 class Particle(object):
     """Implementation of a single particle.
 
@@ -0,0 +1,216 @@
+__author__ = "ajshajib"
+
+import os
+import queue
+import threading
+
+import dill
+import numpy as np
+
+__all__ = ["Checkpoint"]
+
+
+class Checkpoint(object):
+    """On-disk store (HDF5 file) of the progress of the samplers and of the
+    FittingSequence, allowing to resume a run after it has been interrupted.
+
+    Entries are numpy arrays or (dill-)pickled python objects, addressed by HDF5 paths
+    (e.g. 'step_0/pso/position'). Writes are incremental: an entry is either replaced
+    (e.g. the current state of a sampler) or extended along its first axis (e.g. the
+    chain of a sampler), such that only new data is written to disk.
+
+    With asynchronous=True, the writes are queued and performed by a background thread,
+    such that the sampling is not stalled by the file access. The data is copied when
+    queued. Replacements of the same entry that are still pending are skipped in favour
+    of the most recent one.
+    """
+
+    def __init__(self, filename, asynchronous=True, reset=False):
+        """
+
+        :param filename: name of the HDF5 file
+        :param asynchronous: bool, if True, writes are performed by a background thread
+        :param reset: bool, if True, removes an existing file with the same name
+        """
+        self.filename = filename
+        if reset is True and os.path.exists(filename):
+            os.remove(filename)
+        self._asynchronous = asynchronous
+        self._queue = queue.Queue()
+        self._latest = {}
+        self._version = 0
+        self._error = None
+        self._thread = None
+        if asynchronous is True:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def set(self, key, value):
+        """Writes (or replaces) an array entry.
+
+        :param key: HDF5 path of the entry
+        :param value: numpy array (or array-like)
+        :return: None
+        """
+        self._submit("set", key, np.array(value))
+
+    def append(self, key, value):
+        """Extends an array entry along its first axis (creates the entry if not
+        present).
+
+        :param key: HDF5 path of the entry
+        :param value: numpy array (or array-like) with the new entries along the first
+            axis
+        :return: None
+        """
+        self._submit("append", key, np.array(value))
+
+    def set_object(self, key, obj):
+        """Writes (or replaces) a python object, pickled with dill.
+
+        :param key: HDF5 path of the entry
+        :param obj: python object
+        :return: None
+        """
+        self._submit("set", key, np.frombuffer(dill.dumps(obj), dtype=np.uint8))
+
+    def remove(self, key):
+        """Removes an entry (or a group of entries).
+
+        :param key: HDF5 path of the entry
+        :return: None
+        """
+        self._submit("remove", key, None)
+
+    def get(self, key, default=None):
+        """Reads an array entry (after all pending writes are performed).
+
+        :param key: HDF5 path of the entry
+        :param default: returned if the entry does not exist
+        :return: numpy array
+        """
+        import h5py
+
+        self.flush()
+        if not os.path.exists(self.filename):
+            return default
+        with h5py.File(self.filename, "r") as f:
+            if key not in f:
+                return default
+            return f[key][()]
+
+    def get_object(self, key, default=None):
+        """Reads a python object written with set_object().
+
+        :param key: HDF5 path of the entry
+        :param default: returned if the entry does not exist
+        :return: python object
+        """
+        value = self.get(key)
+        if value is None:
+            return default
+        return dill.loads(value.tobytes())
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def flush(self):
+        """Waits until all pending writes are performed.
+
+        :return: None
+        :raises: the error of a failed write
+        """
+        if self._asynchronous is True:
+            self._queue.join()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def close(self):
+        """Performs all pending writes and stops the background thread.
+
+        :return: None
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            self._asynchronous = False
+        self.flush()
+
+    def _submit(self, operation, key, value):
+        """Queues (or performs) a write operation.
+
+        :param operation: 'set', 'append' or 'remove'
+        :param key: HDF5 path of the entry
+        :param value: numpy array or None
+        :return: None
+        """
+        if self._error is not None:
+            self.flush()
+        self._version += 1
+        if operation == "set":
+            self._latest[key] = self._version
+        item = (self._version, operation, key, value)
+        if self._thread is None:
+            self._write([item])
+        else:
+            self._queue.put(item)
+
+    def _run(self):
+        """Background thread performing the queued writes. All writes pending at once
+        are performed with a single access of the file.
+
+        :return: None
+        """
+        while True:
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in items
+            items = [item for item in items if item is not None]
+            try:
+                self._write(items)
+            except Exception as error:
+                self._error = error
+            for _ in range(len(items) + int(stop)):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, items):
+        """Performs write operations on the file.
+
+        :param items: list of (version, operation, key, value)
+        :return: None
+        """
+        import h5py
+
+        with h5py.File(self.filename, "a") as f:
+            for version, operation, key, value in items:
+                if operation == "set" and self._latest.get(key, version) > version:
+                    # a more recent replacement of the entry is pending
+                    continue
+                if operation == "remove":
+                    if key in f:
+                        del f[key]
+                elif operation == "set":
+                    if key in f:
+                        del f[key]
+                    f.create_dataset(key, data=value)
+                elif operation == "append":
+                    if key not in f:
+                        f.create_dataset(
+                            key,
+                            data=value,
+                            chunks=True,
+                            maxshape=(None,) + value.shape[1:],
+                        )
+                    else:
+                        dataset = f[key]
+                        num = dataset.shape[0]
+                        dataset.resize(num + value.shape[0], axis=0)
+                        dataset[num:] = value
@@ -7,6 +7,8 @@ from lenstronomy.Sampling.Likelihoods.position_likelihood import PositionLikelih
 from lenstronomy.Sampling.Likelihoods.flux_ratio_likelihood import FluxRatioLikelihood
 from lenstronomy.Sampling.Likelihoods.prior_likelihood import PriorLikelihood
 from lenstronomy.Sampling.Likelihoods.kinematic_2D_likelihood import KinLikelihood
+from lenstronomy.Sampling.Likelihoods.likelihood_context import LikelihoodContext
+from lenstronomy.PointSource.point_source_cached import PointSourceMemo
 import lenstronomy.Util.class_creator as class_creator
 import numpy as np
 
@@ -76,6 +78,9 @@ class Likelihood(object):
         kin_lens_light_idx=0,
         tracer_likelihood=False,
         tracer_likelihood_mask=None,
+        kwargs_point_source_cache=None,
+        band_parallel=False,
+        num_threads=None,
     ):
         """Initializing class.
 
@@ -127,6 +132,18 @@ class Likelihood(object):
         :param bimodal_time_delay_measurement: if True, two sets of delays are required.
             Only allowed for one set of point sources
         :type bimodal_time_delay_measurement: bool
+        :param kwargs_point_source_cache: None or keyword arguments of PointSourceMemo
+            (e.g. {'tolerance': 1e-8, 'max_size': 100}). If set, image positions, source
+            positions and image amplitudes are memoized across likelihood evaluations
+            and shared among the imaging, position, time-delay and flux ratio
+            likelihoods, keyed on the rounded lens and point source parameters.
+        :type kwargs_point_source_cache: None or dict
+        :param band_parallel: bool, if True, the imaging bands are evaluated in a pool of
+            threads within each likelihood evaluation (only for the 'multi-linear' and
+            'joint-linear' options)
+        :type band_parallel: bool
+        :param num_threads: number of threads of the pool (default: number of bands)
+        :type num_threads: None or int
         """
         # TODO unpack also tracer model from kwargs_data
         (
@@ -143,6 +160,7 @@ class Likelihood(object):
         ) = self._unpack_data(**kwargs_data_joint)
         if len(multi_band_list) == 0:
             image_likelihood = False
+        self._kwargs_point_source_cache = kwargs_point_source_cache
         self.kinematic_data = kinematic_data
         self.param = param_class
         self._lower_limit, self._upper_limit = self.param.param_limits()
@@ -189,6 +207,8 @@ class Likelihood(object):
             "check_positive_flux": check_positive_flux,
             "kwargs_pixelbased": kwargs_pixelbased,
             "linear_solver": linear_solver,
+            "band_parallel": band_parallel,
+            "num_threads": num_threads,
         }
         self._kwargs_image_sim = {
             "multi_band_list": multi_band_list,
@@ -240,6 +260,7 @@ class Likelihood(object):
                 )
             self._kin_lens_idx = kin_lens_idx
             self._kin_lens_light_idx = kin_lens_light_idx
+        self.likelihood_context = None
         self._class_instances(
             kwargs_model=kwargs_model,
             kwargs_image_sim=self._kwargs_image_sim,
@@ -332,6 +353,13 @@ class Likelihood(object):
                 self._kin_lens_idx,
                 self._kin_lens_light_idx,
             )
+        if self._kwargs_point_source_cache is not None:
+            self.point_source_memo = PointSourceMemo(**self._kwargs_point_source_cache)
+            self.PointSource.set_memo(self.point_source_memo)
+            if self._image_likelihood is True:
+                self.image_likelihood.set_point_source_memo(self.point_source_memo)
+        else:
+            self.point_source_memo = None
 
     def __call__(self, a):
         return self.logL(a)
@@ -356,6 +384,32 @@ class Likelihood(object):
         kwargs_return = self.param.args2kwargs(args)
         return self.log_likelihood(kwargs_return, verbose=verbose)
 
+    def residuals(self, args):
+        """Reduced residuals of the imaging data for given variable parameters (e.g. for
+        least-squares optimizers). The other likelihood terms are not included.
+
+        :param args: ordered parameter values that are being sampled
+        :type args: tuple or list of floats
+        :return: 1d numpy array of the reduced residuals of the evaluated pixels
+        """
+        if self._image_likelihood is False:
+            raise ValueError("residuals require the imaging likelihood.")
+        kwargs_return = self.param.args2kwargs(args)
+        self._update_model(kwargs_return.get("kwargs_special", {}))
+        self._reset_point_source_cache(bool_input=True)
+        return self.image_likelihood.residuals(**kwargs_return)
+
+    def update_param_class(self, param_class):
+        """Replaces the Param() instance, e.g. with different fixed parameters or
+        bounds. All other settings and the data remain unchanged.
+
+        :param param_class: instance of a Param() class with the same model and
+            constraint settings as the one the likelihood was created with
+        :return: None
+        """
+        self.param = param_class
+        self._lower_limit, self._upper_limit = self.param.param_limits()
+
     def log_likelihood(self, kwargs_return, verbose=False):
         """
 
@@ -382,6 +436,11 @@ class Likelihood(object):
         self._update_model(kwargs_special)
         # generate image and computes likelihood
         self._reset_point_source_cache(bool_input=True)
+        # lens quantities shared among the individual likelihood terms
+        context = LikelihoodContext(
+            kwargs_lens, kwargs_ps, kwargs_special, point_source=self.PointSource
+        )
+        self.likelihood_context = context
         logL = 0
 
         # computing custom loglikelihood function first so that the full
@@ -408,17 +467,19 @@ class Likelihood(object):
 
             if self._time_delay_likelihood is True:
                 logL_time_delay = self.time_delay_likelihood.logL(
-                    kwargs_lens, kwargs_ps, kwargs_special
+                    kwargs_lens, kwargs_ps, kwargs_special, context=context
                 )
                 logL += logL_time_delay
                 if verbose is True:
                     print("time-delay logL = %s" % logL_time_delay)
             if self._flux_ratio_likelihood is True:
-                ra_image_list, dec_image_list = self.PointSource.image_position(
-                    kwargs_ps=kwargs_ps, kwargs_lens=kwargs_lens
-                )
+                ra_image_list, dec_image_list = context.image_position()
                 logL_flux_ratios = self.flux_ratio_likelihood.logL(
-                    ra_image_list, dec_image_list, kwargs_lens, kwargs_special
+                    ra_image_list,
+                    dec_image_list,
+                    kwargs_lens,
+                    kwargs_special,
+                    context=context,
                 )
                 logL += logL_flux_ratios
                 if verbose is True:
@@ -431,13 +492,15 @@ class Likelihood(object):
                 if verbose is True:
                     print("kinematic logL = %s" % logL_kinematic_2d)
             logL += self._position_likelihood.logL(
-                kwargs_lens, kwargs_ps, kwargs_special, verbose=verbose
+                kwargs_lens, kwargs_ps, kwargs_special, verbose=verbose, context=context
             )
             if self._tracer_likelihood is True:
                 logL_tracer = self.tracer_likelihood.logL(param=param, **kwargs_return)
                 if verbose is True:
                     print("tracer logL = %s" % logL_tracer)
                 logL += logL_tracer
+            if verbose is True:
+                print("lens quantities re-used: %s" % context.statistics)
             self._reset_point_source_cache(bool_input=False)
         return logL  # , None
 
@@ -0,0 +1,280 @@
+__author__ = "ajshajib"
+
+import numpy as np
+
+__all__ = ["ParamMappingPlan"]
+
+# order of the model components in the argument array (see Param.args2kwargs())
+_COMPONENTS = [
+    "kwargs_lens",
+    "kwargs_source",
+    "kwargs_lens_light",
+    "kwargs_ps",
+    "kwargs_special",
+    "kwargs_extinction",
+    "kwargs_tracer_source",
+]
+_SPECIAL = _COMPONENTS.index("kwargs_special")
+
+
+class _ArgRef(object):
+    """Placeholder of a single entry of the argument array, used to trace the read-out
+    of the parameter classes."""
+
+    def __init__(self, index, log=False):
+        """
+
+        :param index: index in the argument array
+        :param log: bool, whether the entry is sampled in log10
+        """
+        self.index = index
+        self.log = log
+
+    def __rpow__(self, base):
+        if base != 10 or self.log is True:
+            raise TypeError("unsupported transform of a sampled parameter")
+        return _ArgRef(self.index, log=True)
+
+
+def _refs(value):
+    """
+
+    :param value: value of a traced keyword argument
+    :return: None if value does not depend on the arguments, otherwise list of entries,
+        each either an _ArgRef or a constant
+    """
+    if isinstance(value, _ArgRef):
+        return [value]
+    if isinstance(value, np.ndarray) and value.dtype == object:
+        entries = list(value.ravel())
+    elif isinstance(value, (list, tuple)):
+        entries = list(value)
+    else:
+        return None
+    if not any(isinstance(entry, _ArgRef) for entry in entries):
+        return None
+    return entries
+
+
+class ParamMappingPlan(object):
+    """Precompiled mapping between the argument array being sampled and the keyword
+    arguments of the model components of a Param() instance.
+
+    The read-out of the individual parameter classes (LensParam, LightParam,
+    PointSourceParam, SpecialParam) is traced once with placeholders of the argument
+    entries. The traced keyword arguments are stored as templates holding the fixed
+    values together with gather tables of the sampled entries. The conversion is then
+    performed with a few numpy operations (gather, log10 transform, bounds) and shallow
+    copies of the templates, instead of walking the parameter names of each profile.
+    Joint parameters, lens scaling and solvers are applied by the Param() class as
+    before.
+    """
+
+    def __init__(self, param_class):
+        """
+
+        :param param_class: Param() instance
+        :raises: TypeError or ValueError if the read-out of the parameter classes can
+            not be traced (the Param() class falls back to the standard read-out)
+        """
+        num_param, _ = param_class.num_param()
+        self.num_param = num_param
+        probe = np.empty(num_param, dtype=object)
+        for j in range(num_param):
+            probe[j] = _ArgRef(j)
+        i = 0
+        traced = []
+        for params in [
+            param_class.lens_params,
+            param_class.source_params,
+            param_class.lens_light_params,
+            param_class.point_source_params,
+        ]:
+            kwargs_list, i = params.get_params(probe, i)
+            traced.append(kwargs_list)
+        kwargs_special, i = param_class.special_params.get_params(
+            probe, i, impose_bound=False
+        )
+        traced.append([kwargs_special])
+        for params in [
+            param_class.extinction_params,
+            param_class.tracer_source_params,
+        ]:
+            kwargs_list, i = params.get_params(probe, i)
+            traced.append(kwargs_list)
+        if i != num_param:
+            raise ValueError("traced %s arguments but %s are sampled" % (i, num_param))
+
+        self._templates = []
+        # scalar entries: (component, k, name, position in the gathered values)
+        self._scalar_targets = []
+        scalar_index, scalar_log = [], []
+        scalar_lower, scalar_upper = [], []
+        # array or list entries: (component, k, name, indices, log10 mask (None if
+        # none, True if all are sampled in log10), constants of lists (None for
+        # arrays), mask of the sampled list entries, bounded, lower, upper)
+        self._array_targets = []
+        lower_special = param_class.special_params.lower_limit
+        upper_special = param_class.special_params.upper_limit
+        for c, kwargs_list in enumerate(traced):
+            templates = []
+            for k, kwargs in enumerate(kwargs_list):
+                template = {}
+                for name, value in kwargs.items():
+                    entries = _refs(value)
+                    if entries is None:
+                        template[name] = value
+                        continue
+                    template[name] = None
+                    if c == _SPECIAL:
+                        lower = lower_special.get(name, -np.inf)
+                        upper = upper_special.get(name, np.inf)
+                    else:
+                        lower, upper = -np.inf, np.inf
+                    if isinstance(value, _ArgRef):
+                        self._scalar_targets.append((c, k, name, len(scalar_index)))
+                        scalar_index.append(value.index)
+                        scalar_log.append(value.log)
+                        scalar_lower.append(lower)
+                        scalar_upper.append(upper)
+                        continue
+                    is_ref = np.array([isinstance(e, _ArgRef) for e in entries])
+                    index = np.array(
+                        [e.index for e in entries if isinstance(e, _ArgRef)],
+                        dtype=int,
+                    )
+                    log = np.array(
+                        [e.log for e in entries if isinstance(e, _ArgRef)], dtype=bool
+                    )
+                    if not np.any(log):
+                        log = None
+                    elif np.all(log):
+                        log = True
+                    if isinstance(value, np.ndarray):
+                        if not np.all(is_ref):
+                            raise TypeError("partially sampled array %s" % name)
+                        constants = None
+                    else:
+                        constants = [
+                            None if isinstance(e, _ArgRef) else e for e in entries
+                        ]
+                    self._array_targets.append(
+                        (
+                            c,
+                            k,
+                            name,
+                            _contiguous(index),
+                            log,
+                            constants,
+                            is_ref,
+                            c == _SPECIAL,
+                            lower,
+                            upper,
+                        )
+                    )
+                templates.append(template)
+            self._templates.append(templates)
+        self._scalar_index = np.array(scalar_index, dtype=int)
+        self._scalar_log = np.array(scalar_log, dtype=bool)
+        self._scalar_any_log = bool(np.any(self._scalar_log))
+        self._scalar_lower = np.array(scalar_lower, dtype=float)
+        self._scalar_upper = np.array(scalar_upper, dtype=float)
+        self._scalar_bounded = bool(
+            np.any(np.isfinite(self._scalar_lower))
+            or np.any(np.isfinite(self._scalar_upper))
+        )
+
+    def get_params(self, args, impose_bound=True):
+        """Reads out the keyword arguments of all model components from the argument
+        array (equivalent to the get_params() calls of the parameter classes).
+
+        :param args: numpy array of the sampled arguments
+        :param impose_bound: bool, if True, imposes the lower and upper limits on the
+            special parameters
+        :return: kwargs_lens, kwargs_source, kwargs_lens_light, kwargs_ps,
+            kwargs_special, kwargs_extinction, kwargs_tracer_source
+        """
+        kwargs_components = [
+            [dict(template) for template in templates] for templates in self._templates
+        ]
+        values = args[self._scalar_index]
+        if self._scalar_any_log:
+            values[self._scalar_log] = 10 ** values[self._scalar_log]
+        if impose_bound and self._scalar_bounded:
+            values = np.minimum(
+                np.maximum(values, self._scalar_lower), self._scalar_upper
+            )
+        for c, k, name, pos in self._scalar_targets:
+            kwargs_components[c][k][name] = values[pos]
+        for (
+            c,
+            k,
+            name,
+            index,
+            log,
+            constants,
+            is_ref,
+            bounded,
+            lower,
+            upper,
+        ) in self._array_targets:
+            value = args[index]
+            if log is True:
+                value = 10**value
+            elif log is not None:
+                value = np.where(log, 10**value, value)
+            if impose_bound and bounded:
+                value = np.minimum(np.maximum(value, lower), upper)
+            if constants is not None:
+                value = iter(value)
+                value = [next(value) if r else e for e, r in zip(constants, is_ref)]
+            kwargs_components[c][k][name] = value
+        kwargs_components[_SPECIAL] = kwargs_components[_SPECIAL][0]
+        return tuple(kwargs_components)
+
+    def set_params(self, **kwargs):
+        """Gathers the sampled arguments from the keyword arguments of the model
+        components (equivalent to the set_params() calls of the parameter classes).
+
+        :param kwargs: keyword argument lists of the model components, named as in
+            Param.kwargs2args()
+        :return: numpy array of the sampled arguments
+        """
+        args = np.empty(self.num_param)
+        for c, k, name, pos in self._scalar_targets:
+            value = self._component(kwargs, c)[k][name]
+            if self._scalar_log[pos]:
+                value = np.log10(value)
+            args[self._scalar_index[pos]] = value
+        for c, k, name, index, _, constants, is_ref, _, _, _ in self._array_targets:
+            value = self._component(kwargs, c)[k][name]
+            if constants is not None:
+                value = [v for v, r in zip(value, is_ref) if r]
+            # as in LensParam.set_params(), array-valued parameters are not
+            # transformed back from log10
+            args[index] = value
+        return args
+
+    @staticmethod
+    def _component(kwargs, c):
+        """
+
+        :param kwargs: keyword argument lists of the model components
+        :param c: index of the component
+        :return: keyword argument list of the component
+        """
+        kwargs_list = kwargs.get(_COMPONENTS[c])
+        if c == _SPECIAL:
+            return [kwargs_list]
+        return kwargs_list
+
+
+def _contiguous(index):
+    """
+
+    :param index: integer array of indices
+    :return: slice if the indices are contiguous and increasing, else the index array
+    """
+    if len(index) > 0 and np.all(np.diff(index) == 1):
+        return slice(int(index[0]), int(index[-1]) + 1)
+    return index
@@ -9,6 +9,7 @@ from lenstronomy.LensModel.lens_param import LensParam
 from lenstronomy.LightModel.light_param import LightParam
 from lenstronomy.PointSource.point_source_param import PointSourceParam
 from lenstronomy.Sampling.special_param import SpecialParam
+from lenstronomy.Sampling.param_mapping import ParamMappingPlan
 
 __all__ = ["Param"]
 
@@ -539,6 +540,7 @@ class Param(object):
         self._linear_solver = linear_solver
 
         self._jax = _jax
+        self._mapping_plan = None
 
     @property
     def num_point_source_images(self):
@@ -556,6 +558,23 @@ class Param(object):
         """
         return self._linear_solver
 
+    @property
+    def mapping_plan(self):
+        """Precompiled mapping between the sampled arguments and the keyword arguments
+        of the model components (see ParamMappingPlan), compiled on first use.
+
+        :return: ParamMappingPlan instance, or None if the parameter configuration can
+            not be compiled (the parameter classes are then read out one by one)
+        """
+        if self._mapping_plan is None:
+            try:
+                self._mapping_plan = ParamMappingPlan(self)
+            except (TypeError, ValueError, KeyError, IndexError):
+                self._mapping_plan = False
+        if self._mapping_plan is False:
+            return None
+        return self._mapping_plan
+
     def args2kwargs(self, args, bijective=False):
         """
 
@@ -574,15 +593,27 @@ class Param(object):
         else:
             impose_bound = False
 
-        kwargs_lens, i = self.lens_params.get_params(args, i)
-        kwargs_source, i = self.source_params.get_params(args, i)
-        kwargs_lens_light, i = self.lens_light_params.get_params(args, i)
-        kwargs_ps, i = self.point_source_params.get_params(args, i)
-        kwargs_special, i = self.special_params.get_params(
-            args, i, impose_bound=impose_bound
-        )
-        kwargs_extinction, i = self.extinction_params.get_params(args, i)
-        kwargs_tracer_source, i = self.tracer_source_params.get_params(args, i)
+        plan = self.mapping_plan if self._jax is False else None
+        if plan is not None and len(args) == plan.num_param:
+            (
+                kwargs_lens,
+                kwargs_source,
+                kwargs_lens_light,
+                kwargs_ps,
+                kwargs_special,
+                kwargs_extinction,
+                kwargs_tracer_source,
+            ) = plan.get_params(args, impose_bound=impose_bound)
+        else:
+            kwargs_lens, i = self.lens_params.get_params(args, i)
+            kwargs_source, i = self.source_params.get_params(args, i)
+            kwargs_lens_light, i = self.lens_light_params.get_params(args, i)
+            kwargs_ps, i = self.point_source_params.get_params(args, i)
+            kwargs_special, i = self.special_params.get_params(
+                args, i, impose_bound=impose_bound
+            )
+            kwargs_extinction, i = self.extinction_params.get_params(args, i)
+            kwargs_tracer_source, i = self.tracer_source_params.get_params(args, i)
         self._update_lens_model(kwargs_special)
         # update lens_light joint parameters
         kwargs_lens_light = self._update_lens_light_joint_with_point_source(
@@ -607,7 +638,8 @@ class Param(object):
             kwargs_lens, kwargs_lens, self._joint_lens_with_lens
         )
 
-        kwargs_lens = self.update_lens_scaling(kwargs_special, kwargs_lens)
+        if self._mass_scaling or self._general_scaling:
+            kwargs_lens = self.update_lens_scaling(kwargs_special, kwargs_lens)
         # update point source constraint solver
         if self._solver is True:
             x_pos, y_pos = kwargs_ps[0]["ra_image"], kwargs_ps[0]["dec_image"]
@@ -624,7 +656,7 @@ class Param(object):
             kwargs_source, kwargs_tracer_source, self._joint_source_light_with_tracer
         )
         # optional revert lens_scaling for bijective
-        if bijective is True:
+        if bijective is True and (self._mass_scaling or self._general_scaling):
             kwargs_lens = self.update_lens_scaling(
                 kwargs_special, kwargs_lens, inverse=True
             )
@@ -660,6 +692,17 @@ class Param(object):
         :param kwargs_tracer_source: tracer of the source light keyword argument list
         :return: numpy array of parameters
         """
+        plan = self.mapping_plan
+        if plan is not None:
+            return plan.set_params(
+                kwargs_lens=kwargs_lens,
+                kwargs_source=kwargs_source,
+                kwargs_lens_light=kwargs_lens_light,
+                kwargs_ps=kwargs_ps,
+                kwargs_special=kwargs_special,
+                kwargs_extinction=kwargs_extinction,
+                kwargs_tracer_source=kwargs_tracer_source,
+            )
         args = self.lens_params.set_params(kwargs_lens)
         args += self.source_params.set_params(kwargs_source)
         args += self.lens_light_params.set_params(kwargs_lens_light)
@@ -776,12 +819,13 @@ class Param(object):
             source plane
         :return: updated source light model keyword arguments
         """
-        kwargs_source_list = self.image2source_plane(
-            kwargs_source_list,
-            kwargs_lens_list,
-            image_plane=image_plane,
-            kwargs_special=kwargs_special,
-        )
+        if not image_plane and any(self._image_plane_source_list):
+            kwargs_source_list = self.image2source_plane(
+                kwargs_source_list,
+                kwargs_lens_list,
+                image_plane=image_plane,
+                kwargs_special=kwargs_special,
+            )
 
         for setting in self._joint_source_with_point_source:
             i_point_source, k_source, param_list = setting
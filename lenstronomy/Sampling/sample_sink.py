@@ -0,0 +1,419 @@
+__author__ = "ajshajib"
+
+import os
+import struct
+
+import numpy as np
+
+__all__ = [
+    "SampleSink",
+    "HDF5SampleSink",
+    "NPYSampleSink",
+    "RingBufferSampleSink",
+    "open_samples",
+    "argmax_chunked",
+    "WalkerGroupedView",
+]
+
+# total length of the header of the .npy files written by NPYSampleSink, fixed such
+# that the shape can be updated in place when samples are appended
+_NPY_HEADER_LENGTH = 128
+
+
+class SampleSink(object):
+    """Base class of the sinks to which the MCMC samplers stream their samples.
+
+    The samples are appended step by step (one row per walker) with append(), buffered
+    in memory and written in chunks of `chunk_size` samples. The samples written so far
+    can be accessed at any time through the `samples` and `log_prob` attributes, which
+    are lazy (e.g. HDF5 datasets or memory maps) for the on-disk sinks.
+    """
+
+    def __init__(self, chunk_size=1000):
+        """
+
+        :param chunk_size: number of samples buffered in memory before they are written
+        """
+        self._chunk_size = int(chunk_size)
+        self._buffer_samples = []
+        self._buffer_log_prob = []
+        self._num_buffered = 0
+        self._num_written = 0
+        self._num_param = None
+
+    def append(self, samples, log_prob):
+        """Appends samples to the sink.
+
+        :param samples: numpy array of shape (num_samples, num_param), e.g. the
+            positions of the walkers of one step
+        :param log_prob: numpy array of shape (num_samples,) of the log likelihoods
+        :return: None
+        """
+        samples = np.array(samples, dtype=float, ndmin=2)
+        log_prob = np.array(log_prob, dtype=float, ndmin=1)
+        if len(samples) != len(log_prob):
+            raise ValueError(
+                "%s samples but %s log likelihood values are appended."
+                % (len(samples), len(log_prob))
+            )
+        if self._num_param is None:
+            self._num_param = samples.shape[1]
+        elif samples.shape[1] != self._num_param:
+            raise ValueError(
+                "samples with %s parameters are appended to a sink of %s parameters."
+                % (samples.shape[1], self._num_param)
+            )
+        self._buffer_samples.append(samples)
+        self._buffer_log_prob.append(log_prob)
+        self._num_buffered += len(samples)
+        if self._num_buffered >= self._chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered samples.
+
+        :return: None
+        """
+        if self._num_buffered == 0:
+            return
+        samples = np.concatenate(self._buffer_samples, axis=0)
+        log_prob = np.concatenate(self._buffer_log_prob, axis=0)
+        self._buffer_samples, self._buffer_log_prob = [], []
+        self._num_buffered = 0
+        self._write(samples, log_prob)
+        self._num_written += len(samples)
+
+    def close(self):
+        """Writes the buffered samples and releases the resources of the sink. The
+        samples remain accessible.
+
+        :return: None
+        """
+        self.flush()
+
+    def __len__(self):
+        return self._num_written + self._num_buffered
+
+    @property
+    def samples(self):
+        """
+
+        :return: array-like of shape (num_samples, num_param) of the samples
+        """
+        self.flush()
+        if self._num_written == 0:
+            return np.zeros((0, self._num_param or 0))
+        return self._read()[0]
+
+    @property
+    def log_prob(self):
+        """
+
+        :return: array-like of shape (num_samples,) of the log likelihoods
+        """
+        self.flush()
+        if self._num_written == 0:
+            return np.zeros(0)
+        return self._read()[1]
+
+    def _write(self, samples, log_prob):
+        """Writes a chunk of samples.
+
+        :param samples: numpy array of shape (num_samples, num_param)
+        :param log_prob: numpy array of shape (num_samples,)
+        :return: None
+        """
+        raise NotImplementedError
+
+    def _read(self):
+        """
+
+        :return: samples, log_prob written so far
+        """
+        raise NotImplementedError
+
+
+class HDF5SampleSink(SampleSink):
+    """Sink writing the samples into resizable, chunked datasets 'samples' and
+    'log_prob' of an HDF5 file.
+
+    The samples are read lazily as h5py datasets.
+    """
+
+    def __init__(self, filename, chunk_size=1000, group=None):
+        """
+
+        :param filename: name of the HDF5 file (an existing file is overwritten)
+        :param chunk_size: number of samples buffered in memory before they are written
+            (also the chunk size of the datasets)
+        :param group: None or name of the group of the datasets in the file
+        """
+        import h5py
+
+        super(HDF5SampleSink, self).__init__(chunk_size=chunk_size)
+        self._filename = filename
+        self._group = group
+        self._file = h5py.File(filename, "w")
+
+    def _path(self, name):
+        if self._group is None:
+            return name
+        return self._group + "/" + name
+
+    def _write(self, samples, log_prob):
+        f = self._file
+        if self._num_written == 0:
+            chunk_size = max(min(self._chunk_size, len(samples)), 1)
+            f.create_dataset(
+                self._path("samples"),
+                data=samples,
+                maxshape=(None, samples.shape[1]),
+                chunks=(chunk_size, samples.shape[1]),
+            )
+            f.create_dataset(
+                self._path("log_prob"),
+                data=log_prob,
+                maxshape=(None,),
+                chunks=(chunk_size,),
+            )
+        else:
+            num = self._num_written
+            for name, value in [("samples", samples), ("log_prob", log_prob)]:
+                dataset = f[self._path(name)]
+                dataset.resize(num + len(value), axis=0)
+                dataset[num:] = value
+        f.flush()
+
+    def _read(self):
+        import h5py
+
+        if not self._file:
+            self._file = h5py.File(self._filename, "r")
+        return self._file[self._path("samples")], self._file[self._path("log_prob")]
+
+    def close(self):
+        self.flush()
+        if self._file and self._file.mode != "r":
+            self._file.close()
+
+
+class NPYSampleSink(SampleSink):
+    """Sink appending the samples to the files 'samples.npy' and 'log_prob.npy' of a
+    directory.
+
+    The header of the files is updated in place with each chunk, such that the files are
+    valid .npy files at any time. The samples are read lazily as memory maps.
+    """
+
+    def __init__(self, path, chunk_size=1000):
+        """
+
+        :param path: directory of the .npy files (existing files are overwritten)
+        :param chunk_size: number of samples buffered in memory before they are written
+        """
+        super(NPYSampleSink, self).__init__(chunk_size=chunk_size)
+        os.makedirs(path, exist_ok=True)
+        self._filenames = [
+            os.path.join(path, "samples.npy"),
+            os.path.join(path, "log_prob.npy"),
+        ]
+        self._files = [open(filename, "wb+") for filename in self._filenames]
+
+    def _write(self, samples, log_prob):
+        num = self._num_written + len(samples)
+        for f, value in zip(self._files, [samples, log_prob]):
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                f.seek(_NPY_HEADER_LENGTH)
+            f.write(np.ascontiguousarray(value).tobytes())
+            f.seek(0)
+            f.write(_npy_header((num,) + value.shape[1:], value.dtype))
+            f.flush()
+
+    def _read(self):
+        return tuple(np.load(filename, mmap_mode="r") for filename in self._filenames)
+
+    def close(self):
+        self.flush()
+        for f in self._files:
+            f.close()
+
+
+class RingBufferSampleSink(SampleSink):
+    """In-memory sink keeping only the most recent `capacity` samples, e.g. to monitor a
+    run with bounded memory."""
+
+    def __init__(self, capacity):
+        """
+
+        :param capacity: maximum number of samples kept
+        """
+        super(RingBufferSampleSink, self).__init__(chunk_size=1)
+        self._capacity = int(capacity)
+        self._samples = None
+        self._log_prob = None
+
+    def _write(self, samples, log_prob):
+        if self._samples is None:
+            self._samples = np.zeros((self._capacity, samples.shape[1]))
+            self._log_prob = np.zeros(self._capacity)
+        # only the last samples of the chunk fitting into the buffer are kept
+        num_dropped = max(len(samples) - self._capacity, 0)
+        samples = samples[num_dropped:]
+        log_prob = log_prob[num_dropped:]
+        index = (
+            self._num_written + num_dropped + np.arange(len(samples))
+        ) % self._capacity
+        self._samples[index] = samples
+        self._log_prob[index] = log_prob
+
+    def __len__(self):
+        return min(self._num_written + self._num_buffered, self._capacity)
+
+    @property
+    def num_total(self):
+        """
+
+        :return: number of samples appended since the start (including those dropped)
+        """
+        return self._num_written + self._num_buffered
+
+    def _read(self):
+        num_kept = min(self._num_written, self._capacity)
+        index = (self._num_written - num_kept + np.arange(num_kept)) % self._capacity
+        return self._samples[index], self._log_prob[index]
+
+
+def open_samples(filename, group=None):
+    """Opens the samples written by an HDF5SampleSink or NPYSampleSink for lazy reading.
+
+    :param filename: name of the HDF5 file or directory of the .npy files
+    :param group: None or name of the group of the datasets in the HDF5 file
+    :return: samples, log_prob as h5py datasets or memory maps
+    """
+    if os.path.isdir(filename):
+        return (
+            np.load(os.path.join(filename, "samples.npy"), mmap_mode="r"),
+            np.load(os.path.join(filename, "log_prob.npy"), mmap_mode="r"),
+        )
+    import h5py
+
+    f = h5py.File(filename, "r")
+    if group is not None:
+        f = f[group]
+    return f["samples"], f["log_prob"]
+
+
+def argmax_chunked(values, chunk_size=100000):
+    """Index of the maximum of a 1d array-like, read in chunks (such that lazy arrays
+    are not loaded at once).
+
+    :param values: 1d numpy array, h5py dataset or memory map
+    :param chunk_size: number of values read at once
+    :return: index of the maximum
+    """
+    if isinstance(values, np.ndarray) and not isinstance(values, np.memmap):
+        return int(np.argmax(values))
+    best_index, best_value = 0, -np.inf
+    for start in range(0, len(values), chunk_size):
+        chunk = np.asarray(values[start : start + chunk_size])
+        i = int(np.argmax(chunk))
+        if chunk[i] > best_value or start == 0:
+            best_index, best_value = start + i, chunk[i]
+    return best_index
+
+
+def _npy_header(shape, dtype):
+    """Header of a .npy file (version 1.0) with the fixed length _NPY_HEADER_LENGTH.
+
+    :param shape: shape of the array
+    :param dtype: numpy dtype of the array
+    :return: bytes
+    """
+    header = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (
+        np.lib.format.dtype_to_descr(np.dtype(dtype)),
+        tuple(int(n) for n in shape),
+    )
+    header_length = _NPY_HEADER_LENGTH - 10
+    if len(header) >= header_length:
+        raise ValueError("shape %s exceeds the .npy header" % (shape,))
+    header = header.ljust(header_length - 1) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", header_length) + header.encode()
+
+
+class WalkerGroupedView(object):
+    """Read-only view of samples stored step by step (one row per walker, as in the
+    sinks) in the walker-grouped order of a flattened zeus chain, i.e. with all steps of
+    the first walker first.
+
+    The view does not copy the underlying array-like. Only the rows that are indexed are
+    read (and re-ordered), such that lazy arrays (h5py datasets, memory maps) are not
+    loaded at once. np.asarray() of the view reads the full array.
+    """
+
+    def __init__(self, values, n_walkers):
+        """
+
+        :param values: array-like of shape (n_steps * n_walkers, ...) with the rows of
+            the walkers of each step one after the other
+        :param n_walkers: number of walkers
+        """
+        if len(values) % n_walkers != 0:
+            raise ValueError(
+                "%s rows can not be split into steps of %s walkers."
+                % (len(values), n_walkers)
+            )
+        self._values = values
+        self._n_walkers = int(n_walkers)
+        self._n_steps = len(values) // self._n_walkers
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def shape(self):
+        return np.shape(self._values)
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def dtype(self):
+        return self._values.dtype
+
+    def _source_index(self, index):
+        """
+
+        :param index: row index (or array of row indices) in walker-grouped order
+        :return: row index (or array of row indices) in the underlying array-like
+        """
+        walker, step = np.divmod(index, self._n_steps)
+        return step * self._n_walkers + walker
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            key, rest = key[0], key[1:]
+        else:
+            rest = ()
+        if isinstance(key, (int, np.integer)):
+            index = np.arange(len(self))[key]
+            return np.asarray(self._values[int(self._source_index(index))])[rest]
+        if isinstance(key, slice):
+            index = np.arange(*key.indices(len(self)))
+        else:
+            index = np.arange(len(self))[key]
+        source = self._source_index(index)
+        # lazy arrays are read with increasing indices, each row once
+        source_unique, inverse = np.unique(source, return_inverse=True)
+        values = np.asarray(self._values[source_unique])[inverse]
+        return values[(slice(None),) + rest]
+
+    def __array__(self, dtype=None, copy=None):
+        values = np.asarray(self._values)
+        shape = values.shape[1:]
+        values = values.reshape((self._n_steps, self._n_walkers) + shape)
+        values = values.swapaxes(0, 1).reshape((-1,) + shape)
+        if dtype is not None:
+            values = values.astype(dtype)
+        return values
@@ -1,15 +1,22 @@
 __author__ = ["sibirrer", "ajshajib", "dgilman", "nataliehogg"]
 
 import time
+import weakref
 
 import numpy as np
 from lenstronomy.Sampling.Samplers.pso import ParticleSwarmOptimizer
+from lenstronomy.Sampling.Samplers.levenberg_marquardt import LevenbergMarquardt
 from lenstronomy.Util import sampling_util
 from lenstronomy.Sampling.Pool.pool import choose_pool
 from lenstronomy.Sampling.Pool.parallelization_util import (
     sampler_logl_worker,
+    sampler_residuals_worker,
     set_sampler_likelihood_module,
+    set_sampler_likelihood_module_shared,
 )
+from lenstronomy.Sampling.Pool.shared_memory import SharedMemoryExport
+from lenstronomy.Sampling.sample_sink import WalkerGroupedView
+from lenstronomy.Sampling.surrogate import SurrogateLogLikelihood
 from scipy.optimize import minimize
 
 __all__ = ["Sampler"]
@@ -24,13 +31,19 @@ class Sampler(object):
 
     """
 
-    def __init__(self, likelihood_class):
+    def __init__(self, likelihood_class, persistent_pool=None):
         """
 
         :param likelihood_class: instance of Likelihood class
+        :param persistent_pool: None or PersistentLikelihoodPool instance, updated with
+            likelihood_class, whose workers are used instead of spawning a new pool when
+            threadCount > 1 (and mpi=False)
         """
         self.chain = likelihood_class
+        self._persistent_pool = persistent_pool
         self.lower_limit, self.upper_limit = self.chain.param_limits
+        # SurrogateLogLikelihood instance of the last run with a surrogate
+        self.surrogate = None
         # Keep the worker-local log-likelihood state in sync on ranks that construct this class.
         set_sampler_likelihood_module(self.chain)
 
@@ -41,16 +54,73 @@ class Sampler(object):
             return pool, sampler_logl_worker
 
         if threadCount != 1:
-            pool = choose_pool(
-                mpi=mpi,
+            if self._persistent_pool is not None:
+                return self._persistent_pool.pool, self._persistent_pool.logl_function
+            pool = self._multiprocessing_pool(threadCount)
+            return pool, sampler_logl_worker
+
+        pool = choose_pool(mpi=mpi, processes=threadCount)
+        return pool, self.chain.logL
+
+    def _multiprocessing_pool(self, threadCount):
+        """Build a multiprocessing pool whose workers hold the likelihood module. The
+        large arrays of the likelihood module (data, noise maps, PSF kernels, grids,
+        ...) are placed in shared memory and attached zero-copy by the workers, if
+        shared memory is available.
+
+        :param threadCount: number of processes
+        :return: pool instance
+        """
+        try:
+            export = SharedMemoryExport(self.chain)
+        except Exception as error:
+            print(
+                "Shared memory not available (%s), the likelihood is copied to every "
+                "worker instead." % error
+            )
+            return choose_pool(
+                mpi=False,
                 processes=threadCount,
                 initializer=set_sampler_likelihood_module,
                 initargs=(self.chain,),
             )
-            return pool, sampler_logl_worker
+        pool = choose_pool(
+            mpi=False,
+            processes=threadCount,
+            initializer=set_sampler_likelihood_module_shared,
+            initargs=(export.payload,),
+        )
+        # the segments are released once the pool is no longer referenced
+        weakref.finalize(pool, export.close)
+        return pool
 
-        pool = choose_pool(mpi=mpi, processes=threadCount)
-        return pool, self.chain.logL
+    def _surrogate_logl(self, logl_function, pool, kwargs_surrogate):
+        """Wraps a log likelihood with a SurrogateLogLikelihood.
+
+        :param logl_function: log likelihood of a single parameter vector
+        :param pool: pool instance evaluating logl_function
+        :param kwargs_surrogate: keyword arguments of SurrogateLogLikelihood
+        :return: SurrogateLogLikelihood instance
+        """
+        self.surrogate = SurrogateLogLikelihood(
+            logl_function,
+            self.lower_limit,
+            self.upper_limit,
+            pool=pool,
+            **kwargs_surrogate
+        )
+        return self.surrogate
+
+    def _print_surrogate_statistics(self):
+        statistics = self.surrogate.statistics
+        print(
+            "surrogate: %s of %s log likelihoods evaluated, %.1f%% saved"
+            % (
+                statistics["num_evaluated"],
+                statistics["num_calls"],
+                statistics["fraction_saved"] * 100,
+            )
+        )
 
     def simplex(self, init_pos, n_iterations, method, print_key="SIMPLEX"):
         """
@@ -83,6 +153,82 @@ class Sampler(object):
 
         return result["x"]
 
+    def levenberg_marquardt(
+        self,
+        init_pos,
+        n_iterations,
+        threadCount=1,
+        mpi=False,
+        step_size=1e-4,
+        tolerance=1e-6,
+        jacobian=None,
+        print_key="LM",
+        verbose=True,
+    ):
+        """Levenberg-Marquardt optimization of the reduced residuals of the imaging data
+        after the linear inversion. The steps are accepted on the full log likelihood
+        (including priors and the other likelihood terms).
+
+        :param init_pos: starting point for the optimization
+        :param n_iterations: maximum number of iterations
+        :param threadCount: number of threads in the computation (only applied if
+            mpi=False), the finite differences of the Jacobian are evaluated in parallel
+        :param mpi: bool, if True, makes instance of MPIPool to allow for MPI execution
+        :param step_size: finite difference step relative to the width of the parameter
+            limits
+        :param tolerance: relative log likelihood improvement below which the
+            optimization stops
+        :param jacobian: None or function returning the Jacobian of the residuals of a
+            parameter vector (replaces the finite differences)
+        :param print_key: string, prints the process name
+        :param verbose: suppress or turn on print statements
+        :return: best fit parameters, list of the log likelihoods of the iterations
+        """
+        pool, _ = self._pool_and_logl(mpi=mpi, threadCount=threadCount)
+        if mpi is False and threadCount == 1:
+            residual_function = self.chain.residuals
+        elif mpi is False and self._persistent_pool is not None:
+            residual_function = self._persistent_pool.residuals_function
+        else:
+            residual_function = sampler_residuals_worker
+        optimizer = LevenbergMarquardt(
+            residual_function,
+            self.chain.logL,
+            self.lower_limit,
+            self.upper_limit,
+            pool=pool,
+            step_size=step_size,
+            jacobian=jacobian,
+        )
+        if pool.is_master() and verbose:
+            print("Computing the %s ..." % print_key)
+        time_start = time.time()
+        result, logL_list = optimizer.optimize(
+            init_pos, n_iterations=n_iterations, tolerance=tolerance, verbose=verbose
+        )
+        if pool.is_master() and verbose:
+            kwargs_return = self.chain.param.args2kwargs(result)
+            print(
+                -logL_list[-1]
+                * 2
+                / (max(self.chain.effective_num_data_points(**kwargs_return), 1)),
+                "reduced X^2 of best position",
+            )
+            print(logL_list[-1], "log likelihood")
+            print(
+                "%s iterations, %s residual and %s log likelihood evaluations"
+                % (
+                    len(logL_list) - 1,
+                    optimizer.num_residual_calls,
+                    optimizer.num_logl_calls,
+                )
+            )
+            self._print_result(result=result)
+            time_end = time.time()
+            print(time_end - time_start, "time used for ", print_key)
+            print("===================")
+        return result, logL_list
+
     def pso(
         self,
         n_particles,
@@ -94,6 +240,11 @@ class Sampler(object):
         mpi=False,
         print_key="PSO",
         verbose=True,
+        asynchronous=False,
+        checkpoint=None,
+        checkpoint_key="pso",
+        resume=False,
+        kwargs_surrogate=None,
     ):
         """Return the best fit for the lens model on catalogue basis with particle swarm
         optimizer.
@@ -110,6 +261,17 @@ class Sampler(object):
         :param mpi: bool, if True, makes instance of MPIPool to allow for MPI execution
         :param print_key: string, prints the process name in the progress bar (optional)
         :param verbose: suppress or turn on print statements
+        :param asynchronous: bool, if True, runs the asynchronous PSO that updates each
+            particle as soon as its likelihood is returned (only effective with
+            threadCount > 1; the MPI pool only supports synchronous mapping)
+        :param checkpoint: None or Checkpoint instance, the state of the swarm is saved
+            after each iteration
+        :param checkpoint_key: path of the PSO entries in the checkpoint
+        :param resume: bool, if True, continues from the state saved in the checkpoint
+        :param kwargs_surrogate: None or keyword arguments of SurrogateLogLikelihood; if
+            set, the particles are pre-screened with an emulator of the log likelihood
+            and only the promising ones are evaluated (not supported by the asynchronous
+            PSO)
         :return: kwargs_result (of best fit), [lnlikelihood of samples, positions of
             samples, velocity of samples])
         """
@@ -122,13 +284,34 @@ class Sampler(object):
             lower_start = np.maximum(lower_start, self.lower_limit)
             upper_start = np.minimum(upper_start, self.upper_limit)
 
+        if mpi is True and asynchronous is True:
+            print(
+                "asynchronous PSO is not supported by the MPI pool, "
+                "running the synchronous PSO instead."
+            )
+            asynchronous = False
+        if asynchronous is True and kwargs_surrogate is not None:
+            print(
+                "the surrogate requires the synchronous PSO, "
+                "running the synchronous PSO instead."
+            )
+            asynchronous = False
         pool, logl_function = self._pool_and_logl(mpi=mpi, threadCount=threadCount)
+        # the surrogate screens the whole swarm and maps the remaining particles itself
+        vectorize = kwargs_surrogate is not None
+        if vectorize is True:
+            logl_function = self._surrogate_logl(logl_function, pool, kwargs_surrogate)
 
         if mpi is True and pool.is_master():
             print("MPI option chosen for PSO.")
 
         pso = ParticleSwarmOptimizer(
-            logl_function, lower_start, upper_start, n_particles, pool=pool
+            logl_function,
+            lower_start,
+            upper_start,
+            n_particles,
+            pool=pool,
+            vectorize=vectorize,
         )
 
         if init_pos is None:
@@ -142,7 +325,12 @@ class Sampler(object):
         time_start = time.time()
 
         result, [log_likelihood_list, pos_list, vel_list] = pso.optimize(
-            n_iterations, verbose=verbose
+            n_iterations,
+            verbose=verbose,
+            asynchronous=asynchronous,
+            checkpoint=checkpoint,
+            checkpoint_key=checkpoint_key,
+            resume=resume,
         )
 
         if pool.is_master():
@@ -155,6 +343,8 @@ class Sampler(object):
                     "reduced X^2 of best position",
                 )
                 print(pso.global_best.fitness, "log likelihood")
+                if kwargs_surrogate is not None:
+                    self._print_surrogate_statistics()
                 self._print_result(result=result)
                 time_end = time.time()
                 print(time_end - time_start, "time used for ", print_key)
@@ -174,6 +364,8 @@ class Sampler(object):
         initpos=None,
         backend_filename=None,
         start_from_backend=False,
+        sample_sink=None,
+        kwargs_surrogate=None,
     ):
         """Run MCMC with emcee. For details, please have a look at the documentation of
         the emcee packager.
@@ -201,8 +393,15 @@ class Sampler(object):
         :param start_from_backend: if True, start from the state saved in `backup_filename`.
          Otherwise, create a new backup file with name `backup_filename` (any already existing file is overwritten!).
         :type start_from_backend: bool
+        :param sample_sink: None or SampleSink instance, the samples after burn-in of the
+            current run are streamed to the sink step by step and returned as its
+            (lazy) arrays. Without a backend, emcee does not keep the chain in memory.
+        :param kwargs_surrogate: None or keyword arguments of SurrogateLogLikelihood;
+            if set, the proposals are pre-screened with an emulator of the log
+            likelihood and proposals that are very likely rejected are not evaluated. The samples are
+            then approximate.
         :return: samples, ln likelihood value of samples
-        :rtype: numpy 2d array, numpy 1d array
+        :rtype: numpy 2d array, numpy 1d array (or the arrays of sample_sink)
         """
         import emcee
 
@@ -217,6 +416,10 @@ class Sampler(object):
             )
 
         pool, logl_function = self._pool_and_logl(mpi=mpi, threadCount=threadCount)
+        # the surrogate screens all proposals of a step and maps the remaining ones itself
+        vectorize = kwargs_surrogate is not None
+        if vectorize is True:
+            logl_function = self._surrogate_logl(logl_function, pool, kwargs_surrogate)
 
         if backend_filename is not None:
             backend = emcee.backends.HDFBackend(
@@ -247,17 +450,42 @@ class Sampler(object):
         time_start = time.time()
 
         sampler = emcee.EnsembleSampler(
-            n_walkers, num_param, logl_function, pool=pool, backend=backend
+            n_walkers,
+            num_param,
+            logl_function,
+            pool=None if vectorize else pool,
+            backend=backend,
+            vectorize=vectorize,
         )
 
-        sampler.run_mcmc(initpos, n_run_eff, progress=progress)
-        flat_samples = sampler.get_chain(discard=n_burn, thin=1, flat=True)
-        dist = sampler.get_log_prob(flat=True, discard=n_burn, thin=1)
+        if sample_sink is None:
+            sampler.run_mcmc(initpos, n_run_eff, progress=progress)
+            flat_samples = sampler.get_chain(discard=n_burn, thin=1, flat=True)
+            dist = sampler.get_log_prob(flat=True, discard=n_burn, thin=1)
+        else:
+            num_previous = 0
+            if initpos is None:
+                num_previous = backend.iteration
+                initpos = backend.get_last_sample()
+            for i, state in enumerate(
+                sampler.sample(
+                    initpos,
+                    iterations=n_run_eff,
+                    progress=progress,
+                    store=backend is not None,
+                )
+            ):
+                if num_previous + i >= n_burn:
+                    sample_sink.append(state.coords, state.log_prob)
+            sample_sink.flush()
+            flat_samples, dist = sample_sink.samples, sample_sink.log_prob
         if pool.is_master():
             print("Computing the MCMC...")
             print("Number of walkers = ", n_walkers)
             print("Burn-in iterations: ", n_burn)
             print("Sampling iterations (in current run):", n_run_eff)
+            if kwargs_surrogate is not None:
+                self._print_surrogate_statistics()
             time_end = time.time()
             print(time_end - time_start, "time taken for MCMC sampling")
         return flat_samples, dist
@@ -274,6 +502,10 @@ class Sampler(object):
         progress=False,
         initpos=None,
         backend_filename=None,
+        checkpoint=None,
+        checkpoint_key="zeus",
+        resume=False,
+        sample_sink=None,
         **kwargs_zeus
     ):
         """
@@ -301,8 +533,17 @@ class Sampler(object):
         :type initpos: numpy array of size num param x num walkser
         :param backend_filename: name of the HDF5 file where sampling state is saved (through zeus callback function)
         :type backend_filename: string
+        :param checkpoint: None or Checkpoint instance, the chain is appended to the checkpoint every 'ncheck' steps
+         and at the end of the run
+        :param checkpoint_key: path of the zeus entries in the checkpoint
+        :param resume: bool, if True, continues the chain saved in the checkpoint (if present) from its last
+         walker positions for the remaining number of steps, otherwise previously saved entries are removed
+        :param sample_sink: None or SampleSink instance, the samples after burn-in are streamed to the sink (step by
+         step, every 'ncheck' steps, one row per walker as for emcee). The samples are then returned as
+         WalkerGroupedView instances of the arrays of the sink, which present them in the walker-grouped order of
+         zeus (as without a sink) and only read the indexed rows from the sink; np.asarray() of them loads the chain
         :return: samples, ln likelihood value of samples
-        :rtype: numpy 2d array, numpy 1d array
+        :rtype: numpy 2d array, numpy 1d array (or WalkerGroupedView instances of the arrays of sample_sink)
         """
         import zeus
 
@@ -351,7 +592,42 @@ class Sampler(object):
 
         n_run_eff = n_burn + n_run
 
+        chain_saved, log_prob_saved = None, None
+        num_saved = 0
+        if checkpoint is not None:
+            if resume is True:
+                chain_saved = checkpoint.get(checkpoint_key + "/chain")
+                log_prob_saved = checkpoint.get(checkpoint_key + "/log_prob")
+            else:
+                checkpoint.remove(checkpoint_key)
+        if chain_saved is not None and len(chain_saved) > 0:
+            # the log probability might lag behind the chain if the run was interrupted
+            num_saved = min(len(chain_saved), len(log_prob_saved))
+            chain_saved = chain_saved[:num_saved]
+            log_prob_saved = log_prob_saved[:num_saved]
+            if np.shape(chain_saved)[1:] != (n_walkers, num_param):
+                raise ValueError(
+                    "The zeus chain in the checkpoint has %s walkers and %s parameters, "
+                    "while %s walkers and %s parameters are requested."
+                    % (np.shape(chain_saved)[1:] + (n_walkers, num_param))
+                )
+            print("Resuming zeus after %s saved steps." % num_saved)
+            initpos = chain_saved[-1]
+            n_run_eff -= num_saved
+
         callback_list = []
+        if checkpoint is not None:
+            checkpoint_callback = _ZeusCheckpoint(
+                checkpoint, checkpoint_key, ncheck=ncheck
+            )
+            callback_list.append(checkpoint_callback)
+        if sample_sink is not None:
+            sink_callback = _ZeusSampleSink(
+                sample_sink, n_burn=n_burn, offset=num_saved, ncheck=ncheck
+            )
+            if num_saved > 0:
+                sink_callback.save(chain_saved, log_prob_saved, offset=0)
+            callback_list.append(sink_callback)
 
         if backend_filename is not None:
             backend = zeus.callbacks.SaveProgressCallback(
@@ -414,12 +690,37 @@ class Sampler(object):
             light_mode=light_mode,
         )
 
-        sampler.run_mcmc(initpos, n_run_eff, progress=progress, callbacks=callback_list)
-
-        flat_samples = sampler.get_chain(flat=True, thin=1, discard=n_burn)
-
-        dist = sampler.get_log_prob(flat=True, thin=1, discard=n_burn)
-
+        if checkpoint is None and sample_sink is None:
+            sampler.run_mcmc(
+                initpos, n_run_eff, progress=progress, callbacks=callback_list
+            )
+            flat_samples = sampler.get_chain(flat=True, thin=1, discard=n_burn)
+            dist = sampler.get_log_prob(flat=True, thin=1, discard=n_burn)
+            return flat_samples, dist
+
+        chain = np.zeros((0, n_walkers, num_param))
+        log_prob = np.zeros((0, n_walkers))
+        if n_run_eff > 0:
+            sampler.run_mcmc(
+                initpos, n_run_eff, progress=progress, callbacks=callback_list
+            )
+            chain = sampler.get_chain()
+            log_prob = sampler.get_log_prob()
+            if checkpoint is not None:
+                checkpoint_callback.save(chain, log_prob)
+        if sample_sink is not None:
+            sink_callback.save(chain, log_prob)
+            sample_sink.flush()
+            return (
+                WalkerGroupedView(sample_sink.samples, n_walkers),
+                WalkerGroupedView(sample_sink.log_prob, n_walkers),
+            )
+        if chain_saved is not None and len(chain_saved) > 0:
+            chain = np.concatenate([chain_saved, chain], axis=0)
+            log_prob = np.concatenate([log_prob_saved, log_prob], axis=0)
+        # flattened in the same (walker-wise) order as zeus
+        flat_samples = chain[n_burn:].reshape((-1, num_param), order="F")
+        dist = log_prob[n_burn:].reshape((-1,), order="F")
         return flat_samples, dist
 
     def _print_result(self, result):
@@ -434,3 +735,95 @@ class Sampler(object):
         print(kwargs_return.get("kwargs_ps", None), "point source result")
         print(kwargs_return.get("kwargs_tracer_source", None), "tracer source result")
         print(kwargs_return.get("kwargs_special", None), "special param result")
+
+
+class _ZeusCheckpoint(object):
+    """Callback of the zeus sampler appending the new steps of the chain to a
+    Checkpoint."""
+
+    def __init__(self, checkpoint, key, ncheck=1):
+        """
+
+        :param checkpoint: Checkpoint instance
+        :param key: path of the zeus entries in the checkpoint
+        :param ncheck: number of steps after which the chain is saved
+        """
+        self._checkpoint = checkpoint
+        self._key = key
+        self._ncheck = ncheck
+        self._num_saved = 0
+
+    def __call__(self, i, chain, log_prob):
+        """
+
+        :param i: current iteration
+        :param chain: chain up to iteration i
+        :param log_prob: log probabilities up to iteration i
+        :return: None (does not affect the termination of the sampler)
+        """
+        if i % self._ncheck == 0:
+            self.save(chain, log_prob)
+        return None
+
+    def save(self, chain, log_prob):
+        """Appends the steps not yet saved.
+
+        :param chain: chain of the sampler, shape (n_steps, n_walkers, n_param)
+        :param log_prob: log probabilities, shape (n_steps, n_walkers)
+        :return: None
+        """
+        num_steps = len(chain)
+        if num_steps > self._num_saved:
+            self._checkpoint.append(self._key + "/chain", chain[self._num_saved :])
+            self._checkpoint.append(
+                self._key + "/log_prob", log_prob[self._num_saved : num_steps]
+            )
+            self._num_saved = num_steps
+
+
+class _ZeusSampleSink(object):
+    """Callback of the zeus sampler streaming the new steps after burn-in to a
+    SampleSink."""
+
+    def __init__(self, sample_sink, n_burn, offset=0, ncheck=1):
+        """
+
+        :param sample_sink: SampleSink instance
+        :param n_burn: number of burn-in steps (not streamed)
+        :param offset: number of steps preceding the chain of the sampler (e.g. resumed
+            from a checkpoint)
+        :param ncheck: number of steps after which the new samples are streamed
+        """
+        self._sample_sink = sample_sink
+        self._n_burn = n_burn
+        self._offset = offset
+        self._ncheck = ncheck
+        self._num_streamed = 0
+
+    def __call__(self, i, chain, log_prob):
+        """
+
+        :param i: current iteration
+        :param chain: chain up to iteration i
+        :param log_prob: log probabilities up to iteration i
+        :return: None (does not affect the termination of the sampler)
+        """
+        if i % self._ncheck == 0:
+            self.save(chain, log_prob)
+        return None
+
+    def save(self, chain, log_prob, offset=None):
+        """Appends the steps after burn-in not yet streamed to the sink.
+
+        :param chain: chain, shape (n_steps, n_walkers, n_param)
+        :param log_prob: log probabilities, shape (n_steps, n_walkers)
+        :param offset: number of steps preceding the chain (default: offset of the
+            sampler chain)
+        :return: None
+        """
+        if offset is None:
+            offset = self._offset
+        start = max(self._num_streamed, self._n_burn, offset)
+        for step in range(start, offset + len(chain)):
+            self._sample_sink.append(chain[step - offset], log_prob[step - offset])
+        self._num_streamed = max(self._num_streamed, offset + len(chain))
@@ -0,0 +1,232 @@
+__author__ = "ajshajib"
+
+import warnings
+
+import numpy as np
+
+__all__ = ["GaussianProcessEmulator", "SurrogateLogLikelihood"]
+
+
+class GaussianProcessEmulator(object):
+    """Gaussian process emulator of the log likelihood (scikit-learn
+    GaussianProcessRegressor with an anisotropic squared exponential kernel and a white
+    noise term) on parameters rescaled to the unit cube of the parameter limits."""
+
+    def __init__(
+        self, lower_limit, upper_limit, optimize_interval=10, num_optimize=150
+    ):
+        """
+
+        :param lower_limit: lower limits of the parameters
+        :param upper_limit: upper limits of the parameters
+        :param optimize_interval: number of fits after which the kernel
+            hyper-parameters are optimized again (in between, the last optimized
+            kernel is used)
+        :param num_optimize: maximum number of points (randomly selected) the kernel
+            hyper-parameters are optimized on
+        """
+        self._lower = np.array(lower_limit, dtype=float)
+        self._width = np.array(upper_limit, dtype=float) - self._lower
+        self._width[~np.isfinite(self._width) | (self._width <= 0)] = 1
+        self._optimize_interval = int(optimize_interval)
+        self._num_optimize = int(num_optimize)
+        self._num_fits = 0
+        self._kernel = None
+        self._gp = None
+
+    def _rescale(self, x):
+        return (np.atleast_2d(x) - self._lower) / self._width
+
+    def fit(self, x, y):
+        """Fits the emulator to evaluated points.
+
+        :param x: parameters, shape (num_points, num_param)
+        :param y: log likelihood values, shape (num_points,)
+        :return: None
+        """
+        from sklearn.gaussian_process import GaussianProcessRegressor
+        from sklearn.gaussian_process.kernels import RBF, ConstantKernel, WhiteKernel
+
+        optimize = self._kernel is None or self._num_fits % self._optimize_interval == 0
+        if self._kernel is None:
+            num_param = np.shape(x)[1]
+            self._kernel = ConstantKernel(1.0, (1e-3, 1e3)) * RBF(
+                np.ones(num_param) * 0.2, (1e-3, 1e2)
+            ) + WhiteKernel(1e-4, (1e-8, 1e-1))
+        x, y = self._rescale(x), np.asarray(y)
+        with warnings.catch_warnings():
+            # bounds of the hyper-parameters reached
+            warnings.simplefilter("ignore")
+            if optimize:
+                index = np.arange(len(y))
+                if len(y) > self._num_optimize:
+                    index = np.random.choice(len(y), self._num_optimize, replace=False)
+                gp = GaussianProcessRegressor(kernel=self._kernel, normalize_y=True)
+                gp.fit(x[index], y[index])
+                self._kernel = gp.kernel_
+            gp = GaussianProcessRegressor(
+                kernel=self._kernel, normalize_y=True, optimizer=None
+            )
+            gp.fit(x, y)
+        self._gp = gp
+        self._num_fits += 1
+
+    def predict(self, x):
+        """
+
+        :param x: parameters, shape (num_points, num_param)
+        :return: mean and standard deviation of the emulated log likelihood
+        """
+        return self._gp.predict(self._rescale(x), return_std=True)
+
+
+class SurrogateLogLikelihood(object):
+    """Log likelihoods of a set of points (e.g. a PSO swarm or the proposals of an emcee
+    step) pre-screened with an emulator.
+
+    The emulator is fitted to the log likelihoods evaluated so far. A point is
+    evaluated with the true (expensive) likelihood if there are not yet enough
+    evaluated points, if its optimistic emulated value (mean + `kappa` standard
+    deviations) is within `delta_logL` of the best log likelihood found so far, or if
+    it is randomly selected for exploration (fraction `explore_fraction`). Otherwise
+    the emulated mean is returned instead.
+
+    With the PSO, the screened particles are those far from the global best. With
+    MCMC, the screened proposals are those with a very low acceptance probability;
+    the samples are then approximate, with an error controlled by `delta_logL` and
+    `kappa`.
+    """
+
+    def __init__(
+        self,
+        logl_function,
+        lower_limit,
+        upper_limit,
+        num_train_min=None,
+        num_train_max=500,
+        delta_logL=None,
+        kappa=3,
+        explore_fraction=0.05,
+        delta_clip=1000,
+        emulator=None,
+        pool=None,
+    ):
+        """
+
+        :param logl_function: function returning the true log likelihood of a
+            parameter vector, e.g. Likelihood.logL
+        :param lower_limit: lower limits of the parameters
+        :param upper_limit: upper limits of the parameters
+        :param num_train_min: number of true evaluations before the emulator is used
+            (default: 10 times the number of parameters)
+        :param num_train_max: maximum number of points the emulator is fitted to (the
+            points with the highest log likelihoods are kept)
+        :param delta_logL: points with an optimistic emulated log likelihood within
+            delta_logL of the best one are evaluated (default: number of parameters)
+        :param kappa: number of standard deviations of the emulator added to its mean
+            for the optimistic emulated log likelihood
+        :param explore_fraction: fraction of the screened points evaluated anyway to
+            validate the emulator
+        :param delta_clip: log likelihoods below the best one by more than delta_clip
+            are clipped when fitting the emulator
+        :param emulator: emulator instance with fit() and predict() methods, default
+            GaussianProcessEmulator
+        :param pool: None or pool instance whose map() method evaluates the true log
+            likelihoods of the points that are not screened out
+        """
+        num_param = len(lower_limit)
+        self._logl_function = logl_function
+        self._pool = pool
+        if num_train_min is None:
+            num_train_min = 10 * num_param
+        self._num_train_min = num_train_min
+        self._num_train_max = num_train_max
+        if delta_logL is None:
+            delta_logL = num_param
+        self._delta_logL = delta_logL
+        self._kappa = kappa
+        self._explore_fraction = explore_fraction
+        self._delta_clip = delta_clip
+        if emulator is None:
+            emulator = GaussianProcessEmulator(lower_limit, upper_limit)
+        self._emulator = emulator
+        self._x_train = np.zeros((0, num_param))
+        self._y_train = np.zeros(0)
+        self._fitted = False
+        self.num_calls = 0
+        self.num_evaluated = 0
+
+    def __call__(self, args_2d):
+        """
+
+        :param args_2d: parameters, one row per point
+        :return: array of (true or emulated) log likelihoods
+        """
+        args_2d = np.atleast_2d(np.asarray(args_2d, dtype=float))
+        num = len(args_2d)
+        self.num_calls += num
+        logL = np.zeros(num)
+        if self._fitted is False:
+            evaluate = np.ones(num, dtype=bool)
+        else:
+            mean, std = self._emulator.predict(args_2d)
+            logL_best = np.max(self._y_train)
+            evaluate = mean + self._kappa * std >= logL_best - self._delta_logL
+            evaluate |= np.random.uniform(size=num) < self._explore_fraction
+            logL[~evaluate] = mean[~evaluate]
+        if np.any(evaluate):
+            map_function = map if self._pool is None else self._pool.map
+            logL_true = np.array(
+                list(map_function(self._logl_function, args_2d[evaluate])),
+                dtype=float,
+            )
+            logL[evaluate] = logL_true
+            self.num_evaluated += int(np.sum(evaluate))
+            self._update(args_2d[evaluate], logL_true)
+        return logL
+
+    def _update(self, x, y):
+        """Adds evaluated points to the training set and re-fits the emulator.
+
+        :param x: parameters of the evaluated points
+        :param y: true log likelihoods of the evaluated points
+        :return: None
+        """
+        finite = np.isfinite(y)
+        self._x_train = np.append(self._x_train, x[finite], axis=0)
+        self._y_train = np.append(self._y_train, y[finite])
+        if len(self._y_train) > self._num_train_max:
+            keep = np.argsort(self._y_train)[-self._num_train_max :]
+            self._x_train = self._x_train[keep]
+            self._y_train = self._y_train[keep]
+        if len(self._y_train) >= self._num_train_min:
+            y_clipped = np.maximum(
+                self._y_train, np.max(self._y_train) - self._delta_clip
+            )
+            self._emulator.fit(self._x_train, y_clipped)
+            self._fitted = True
+
+    @property
+    def fraction_saved(self):
+        """
+
+        :return: fraction of the requested log likelihoods that were emulated instead
+            of evaluated
+        """
+        if self.num_calls == 0:
+            return 0.0
+        return 1 - self.num_evaluated / self.num_calls
+
+    @property
+    def statistics(self):
+        """
+
+        :return: dictionary with the number of requested log likelihoods
+            ('num_calls'), true evaluations ('num_evaluated') and the fraction of the
+            evaluations saved ('fraction_saved')
+        """
+        return {
+            "num_calls": self.num_calls,
+            "num_evaluated": self.num_evaluated,
+            "fraction_saved": self.fraction_saved,
+        }
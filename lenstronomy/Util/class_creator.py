@@ -359,6 +359,8 @@ def create_im_sim(
     band_index=0,
     kwargs_pixelbased=None,
     linear_solver=True,
+    band_parallel=False,
+    num_threads=None,
 ):
     """
 
@@ -376,6 +378,9 @@ def create_im_sim(
     :param kwargs_pixelbased: keyword arguments with various settings related to the pixel-based solver (see SLITronomy documentation)
     :param linear_solver: bool, if True (default) fixes the linear amplitude parameters 'amp' (avoid sampling) such
      that they get overwritten by the linear solver solution.
+    :param band_parallel: bool, if True, the bands are evaluated in a pool of threads (only applied in the
+     'multi-linear' and 'joint-linear' options)
+    :param num_threads: number of threads of the pool (default: number of bands)
     :return: MultiBand class instance
     """
     if linear_solver is False and multi_band_type not in [
@@ -396,6 +401,8 @@ def create_im_sim(
             compute_bool=bands_compute,
             likelihood_mask_list=image_likelihood_mask_list,
             linear_solver=linear_solver,
+            band_parallel=band_parallel,
+            num_threads=num_threads,
         )
     elif multi_band_type == "joint-linear":
         from lenstronomy.ImSim.MultiBand.joint_linear import JointLinear
@@ -405,6 +412,8 @@ def create_im_sim(
             kwargs_model,
             compute_bool=bands_compute,
             likelihood_mask_list=image_likelihood_mask_list,
+            band_parallel=band_parallel,
+            num_threads=num_threads,
         )
     elif multi_band_type == "single-band":
         from lenstronomy.ImSim.MultiBand.single_band_multi_model import (
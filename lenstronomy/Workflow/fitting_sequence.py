@@ -1,4 +1,5 @@
 import copy
+import weakref
 
 from lenstronomy.Workflow.psf_fitting import PsfFitting
 from lenstronomy.Workflow.alignment_matching import AlignmentFitting
@@ -7,6 +8,12 @@ from lenstronomy.ImSim.MultiBand.single_band_multi_model import SingleBandMultiM
 from lenstronomy.Workflow.multi_band_manager import MultiBandUpdateManager
 from lenstronomy.Sampling.likelihood import Likelihood
 from lenstronomy.Sampling.sampler import Sampler
+from lenstronomy.Sampling.checkpoint import Checkpoint
+from lenstronomy.Sampling.sample_sink import argmax_chunked
+from lenstronomy.Sampling.Pool.persistent_pool import (
+    PersistentLikelihoodPool,
+    likelihood_signature,
+)
 from lenstronomy.Sampling.Samplers.multinest_sampler import MultiNestSampler
 from lenstronomy.Sampling.Samplers.polychord_sampler import DyPolyChordSampler
 from lenstronomy.Sampling.Samplers.dynesty_sampler import DynestySampler
@@ -33,6 +40,7 @@ class FittingSequence(object):
         kwargs_params,
         mpi=False,
         verbose=True,
+        persistent_pool=False,
     ):
         """
 
@@ -55,6 +63,10 @@ class FittingSequence(object):
         :param mpi: MPI option (bool), if True, will launch an MPI Pool job for the steps in the fitting sequence where
          possible
         :param verbose: bool, if True prints temporary results and indicators of the fitting process
+        :param persistent_pool: bool, if True, the multiprocessing workers of the PSO and MCMC steps with
+         threadCount > 1 (and mpi=False) are spawned once and re-used across the steps of the fitting sequence
+         (see PersistentLikelihoodPool). The workers and their shared-memory segments are kept alive
+         after fit_sequence() returns, until close_pool() is called. If False, each step uses its own pool.
         """
         self.kwargs_data_joint = kwargs_data_joint
         self.multi_band_list = kwargs_data_joint.get("multi_band_list", [])
@@ -71,6 +83,9 @@ class FittingSequence(object):
         self._mcmc_init_samples = None
         self._psf_iteration_memory = []
         self._psf_iteration_index = 0  # index of the sequence of the PSF iteration (how many times it is being run)
+        self._persistent_pool = persistent_pool
+        self._pool = None
+        self._pool_finalizer = None
 
     @property
     def kwargs_fixed(self):
@@ -80,21 +95,64 @@ class FittingSequence(object):
         """
         return self._updateManager.fixed_kwargs
 
-    def fit_sequence(self, fitting_list):
+    def fit_sequence(self, fitting_list, checkpoint_filename=None, resume=False):
         """
 
         :param fitting_list: list of [['string', {kwargs}], ..] with 'string being the specific fitting option and
          kwargs being the arguments passed to this option
+        :param checkpoint_filename: None or name of an HDF5 file where the progress of the fitting sequence (completed
+         steps, state of the FittingSequence and best fit) and the state of PSO and zeus steps are saved
+         (see Checkpoint)
+        :param resume: bool, if True, resumes the fitting sequence from the progress saved in `checkpoint_filename`,
+         skipping the completed steps and continuing an interrupted PSO or zeus step. Otherwise, an existing file is
+         overwritten.
         :return: fitting results
         """
         chain_list = []
+        checkpoint = None
+        num_completed = 0
+        if checkpoint_filename is not None:
+            checkpoint = Checkpoint(checkpoint_filename, reset=not resume)
+            if resume is True:
+                chain_list = self._load_checkpoint(checkpoint, fitting_list)
+                num_completed = len(chain_list)
+        try:
+            chain_list = self._fit_sequence(
+                fitting_list, chain_list, checkpoint, num_completed
+            )
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+        return [chain for chain in chain_list if chain is not None]
+
+    def _fit_sequence(self, fitting_list, chain_list, checkpoint, num_completed):
+        """Executes the fitting sequence from step num_completed onwards.
+
+        :param fitting_list: list of [['string', {kwargs}], ..], see fit_sequence()
+        :param chain_list: list of outputs of the completed steps (None for steps
+            without output)
+        :param checkpoint: None or Checkpoint instance
+        :param num_completed: number of completed steps of fitting_list
+        :return: list of outputs of the steps (None for steps without output)
+        """
         for i, fitting in enumerate(fitting_list):
+            if i < num_completed:
+                continue
             fitting_type = fitting[0]
             kwargs = fitting[1]
+            num_chains = len(chain_list)
+            kwargs_checkpoint = {}
+            if checkpoint is not None:
+                kwargs_checkpoint = {
+                    "checkpoint": checkpoint,
+                    "checkpoint_key": "step_%s" % i,
+                    "resume": i == num_completed,
+                }
 
             if fitting_type in [
                 "PSO",
                 "SIMPLEX",
+                "LM",
                 "MCMC",
                 "emcee",
                 "zeus",
@@ -129,7 +187,7 @@ class FittingSequence(object):
                 self.flux_calibration(**kwargs)
 
             elif fitting_type == "PSO":
-                kwargs_result, chain, param = self.pso(**kwargs)
+                kwargs_result, chain, param = self.pso(**kwargs, **kwargs_checkpoint)
                 self._updateManager.update_param_state(**kwargs_result)
 
                 chain_list.append([fitting_type, chain, param])
@@ -139,6 +197,11 @@ class FittingSequence(object):
                 self._updateManager.update_param_state(**kwargs_result)
                 chain_list.append([fitting_type, kwargs_result])
 
+            elif fitting_type == "LM":
+                kwargs_result = self.levenberg_marquardt(**kwargs)
+                self._updateManager.update_param_state(**kwargs_result)
+                chain_list.append([fitting_type, kwargs_result])
+
             elif fitting_type in ["MCMC", "emcee", "zeus"]:
                 if fitting_type == "MCMC":
                     print("MCMC selected. Sampling with default option emcee.")
@@ -147,6 +210,8 @@ class FittingSequence(object):
                     kwargs["init_samples"] = self._mcmc_init_samples
                 elif kwargs["init_samples"] is None:
                     kwargs["init_samples"] = self._mcmc_init_samples
+                if fitting_type == "zeus":
+                    kwargs = dict(kwargs, **kwargs_checkpoint)
                 mcmc_output = self.mcmc(**kwargs, sampler_type=fitting_type)
                 kwargs_result = self._result_from_mcmc(mcmc_output)
                 self._updateManager.update_param_state(**kwargs_result)
@@ -214,15 +279,89 @@ class FittingSequence(object):
 
             else:
                 raise ValueError(
-                    "fitting_sequence {} is not supported. Please use: 'PSO', 'SIMPLEX', "
+                    "fitting_sequence {} is not supported. Please use: 'PSO', 'SIMPLEX', 'LM', "
                     "'MCMC' or 'emcee', 'zeus', 'Cobaya', "
                     "'dynesty', 'dyPolyChord',  'Multinest', 'Nautilus, '"
                     "'psf_iteration', 'restart', 'update_settings', 'calibrate_images' or "
                     "'align_images'".format(fitting_type)
                 )
-
+            if len(chain_list) == num_chains:
+                # step without output
+                chain_list.append(None)
+            if checkpoint is not None:
+                self._save_checkpoint(checkpoint, fitting_list, chain_list)
         return chain_list
 
+    def _checkpoint_state(self):
+        """
+
+        :return: dictionary of the state of the FittingSequence to be saved in a checkpoint
+        """
+        return {
+            "kwargs_data_joint": self.kwargs_data_joint,
+            "update_manager": self._updateManager,
+            "mcmc_init_samples": self._mcmc_init_samples,
+            "psf_iteration_memory": self._psf_iteration_memory,
+            "psf_iteration_index": self._psf_iteration_index,
+        }
+
+    def _save_checkpoint(self, checkpoint, fitting_list, chain_list):
+        """Saves the progress after a completed step. Only the output of the last step
+        is added to the outputs already saved.
+
+        :param checkpoint: Checkpoint instance
+        :param fitting_list: list of [['string', {kwargs}], ..], see fit_sequence()
+        :param chain_list: list of outputs of the completed steps
+        :return: None
+        """
+        i = len(chain_list) - 1
+        try:
+            checkpoint.set_object("fitting_sequence/chain_list/%s" % i, chain_list[i])
+        except Exception as error:
+            print(
+                "Warning: output of step %s can not be saved in the checkpoint (%s)."
+                % (i, error)
+            )
+            checkpoint.set_object("fitting_sequence/chain_list/%s" % i, None)
+        checkpoint.set_object("fitting_sequence/state", self._checkpoint_state())
+        checkpoint.set_object(
+            "fitting_sequence/best_fit", self.best_fit(bijective=True)
+        )
+        checkpoint.set_object("fitting_sequence/fitting_list", fitting_list[: i + 1])
+        checkpoint.set("fitting_sequence/num_completed", i + 1)
+
+    def _load_checkpoint(self, checkpoint, fitting_list):
+        """Restores the state of the FittingSequence saved in a checkpoint.
+
+        :param checkpoint: Checkpoint instance
+        :param fitting_list: list of [['string', {kwargs}], ..], see fit_sequence()
+        :return: list of outputs of the completed steps (None for steps without output)
+        """
+        num_completed = checkpoint.get("fitting_sequence/num_completed")
+        if num_completed is None:
+            return []
+        num_completed = int(num_completed)
+        fitting_list_saved = checkpoint.get_object("fitting_sequence/fitting_list")
+        if [fitting[0] for fitting in fitting_list_saved] != [
+            fitting[0] for fitting in fitting_list[:num_completed]
+        ]:
+            raise ValueError(
+                "The completed steps saved in %s do not match the fitting_list."
+                % checkpoint.filename
+            )
+        state = checkpoint.get_object("fitting_sequence/state")
+        self.kwargs_data_joint = state["kwargs_data_joint"]
+        self.multi_band_list = self.kwargs_data_joint.get("multi_band_list", [])
+        self._updateManager = state["update_manager"]
+        self._mcmc_init_samples = state["mcmc_init_samples"]
+        self._psf_iteration_memory = state["psf_iteration_memory"]
+        self._psf_iteration_index = state["psf_iteration_index"]
+        print("Resuming the fitting sequence after %s completed steps." % num_completed)
+        return [
+            checkpoint.get_object("fitting_sequence/chain_list/%s" % i)
+            for i in range(num_completed)
+        ]
+
     def best_fit(self, bijective=False):
         """
 
@@ -292,6 +431,43 @@ class FittingSequence(object):
         )
         return likelihood_class
 
+    def _sampler(self, threadCount=1):
+        """Sampler() instance of the current state of FittingSequence. If a persistent
+        pool is requested for threadCount > 1 (and mpi=False), the workers of the
+        persistent pool are updated with the current likelihood and passed on to the
+        Sampler.
+
+        :param threadCount: number of CPU threads of the sampling step
+        :return: Sampler() instance
+        """
+        likelihood_class = self.likelihood_class
+        if self._persistent_pool is False or self._mpi is True or threadCount == 1:
+            return Sampler(likelihood_class=likelihood_class)
+        if self._pool is not None and self._pool.processes != threadCount:
+            self.close_pool()
+        if self._pool is None:
+            self._pool = PersistentLikelihoodPool(processes=threadCount)
+            self._pool_finalizer = weakref.finalize(self, self._pool.close)
+        signature = likelihood_signature(
+            self.kwargs_data_joint,
+            self._updateManager.kwargs_model,
+            self._updateManager.kwargs_constraints,
+            self._updateManager.kwargs_likelihood,
+        )
+        self._pool.update(likelihood_class, signature=signature)
+        return Sampler(likelihood_class=likelihood_class, persistent_pool=self._pool)
+
+    def close_pool(self):
+        """Terminates the workers of the persistent pool (if any) and releases their
+        shared memory.
+
+        :return: None
+        """
+        if self._pool_finalizer is not None:
+            self._pool_finalizer()
+        self._pool = None
+        self._pool_finalizer = None
+
     def simplex(self, n_iterations, method="Nelder-Mead"):
         """Downhill simplex optimization using the Nelder-Mead algorithm.
 
@@ -310,6 +486,36 @@ class FittingSequence(object):
         kwargs_result = param_class.args2kwargs(result, bijective=True)
         return kwargs_result
 
+    def levenberg_marquardt(
+        self, n_iterations=100, threadCount=1, step_size=1e-4, tolerance=1e-6
+    ):
+        """Levenberg-Marquardt optimization of the imaging residuals (after the linear
+        inversion) with a finite difference Jacobian, evaluated in parallel with
+        threadCount > 1. Requires the linear solver and no pixel-based modelling.
+
+        :param n_iterations: maximum number of iterations to perform
+        :param threadCount: number of CPU threads. If MPI option is set, threadCount=1
+        :param step_size: finite difference step relative to the width of the parameter
+            limits
+        :param tolerance: relative log likelihood improvement below which the
+            optimization stops
+        :return: result of the best fit
+        """
+        param_class = self.param_class
+        kwargs_temp = self._updateManager.parameter_state
+        init_pos = param_class.kwargs2args(**kwargs_temp)
+        sampler = self._sampler(threadCount=threadCount)
+        result, _ = sampler.levenberg_marquardt(
+            init_pos,
+            n_iterations,
+            threadCount=threadCount,
+            mpi=self._mpi,
+            step_size=step_size,
+            tolerance=tolerance,
+        )
+        kwargs_result = param_class.args2kwargs(result, bijective=True)
+        return kwargs_result
+
     def mcmc(
         self,
         n_burn,
@@ -324,6 +530,8 @@ class FittingSequence(object):
         progress=True,
         backend_filename=None,
         start_from_backend=False,
+        sample_sink=None,
+        kwargs_surrogate=None,
         **kwargs_zeus
     ):
         """MCMC routine.
@@ -344,13 +552,19 @@ class FittingSequence(object):
         :param start_from_backend: if True, start from the state saved in `backup_filename`.
          O therwise, create a new backup file with name `backup_filename` (any already existing file is overwritten!).
         :type start_from_backend: bool
-        :param kwargs_zeus: zeus-specific kwargs
+        :param sample_sink: None or SampleSink instance (see lenstronomy.Sampling.sample_sink), the samples after
+         burn-in are streamed to the sink while sampling and the output holds its (lazy) arrays instead of in-memory
+         samples. A new sink is needed for each MCMC run.
+        :param kwargs_surrogate: None or keyword arguments of SurrogateLogLikelihood, pre-screens the proposals of
+         emcee with an emulator of the log likelihood (see Sampler.mcmc_emcee())
+        :param kwargs_zeus: zeus-specific kwargs. 'checkpoint', 'checkpoint_key' and 'resume' save and resume the
+         state of zeus (see Sampler.mcmc_zeus())
         :return: list of output arguments, e.g. MCMC samples, parameter names, logL distances of all samples specified
          by the specific sampler used
         """
         param_class = self.param_class
         # run PSO
-        mcmc_class = Sampler(likelihood_class=self.likelihood_class)
+        mcmc_class = self._sampler(threadCount=threadCount)
         kwargs_temp = self._updateManager.parameter_state
         mean_start = param_class.kwargs2args(**kwargs_temp)
         kwargs_sigma = self._updateManager.sigma_kwargs
@@ -368,7 +582,8 @@ class FittingSequence(object):
             if num_param_prev == num_param:
                 print("re-using previous samples to initialize the next MCMC run.")
                 idxs = np.random.choice(len(init_samples), n_walkers)
-                initpos = init_samples[idxs]
+                # read sample by sample to support lazy arrays (e.g. of a SampleSink)
+                initpos = np.array([init_samples[idx] for idx in idxs])
             else:
                 raise ValueError(
                     "Can not re-use previous MCMC samples as number of parameters have changed!"
@@ -389,6 +604,7 @@ class FittingSequence(object):
                 progress=progress,
                 initpos=initpos,
                 backend_filename=backend_filename,
+                sample_sink=sample_sink,
                 **kwargs_zeus
             )
             output = [sampler_type, samples, param_list, dist]
@@ -406,6 +622,8 @@ class FittingSequence(object):
                 initpos=initpos,
                 backend_filename=backend_filename,
                 start_from_backend=start_from_backend,
+                sample_sink=sample_sink,
+                kwargs_surrogate=kwargs_surrogate,
             )
             output = [sampler_type, samples, param_list, dist]
 
@@ -413,7 +631,17 @@ class FittingSequence(object):
         return output
 
     def pso(
-        self, n_particles, n_iterations, sigma_scale=1, print_key="PSO", threadCount=1
+        self,
+        n_particles,
+        n_iterations,
+        sigma_scale=1,
+        print_key="PSO",
+        threadCount=1,
+        asynchronous=False,
+        checkpoint=None,
+        checkpoint_key="pso",
+        resume=False,
+        kwargs_surrogate=None,
     ):
         """Particle Swarm Optimization.
 
@@ -423,6 +651,15 @@ class FittingSequence(object):
             width in the initial settings
         :param print_key: string, printed text when executing this routine
         :param threadCount: number of CPU threads. If MPI option is set, threadCount=1
+        :param asynchronous: bool, if True, runs the asynchronous PSO where each
+            particle is updated as soon as its likelihood is returned, avoiding to wait
+            for the slowest likelihood evaluation of the swarm
+        :param checkpoint: None or Checkpoint instance, the state of the swarm is saved
+            after each iteration
+        :param checkpoint_key: path of the PSO entries in the checkpoint
+        :param resume: bool, if True, continues from the state saved in the checkpoint
+        :param kwargs_surrogate: None or keyword arguments of SurrogateLogLikelihood,
+            pre-screens the particles with an emulator of the log likelihood
         :return: result of the best fit, the PSO chain of the best fit parameter after
             each iteration [lnlikelihood, parameters, velocities], list of parameters in
             same order as in chain
@@ -444,7 +681,7 @@ class FittingSequence(object):
 
         num_param, param_list = param_class.num_param()
         # run PSO
-        sampler = Sampler(likelihood_class=self.likelihood_class)
+        sampler = self._sampler(threadCount=threadCount)
         result, chain = sampler.pso(
             n_particles,
             n_iterations,
@@ -455,6 +692,11 @@ class FittingSequence(object):
             mpi=self._mpi,
             print_key=print_key,
             verbose=self._verbose,
+            asynchronous=asynchronous,
+            checkpoint=checkpoint,
+            checkpoint_key=checkpoint_key,
+            resume=resume,
+            kwargs_surrogate=kwargs_surrogate,
         )
         kwargs_result = param_class.args2kwargs(result, bijective=True)
         return kwargs_result, chain, param_list
@@ -891,13 +1133,14 @@ class FittingSequence(object):
     def best_fit_from_samples(self, samples, logl):
         """Return best fit (max likelihood) value of samples in lenstronomy conventions.
 
-        :param samples: samples of multi-dimensional parameter space
+        :param samples: samples of multi-dimensional parameter space (numpy array or
+            lazy array, e.g. of a SampleSink)
         :param logl: likelihood values for each sample
         :return: kwargs_result in lenstronomy convention
         """
         # get index of best logL sample
-        best_fit_index = np.argmax(logl)
-        best_fit_sample = samples[best_fit_index, :]
+        best_fit_index = argmax_chunked(logl)
+        best_fit_sample = np.asarray(samples[best_fit_index, :])
         best_fit_result = best_fit_sample.tolist()
         # get corresponding kwargs
         kwargs_result = self.param_class.args2kwargs(best_fit_result, bijective=True)
@@ -148,6 +148,38 @@ class TestJointLinear(object):
         )
         assert len(wls_list) == 2
 
+    def test_image_linear_solve_normal_equations(self):
+        # reference: weighted least squares of the response matrix of all bands
+        A = self.imageModel.linear_response_matrix(
+            self.kwargs_lens, self.kwargs_source, self.kwargs_lens_light, self.kwargs_ps
+        )
+        C_D_response, _ = self.imageModel.error_response(
+            self.kwargs_lens, self.kwargs_ps
+        )
+        param_ref, cov_ref, wls_ref = de_lens.get_param_WLS(
+            A.T, 1 / C_D_response, self.imageModel.data_response, inv_bool=True
+        )
+        wls_ref_list = self.imageModel._array2image_list(wls_ref)
+        for band_parallel in [False, True]:
+            self.imageModel._band_parallel = band_parallel
+            wls_list, _, cov_param, param = self.imageModel.image_linear_solve(
+                self.kwargs_lens,
+                self.kwargs_source,
+                self.kwargs_lens_light,
+                self.kwargs_ps,
+                inv_bool=True,
+            )
+            npt.assert_allclose(param, param_ref, rtol=1e-8)
+            npt.assert_allclose(cov_param, cov_ref, rtol=1e-6)
+            for wls, wls_ref_i in zip(wls_list, wls_ref_list):
+                npt.assert_allclose(wls, wls_ref_i, rtol=1e-6, atol=1e-12)
+
+        # the thread pool is not pickled
+        import pickle
+
+        image_model = pickle.loads(pickle.dumps(self.imageModel))
+        assert image_model._executor is None
+
     def test_likelihood_data_given_model(self):
         logL, param = self.imageModel.likelihood_data_given_model(
             self.kwargs_lens,
@@ -159,6 +191,24 @@ class TestJointLinear(object):
         chi2_reduced = logL * 2 / self.imageModel.num_data_evaluate
         npt.assert_almost_equal(chi2_reduced, -1, 1)
 
+    def test_residual_vector(self):
+        model_list, error_map_list, _, _ = self.imageModel.image_linear_solve(
+            self.kwargs_lens,
+            self.kwargs_source,
+            self.kwargs_lens_light,
+            self.kwargs_ps,
+        )
+        residuals = self.imageModel.residual_vector(model_list, error_map_list)
+        assert len(residuals) == self.imageModel.num_data_evaluate
+        logL, _ = self.imageModel.likelihood_data_given_model(
+            self.kwargs_lens,
+            self.kwargs_source,
+            self.kwargs_lens_light,
+            self.kwargs_ps,
+            source_marg=False,
+        )
+        npt.assert_almost_equal(-np.sum(residuals**2) / 2 / logL, 1, decimal=8)
+
     def test_likelihood_data_given_model_source_marg_and_positive_flux(self):
         original_marginalization_new = de_lens.marginalization_new
         de_lens.marginalization_new = lambda *args, **kwargs: 0.0
@@ -7,6 +7,7 @@ import pytest
 from lenstronomy.Data.imaging_data import ImageData
 from lenstronomy.Data.psf import PSF
 from lenstronomy.ImSim.MultiBand.joint_linear_vary_background import JointLinear_VaryBG
+import lenstronomy.ImSim.de_lens as de_lens
 import lenstronomy.Util.param_util as param_util
 from lenstronomy.LensModel.lens_model import LensModel
 from lenstronomy.LightModel.light_model import LightModel
@@ -177,6 +178,47 @@ class TestJointLinear_VaryBG(object):
         assert param.ndim == 1
         assert len(param) == self.num_params_total
 
+    def test_image_linear_solve_schur_complement(self):
+        # reference: weighted least squares of the response matrix of all bands
+        A = self.imageModel.linear_response_matrix(
+            self.kwargs_lens, self.kwargs_source, self.kwargs_lens_light, self.kwargs_ps
+        )
+        C_D_response, _ = self.imageModel.error_response(
+            self.kwargs_lens, self.kwargs_ps
+        )
+        param_ref, cov_ref, wls_ref = de_lens.get_param_WLS(
+            A.T, 1 / C_D_response, self.imageModel.data_response, inv_bool=True
+        )
+        wls_list, _, cov_param, param = self.imageModel.image_linear_solve(
+            self.kwargs_lens,
+            self.kwargs_source,
+            self.kwargs_lens_light,
+            self.kwargs_ps,
+            inv_bool=True,
+        )
+        npt.assert_allclose(param, param_ref, rtol=1e-8)
+        npt.assert_allclose(cov_param, cov_ref, rtol=1e-6, atol=1e-14)
+        npt.assert_allclose(
+            np.concatenate([wls.ravel() for wls in wls_list]),
+            wls_ref,
+            rtol=1e-6,
+            atol=1e-12,
+        )
+
+        # a band not computed has a zero background level
+        self.imageModel._compute_bool = [True, False]
+        wls_list, _, cov_param, param = self.imageModel.image_linear_solve(
+            self.kwargs_lens,
+            self.kwargs_source,
+            self.kwargs_lens_light,
+            self.kwargs_ps,
+            inv_bool=True,
+        )
+        assert len(wls_list) == 1
+        assert len(param) == self.num_params_total
+        assert param[-1] == 0
+        assert np.all(cov_param[-1] == 0)
+
     def test_background_params(self):
         """The per-band background parameters (last num_bands entries in param) should
         recover the known constant backgrounds injected into each band's data."""
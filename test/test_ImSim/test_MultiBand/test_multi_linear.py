@@ -1,5 +1,8 @@
 __author__ = "sibirrer"
 
+import copy
+import pickle
+
 import numpy.testing as npt
 import pytest
 import numpy as np
@@ -213,6 +216,167 @@ class TestImageModel(object):
         assert kwargs_lens_light[0]["amp"] == 10
         assert kwargs_ps[0]["source_amp"] == 10
 
+    def test_shared_ray_shooting(self):
+        kwargs_data, kwargs_psf, kwargs_numerics = self.multi_band_list[0]
+        kwargs_numerics_fine = {"supersampling_factor": 3}
+        multi_band_list = [
+            [kwargs_data, kwargs_psf, kwargs_numerics],
+            [kwargs_data, kwargs_psf, kwargs_numerics_fine],
+            [kwargs_data, kwargs_psf, kwargs_numerics],
+        ]
+        image_model = MultiLinear(multi_band_list, self.kwargs_model)
+        image_model_ref = MultiLinear(
+            multi_band_list, self.kwargs_model, share_ray_shooting=False
+        )
+        assert image_model_ref.ray_shooting_cache is None
+        cache = image_model.ray_shooting_cache
+        model, error_map, cov_param, param = image_model.image_linear_solve(
+            self.kwargs_lens,
+            self.kwargs_source,
+            self.kwargs_lens_light,
+            self.kwargs_ps,
+        )
+        # one ray-shooting per unique grid
+        assert cache.misses == 2
+        assert cache.hits == 1
+        assert len(cache) == 2
+        model_ref, _, _, param_ref = image_model_ref.image_linear_solve(
+            self.kwargs_lens,
+            self.kwargs_source,
+            self.kwargs_lens_light,
+            self.kwargs_ps,
+        )
+        for i in range(3):
+            npt.assert_array_equal(model[i], model_ref[i])
+            npt.assert_array_equal(param[i], param_ref[i])
+
+        # the cache is looked up with the lens parameters
+        kwargs_lens = copy.deepcopy(self.kwargs_lens)
+        kwargs_lens[0]["theta_E"] = 1.1
+        logL, _ = image_model.likelihood_data_given_model(
+            kwargs_lens, self.kwargs_source, self.kwargs_lens_light, self.kwargs_ps
+        )
+        logL_ref, _ = image_model_ref.likelihood_data_given_model(
+            kwargs_lens, self.kwargs_source, self.kwargs_lens_light, self.kwargs_ps
+        )
+        npt.assert_almost_equal(logL, logL_ref, decimal=8)
+        assert cache.misses == 4
+
+        image_model_pickled = pickle.loads(
+            pickle.dumps(MultiLinear(multi_band_list, self.kwargs_model))
+        )
+        image_model_ref = MultiLinear(
+            multi_band_list, self.kwargs_model, share_ray_shooting=False
+        )
+        logL_pickled, _ = image_model_pickled.likelihood_data_given_model(
+            kwargs_lens, self.kwargs_source, self.kwargs_lens_light, self.kwargs_ps
+        )
+        logL_ref, _ = image_model_ref.likelihood_data_given_model(
+            kwargs_lens, self.kwargs_source, self.kwargs_lens_light, self.kwargs_ps
+        )
+        npt.assert_almost_equal(logL_pickled, logL_ref, decimal=8)
+        assert image_model_pickled.ray_shooting_cache.hits == 1
+
+        # bands evaluated in parallel threads
+        image_model_parallel = MultiLinear(
+            multi_band_list, self.kwargs_model, band_parallel=True
+        )
+        model_parallel, _, _, _ = image_model_parallel.image_linear_solve(
+            self.kwargs_lens,
+            self.kwargs_source,
+            self.kwargs_lens_light,
+            self.kwargs_ps,
+        )
+        for i in range(3):
+            npt.assert_array_equal(model_parallel[i], model_ref[i])
+        assert image_model_parallel.ray_shooting_cache.misses == 2
+        image_model_parallel.close()
+
+        # no shared grids
+        image_model_single = MultiLinear(multi_band_list[:2], self.kwargs_model)
+        assert image_model_single.ray_shooting_cache is None
+
+    def test_band_parallel(self):
+        kwargs_data, kwargs_psf, kwargs_numerics = self.multi_band_list[0]
+        multi_band_list = [
+            [kwargs_data, kwargs_psf, kwargs_numerics],
+            [kwargs_data, kwargs_psf, {"supersampling_factor": 1}],
+            [kwargs_data, kwargs_psf, kwargs_numerics],
+        ]
+        image_model = MultiLinear(
+            multi_band_list, self.kwargs_model, band_parallel=True, num_threads=2
+        )
+        image_model_ref = MultiLinear(multi_band_list, self.kwargs_model)
+        kwargs_source = copy.deepcopy(self.kwargs_source)
+        kwargs_lens_light = copy.deepcopy(self.kwargs_lens_light)
+        kwargs_ps = copy.deepcopy(self.kwargs_ps)
+        logL, param = image_model.likelihood_data_given_model(
+            self.kwargs_lens,
+            kwargs_source,
+            kwargs_lens_light,
+            kwargs_ps,
+            source_marg=True,
+        )
+        logL_ref, param_ref = image_model_ref.likelihood_data_given_model(
+            self.kwargs_lens,
+            self.kwargs_source,
+            self.kwargs_lens_light,
+            self.kwargs_ps,
+            source_marg=True,
+        )
+        npt.assert_almost_equal(logL, logL_ref, decimal=8)
+        for i in range(3):
+            npt.assert_almost_equal(param[i], param_ref[i], decimal=8)
+        # the linear amplitudes are written into the keyword arguments as in the
+        # sequential evaluation
+        npt.assert_almost_equal(
+            kwargs_source[0]["amp"], self.kwargs_source[0]["amp"], decimal=8
+        )
+        npt.assert_almost_equal(
+            kwargs_ps[0]["source_amp"], self.kwargs_ps[0]["source_amp"], decimal=8
+        )
+
+        model, error_map, cov_param, param = image_model.image_linear_solve(
+            self.kwargs_lens, kwargs_source, kwargs_lens_light, kwargs_ps
+        )
+        model_ref, _, _, param_ref = image_model_ref.image_linear_solve(
+            self.kwargs_lens, self.kwargs_source, self.kwargs_lens_light, self.kwargs_ps
+        )
+        for i in range(3):
+            npt.assert_almost_equal(model[i], model_ref[i], decimal=8)
+        # the thread pool is shut down and re-created when needed
+        assert image_model._executor is not None
+        image_model.close()
+        assert image_model._executor is None
+        logL_closed, _ = image_model.likelihood_data_given_model(
+            self.kwargs_lens,
+            kwargs_source,
+            kwargs_lens_light,
+            kwargs_ps,
+            source_marg=True,
+        )
+        npt.assert_almost_equal(logL_closed, logL_ref, decimal=8)
+        image_model.close()
+
+        # bands not computed
+        image_model = MultiLinear(
+            multi_band_list,
+            self.kwargs_model,
+            compute_bool=[True, False, True],
+            band_parallel=True,
+        )
+        logL, param = image_model.likelihood_data_given_model(
+            self.kwargs_lens, kwargs_source, kwargs_lens_light, kwargs_ps
+        )
+        assert param[1] is None
+        image_model_pickled = pickle.loads(pickle.dumps(image_model))
+        logL_pickled, _ = image_model_pickled.likelihood_data_given_model(
+            self.kwargs_lens, kwargs_source, kwargs_lens_light, kwargs_ps
+        )
+        npt.assert_almost_equal(logL_pickled, logL, decimal=8)
+        image_model.close()
+        image_model_pickled.close()
+
 
 if __name__ == "__main__":
     pytest.main()
@@ -1,5 +1,8 @@
 __author__ = "sibirrer"
 
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import numpy.testing as npt
 from lenstronomy.ImSim.Numerics.convolution import (
@@ -38,6 +41,33 @@ class TestPixelKernelConvolution(object):
         image_convolved_t = pixel_conv_t.convolution2d(self.model)
         npt.assert_equal(image_convolved, image_convolved_t)
 
+    def test_static_cache(self):
+        kernel = np.ones((3, 3)) / 9.0
+        pixel_conv = PixelKernelConvolution(kernel=kernel)
+        pixel_conv_fft = PixelKernelConvolution(kernel=kernel, convolution_type="fft")
+        image_large = np.ones((14, 14))
+        # images of different shapes are convolved with their own kernel transform
+        for image in [self.model, image_large, self.model]:
+            npt.assert_almost_equal(
+                pixel_conv.convolution2d(image),
+                pixel_conv_fft.convolution2d(image),
+                decimal=8,
+            )
+        pixel_conv_pickled = pickle.loads(pickle.dumps(pixel_conv))
+        npt.assert_almost_equal(
+            pixel_conv_pickled.convolution2d(image_large),
+            pixel_conv_fft.convolution2d(image_large),
+            decimal=8,
+        )
+        # images convolved in parallel threads
+        pixel_conv = PixelKernelConvolution(kernel=kernel)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            image_list = list(executor.map(pixel_conv.convolution2d, [image_large] * 8))
+        for image_convolved in image_list:
+            npt.assert_almost_equal(
+                image_convolved, pixel_conv_fft.convolution2d(image_large), decimal=8
+            )
+
     def test_pixel_kernel(self):
         kernel = np.zeros((5, 5))
         kernel[1, 1] = 1
@@ -0,0 +1,141 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+import lenstronomy.Util.simulation_util as sim_util
+import lenstronomy.Util.util as util
+from lenstronomy.Data.imaging_data import ImageData
+from lenstronomy.Data.psf import PSF
+from lenstronomy.LensModel.lens_model import LensModel
+from lenstronomy.ImSim.SourceReconstruction.adaptive_source_grid import (
+    AdaptiveSourceGrid,
+    ray_traced_source_grid,
+)
+from lenstronomy.ImSim.SourceReconstruction.pixelated_source_reconstruction import (
+    PixelatedSourceReconstruction,
+)
+
+
+class TestAdaptiveSourceGrid(object):
+    def setup_method(self):
+        np.random.seed(42)
+        self.x_nodes = np.random.uniform(-1, 1, 50)
+        self.y_nodes = np.random.uniform(-1, 1, 50)
+        self.grid = AdaptiveSourceGrid(self.x_nodes, self.y_nodes)
+
+        kwargs_data = sim_util.data_configure_simple(20, 0.1, np.inf, 1)
+        kwargs_data["image_data"] = np.random.rand(20, 20)
+        self.data_class = ImageData(**kwargs_data)
+        self.lens_model_class = LensModel(["SIE"])
+        self.kwargs_lens = [
+            {"theta_E": 0.8, "e1": 0.1, "e2": 0.0, "center_x": 0.0, "center_y": 0.0}
+        ]
+
+    def test_interpolation(self):
+        assert self.grid.num_pixel == 50
+        x_nodes, y_nodes = self.grid.nodes
+        npt.assert_almost_equal(x_nodes, self.x_nodes)
+        assert self.grid.triangulation.npoints == 50
+
+        # linear functions are interpolated exactly within the convex hull
+        x, y = np.random.uniform(-0.5, 0.5, (2, 100))
+        values = 1 + 2 * self.x_nodes - 3 * self.y_nodes
+        inside = self.grid.triangulation.find_simplex(np.column_stack([x, y])) >= 0
+        assert np.sum(inside) > 90
+        interpolated = self.grid.interpolate(values, x, y)
+        npt.assert_almost_equal(interpolated[inside], (1 + 2 * x - 3 * y)[inside])
+
+        # the nodes are reproduced and the values vanish outside the convex hull
+        npt.assert_almost_equal(
+            self.grid.interpolate(values, self.x_nodes, self.y_nodes), values
+        )
+        npt.assert_almost_equal(self.grid.interpolate(values, [5, -3], [0, 2]), 0)
+
+        mapping = self.grid.mapping_matrix(x, y)
+        assert mapping.shape == (100, 50)
+        npt.assert_almost_equal(mapping.sum(axis=1).A1, inside.astype(float))
+
+        with pytest.raises(ValueError):
+            AdaptiveSourceGrid([0, 1], [0, 1])
+
+    def test_ray_traced_source_grid(self):
+        grid = ray_traced_source_grid(
+            self.data_class, self.lens_model_class, self.kwargs_lens, 40
+        )
+        assert 3 <= grid.num_pixel <= 40
+        x_grid, y_grid = self.data_class.pixel_coordinates
+        beta_x, beta_y = self.lens_model_class.ray_shooting(
+            x_grid, y_grid, self.kwargs_lens
+        )
+        x_nodes, y_nodes = grid.nodes
+        assert np.min(x_nodes) >= np.min(beta_x)
+        assert np.max(y_nodes) <= np.max(beta_y)
+
+        # more nodes close to the caustics with magnification weights
+        mask = np.zeros((20, 20))
+        mask[2:18, 2:18] = 1
+        grid_weighted = ray_traced_source_grid(
+            self.data_class,
+            self.lens_model_class,
+            self.kwargs_lens,
+            40,
+            mask=mask,
+            magnification_power=2,
+        )
+        radius = np.hypot(*grid.nodes)
+        radius_weighted = np.hypot(*grid_weighted.nodes)
+        assert np.median(radius_weighted) < np.median(radius)
+
+        with pytest.raises(ValueError):
+            ray_traced_source_grid(
+                self.data_class,
+                self.lens_model_class,
+                self.kwargs_lens,
+                50,
+                mask=mask * 0,
+            )
+
+    def test_pixelated_source_reconstruction(self):
+        kernel = np.zeros((5, 5))
+        kernel[1:4, 1:4] = 1 / 9.0
+        psf_class = PSF(
+            psf_type="PIXEL",
+            kernel_point_source=kernel,
+            kernel_point_source_normalisation=False,
+        )
+        grid = ray_traced_source_grid(
+            self.data_class, self.lens_model_class, self.kwargs_lens, 30
+        )
+        psr = PixelatedSourceReconstruction(
+            self.data_class, psf_class, self.lens_model_class, grid
+        )
+        x_grid, y_grid = self.data_class.pixel_coordinates
+        beta_x, beta_y = self.lens_model_class.ray_shooting(
+            util.image2array(x_grid), util.image2array(y_grid), self.kwargs_lens
+        )
+        mapping = grid.mapping_matrix(beta_x, beta_y)
+        npt.assert_almost_equal(
+            psr.lensing_operator(self.kwargs_lens).toarray(), mapping.toarray()
+        )
+        values = np.random.rand(grid.num_pixel)
+        npt.assert_almost_equal(
+            psr.lens_an_image_by_rayshooting(self.kwargs_lens, values),
+            util.array2image(mapping @ values),
+        )
+
+        blurred = psr.convolution_operator() @ mapping
+        weights = util.image2array(1 / self.data_class.C_D)
+        M, b = psr.generate_M_b(self.kwargs_lens, verbose=True, show_progress=False)
+        npt.assert_almost_equal(
+            M, (blurred.T @ (blurred.multiply(weights[:, None]))).toarray()
+        )
+        npt.assert_almost_equal(
+            b, blurred.T @ (weights * util.image2array(self.data_class.data))
+        )
+        M_operator, b_operator = psr.generate_M_operator_b(self.kwargs_lens)
+        npt.assert_almost_equal(M_operator @ values, M @ values)
+        npt.assert_almost_equal(b_operator, b)
+
+
+if __name__ == "__main__":
+    pytest.main()
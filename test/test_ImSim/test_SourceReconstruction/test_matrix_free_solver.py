@@ -0,0 +1,81 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+import scipy.sparse as sparse_matrix
+from scipy.sparse.linalg import aslinearoperator
+
+from lenstronomy.ImSim.SourceReconstruction.matrix_free_solver import (
+    conjugate_gradient,
+    jacobi_preconditioner,
+    regularized_operator,
+    solve_regularized,
+    stochastic_lanczos_log_det,
+)
+from lenstronomy.ImSim.SourceReconstruction.regularization_matrix_pixel import (
+    pixelated_regularization_matrix,
+)
+
+
+class TestMatrixFreeSolver(object):
+    def setup_method(self):
+        np.random.seed(42)
+        A = np.random.rand(49, 30)
+        self.M = A.dot(A.T)
+        self.U = pixelated_regularization_matrix(7, 7, "curvature", sparse=True)
+        self.b = np.random.rand(49)
+
+    def test_conjugate_gradient(self):
+        matrix = self.M + 0.5 * self.U.toarray()
+        x = conjugate_gradient(matrix, self.b, tolerance=1e-12)
+        npt.assert_allclose(x, np.linalg.solve(matrix, self.b), rtol=1e-6)
+
+        # several right-hand sides, preconditioner and initial guess
+        b = np.random.rand(49, 3)
+        x = conjugate_gradient(
+            aslinearoperator(matrix),
+            b,
+            preconditioner=np.diag(matrix),
+            tolerance=1e-12,
+            x0=np.ones((49, 3)),
+        )
+        npt.assert_allclose(x, np.linalg.solve(matrix, b), rtol=1e-6)
+
+        with pytest.warns(RuntimeWarning):
+            conjugate_gradient(matrix, self.b, max_iterations=2)
+
+    def test_solve_regularized(self):
+        for l in [0.01, 1, 100]:
+            x = solve_regularized(self.M, self.U, self.b, l, tolerance=1e-12)
+            expected = np.linalg.solve(self.M + l * self.U.toarray(), self.b)
+            npt.assert_allclose(x, expected, rtol=1e-5)
+        operator = regularized_operator(self.M, self.U, 2)
+        npt.assert_allclose(
+            operator @ self.b, (self.M + 2 * self.U.toarray()).dot(self.b)
+        )
+
+    def test_jacobi_preconditioner(self):
+        diagonal = jacobi_preconditioner(self.M, self.U, 2)
+        npt.assert_allclose(diagonal, np.diag(self.M) + 2 * self.U.diagonal())
+        assert jacobi_preconditioner(aslinearoperator(self.M), self.U, 2) is None
+        assert jacobi_preconditioner(-self.M, sparse_matrix.identity(49), 0) is None
+
+    def test_stochastic_lanczos_log_det(self):
+        matrix = self.M + self.U.toarray()
+        expected = np.linalg.slogdet(matrix)[1]
+        log_det = stochastic_lanczos_log_det(matrix, num_probes=100)
+        npt.assert_allclose(log_det, expected, rtol=0.02)
+        log_det = stochastic_lanczos_log_det(
+            matrix, num_probes=100, preconditioner=np.diag(matrix)
+        )
+        npt.assert_allclose(log_det, expected, rtol=0.02)
+
+        # exact for a diagonal matrix (breakdown of the Lanczos iterations)
+        diagonal = np.random.uniform(1, 2, 20)
+        log_det = stochastic_lanczos_log_det(np.diag(diagonal), preconditioner=diagonal)
+        npt.assert_allclose(log_det, np.sum(np.log(diagonal)))
+        log_det = stochastic_lanczos_log_det(np.identity(20) * 3, num_steps=50)
+        npt.assert_allclose(log_det, 20 * np.log(3))
+
+
+if __name__ == "__main__":
+    pytest.main()
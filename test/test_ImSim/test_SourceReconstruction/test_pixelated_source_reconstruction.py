@@ -1,5 +1,6 @@
 import pytest
 import numpy as np
+import numpy.testing as npt
 
 from lenstronomy.ImSim.SourceReconstruction.pixelated_source_reconstruction import (
     PixelatedSourceReconstruction,
@@ -532,6 +533,104 @@ class TestPixelatedSourceReconstruction(object):
         assert np.allclose(M_expected, M_result, atol=1e-5)
         assert np.allclose(b_expected, b_result, atol=1e-5)
 
+    def test_sparse_operators(self):
+        kwargs_source_grid = {
+            "nx": 8,
+            "ny": 8,
+            "transform_pix2angle": 0.02 * np.identity(2),
+            "ra_at_xy_0": -0.08,
+            "dec_at_xy_0": -0.08,
+        }
+        source_pixel_grid_class = PixelGrid(**kwargs_source_grid)
+        kernel = self.kernel[7:12, 7:12] / np.sum(self.kernel[7:12, 7:12])
+        kwargs_psf = dict(self.kwargs_psf, kernel_point_source=kernel)
+        psr = PixelatedSourceReconstruction(
+            self.data_class,
+            PSF(**kwargs_psf),
+            self.lens_model_class,
+            source_pixel_grid_class,
+        )
+        lensing_operator = psr.lensing_operator(self.kwargs_lens)
+        lensed_sp = psr.lens_pixel_source_of_a_rectangular_region(self.kwargs_lens)
+        num_source = source_pixel_grid_class.num_pixel
+        for k in [0, 27, num_source - 1]:
+            npt.assert_almost_equal(
+                lensing_operator[:, k].toarray().reshape(10, 10),
+                psr.sparse_to_array(lensed_sp[k]),
+            )
+            x = lensing_operator[:, k].toarray().ravel()
+            npt.assert_almost_equal(
+                psr.convolution_operator() @ x,
+                psr.sparse_convolution(lensed_sp[k]).ravel(),
+            )
+            npt.assert_almost_equal(
+                psr._convolve_lensed_pixels(lensing_operator, slice(k, k + 1))[0],
+                psr.sparse_convolution(lensed_sp[k]).ravel(),
+            )
+
+        # reference: M_ij = sum(conv_i * conv_j / C_D) of the convolved lensed pixels
+        conv = np.array([psr.sparse_convolution(sp).ravel() for sp in lensed_sp])
+        weights = 1 / self.data_class.C_D.ravel()
+        M_ref = (conv * weights).dot(conv.T)
+        b_ref = (conv * weights).dot(self.image_data.ravel())
+        psr._use_sparse_convolution = lambda *args: True
+        M, b = psr.generate_M_b_diagonal_likelihood(
+            self.kwargs_lens, show_progress=False
+        )
+        npt.assert_almost_equal(M, M_ref, decimal=10)
+        npt.assert_almost_equal(b, b_ref, decimal=10)
+        psr._use_sparse_convolution = lambda *args: False
+        M_dense, b_dense = psr.generate_M_b_diagonal_likelihood(
+            self.kwargs_lens, show_progress=False
+        )
+        npt.assert_almost_equal(M_dense, M_ref, decimal=10)
+        npt.assert_almost_equal(b_dense, b_ref, decimal=10)
+
+    def test_generate_M_operator_b(self):
+        kwargs_source_grid = {
+            "nx": 8,
+            "ny": 8,
+            "transform_pix2angle": 0.02 * np.identity(2),
+            "ra_at_xy_0": -0.08,
+            "dec_at_xy_0": -0.08,
+        }
+        source_pixel_grid_class = PixelGrid(**kwargs_source_grid)
+        x = np.random.rand(64, 3)
+        small_kernel = self.kernel[7:12, 7:12] / np.sum(self.kernel[7:12, 7:12])
+        for kernel, sparse in [(self.kernel, False), (small_kernel, True)]:
+            kwargs_psf = dict(self.kwargs_psf, kernel_point_source=kernel)
+            psr = PixelatedSourceReconstruction(
+                self.data_class,
+                PSF(**kwargs_psf),
+                self.lens_model_class,
+                source_pixel_grid_class,
+            )
+            psr._use_sparse_convolution = lambda *args: sparse
+            M, b = psr.generate_M_b(self.kwargs_lens, show_progress=False)
+            M_operator, b_operator = psr.generate_M_operator_b(self.kwargs_lens)
+            npt.assert_almost_equal(M_operator @ x, M.dot(x), decimal=10)
+            npt.assert_almost_equal(M_operator @ x[:, 0], M.dot(x[:, 0]), decimal=10)
+            npt.assert_almost_equal(b_operator, b, decimal=10)
+            assert M_operator.H is M_operator
+            if sparse:
+                npt.assert_almost_equal(M_operator.diagonal(), np.diag(M))
+            else:
+                assert np.all(M_operator.diagonal() >= 0)
+
+        kwargs_data_interferometry = dict(
+            self.kwargs_data, likelihood_method="interferometry_natwt"
+        )
+        psr = PixelatedSourceReconstruction(
+            ImageData(**kwargs_data_interferometry),
+            self.psf_class,
+            self.lens_model_class,
+            source_pixel_grid_class,
+        )
+        M, b = psr.generate_M_b(self.kwargs_lens, show_progress=False)
+        M_operator, b_operator = psr.generate_M_operator_b(self.kwargs_lens)
+        npt.assert_almost_equal(M_operator @ x, M.dot(x), decimal=10)
+        npt.assert_almost_equal(b_operator, b, decimal=10)
+
     def test_lens_pixel_source_of_a_rectangular_region(self):
         psr = PixelatedSourceReconstruction(
             self.data_class,
@@ -1,7 +1,9 @@
 import numpy as np
 import pytest
+from scipy.spatial import Delaunay
 
 from lenstronomy.ImSim.SourceReconstruction.regularization_matrix_pixel import (
+    adaptive_regularization_matrix,
     pixelated_regularization_matrix,
 )
 
@@ -375,3 +377,49 @@ def test_pixelated_regularization_matrix():
         ]
     )
     assert np.allclose(result, expected, atol=1e-5)
+
+
+def test_pixelated_regularization_matrix_sparse():
+    for regularization_type in ["zeroth_order", "gradient", "curvature"]:
+        for xlen, ylen in [(4, 3), (1, 5), (2, 2)]:
+            result = pixelated_regularization_matrix(
+                xlen, ylen, regularization_type, sparse=True
+            )
+            expected = pixelated_regularization_matrix(xlen, ylen, regularization_type)
+            assert result.format == "csr"
+            assert np.allclose(result.toarray(), expected)
+
+
+def test_adaptive_regularization_matrix():
+    np.random.seed(42)
+    x_nodes, y_nodes = np.random.uniform(-1, 1, (2, 30))
+    with pytest.raises(ValueError, match="Unsupported regularization_type"):
+        adaptive_regularization_matrix(x_nodes, y_nodes, "WRONG")
+
+    result = adaptive_regularization_matrix(x_nodes, y_nodes, "zeroth_order")
+    assert np.allclose(result, np.identity(30))
+
+    triangulation = Delaunay(np.column_stack([x_nodes, y_nodes]))
+    hull = np.unique(triangulation.convex_hull)
+    for regularization_type in ["gradient", "curvature"]:
+        result = adaptive_regularization_matrix(
+            x_nodes, y_nodes, regularization_type, sparse=True
+        )
+        assert result.format == "csr"
+        dense = adaptive_regularization_matrix(x_nodes, y_nodes, regularization_type)
+        assert np.allclose(result.toarray(), dense)
+        assert np.allclose(dense, dense.T)
+        assert np.all(np.linalg.eigvalsh(dense) > 0)
+        # a constant amplitude is only penalized on the convex hull
+        penalty = np.ones(30).dot(dense).dot(np.ones(30))
+        assert np.isclose(penalty, len(hull))
+
+    # gradient: sum of the squared differences over the edges (and hull nodes)
+    a = np.random.rand(30)
+    edges = set()
+    for simplex in triangulation.simplices:
+        for i in range(3):
+            edges.add(tuple(sorted((simplex[i], simplex[(i + 1) % 3]))))
+    expected = sum((a[i] - a[j]) ** 2 for i, j in edges) + np.sum(a[hull] ** 2)
+    dense = adaptive_regularization_matrix(x_nodes, y_nodes, "gradient")
+    assert np.isclose(a.dot(dense).dot(a), expected)
@@ -1,8 +1,15 @@
 import numpy as np
+import numpy.testing as npt
 import pytest
 from lenstronomy.ImSim.SourceReconstruction.solve_regularization_strength import (
     d_log_evi_d_lambda,
+    d_log_evi_d_lambda_matrix_free,
+    log_evidence_matrix_free,
     solve_optimal_lambda,
+    RegularizationSpectrum,
+)
+from lenstronomy.ImSim.SourceReconstruction.regularization_matrix_pixel import (
+    pixelated_regularization_matrix,
 )
 
 
@@ -270,3 +277,73 @@ def test_solve_optimal_lambda_success():
         solve_optimal_lambda(
             d_log_evi_d_lambda, U, M, b, 1e0, 1e2, check_initial_bounds=True
         )
+
+
+def test_matrix_free():
+    np.random.seed(42)
+    A = np.random.rand(64, 80)
+    M = A.dot(A.T)
+    b = M.dot(np.random.rand(64)) + A.dot(np.random.randn(80))
+    U = pixelated_regularization_matrix(8, 8, "gradient", sparse=True)
+    for l in [0.1, 1, 10]:
+        result = d_log_evi_d_lambda_matrix_free(l, U, M, b, num_probes=200)
+        expected = d_log_evi_d_lambda(l, U.toarray(), M, b)
+        npt.assert_allclose(result, expected, rtol=0.05)
+
+        M_plus_lambda_U = M + l * U.toarray()
+        expected = (
+            b.dot(np.linalg.solve(M_plus_lambda_U, b))
+            - np.linalg.slogdet(M_plus_lambda_U)[1]
+            + 64 * np.log(l)
+        ) / 2
+        result = log_evidence_matrix_free(l, U, M, b, num_probes=100)
+        npt.assert_allclose(result, expected, atol=1)
+
+    # same optimal lambda as the exact derivative
+    lambda_exact = solve_optimal_lambda(
+        d_log_evi_d_lambda, U.toarray(), M, b, 1e-3, 1e3
+    )
+    lambda_matrix_free = solve_optimal_lambda(
+        d_log_evi_d_lambda_matrix_free, U, M, b, 0.1, 100
+    )
+    npt.assert_allclose(lambda_matrix_free, lambda_exact, rtol=0.1)
+
+
+def test_regularization_spectrum():
+    np.random.seed(42)
+    A = np.random.rand(64, 80)
+    M = A.dot(A.T)
+    b = M.dot(np.random.rand(64)) + A.dot(np.random.randn(80))
+    U = pixelated_regularization_matrix(8, 8, "gradient", sparse=True)
+    spectrum = RegularizationSpectrum(U, M, b)
+    U = U.toarray()
+    lambdas = np.array([0.1, 1, 10])
+    derivatives = spectrum.d_log_evi_d_lambda(lambdas)
+    log_evidences = spectrum.log_evidence(lambdas)
+    for i, l in enumerate(lambdas):
+        M_plus_lambda_U = M + l * U
+        npt.assert_allclose(derivatives[i], d_log_evi_d_lambda(l, U, M, b), rtol=1e-6)
+        npt.assert_allclose(spectrum.d_log_evi_d_lambda(l), derivatives[i], rtol=1e-12)
+        expected = (
+            b.dot(np.linalg.solve(M_plus_lambda_U, b))
+            - np.linalg.slogdet(M_plus_lambda_U)[1]
+            + np.linalg.slogdet(U)[1]
+            + 64 * np.log(l)
+        ) / 2
+        npt.assert_allclose(log_evidences[i], expected, rtol=1e-8)
+        npt.assert_allclose(
+            spectrum.source(l), np.linalg.solve(M_plus_lambda_U, b), rtol=1e-6
+        )
+
+    lambda_exact = solve_optimal_lambda(
+        d_log_evi_d_lambda, U, M, b, 1e-3, 1e3, tolerance=1e-9, max_iterations=60
+    )
+    npt.assert_allclose(spectrum.optimal_lambda(1e-3, 1e3), lambda_exact, rtol=1e-6)
+    # maximum at the bounds
+    assert spectrum.optimal_lambda(1e-3, lambda_exact / 10) == lambda_exact / 10
+    assert spectrum.optimal_lambda(lambda_exact * 10, 1e3) == lambda_exact * 10
+
+    with pytest.raises(ValueError):
+        spectrum.optimal_lambda(1, 0.1)
+    with pytest.raises(ValueError):
+        RegularizationSpectrum(np.zeros((64, 64)), M, b)
@@ -122,6 +122,120 @@ class TestDeLens(object):
         log_det_old = de_lens.marginalisation_const(M_inv)
         npt.assert_almost_equal(log_det, log_det_old, decimal=9)
 
+    def test_cholesky(self):
+        np.random.seed(41)
+        A = np.random.normal(size=(200, 15))
+        C_D_inv = np.random.uniform(0.5, 2, 200)
+        d = np.random.normal(size=200)
+        result, cov_param, image = de_lens.get_param_WLS(A, C_D_inv, d)
+        M = A.T.dot(np.multiply(C_D_inv, A.T).T)
+        M_inv = np.linalg.inv(M)
+        npt.assert_almost_equal(cov_param, M_inv, decimal=10)
+        npt.assert_almost_equal(result, M_inv.dot(A.T.dot(C_D_inv * d)), decimal=10)
+        npt.assert_almost_equal(image, A.dot(result), decimal=10)
+
+        assert type(cov_param) is np.ndarray
+
+        # the log determinant of the factorization is used for the marginalization
+        M = A.T.dot(np.multiply(C_D_inv, A.T).T)
+        R = A.T.dot(C_D_inv * d)
+        _, cov_normal, log_det_normal = de_lens.get_param_normal(
+            M, R, return_log_det=True
+        )
+        _, log_det = np.linalg.slogdet(M_inv)
+        npt.assert_almost_equal(log_det_normal, log_det, decimal=8)
+        npt.assert_almost_equal(
+            de_lens.marginalisation_const(cov_normal, log_det=log_det_normal),
+            de_lens.marginalisation_const(M_inv),
+            decimal=8,
+        )
+        for d_prior in [1000, 0.3]:
+            npt.assert_almost_equal(
+                de_lens.marginalization_new(
+                    cov_normal, d_prior=d_prior, log_det=log_det_normal
+                ),
+                de_lens.marginalization_new(M_inv, d_prior=d_prior),
+                decimal=8,
+            )
+        # no log determinant of ill-conditioned systems
+        _, _, log_det_none = de_lens.get_param_normal(
+            np.zeros((3, 3)), np.zeros(3), return_log_det=True
+        )
+        assert log_det_none is None
+
+        result_solve, cov_none, _ = de_lens.get_param_WLS(A, C_D_inv, d, inv_bool=False)
+        assert cov_none is None
+        npt.assert_almost_equal(result_solve, result, decimal=10)
+
+    def test_cholesky_ill_conditioned(self):
+        from scipy.linalg import hilbert
+
+        # condition number 4.5e18, the factorization succeeds but the system is
+        # rejected as with np.linalg.cond() in _cond_inv()
+        M = hilbert(13)
+        R = np.ones(13)
+        assert de_lens._cholesky(M) is None
+        assert not de_lens._cond_inv(M)
+        B, M_inv = de_lens.get_param_normal(M, R)
+        npt.assert_array_equal(B, np.zeros(13))
+        npt.assert_array_equal(M_inv, np.zeros((13, 13)))
+        B, M_inv = de_lens.get_param_normal(M, R, inv_bool=False)
+        npt.assert_array_equal(B, np.zeros(13))
+        # well-conditioned Hilbert matrix
+        M = hilbert(5)
+        B, M_inv = de_lens.get_param_normal(M, np.ones(5))
+        npt.assert_almost_equal(M.dot(B), np.ones(5), decimal=6)
+
+    def test_get_param_block_normal(self):
+        np.random.seed(42)
+        num_local_list = [1, 2, 1]
+        A = np.zeros((150, 4 + sum(num_local_list)))
+        start = 4
+        for i, num_local in enumerate(num_local_list):
+            rows = slice(50 * i, 50 * (i + 1))
+            A[rows, :4] = np.random.normal(size=(50, 4))
+            A[rows, start : start + num_local] = np.random.normal(size=(50, num_local))
+            start += num_local
+        C_D_inv = np.random.uniform(0.5, 2, 150)
+        d = np.random.normal(size=150)
+        result, cov_param, _ = de_lens.get_param_WLS(A, C_D_inv, d)
+
+        M = A.T.dot(np.multiply(C_D_inv, A.T).T)
+        R = A.T.dot(C_D_inv * d)
+        blocks = np.cumsum([4] + num_local_list)
+        M_cross_list = [M[:4, i:j] for i, j in zip(blocks[:-1], blocks[1:])]
+        M_local_list = [M[i:j, i:j] for i, j in zip(blocks[:-1], blocks[1:])]
+        R_local_list = [R[i:j] for i, j in zip(blocks[:-1], blocks[1:])]
+        result_block, cov_block, log_det_block = de_lens.get_param_block_normal(
+            M[:4, :4],
+            R[:4],
+            M_cross_list,
+            M_local_list,
+            R_local_list,
+            return_log_det=True,
+        )
+        npt.assert_almost_equal(result_block, result, decimal=10)
+        npt.assert_almost_equal(cov_block, cov_param, decimal=10)
+        npt.assert_almost_equal(
+            log_det_block, np.linalg.slogdet(cov_param)[1], decimal=8
+        )
+        result_block, cov_none = de_lens.get_param_block_normal(
+            M[:4, :4], R[:4], M_cross_list, M_local_list, R_local_list, inv_bool=False
+        )
+        assert cov_none is None
+        npt.assert_almost_equal(result_block, result, decimal=10)
+
+        # singular local block: solution of the full matrix
+        M_local_list[1] = np.zeros((2, 2))
+        M_full = M.copy()
+        M_full[5:7, 5:7] = 0
+        result_block, cov_block = de_lens.get_param_block_normal(
+            M[:4, :4], R[:4], M_cross_list, M_local_list, R_local_list
+        )
+        result_full, cov_full = de_lens.get_param_normal(M_full, R)
+        npt.assert_almost_equal(result_block, result_full, decimal=8)
+        npt.assert_almost_equal(cov_block, cov_full, decimal=8)
+
     def test_stable_inv(self):
         m = np.diag(np.ones(10) * 2)
         m_inv = de_lens._stable_inv(m)
@@ -4,7 +4,10 @@ import numpy as np
 import numpy.testing as npt
 import lenstronomy.Util.util as util
 from astropy.cosmology import FlatwCDM
-from lenstronomy.ImSim.image2source_mapping import Image2SourceMapping
+from lenstronomy.ImSim.image2source_mapping import (
+    Image2SourceMapping,
+    RayShootingCache,
+)
 from lenstronomy.LensModel.lens_model import LensModel
 from lenstronomy.LightModel.light_model import LightModel
 import pytest
@@ -360,6 +363,43 @@ class TestMultiSourcePlane(object):
         assert response_reshuffled[1, 0] == 0
 
 
+class TestRayShootingCache(object):
+    def test_shared_grid(self):
+        lens_model = LensModel(lens_model_list=["SIS"])
+        light_model = LightModel(light_model_list=["GAUSSIAN"])
+        cache = RayShootingCache()
+        mapping_list = []
+        for _ in range(2):
+            mapping = Image2SourceMapping(lens_model, light_model)
+            mapping.set_ray_shooting_cache(cache, grid_key=0)
+            mapping_list.append(mapping)
+        x, y = util.make_grid(num_pix=10, delta_pix=0.1)
+        kwargs_lens = [{"theta_E": 1, "center_x": 0, "center_y": 0}]
+        kwargs_source = [{"amp": 1, "sigma": 0.5, "center_x": 0, "center_y": 0}]
+        flux = lens_model.ray_shooting(x, y, kwargs_lens)
+        flux = light_model.surface_brightness(flux[0], flux[1], kwargs_source)
+        for mapping in mapping_list:
+            flux_cached = mapping.image_flux_joint(
+                x, y, kwargs_lens, kwargs_source, shared_grid=True
+            )
+            npt.assert_array_equal(flux_cached, flux)
+        assert cache.hits == 1
+        assert cache.misses == 1
+        # other coordinates than the evaluation grid are not cached
+        mapping_list[0].image_flux_joint(x, y, kwargs_lens, kwargs_source)
+        assert cache.hits == 1
+        # changed lens parameters
+        kwargs_lens = [{"theta_E": 1.1, "center_x": 0, "center_y": 0}]
+        response, n = mapping_list[1].image_flux_split(
+            x, y, kwargs_lens, kwargs_source, shared_grid=True
+        )
+        assert cache.misses == 2
+        assert len(cache) == 1
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.hits == 0
+
+
 class TestRaise(unittest.TestCase):
     def test_raise(self):
         with self.assertRaises(ValueError):
@@ -3,6 +3,7 @@ __author__ = "sibirrer"
 import numpy as np
 
 from lenstronomy.ImSim.image_linear_solve import ImageLinearFit
+import lenstronomy.ImSim.de_lens as de_lens
 import lenstronomy.Util.param_util as param_util
 from lenstronomy.LensModel.lens_model import LensModel
 from lenstronomy.LightModel.light_model import LightModel
@@ -127,6 +128,146 @@ class TestImageLinearFit(object):
         chi2_reduced = self.imageLinearFit.reduced_chi2(model, error_map)
         npt.assert_almost_equal(chi2_reduced, 1, decimal=1)
 
+        # the log determinant of the covariance matrix is kept from the factorization
+        _, _, cov_param, _ = self.imageLinearFit.image_linear_solve(
+            self.kwargs_lens,
+            self.kwargs_source,
+            self.kwargs_lens_light,
+            self.kwargs_ps,
+            inv_bool=True,
+        )
+        assert type(cov_param) is np.ndarray
+        npt.assert_almost_equal(
+            self.imageLinearFit._cov_param_log_det(cov_param),
+            np.linalg.slogdet(cov_param)[1],
+            decimal=6,
+        )
+        assert self.imageLinearFit._cov_param_log_det(cov_param.copy()) is None
+
+    def test_lens_light_block(self):
+        image_model = self.imageLinearFit
+        model, error_map, cov_param, param = image_model.image_linear_solve(
+            self.kwargs_lens,
+            self.kwargs_source,
+            self.kwargs_lens_light,
+            self.kwargs_ps,
+            inv_bool=True,
+        )
+        # reference solution with the full response matrix
+        A = image_model.linear_response_matrix(
+            self.kwargs_lens, self.kwargs_source, self.kwargs_lens_light, self.kwargs_ps
+        )
+        C_D_response, _ = image_model.error_response(
+            self.kwargs_lens, self.kwargs_ps, kwargs_special=None
+        )
+        param_ref, cov_ref, model_ref = de_lens.get_param_WLS(
+            A.T, 1 / C_D_response, image_model.data_response
+        )
+        npt.assert_allclose(param, param_ref, rtol=1e-6)
+        npt.assert_allclose(cov_param, cov_ref, rtol=1e-6, atol=1e-12)
+        npt.assert_allclose(
+            image_model.image2array_masked(model), model_ref, rtol=1e-6, atol=1e-10
+        )
+
+        # the lens light block is re-used for a different lens and source model
+        block = image_model._lens_light_block
+        kwargs_lens = [{"theta_E": 1.1, "center_x": 0, "center_y": 0}]
+        kwargs_lens_light = [dict(self.kwargs_lens_light[0], amp=3)]
+        image_model.image_linear_solve(
+            kwargs_lens, self.kwargs_source, kwargs_lens_light, self.kwargs_ps
+        )
+        assert image_model._lens_light_block is block
+
+        # a different lens light model or PSF re-computes it
+        kwargs_lens_light = [dict(self.kwargs_lens_light[0], R_sersic=0.2)]
+        image_model.image_linear_solve(
+            kwargs_lens, self.kwargs_source, kwargs_lens_light, self.kwargs_ps
+        )
+        assert image_model._lens_light_block is not block
+        block = image_model._lens_light_block
+        image_model.update_psf(image_model.PSF)
+        assert image_model._lens_light_block is None
+
+    def test_sparse_response(self):
+        image_model = self.imageLinearFit
+        source_model_class = LightModel(light_model_list=["SHAPELETS"])
+        kwargs_source = [{"n_max": 8, "beta": 0.05, "center_x": 0.1, "center_y": 0}]
+        kwargs_numerics = {"supersampling_factor": 2}
+        image_model_dense = ImageLinearFit(
+            image_model.Data,
+            image_model.PSF,
+            image_model.LensModel,
+            source_model_class,
+            image_model.LensLightModel,
+            image_model.PointSource,
+            kwargs_numerics=kwargs_numerics,
+        )
+        model, _, cov_param, param = image_model_dense.image_linear_solve(
+            self.kwargs_lens, kwargs_source, self.kwargs_lens_light, self.kwargs_ps
+        )
+        # without truncation, the sparse response matrix is exact
+        image_model_sparse = ImageLinearFit(
+            image_model.Data,
+            image_model.PSF,
+            image_model.LensModel,
+            source_model_class,
+            image_model.LensLightModel,
+            image_model.PointSource,
+            kwargs_numerics=dict(kwargs_numerics, linear_response_threshold=0),
+        )
+        model_sparse, _, cov_sparse, param_sparse = (
+            image_model_sparse.image_linear_solve(
+                self.kwargs_lens,
+                kwargs_source,
+                self.kwargs_lens_light,
+                self.kwargs_ps,
+                inv_bool=True,
+            )
+        )
+        npt.assert_allclose(param_sparse, param, rtol=1e-4)
+        npt.assert_allclose(model_sparse, model, rtol=1e-6, atol=1e-8)
+        # truncated basis functions
+        image_model_sparse = ImageLinearFit(
+            image_model.Data,
+            image_model.PSF,
+            image_model.LensModel,
+            source_model_class,
+            image_model.LensLightModel,
+            image_model.PointSource,
+            kwargs_numerics=dict(kwargs_numerics, linear_response_threshold=1e-4),
+        )
+        A = image_model_sparse._source_response(
+            self.kwargs_lens, kwargs_source, threshold=1e-4
+        )
+        A_dense = image_model_sparse._source_response(self.kwargs_lens, kwargs_source)
+        assert A.nnz < 0.5 * np.size(A_dense)
+        npt.assert_allclose(A.toarray(), A_dense, atol=1e-4 * np.max(np.abs(A_dense)))
+        logL, _ = image_model_dense.likelihood_data_given_model(
+            self.kwargs_lens, kwargs_source, self.kwargs_lens_light, self.kwargs_ps
+        )
+        logL_sparse, _ = image_model_sparse.likelihood_data_given_model(
+            self.kwargs_lens, kwargs_source, self.kwargs_lens_light, self.kwargs_ps
+        )
+        npt.assert_allclose(logL_sparse, logL, rtol=1e-3)
+        A_ps = image_model_sparse._point_source_response(
+            self.kwargs_ps, self.kwargs_lens, threshold=0
+        )
+        A_ps_dense = image_model_sparse._point_source_response(
+            self.kwargs_ps, self.kwargs_lens
+        )
+        npt.assert_allclose(A_ps.toarray(), A_ps_dense, rtol=1e-6, atol=1e-10)
+        A_ps = image_model_sparse._point_source_response(
+            self.kwargs_ps, self.kwargs_lens, threshold=1e-4
+        )
+        assert A_ps.nnz < np.size(A_ps_dense)
+        npt.assert_raises(
+            ValueError,
+            ImageLinearFit,
+            image_model.Data,
+            image_model.PSF,
+            kwargs_numerics={"linear_response_threshold": -1},
+        )
+
     def test_num_param_linear(self):
         num_param_linear = self.imageLinearFit.num_param_linear(
             self.kwargs_lens, self.kwargs_source, self.kwargs_lens_light, self.kwargs_ps
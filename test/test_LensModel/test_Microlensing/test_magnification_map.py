@@ -0,0 +1,141 @@
+import os
+import numpy as np
+import numpy.testing as npt
+import pytest
+from lenstronomy.LensModel.Microlensing.magnification_map import (
+    MicrolensingMagnificationMap,
+)
+from lenstronomy.LensModel.lens_model import LensModel
+
+
+class TestMicrolensingMagnificationMap(object):
+    def setup_method(self):
+        np.random.seed(41)
+        num_stars = 300
+        self.x_stars = np.random.uniform(-10, 10, num_stars)
+        self.y_stars = np.random.uniform(-10, 10, num_stars)
+        self.magmap = MicrolensingMagnificationMap(
+            self.x_stars,
+            self.y_stars,
+            theta_E_stars=0.1,
+            kappa_smooth=0.2,
+            gamma1=0.1,
+            gamma2=-0.05,
+            num_cells=6,
+        )
+
+    def test_alpha_stars(self):
+        x = np.random.uniform(-12, 12, 500)
+        y = np.random.uniform(-12, 12, 500)
+        alpha_x, alpha_y = self.magmap.alpha_stars(x, y)
+        alpha_x_direct, alpha_y_direct = self.magmap.alpha_stars_direct(x, y)
+        npt.assert_allclose(alpha_x, alpha_x_direct, rtol=1e-4, atol=1e-6)
+        npt.assert_allclose(alpha_y, alpha_y_direct, rtol=1e-4, atol=1e-6)
+
+        lens_model = LensModel(["POINT_MASS"] * 3)
+        kwargs_lens = [
+            {"theta_E": 0.1, "center_x": self.x_stars[i], "center_y": self.y_stars[i]}
+            for i in range(3)
+        ]
+        magmap = MicrolensingMagnificationMap(
+            self.x_stars[:3], self.y_stars[:3], theta_E_stars=0.1
+        )
+        alpha_x, alpha_y = magmap.alpha_stars(x, y)
+        alpha_x_true, alpha_y_true = lens_model.alpha(x, y, kwargs_lens)
+        npt.assert_almost_equal(alpha_x, alpha_x_true, decimal=8)
+        npt.assert_almost_equal(alpha_y, alpha_y_true, decimal=8)
+
+    def test_magnification_map_smooth(self):
+        kappa, gamma1, gamma2 = 0.2, 0.1, -0.05
+        magmap = MicrolensingMagnificationMap(
+            [], [], theta_E_stars=0.1, kappa_smooth=kappa, gamma1=gamma1, gamma2=gamma2
+        )
+        mag = magmap.magnification_map(
+            source_half_width=1, num_pix_source=10, rays_per_pixel=20
+        )
+        mag_true = 1.0 / ((1 - kappa) ** 2 - gamma1**2 - gamma2**2)
+        npt.assert_almost_equal(np.mean(mag) / mag_true, 1, decimal=2)
+
+    def test_magnification_map_stars(self):
+        # the mean convergence of the stars enters the image plane region of the rays
+        np.random.seed(41)
+        half_width, theta_E, gamma = 10, 0.1, 0.1
+        num_stars = int(0.5 * 4 * half_width**2 / (np.pi * theta_E**2))
+        x_stars = np.random.uniform(-half_width, half_width, num_stars)
+        y_stars = np.random.uniform(-half_width, half_width, num_stars)
+        magmap = MicrolensingMagnificationMap(
+            x_stars, y_stars, theta_E_stars=theta_E, gamma1=gamma
+        )
+        npt.assert_almost_equal(magmap.kappa_star, 0.5, decimal=2)
+        mag = magmap.magnification_map(
+            source_half_width=1.5, num_pix_source=10, rays_per_pixel=8
+        )
+        mag_true = 1.0 / ((1 - magmap.kappa_star) ** 2 - gamma**2)
+        npt.assert_allclose(np.mean(mag), mag_true, rtol=0.15)
+        # the pixels at the edges of the map are not under-counted
+        assert np.mean(mag[[0, -1]]) > 0.7 * mag_true
+        assert np.mean(mag[:, [0, -1]]) > 0.7 * mag_true
+
+        magmap = MicrolensingMagnificationMap(
+            x_stars, y_stars, theta_E_stars=theta_E, gamma1=gamma, kappa_star=0.2
+        )
+        assert magmap.kappa_star == 0.2
+
+    def test_magnification_map_resume(self, tmp_path):
+        kwargs = {
+            "source_half_width": 1,
+            "num_pix_source": 20,
+            "rays_per_pixel": 4,
+            "chunk_rows": 10,
+            "checkpoint_every": 2,
+        }
+        mag = self.magmap.magnification_map(**kwargs)
+        output_file = os.path.join(tmp_path, "magmap.npz")
+        mag_file = self.magmap.magnification_map(output_file=output_file, **kwargs)
+        npt.assert_almost_equal(mag_file, mag, decimal=10)
+        assert np.all(np.load(output_file)["done"])
+
+        # a resumed computation with all chunks done does not shoot any rays
+        self.magmap._ray_counts_chunk = None
+        mag_resumed = self.magmap.magnification_map(output_file=output_file, **kwargs)
+        npt.assert_almost_equal(mag_resumed, mag, decimal=10)
+
+        from schwimmbad import SerialPool
+
+        magmap = MicrolensingMagnificationMap(
+            self.x_stars,
+            self.y_stars,
+            theta_E_stars=0.1,
+            kappa_smooth=0.2,
+            gamma1=0.1,
+            gamma2=-0.05,
+            num_cells=6,
+        )
+        mag_pool = magmap.magnification_map(pool=SerialPool(), **kwargs)
+        npt.assert_almost_equal(mag_pool, mag, decimal=10)
+
+        # a different lens configuration or grid does not resume the stored counts
+        magmap = MicrolensingMagnificationMap(
+            self.x_stars,
+            self.y_stars,
+            theta_E_stars=0.1,
+            kappa_smooth=0.25,
+            gamma1=0.1,
+            gamma2=-0.05,
+            num_cells=6,
+        )
+        with pytest.raises(ValueError):
+            magmap.magnification_map(output_file=output_file, **kwargs)
+        kwargs["num_pix_source"] = 10
+        with pytest.raises(ValueError):
+            self.magmap.magnification_map(output_file=output_file, **kwargs)
+        magmap = MicrolensingMagnificationMap(
+            self.x_stars[1:],
+            self.y_stars[1:],
+            theta_E_stars=0.1,
+            kappa_smooth=0.2,
+            gamma1=0.1,
+            gamma2=-0.05,
+            num_cells=6,
+        )
+        assert magmap.lens_hash != self.magmap.lens_hash
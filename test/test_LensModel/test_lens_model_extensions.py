@@ -107,6 +107,51 @@ class TestLensModelExtensions(object):
         mag = lens_model.magnification(ra_crit, dec_crit, kwargs_lens)
         assert np.all(np.abs(mag) > 1000)
 
+    def test_critical_curve_caustics_adaptive(self):
+        lens_model_list = ["SIE", "SHEAR"]
+        kwargs_lens = [
+            {"theta_E": 1.0, "e1": 0.1, "e2": -0.05, "center_x": 0, "center_y": 0},
+            {"gamma1": 0.03, "gamma2": 0.01},
+        ]
+        lens_model = LensModel(lens_model_list)
+        extension = LensModelExtensions(lens_model)
+        (
+            ra_crit_list,
+            dec_crit_list,
+            ra_caustic_list,
+            dec_caustic_list,
+        ) = extension.critical_curve_caustics_adaptive(
+            kwargs_lens, compute_window=5, start_scale=0.1, max_order=5
+        )
+        assert len(ra_crit_list) >= 1
+        # the tangential critical curve is the longest and closed
+        k = int(np.argmax([len(ra) for ra in ra_crit_list]))
+        npt.assert_almost_equal(ra_crit_list[k][0], ra_crit_list[k][-1], decimal=10)
+        npt.assert_almost_equal(dec_crit_list[k][0], dec_crit_list[k][-1], decimal=10)
+        mag = lens_model.magnification(ra_crit_list[k], dec_crit_list[k], kwargs_lens)
+        assert np.all(np.abs(mag) > 1000)
+        ra_caustic, dec_caustic = lens_model.ray_shooting(
+            ra_crit_list[k], dec_crit_list[k], kwargs_lens
+        )
+        npt.assert_almost_equal(ra_caustic_list[k], ra_caustic, decimal=10)
+        npt.assert_almost_equal(dec_caustic_list[k], dec_caustic, decimal=10)
+
+        # SIS critical curve is a circle with radius theta_E
+        extension = LensModelExtensions(LensModel(["SIS"]))
+        kwargs_sis = [{"theta_E": 1.0, "center_x": 0.1, "center_y": -0.2}]
+        ra_crit_list, dec_crit_list, _, _ = extension.critical_curve_caustics_adaptive(
+            kwargs_sis, compute_window=4, start_scale=0.2, max_order=6
+        )
+        k = int(np.argmax([len(ra) for ra in ra_crit_list]))
+        r = np.hypot(ra_crit_list[k] - 0.1, dec_crit_list[k] + 0.2)
+        npt.assert_almost_equal(r, 1, decimal=4)
+
+        # no critical curve in the window
+        out = extension.critical_curve_caustics_adaptive(
+            kwargs_sis, compute_window=0.5, start_scale=0.1, center_x=3, center_y=3
+        )
+        assert out == ([], [], [], [])
+
     def test_get_magnification_model(self):
         self.kwargs_options = {
             "lens_model_list": ["GAUSSIAN_POTENTIAL"],
@@ -346,6 +391,42 @@ class TestLensModelExtensions(object):
             mag_adaptive_grid / mag_point_source - 1, half_percent_precision
         )
 
+        # re-using the ray tracing cache with a changed source gives identical results
+        ray_tracing_cache = {}
+        mag_cached = extension.magnification_finite_adaptive(
+            x_image,
+            y_image,
+            kwargs_lens,
+            source_model,
+            kwargs_source,
+            grid_resolution,
+            grid_radius_arcsec=grid_size,
+            ray_tracing_cache=ray_tracing_cache,
+        )
+        npt.assert_almost_equal(mag_cached, mag_adaptive_grid, decimal=10)
+        assert len(ray_tracing_cache) == len(x_image)
+        kwargs_source_shifted = [dict(kwargs_source[0], center_x=source_x + 0.0001)]
+        mag_shifted = extension.magnification_finite_adaptive(
+            x_image,
+            y_image,
+            kwargs_lens,
+            source_model,
+            kwargs_source_shifted,
+            grid_resolution,
+            grid_radius_arcsec=grid_size,
+        )
+        mag_shifted_cached = extension.magnification_finite_adaptive(
+            x_image,
+            y_image,
+            kwargs_lens,
+            source_model,
+            kwargs_source_shifted,
+            grid_resolution,
+            grid_radius_arcsec=grid_size,
+            ray_tracing_cache=ray_tracing_cache,
+        )
+        npt.assert_almost_equal(mag_shifted_cached, mag_shifted, decimal=10)
+
         flux_array = np.array([0.0, 0.0])
         grid_x = np.array([0.0, source_sigma])
         grid_y = np.array([0.0, 0.0])
@@ -69,6 +69,18 @@ class TestChainPlots(object):
         )
         plt.close()
 
+    def test_plot_mcmc_behaviour_lazy(self, tmp_path):
+        from lenstronomy.Sampling.sample_sink import NPYSampleSink
+
+        sink = NPYSampleSink(str(tmp_path), chunk_size=100)
+        sink.append(np.random.random((1000, 2)), np.random.random(1000))
+        f, ax = plt.subplots(1, 1, figsize=(4, 4))
+        chain_plot.plot_mcmc_behaviour(
+            ax, sink.samples, ["a", "b"], sink.log_prob, num_average=10
+        )
+        plt.close()
+        sink.close()
+
     def test_chain_list(self):
         param = ["a", "b"]
 
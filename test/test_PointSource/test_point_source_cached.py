@@ -1,5 +1,10 @@
-from lenstronomy.PointSource.point_source_cached import PointSourceCached
+import pickle
+from lenstronomy.PointSource.point_source_cached import (
+    PointSourceCached,
+    PointSourceMemo,
+)
 from lenstronomy.PointSource.Types.unlensed import Unlensed
+import numpy as np
 import numpy.testing as npt
 import pytest
 
@@ -80,3 +85,49 @@ class TestPointSourceCached(object):
 
 if __name__ == "__main__":
     pytest.main()
+
+
+class TestPointSourceMemo(object):
+    def setup_method(self):
+        self.ps = Unlensed()
+        self.kwargs_ps = {"ra_image": [1.0], "dec_image": [0.0], "point_amp": [1]}
+
+    def test_memoized_image_position(self):
+        memo = PointSourceMemo(tolerance=0.01, max_size=2)
+        ps_cached = PointSourceCached(Unlensed(), save_cache=False)
+        ps_cached.set_memo(memo, signature="unlensed")
+        x_img, y_img = ps_cached.image_position(kwargs_ps=self.kwargs_ps)
+        assert memo.misses == 1
+        # within tolerance and different amplitude re-uses the memoized positions
+        kwargs_ps = {"ra_image": [1.001], "dec_image": [0.0], "point_amp": [2]}
+        x_img_2, y_img_2 = ps_cached.image_position(kwargs_ps=kwargs_ps)
+        assert memo.hits == 1
+        npt.assert_almost_equal(x_img_2, x_img)
+        # amplitudes are keyed on the point_amp values
+        amp = ps_cached.image_amplitude(kwargs_ps=kwargs_ps)
+        npt.assert_almost_equal(amp, [2])
+        kwargs_ps = {"ra_image": [1.1], "dec_image": [0.0], "point_amp": [2]}
+        x_img_3, _ = ps_cached.image_position(kwargs_ps=kwargs_ps)
+        npt.assert_almost_equal(x_img_3, [1.1])
+        x_src, _ = ps_cached.source_position(kwargs_ps=kwargs_ps)
+        npt.assert_almost_equal(x_src, [1.1])
+        # LRU bound
+        assert len(memo) == 2
+        memo_pickled = pickle.loads(pickle.dumps(memo))
+        assert len(memo_pickled) == 2
+        found, _ = memo_pickled.get(list(memo._store.keys())[0])
+        assert found
+        memo.clear()
+        assert len(memo) == 0
+        assert memo.hits == 0
+
+    def test_key(self):
+        memo = PointSourceMemo(tolerance=0)
+        key_1 = memo.key({"a": -0.0, "b": np.array([1, 2])}, [None, "str", True])
+        key_2 = memo.key({"b": [1.0, 2.0], "a": 0.0}, [None, "str", True])
+        key_3 = memo.key({"b": [1.0, 2.0], "a": 1e-12}, [None, "str", True])
+        assert key_1 == key_2
+        assert key_1 != key_3
+        hash(key_1)
+        memo = PointSourceMemo(tolerance=1e-6)
+        assert memo.key(1e-12) == memo.key(0) == memo.key(-1e-12)
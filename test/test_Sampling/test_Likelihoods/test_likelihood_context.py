@@ -0,0 +1,102 @@
+import numpy as np
+import numpy.testing as npt
+from lenstronomy.Sampling.Likelihoods.likelihood_context import LikelihoodContext
+from lenstronomy.Sampling.Likelihoods.position_likelihood import PositionLikelihood
+from lenstronomy.Sampling.Likelihoods.flux_ratio_likelihood import FluxRatioLikelihood
+from lenstronomy.LensModel.lens_model import LensModel
+from lenstronomy.LensModel.Solver.lens_equation_solver import LensEquationSolver
+from lenstronomy.PointSource.point_source import PointSource
+
+
+class TestLikelihoodContext(object):
+    def setup_method(self):
+        self.lens_model = LensModel(lens_model_list=["SIE", "SHEAR"])
+        self.kwargs_lens = [
+            {"theta_E": 1.0, "e1": 0.1, "e2": -0.05, "center_x": 0, "center_y": 0},
+            {"gamma1": 0.03, "gamma2": 0.01},
+        ]
+        solver = LensEquationSolver(lensModel=self.lens_model)
+        x_img, y_img = solver.image_position_from_source(
+            kwargs_lens=self.kwargs_lens, sourcePos_x=0.05, sourcePos_y=0.02
+        )
+        self.x_img, self.y_img = x_img, y_img
+        self.kwargs_ps = [
+            {"ra_image": x_img, "dec_image": y_img, "point_amp": np.ones_like(x_img)}
+        ]
+        self.point_source = PointSource(
+            point_source_type_list=["LENSED_POSITION"], lens_model=self.lens_model
+        )
+
+    def test_lens_quantities(self):
+        context = LikelihoodContext(
+            self.kwargs_lens, self.kwargs_ps, {}, point_source=self.point_source
+        )
+        x_s, y_s = context.ray_shooting(self.lens_model, self.x_img, self.y_img)
+        x_s_true, y_s_true = self.lens_model.ray_shooting(
+            self.x_img, self.y_img, self.kwargs_lens
+        )
+        npt.assert_almost_equal(x_s, x_s_true, decimal=10)
+        npt.assert_almost_equal(y_s, y_s_true, decimal=10)
+
+        mag = context.magnification(self.lens_model, self.x_img, self.y_img)
+        mag_true = self.lens_model.magnification(
+            self.x_img, self.y_img, self.kwargs_lens
+        )
+        npt.assert_almost_equal(mag, mag_true, decimal=8)
+        # the hessian computed for the magnification is re-used
+        context.hessian(self.lens_model, self.x_img, self.y_img)
+        assert context.statistics["hessian"] == {"hits": 1, "misses": 1}
+
+        # a different sub-set of lens models is computed separately
+        context.hessian(self.lens_model, self.x_img, self.y_img, k=0)
+        assert context.statistics["hessian"]["misses"] == 2
+
+        fermat = context.fermat_potential(self.lens_model, self.x_img, self.y_img)
+        fermat_true = self.lens_model.fermat_potential(
+            self.x_img, self.y_img, self.kwargs_lens
+        )
+        npt.assert_almost_equal(fermat, fermat_true, decimal=10)
+
+        x_pos, y_pos = context.image_position(original_position=True)
+        x_pos2, y_pos2 = context.image_position(original_position=True)
+        npt.assert_almost_equal(x_pos[0], self.x_img, decimal=10)
+        assert x_pos2 is x_pos
+        assert context.statistics["image_position"] == {"hits": 1, "misses": 1}
+        assert context.num_hits == 2
+
+    def test_shared_between_likelihoods(self):
+        flux_ratios = [np.ones(len(self.x_img) - 1)]
+        flux_likelihood = FluxRatioLikelihood(
+            lens_model_class=self.lens_model,
+            flux_ratios=flux_ratios,
+            flux_ratio_errors=[np.ones(len(self.x_img) - 1)],
+            source_type="INF",
+        )
+        position_likelihood = PositionLikelihood(
+            point_source_class=self.point_source,
+            source_position_likelihood=True,
+            source_position_sigma=0.001,
+            image_position_likelihood=True,
+            ra_image_list=[self.x_img],
+            dec_image_list=[self.y_img],
+        )
+        logL_flux = flux_likelihood.logL(
+            [self.x_img], [self.y_img], self.kwargs_lens, {}
+        )
+        logL_pos = position_likelihood.logL(self.kwargs_lens, self.kwargs_ps, {})
+
+        context = LikelihoodContext(
+            self.kwargs_lens, self.kwargs_ps, {}, point_source=self.point_source
+        )
+        x_pos, y_pos = context.image_position()
+        logL_flux_context = flux_likelihood.logL(
+            x_pos, y_pos, self.kwargs_lens, {}, context=context
+        )
+        logL_pos_context = position_likelihood.logL(
+            self.kwargs_lens, self.kwargs_ps, {}, context=context
+        )
+        npt.assert_almost_equal(logL_flux_context, logL_flux, decimal=8)
+        npt.assert_almost_equal(logL_pos_context, logL_pos, decimal=8)
+        # the hessian of the flux ratio likelihood is re-used by the source position
+        # likelihood
+        assert context.statistics["hessian"]["hits"] >= 1
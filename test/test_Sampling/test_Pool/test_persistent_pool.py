@@ -0,0 +1,72 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from lenstronomy.Sampling.Pool.persistent_pool import (
+    PersistentLikelihoodPool,
+    likelihood_signature,
+)
+
+
+class _FakeParam(object):
+    def __init__(self, scale):
+        self.scale = scale
+
+
+class _FakeLikelihood(object):
+    def __init__(self, scale, num_pix=100):
+        self.data = np.ones((num_pix, num_pix))
+        self.param = _FakeParam(scale)
+
+    def update_param_class(self, param_class):
+        self.param = param_class
+
+    def logL(self, args):
+        return float(np.sum(self.data) * self.param.scale * np.sum(args))
+
+
+def test_likelihood_signature():
+    kwargs_data = {"image_data": np.ones((10, 10))}
+    kwargs_model = {"lens_model_list": ["SIS"]}
+    signature = likelihood_signature(kwargs_data, kwargs_model)
+    assert signature == likelihood_signature(kwargs_data, kwargs_model)
+    kwargs_model_2 = {"lens_model_list": ["SIE"]}
+    assert signature != likelihood_signature(kwargs_data, kwargs_model_2)
+
+
+class TestPersistentLikelihoodPool(object):
+    def setup_method(self):
+        self.pool = PersistentLikelihoodPool(processes=2)
+
+    def teardown_method(self):
+        self.pool.close()
+
+    def test_update(self):
+        args_list = [[1, 2], [3, 4]]
+        likelihood = _FakeLikelihood(scale=1)
+        self.pool.update(likelihood, signature="a")
+        logL = self.pool.pool.map(self.pool.logl_function, args_list)
+        npt.assert_almost_equal(logL, [likelihood.logL(args) for args in args_list])
+        assert self.pool.num_full_updates == 1
+
+        # same signature, only the Param() instance is sent to the workers
+        likelihood = _FakeLikelihood(scale=2)
+        self.pool.update(likelihood, signature="a")
+        assert self.pool.num_full_updates == 1
+        logL = self.pool.pool.map(self.pool.logl_function, args_list)
+        npt.assert_almost_equal(logL, [likelihood.logL(args) for args in args_list])
+
+        # different signature, the likelihood is sent in full
+        likelihood = _FakeLikelihood(scale=3, num_pix=50)
+        self.pool.update(likelihood, signature="b")
+        assert self.pool.num_full_updates == 2
+        logL = self.pool.pool.map(self.pool.logl_function, args_list)
+        npt.assert_almost_equal(logL, [likelihood.logL(args) for args in args_list])
+
+        # no signature, always sent in full
+        self.pool.update(likelihood)
+        assert self.pool.num_full_updates == 3
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,66 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from lenstronomy.Sampling.Pool import parallelization_util as pu
+from lenstronomy.Sampling.Pool.shared_memory import (
+    SharedMemoryExport,
+    load_shared_memory_payload,
+)
+from lenstronomy.Sampling.Pool.multiprocessing import MultiPool
+
+
+class _FakeLikelihood(object):
+    def __init__(self, num_pix=100):
+        self.data = np.arange(num_pix**2, dtype=float).reshape(num_pix, num_pix)
+        self.indices = np.arange(num_pix**2)
+        self.same_data = self.data
+        self.small = np.ones(3)
+        self.settings = {"kernel": np.ones((40, 40)), "name": "test"}
+
+    def logL(self, args):
+        return float(np.sum(self.data) * np.sum(args))
+
+
+class TestSharedMemoryExport(object):
+    def test_export(self):
+        likelihood = _FakeLikelihood()
+        with SharedMemoryExport(likelihood, min_bytes=1000) as export:
+            # data, indices and kernel are shared once, the small array is pickled
+            assert export.num_segments == 3
+            assert export.shared_bytes == (
+                likelihood.data.nbytes
+                + likelihood.indices.nbytes
+                + likelihood.settings["kernel"].nbytes
+            )
+            assert len(export.payload) < likelihood.data.nbytes
+
+            loaded = load_shared_memory_payload(export.payload)
+            npt.assert_almost_equal(loaded.data, likelihood.data)
+            npt.assert_almost_equal(loaded.settings["kernel"], 1)
+            assert loaded.settings["name"] == "test"
+            assert np.shares_memory(loaded.same_data, loaded.data)
+            assert loaded.data.flags.writeable is False
+            assert loaded.small.flags.writeable is True
+            assert loaded.logL([1, 2]) == likelihood.logL([1, 2])
+            with pytest.raises(ValueError):
+                loaded.data[0, 0] = 1
+        assert export.num_segments == 0
+
+    def test_pool(self):
+        likelihood = _FakeLikelihood()
+        export = SharedMemoryExport(likelihood, min_bytes=1000)
+        with MultiPool(
+            processes=2,
+            initializer=pu.set_sampler_likelihood_module_shared,
+            initargs=(export.payload,),
+        ) as pool:
+            logL = pool.map(pu.sampler_logl_worker, [[1, 2], [3, 4]])
+        export.close()
+        npt.assert_almost_equal(
+            logL, [likelihood.logL([1, 2]), likelihood.logL([3, 4])]
+        )
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,97 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+from scipy.optimize import minimize
+
+from lenstronomy.Sampling.Samplers.levenberg_marquardt import LevenbergMarquardt
+from lenstronomy.Sampling.Pool.pool import choose_pool
+
+_X = np.linspace(0, 5, 50)
+_TRUTH = np.array([2.0, 1.3, 0.5])
+_DATA = _TRUTH[0] * np.exp(-_TRUTH[1] * _X) + _TRUTH[2]
+
+
+def _residuals(p):
+    return (p[0] * np.exp(-p[1] * _X) + p[2] - _DATA) / 0.01
+
+
+def _jacobian(p):
+    return (
+        np.array(
+            [np.exp(-p[1] * _X), -p[0] * _X * np.exp(-p[1] * _X), np.ones_like(_X)]
+        ).T
+        / 0.01
+    )
+
+
+def _logl(p):
+    return -np.sum(_residuals(p) ** 2) / 2
+
+
+class TestLevenbergMarquardt(object):
+    def setup_method(self):
+        self.lower = np.array([0, 0, -1])
+        self.upper = np.array([10, 5, 1])
+        self.init_pos = np.array([1.0, 0.5, 0.0])
+
+    def test_optimize(self):
+        optimizer = LevenbergMarquardt(_residuals, _logl, self.lower, self.upper)
+        result, logL_list = optimizer.optimize(self.init_pos, n_iterations=50)
+        npt.assert_almost_equal(result, _TRUTH, decimal=5)
+        assert np.all(np.diff(logL_list) > 0)
+        assert optimizer.num_residual_calls == 4 * (len(logL_list) - 1)
+
+        # far fewer likelihood calls than the downhill simplex
+        num_calls = optimizer.num_residual_calls + optimizer.num_logl_calls
+        result_simplex = minimize(
+            lambda p: -_logl(p), self.init_pos, method="Nelder-Mead"
+        )
+        assert num_calls < result_simplex["nfev"]
+
+    def test_jacobian(self):
+        optimizer = LevenbergMarquardt(
+            _residuals, _logl, self.lower, self.upper, jacobian=_jacobian
+        )
+        _, jacobian = optimizer.residuals_and_jacobian(self.init_pos)
+        optimizer_fd = LevenbergMarquardt(
+            _residuals, _logl, self.lower, self.upper, step_size=1e-7
+        )
+        _, jacobian_fd = optimizer_fd.residuals_and_jacobian(self.init_pos)
+        npt.assert_allclose(jacobian_fd, jacobian, rtol=1e-4, atol=1e-3)
+        result, _ = optimizer.optimize(self.init_pos, n_iterations=50)
+        npt.assert_almost_equal(result, _TRUTH, decimal=5)
+        assert optimizer.num_residual_calls < optimizer_fd.num_residual_calls + 4
+
+    def test_bounds(self):
+        # the truth of the last parameter lies outside the limits
+        upper = np.array([10, 5, 0.2])
+        optimizer = LevenbergMarquardt(_residuals, _logl, self.lower, upper)
+        result, _ = optimizer.optimize(self.init_pos, n_iterations=50)
+        assert np.all(result <= upper)
+        npt.assert_almost_equal(result[2], 0.2)
+        # finite difference steps point inwards at the upper limit
+        h = optimizer._steps(np.array([1, 1, 0.2]))
+        assert h[2] < 0 and h[0] > 0
+
+    def test_fixed(self):
+        lower = np.array([0, 0, 0.5])
+        upper = np.array([10, 5, 0.5])
+        optimizer = LevenbergMarquardt(_residuals, _logl, lower, upper)
+        r, jacobian = optimizer.residuals_and_jacobian(self.init_pos)
+        npt.assert_almost_equal(jacobian[:, 2], 0)
+        assert optimizer.num_residual_calls == 3
+        result, _ = optimizer.optimize(self.init_pos, n_iterations=50)
+        npt.assert_almost_equal(result, _TRUTH, decimal=5)
+
+    def test_pool(self):
+        pool = choose_pool(mpi=False, processes=2)
+        optimizer = LevenbergMarquardt(
+            _residuals, _logl, self.lower, self.upper, pool=pool
+        )
+        result, _ = optimizer.optimize(self.init_pos, n_iterations=50)
+        pool.close()
+        npt.assert_almost_equal(result, _TRUTH, decimal=5)
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -7,9 +7,11 @@ import numpy as np
 import pytest
 import time
 import numpy.testing as npt
+from concurrent.futures import ThreadPoolExecutor
 
 from lenstronomy.Sampling.Samplers.pso import ParticleSwarmOptimizer
 from lenstronomy.Sampling.Samplers.pso import Particle
+from lenstronomy.Sampling.Samplers.pso import Swarm
 
 
 class TestParticleSwarmOptimizer(object):
@@ -50,6 +52,49 @@ class TestParticleSwarmOptimizer(object):
 
         assert particle.personal_best.fitness == 1
 
+    def test_swarm(self):
+        position = np.array([[0.0, 1.0], [2.0, 3.0], [4.0, 5.0]])
+        swarm = Swarm(position, np.zeros((3, 2)))
+        assert len(swarm) == 3
+        npt.assert_almost_equal(swarm.fitness, 0)
+        particle = swarm[1]
+        npt.assert_almost_equal(particle.position, [2, 3])
+        assert particle.personal_best is particle
+
+        swarm.fitness = np.array([1.0, 2.0, 3.0])
+        swarm.personal_best_fitness[1] = 5
+        particle = swarm[1]
+        assert particle.personal_best.fitness == 5
+
+        swarm_copy = swarm.copy()
+        swarm_copy.position[0, 0] = 10
+        assert swarm.position[0, 0] == 0
+        assert [p.fitness for p in swarm_copy] == [1, 2, 3]
+
+    def test_update_best(self):
+        low = np.zeros(2)
+        high = np.ones(2)
+
+        def func(p):
+            return -np.sum((p - 0.5) ** 2)
+
+        pso = ParticleSwarmOptimizer(func, low, high, 20)
+        pso._get_fitness(pso.swarm)
+        pso._update_best()
+        assert pso.global_best.fitness == np.max(pso.swarm.fitness)
+        npt.assert_almost_equal(pso.swarm.personal_best_fitness, pso.swarm.fitness)
+
+        # personal bests are only replaced by better positions
+        pso.swarm.position = np.zeros((20, 2))
+        pso._get_fitness(pso.swarm)
+        pso._update_best()
+        assert np.all(pso.swarm.personal_best_fitness >= pso.swarm.fitness)
+        assert np.all(pso.swarm.personal_best_fitness > -0.5)
+
+        pso._update_velocity(c1=1.193, c2=1.193)
+        assert pso.swarm.position.shape == (20, 2)
+        npt.assert_almost_equal(pso.swarm.position, pso.swarm.velocity, decimal=10)
+
     def test_setup(self):
         """
 
@@ -110,6 +155,101 @@ class TestParticleSwarmOptimizer(object):
         assert np.all(chi2_list) != 0
         assert pso.global_best.fitness != -np.inf
 
+    def test_optimize_checkpoint(self, tmp_path):
+        from lenstronomy.Sampling.checkpoint import Checkpoint
+
+        low = np.zeros(2)
+        high = np.ones(2)
+
+        def func(p):
+            return -np.sum((np.array(p) - 0.3) ** 2)
+
+        checkpoint = Checkpoint(str(tmp_path / "pso.h5"))
+        np.random.seed(42)
+        pso = ParticleSwarmOptimizer(func, low, high, 10)
+        pso.optimize(4, verbose=False, checkpoint=checkpoint)
+        npt.assert_almost_equal(
+            checkpoint.get("pso/position"), pso.swarm.position, decimal=8
+        )
+        assert len(checkpoint.get("pso/chain_log_likelihood")) == 4
+
+        # continues from the saved state for the remaining iterations
+        pso_resume = ParticleSwarmOptimizer(func, low, high, 10)
+        result, [chi2_list, pos_list, vel_list] = pso_resume.optimize(
+            6, verbose=False, checkpoint=checkpoint, resume=True
+        )
+        assert len(chi2_list) == 6
+        assert len(checkpoint.get("pso/chain_log_likelihood")) == 6
+        assert pso_resume.global_best.fitness >= pso.global_best.fitness
+
+        # a mismatching swarm can not be resumed
+        pso_resume = ParticleSwarmOptimizer(func, low, high, 5)
+        with pytest.raises(ValueError):
+            pso_resume.optimize(6, verbose=False, checkpoint=checkpoint, resume=True)
+
+        # without resume, the saved state is replaced
+        pso.optimize(2, verbose=False, checkpoint=checkpoint)
+        assert len(checkpoint.get("pso/chain_log_likelihood")) == 2
+        checkpoint.close()
+
+    def test_optimize_vectorize(self):
+        def ln_probability_batch(x):
+            return -np.sum(np.array(x) ** 2, axis=1)
+
+        np.random.seed(42)
+        pso = ParticleSwarmOptimizer(
+            ln_probability_batch, [-10, -10], [10, 10], 20, vectorize=True
+        )
+        result, [chi2_list, _, _] = pso.optimize(50, verbose=False, m=-1)
+        assert len(chi2_list) == 50
+        npt.assert_almost_equal(result, [0, 0], decimal=2)
+
+        with pytest.raises(ValueError):
+            pso.optimize(2, verbose=False, asynchronous=True)
+
+    def test_optimize_async(self):
+        np.random.seed(42)
+
+        def ln_probability(x):
+            return -np.sum(np.array(x) ** 2)
+
+        # serial evaluation
+        pso = ParticleSwarmOptimizer(ln_probability, [-10, -10], [10, 10], 20)
+        max_iter = 50
+        result, [chi2_list, pos_list, vel_list] = pso.optimize(
+            max_iter, verbose=False, m=-1, asynchronous=True
+        )
+        assert len(chi2_list) == max_iter
+        npt.assert_almost_equal(result, [0, 0], decimal=2)
+        # the global best is never worse than any personal best
+        assert pso.global_best.fitness >= np.max(pso.swarm.personal_best_fitness)
+
+        # non-blocking evaluations with an executor
+        class Executor(ThreadPoolExecutor):
+            def is_master(self):
+                return True
+
+        with Executor(max_workers=4) as pool:
+            pso = ParticleSwarmOptimizer(
+                ln_probability, [-10, -10], [10, 10], 20, pool=pool
+            )
+            result, [chi2_list, _, _] = pso.optimize(
+                max_iter, verbose=False, m=-1, asynchronous=True
+            )
+        assert len(chi2_list) == max_iter
+        npt.assert_almost_equal(result, [0, 0], decimal=2)
+
+        # errors in the likelihood are raised
+        def ln_probability_error(x):
+            raise ValueError("error in likelihood")
+
+        with Executor(max_workers=2) as pool:
+            pso = ParticleSwarmOptimizer(
+                ln_probability_error, [-10, -10], [10, 10], 4, pool=pool
+            )
+            with pytest.raises(ValueError):
+                pso.optimize(2, verbose=False, asynchronous=True)
+
     def test_sample(self):
         """
 
@@ -0,0 +1,54 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from lenstronomy.Sampling.checkpoint import Checkpoint
+
+
+@pytest.mark.parametrize("asynchronous", [True, False])
+def test_checkpoint(tmp_path, asynchronous):
+    filename = str(tmp_path / "checkpoint.h5")
+    checkpoint = Checkpoint(filename, asynchronous=asynchronous)
+    assert checkpoint.get("a/position") is None
+    assert checkpoint.get_object("a/state", default=1) == 1
+
+    for i in range(3):
+        checkpoint.set("a/position", np.ones((4, 2)) * i)
+        checkpoint.append("a/chain", np.ones((1, 2)) * i)
+    checkpoint.set_object("a/state", {"step": 2, "name": "PSO"})
+    npt.assert_almost_equal(checkpoint.get("a/position"), np.ones((4, 2)) * 2)
+    npt.assert_almost_equal(checkpoint.get("a/chain")[:, 0], [0, 1, 2])
+    assert checkpoint.get_object("a/state") == {"step": 2, "name": "PSO"}
+    assert "a/chain" in checkpoint
+
+    # the data is copied when queued
+    value = np.zeros(2)
+    checkpoint.set("b", value)
+    value[:] = 1
+    npt.assert_almost_equal(checkpoint.get("b"), [0, 0])
+
+    checkpoint.remove("a")
+    assert "a/chain" not in checkpoint
+    checkpoint.close()
+
+    # entries persist and are removed with reset=True
+    checkpoint = Checkpoint(filename, asynchronous=asynchronous)
+    npt.assert_almost_equal(checkpoint.get("b"), [0, 0])
+    checkpoint.close()
+    checkpoint = Checkpoint(filename, asynchronous=asynchronous, reset=True)
+    assert checkpoint.get("b") is None
+    checkpoint.close()
+
+
+def test_raise(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.h5"))
+    checkpoint.append("a", np.ones((2, 2)))
+    # inconsistent shape along the second axis
+    checkpoint.append("a", np.ones((2, 3)))
+    with pytest.raises(Exception):
+        checkpoint.flush()
+    checkpoint.close()
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -195,6 +195,100 @@ class TestLikelihood(object):
         num_data_evaluate = self.Likelihood.num_data
         npt.assert_almost_equal(logL / num_data_evaluate, -1 / 2.0, decimal=1)
 
+    def test_point_source_cache(self):
+        kwargs_likelihood = {
+            "time_delay_likelihood": True,
+            "image_position_likelihood": True,
+            "flux_ratio_likelihood": True,
+            "kwargs_point_source_cache": {"tolerance": 0, "max_size": 10},
+        }
+        likelihood = Likelihood(
+            kwargs_data_joint=self.kwargs_data,
+            kwargs_model=self.kwargs_model,
+            param_class=self.param_class,
+            **kwargs_likelihood,
+        )
+        likelihood_no_cache = Likelihood(
+            kwargs_data_joint=self.kwargs_data,
+            kwargs_model=self.kwargs_model,
+            param_class=self.param_class,
+            **{
+                k: v
+                for k, v in kwargs_likelihood.items()
+                if k != "kwargs_point_source_cache"
+            },
+        )
+        args = self.param_class.kwargs2args(
+            kwargs_lens=self.kwargs_lens,
+            kwargs_source=self.kwargs_source,
+            kwargs_lens_light=self.kwargs_lens_light,
+            kwargs_ps=self.kwargs_ps,
+            kwargs_special=self.kwargs_cosmo,
+        )
+        logL = likelihood.logL(args)
+        npt.assert_almost_equal(logL, likelihood_no_cache.logL(args), decimal=8)
+        memo = likelihood.point_source_memo
+        misses, hits = memo.misses, memo.hits
+        assert misses > 0
+        # second evaluation with the same parameters is served from the memo
+        logL_2 = likelihood.logL(args)
+        npt.assert_almost_equal(logL_2, logL, decimal=8)
+        assert memo.misses == misses
+        assert memo.hits > hits
+
+    def test_residuals(self):
+        args = self.param_class.kwargs2args(
+            kwargs_lens=self.kwargs_lens,
+            kwargs_source=self.kwargs_source,
+            kwargs_lens_light=self.kwargs_lens_light,
+            kwargs_ps=self.kwargs_ps,
+            kwargs_special=self.kwargs_cosmo,
+        )
+        likelihood = Likelihood(
+            kwargs_data_joint=self.kwargs_data,
+            kwargs_model=self.kwargs_model,
+            param_class=self.param_class,
+        )
+        residuals = likelihood.residuals(args)
+        assert len(residuals) == likelihood.num_data
+        npt.assert_almost_equal(
+            -np.sum(residuals**2) / 2 / likelihood.logL(args), 1, decimal=8
+        )
+
+        likelihood = Likelihood(
+            kwargs_data_joint=self.kwargs_data,
+            kwargs_model=self.kwargs_model,
+            param_class=self.param_class,
+            image_likelihood=False,
+        )
+        with pytest.raises(ValueError):
+            likelihood.residuals(args)
+
+    def test_likelihood_context(self):
+        kwargs_likelihood = {
+            "time_delay_likelihood": True,
+            "image_position_likelihood": True,
+            "flux_ratio_likelihood": True,
+        }
+        likelihood = Likelihood(
+            kwargs_data_joint=self.kwargs_data,
+            kwargs_model=self.kwargs_model,
+            param_class=self.param_class,
+            **kwargs_likelihood,
+        )
+        args = self.param_class.kwargs2args(
+            kwargs_lens=self.kwargs_lens,
+            kwargs_source=self.kwargs_source,
+            kwargs_lens_light=self.kwargs_lens_light,
+            kwargs_ps=self.kwargs_ps,
+            kwargs_special=self.kwargs_cosmo,
+        )
+        likelihood.logL(args)
+        context = likelihood.likelihood_context
+        # image positions solved once for the time-delay likelihood are re-used by
+        # the image position likelihood
+        assert context.statistics["image_position"]["hits"] >= 1
+
     def test_time_delay_likelihood(self):
         kwargs_likelihood = {
             "time_delay_likelihood": True,
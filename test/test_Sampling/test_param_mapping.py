@@ -0,0 +1,155 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from lenstronomy.Sampling.parameters import Param
+from lenstronomy.Sampling.param_mapping import ParamMappingPlan
+
+
+def _assert_equal(kwargs_1, kwargs_2):
+    if isinstance(kwargs_1, dict):
+        assert list(kwargs_1.keys()) == list(kwargs_2.keys())
+        for key in kwargs_1:
+            _assert_equal(kwargs_1[key], kwargs_2[key])
+    elif isinstance(kwargs_1, list):
+        assert isinstance(kwargs_2, list)
+        assert len(kwargs_1) == len(kwargs_2)
+        for value_1, value_2 in zip(kwargs_1, kwargs_2):
+            _assert_equal(value_1, value_2)
+    else:
+        assert type(kwargs_1) == type(kwargs_2)
+        npt.assert_array_equal(kwargs_1, kwargs_2)
+
+
+def _compare(param, args, bijective=False):
+    """Compares the mapping plan with the read-out of the individual parameter
+    classes."""
+    assert param.mapping_plan is not None
+    kwargs_plan = param.args2kwargs(np.array(args), bijective=bijective)
+    args_plan = param.kwargs2args(**kwargs_plan)
+    param._mapping_plan = False
+    kwargs_ref = param.args2kwargs(np.array(args), bijective=bijective)
+    args_ref = param.kwargs2args(**kwargs_ref)
+    param._mapping_plan = None
+    _assert_equal(kwargs_plan, kwargs_ref)
+    npt.assert_array_equal(args_plan, args_ref)
+
+
+class TestParamMappingPlan(object):
+    def setup_method(self):
+        kwargs_model = {
+            "lens_model_list": ["SIE", "SHEAR", "NFW"],
+            "source_light_model_list": ["SERSIC_ELLIPSE", "SHAPELETS"],
+            "lens_light_model_list": ["SERSIC", "MULTI_GAUSSIAN"],
+            "point_source_model_list": ["LENSED_POSITION", "SOURCE_POSITION"],
+        }
+        kwargs_fixed_lens = [
+            {"center_x": 0},
+            {"ra_0": 0, "dec_0": 0},
+            {"Rs": 2},
+        ]
+        kwargs_fixed_source = [{"n_sersic": 1}, {"n_max": 2, "beta": 0.2}]
+        kwargs_fixed_lens_light = [{}, {"sigma": [0.1, 0.5, 1.0]}]
+        kwargs_fixed_ps = [{}, {}]
+        self.param = Param(
+            kwargs_model,
+            kwargs_fixed_lens=kwargs_fixed_lens,
+            kwargs_fixed_source=kwargs_fixed_source,
+            kwargs_fixed_lens_light=kwargs_fixed_lens_light,
+            kwargs_fixed_ps=kwargs_fixed_ps,
+            kwargs_fixed_special={},
+            num_point_source_list=[4, 1],
+            log_sampling_lens=[[0, ["theta_E"]], [2, ["alpha_Rs"]]],
+            Ddt_sampling=True,
+            point_source_offset=True,
+            joint_lens_with_light=[[0, 0, ["center_y"]]],
+            joint_source_with_source=[[0, 1, ["center_x", "center_y"]]],
+        )
+        self.num_param, _ = self.param.num_param()
+
+    def test_args2kwargs(self):
+        np.random.seed(42)
+        for _ in range(5):
+            args = np.random.uniform(-0.5, 0.5, self.num_param)
+            _compare(self.param, args)
+            _compare(self.param, args, bijective=True)
+
+    def test_kwargs2args(self):
+        np.random.seed(41)
+        args = np.random.uniform(-0.5, 0.5, self.num_param)
+        kwargs = self.param.args2kwargs(args, bijective=True)
+        args_new = self.param.kwargs2args(**kwargs)
+        # joint parameters are overwritten, all others are recovered
+        kwargs_new = self.param.args2kwargs(args_new, bijective=True)
+        _assert_equal(kwargs_new, kwargs)
+
+    def test_special_bounds(self):
+        args = np.zeros(self.num_param)
+        _, param_names = self.param.num_param()
+        # D_dt below its lower limit
+        args[param_names.index("D_dt")] = -10
+        kwargs = self.param.args2kwargs(args)
+        assert kwargs["kwargs_special"]["D_dt"] == 0
+        _compare(self.param, args)
+
+    def test_scaling(self):
+        kwargs_model = {"lens_model_list": ["PJAFFE", "NFW", "SIS"]}
+        param = Param(
+            kwargs_model,
+            kwargs_fixed_lens=[{"Rs": 2.0, "center_x": 1.0}, {"Rs": 3}, {}],
+            kwargs_fixed_special={},
+            general_scaling={
+                "sigma0": [1, False, False],
+                "alpha_Rs": [False, 1, False],
+            },
+            mass_scaling_list=[False, False, 1],
+        )
+        num_param, _ = param.num_param()
+        args = np.random.uniform(0.1, 1, num_param)
+        _compare(param, args)
+        _compare(param, args, bijective=True)
+
+    def test_shapelet_lens(self):
+        kwargs_model = {"lens_model_list": ["SHAPELETS_CART"]}
+        param = Param(
+            kwargs_model, kwargs_fixed_lens=[{"beta": 1}], num_shapelet_lens=6
+        )
+        num_param, _ = param.num_param()
+        args = np.random.uniform(0.1, 1, num_param)
+        _compare(param, args)
+
+    def test_fallback(self):
+        param = Param({"lens_model_list": ["SIS"]})
+        param._mapping_plan = None
+        # a different argument length uses the read-out of the parameter classes
+        kwargs = param.args2kwargs([1, 0, 0, 5])
+        assert kwargs["kwargs_lens"][0]["theta_E"] == 1
+
+    def test_repeated_evaluation(self):
+        # the plan is compiled once and re-used for all subsequent evaluations
+        plan = self.param.mapping_plan
+        args_list = np.random.uniform(-0.5, 0.5, (20, self.num_param))
+        kwargs_plan = [self.param.args2kwargs(args) for args in args_list]
+        assert self.param.mapping_plan is plan
+        self.param._mapping_plan = False
+        for args, kwargs in zip(args_list, kwargs_plan):
+            _assert_equal(kwargs, self.param.args2kwargs(args))
+        self.param._mapping_plan = None
+
+
+def test_raise():
+    param = Param({"lens_model_list": ["SIS"]})
+
+    def get_params(args, i):
+        kwargs = {"theta_E": args[i] * 2, "center_x": args[i + 1]}
+        return [dict(kwargs, center_y=args[i + 2])], i + 3
+
+    # a transform of the arguments that can not be traced
+    param.lens_params.get_params = get_params
+    with pytest.raises(TypeError):
+        ParamMappingPlan(param)
+    assert param.mapping_plan is None
+
+
+if __name__ == "__main__":
+    pytest.main()
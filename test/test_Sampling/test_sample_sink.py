@@ -0,0 +1,105 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from lenstronomy.Sampling.sample_sink import (
+    HDF5SampleSink,
+    NPYSampleSink,
+    RingBufferSampleSink,
+    open_samples,
+    argmax_chunked,
+    WalkerGroupedView,
+)
+
+
+def _fill(sink, num_steps=5, num_walkers=4, num_param=3):
+    for i in range(num_steps):
+        samples = np.ones((num_walkers, num_param)) * i
+        log_prob = np.arange(num_walkers) + i * num_walkers
+        sink.append(samples, log_prob)
+
+
+@pytest.mark.parametrize("sink_type", ["hdf5", "npy"])
+def test_on_disk_sink(tmp_path, sink_type):
+    if sink_type == "hdf5":
+        filename = str(tmp_path / "samples.h5")
+        sink = HDF5SampleSink(filename, chunk_size=7)
+    else:
+        filename = str(tmp_path / "samples")
+        sink = NPYSampleSink(filename, chunk_size=7)
+    assert len(sink.samples) == 0
+    _fill(sink)
+    assert len(sink) == 20
+    # samples written so far are accessible during the run
+    assert np.shape(sink.samples) == (20, 3)
+    npt.assert_almost_equal(sink.log_prob[:], np.arange(20))
+    _fill(sink, num_steps=2)
+    sink.close()
+    assert np.shape(sink.samples) == (28, 3)
+    npt.assert_almost_equal(sink.samples[27], [1, 1, 1])
+
+    samples, log_prob = open_samples(filename)
+    assert np.shape(samples) == (28, 3)
+    npt.assert_almost_equal(log_prob[:20], np.arange(20))
+
+
+def test_ring_buffer():
+    sink = RingBufferSampleSink(capacity=10)
+    _fill(sink)
+    assert len(sink) == 10
+    assert sink.num_total == 20
+    npt.assert_almost_equal(sink.log_prob, np.arange(10, 20))
+    npt.assert_almost_equal(sink.samples[-1], [4, 4, 4])
+    # a chunk larger than the capacity
+    sink.append(np.zeros((13, 3)), np.arange(13))
+    npt.assert_almost_equal(sink.log_prob, np.arange(3, 13))
+
+
+def test_argmax_chunked(tmp_path):
+    values = np.random.normal(size=1001)
+    sink = HDF5SampleSink(str(tmp_path / "samples.h5"))
+    sink.append(np.zeros((1001, 1)), values)
+    assert argmax_chunked(sink.log_prob, chunk_size=100) == np.argmax(values)
+    assert argmax_chunked(values) == np.argmax(values)
+    sink.close()
+
+
+def test_walker_grouped_view(tmp_path):
+    num_steps, num_walkers = 5, 4
+    chain = np.random.normal(size=(num_steps, num_walkers, 3))
+    # flattened zeus chain, all steps of the first walker first
+    chain_flat = chain.reshape((-1, 3), order="F")
+    sink = HDF5SampleSink(str(tmp_path / "samples.h5"), chunk_size=3)
+    for samples in chain:
+        sink.append(samples, samples[:, 0])
+    samples = WalkerGroupedView(sink.samples, num_walkers)
+    log_prob = WalkerGroupedView(sink.log_prob, num_walkers)
+    assert len(samples) == num_steps * num_walkers
+    assert samples.shape == chain_flat.shape
+    npt.assert_array_equal(np.asarray(samples), chain_flat)
+    npt.assert_array_equal(samples[7], chain_flat[7])
+    npt.assert_array_equal(samples[-1], chain_flat[-1])
+    npt.assert_array_equal(samples[2:15:3], chain_flat[2:15:3])
+    npt.assert_array_equal(samples[::-1], chain_flat[::-1])
+    npt.assert_array_equal(samples[[9, 2, 9]], chain_flat[[9, 2, 9]])
+    npt.assert_array_equal(samples[:, 1], chain_flat[:, 1])
+    assert samples[4, 2] == chain_flat[4, 2]
+    assert samples[3:3].shape == (0, 3)
+    npt.assert_array_equal(log_prob[:], chain_flat[:, 0])
+    assert argmax_chunked(log_prob, chunk_size=6) == np.argmax(chain_flat[:, 0])
+    sink.close()
+    with pytest.raises(ValueError):
+        WalkerGroupedView(np.zeros((10, 3)), num_walkers)
+
+
+def test_raise(tmp_path):
+    sink = RingBufferSampleSink(capacity=10)
+    with pytest.raises(ValueError):
+        sink.append(np.zeros((2, 3)), np.zeros(3))
+    sink.append(np.zeros((2, 3)), np.zeros(2))
+    with pytest.raises(ValueError):
+        sink.append(np.zeros((2, 2)), np.zeros(2))
+
+
+if __name__ == "__main__":
+    pytest.main()
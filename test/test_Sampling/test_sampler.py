@@ -2,6 +2,7 @@ __author__ = "sibirrer"
 
 import pytest
 import numpy as np
+import numpy.testing as npt
 import os
 import lenstronomy.Util.simulation_util as sim_util
 from lenstronomy.ImSim.image_model import ImageModel
@@ -157,6 +158,52 @@ class TestSampler(object):
 
         assert len(result) == 16
 
+        result, chain = self.sampler.pso(
+            n_particles,
+            n_iterations,
+            threadCount=2,
+            mpi=False,
+            asynchronous=True,
+        )
+        assert len(result) == 16
+        assert len(chain[0]) == n_iterations
+
+        result, chain = self.sampler.pso(
+            n_particles, n_iterations, threadCount=2, mpi=False
+        )
+        assert len(result) == 16
+
+    def test_surrogate(self):
+        kwargs_surrogate = {"num_train_min": 10}
+        result, chain = self.sampler.pso(
+            n_particles=10,
+            n_iterations=3,
+            mpi=False,
+            kwargs_surrogate=kwargs_surrogate,
+        )
+        assert len(result) == 16
+        assert self.sampler.surrogate.num_calls == 40
+        assert self.sampler.surrogate.num_evaluated <= 40
+
+        n_walkers = 36
+        mean_start = self.param_class.kwargs2args(
+            kwargs_lens=self.kwargs_lens,
+            kwargs_source=self.kwargs_source,
+            kwargs_lens_light=self.kwargs_lens_light,
+        )
+        sigma_start = np.ones_like(mean_start) * 0.1
+        samples, dist = self.sampler.mcmc_emcee(
+            n_walkers,
+            2,
+            1,
+            mean_start,
+            sigma_start,
+            kwargs_surrogate=kwargs_surrogate,
+        )
+        assert len(samples) == n_walkers * 2
+        # initial walkers and 3 steps
+        assert self.sampler.surrogate.num_calls == 4 * n_walkers
+
     def test_mcmc_emcee(self):
         n_walkers = 36
         n_run = 2
@@ -202,6 +249,45 @@ class TestSampler(object):
 
         os.remove(backup_filename)  # just remove the backup file created above
 
+    def test_mcmc_sample_sink(self, tmp_path):
+        from lenstronomy.Sampling.sample_sink import (
+            HDF5SampleSink,
+            NPYSampleSink,
+            WalkerGroupedView,
+        )
+
+        n_walkers = 36
+        n_run = 3
+        n_burn = 2
+        mean_start = self.param_class.kwargs2args(
+            kwargs_lens=self.kwargs_lens,
+            kwargs_source=self.kwargs_source,
+            kwargs_lens_light=self.kwargs_lens_light,
+        )
+        sigma_start = np.ones_like(mean_start) * 0.1
+        sink = HDF5SampleSink(str(tmp_path / "emcee.h5"), chunk_size=50)
+        samples, dist = self.sampler.mcmc_emcee(
+            n_walkers, n_run, n_burn, mean_start, sigma_start, sample_sink=sink
+        )
+        assert np.shape(samples) == (n_walkers * n_run, len(mean_start))
+        assert len(dist) == len(samples)
+        assert np.all(np.isfinite(dist[:]))
+
+        sink = NPYSampleSink(str(tmp_path / "zeus"), chunk_size=50)
+        samples, dist = self.sampler.mcmc_zeus(
+            n_walkers, n_run, n_burn, mean_start, sigma_start, sample_sink=sink
+        )
+        assert np.shape(samples) == (n_walkers * n_run, len(mean_start))
+        assert len(dist) == len(samples)
+        # the sink stores the samples step by step, while the returned samples are
+        # grouped by walker as the flattened zeus chain
+        npt.assert_allclose(samples[:n_run], sink.samples[::n_walkers])
+        npt.assert_allclose(dist[:n_run], sink.log_prob[::n_walkers])
+        # the returned samples are lazy views of the memory maps of the sink
+        assert isinstance(samples, WalkerGroupedView)
+        assert isinstance(samples._values, np.memmap)
+        npt.assert_array_equal(np.asarray(samples)[n_run:], samples[n_run:])
+
     def test_mcmc_zeus(self):
         n_walkers = 36
         n_run = 2
@@ -270,6 +356,48 @@ class TestSampler(object):
         )
         assert len(samples_mi) == n_walkers * n_run
 
+    def test_mcmc_zeus_checkpoint(self, tmp_path):
+        from lenstronomy.Sampling.checkpoint import Checkpoint
+
+        n_walkers = 36
+        mean_start = self.param_class.kwargs2args(
+            kwargs_lens=self.kwargs_lens,
+            kwargs_source=self.kwargs_source,
+            kwargs_lens_light=self.kwargs_lens_light,
+        )
+        sigma_start = np.ones_like(mean_start) * 0.1
+        checkpoint = Checkpoint(str(tmp_path / "zeus.h5"))
+        samples, dist = self.sampler.mcmc_zeus(
+            n_walkers, 2, 1, mean_start, sigma_start, checkpoint=checkpoint
+        )
+        assert len(samples) == n_walkers * 2
+        chain = checkpoint.get("zeus/chain")
+        assert np.shape(chain) == (3, n_walkers, len(mean_start))
+        npt.assert_almost_equal(samples[0], chain[1, 0])
+        npt.assert_almost_equal(samples[1], chain[2, 0])
+        npt.assert_almost_equal(dist[0], checkpoint.get("zeus/log_prob")[1, 0])
+
+        # continues the saved chain for the remaining steps
+        samples_resume, dist_resume = self.sampler.mcmc_zeus(
+            n_walkers, 3, 1, mean_start, sigma_start, checkpoint=checkpoint, resume=True
+        )
+        assert len(samples_resume) == n_walkers * 3
+        assert len(checkpoint.get("zeus/chain")) == 4
+        npt.assert_almost_equal(samples_resume[0], samples[0])
+        npt.assert_almost_equal(samples_resume[3], samples[2])
+
+        # nothing left to sample
+        samples_resume, _ = self.sampler.mcmc_zeus(
+            n_walkers, 2, 1, mean_start, sigma_start, checkpoint=checkpoint, resume=True
+        )
+        assert len(samples_resume) == n_walkers * 3
+
+        with pytest.raises(ValueError):
+            self.sampler.mcmc_zeus(
+                10, 2, 1, mean_start, sigma_start, checkpoint=checkpoint, resume=True
+            )
+        checkpoint.close()
+
 
 def test_pool_and_logl_mpi(monkeypatch):
     calls = []
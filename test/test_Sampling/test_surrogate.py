@@ -0,0 +1,69 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from lenstronomy.Sampling.surrogate import (
+    GaussianProcessEmulator,
+    SurrogateLogLikelihood,
+)
+from lenstronomy.Sampling.Samplers.pso import ParticleSwarmOptimizer
+from lenstronomy.Sampling.Pool.pool import choose_pool
+
+
+def _logl(args):
+    return -0.5 * np.sum((np.asarray(args) - 0.3) ** 2 / 0.01, axis=-1)
+
+
+class TestGaussianProcessEmulator(object):
+    def test_fit_predict(self):
+        np.random.seed(42)
+        lower, upper = -np.ones(2), np.ones(2)
+        emulator = GaussianProcessEmulator(lower, upper, num_optimize=50)
+        x = np.random.uniform(-1, 1, (100, 2))
+        emulator.fit(x, _logl(x))
+        x_test = np.random.uniform(-0.5, 0.5, (10, 2))
+        mean, std = emulator.predict(x_test)
+        npt.assert_allclose(mean, _logl(x_test), atol=0.5)
+        assert np.all(std >= 0)
+        # re-fit with the optimized kernel
+        emulator.fit(x[:60], _logl(x[:60]))
+        mean, _ = emulator.predict(x_test)
+        npt.assert_allclose(mean, _logl(x_test), atol=1)
+
+
+class TestSurrogateLogLikelihood(object):
+    def test_pso(self):
+        np.random.seed(42)
+        lower, upper = -np.ones(3), np.ones(3)
+        surrogate = SurrogateLogLikelihood(_logl, lower, upper)
+        pso = ParticleSwarmOptimizer(surrogate, lower, upper, 30, vectorize=True)
+        result, _ = pso.optimize(30, verbose=False)
+        npt.assert_almost_equal(result, [0.3, 0.3, 0.3], decimal=2)
+        statistics = surrogate.statistics
+        # the initial swarm and 30 iterations
+        assert statistics["num_calls"] == 31 * 30
+        assert statistics["num_evaluated"] < statistics["num_calls"]
+        assert 0 < surrogate.fraction_saved < 1
+
+    def test_screening(self):
+        np.random.seed(42)
+        lower, upper = -np.ones(2), np.ones(2)
+        pool = choose_pool(mpi=False, processes=1)
+        surrogate = SurrogateLogLikelihood(
+            _logl, lower, upper, num_train_min=50, explore_fraction=0, pool=pool
+        )
+        assert surrogate.fraction_saved == 0
+        # not enough points, all are evaluated
+        x = np.random.uniform(-1, 1, (100, 2))
+        npt.assert_almost_equal(surrogate(x), _logl(x))
+        assert surrogate.num_evaluated == 100
+        # points far from the maximum are emulated, those close to it evaluated
+        x = np.array([[0.3, 0.3], [-1, -1]])
+        logL = surrogate(x)
+        assert surrogate.num_evaluated == 101
+        npt.assert_almost_equal(logL[0], _logl(x)[0])
+        assert logL[1] < np.max(surrogate._y_train) - 2
+
+
+if __name__ == "__main__":
+    pytest.main()
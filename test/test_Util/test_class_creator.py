@@ -253,6 +253,17 @@ class TestClassCreator(object):
         )
         assert multi_band.LensModel.lens_model_list[0] == "SIS"
 
+        for multi_band_type in ["multi-linear", "joint-linear"]:
+            multi_band = class_creator.create_im_sim(
+                multi_band_list * 2,
+                multi_band_type,
+                kwargs_model,
+                band_parallel=True,
+                num_threads=2,
+            )
+            assert multi_band._band_parallel is True
+            assert multi_band._num_threads == 2
+
 
 class TestRaise(unittest.TestCase):
     def test_raise(self):
@@ -300,6 +300,13 @@ class TestFittingSequence(object):
 
         kwargs_pso = {"sigma_scale": 1, "n_particles": n_p, "n_iterations": n_i}
         fitting_list.append(["PSO", kwargs_pso])
+        kwargs_pso_async = {
+            "sigma_scale": 1,
+            "n_particles": n_p,
+            "n_iterations": n_i,
+            "asynchronous": True,
+        }
+        fitting_list.append(["PSO", kwargs_pso_async])
         kwargs_align = {"delta_shift": 0.2, "n_particles": 2, "n_iterations": 2}
         fitting_list.append(["align_images", kwargs_align])
         kwargs_psf_iter = {
@@ -383,6 +390,162 @@ class TestFittingSequence(object):
         assert "psf_before" in psf_iteration_list[0]
         assert "psf_after" in psf_iteration_list[0]
 
+    def test_persistent_pool(self):
+        fittingSequence = FittingSequence(
+            self.kwargs_data_joint,
+            self.kwargs_model,
+            self.kwargs_constraints,
+            self.kwargs_likelihood,
+            self.kwargs_params,
+            persistent_pool=True,
+        )
+        kwargs_pso = {
+            "sigma_scale": 1,
+            "n_particles": 2,
+            "n_iterations": 2,
+            "threadCount": 2,
+        }
+        kwargs_update = {"lens_light_add_fixed": [[0, ["n_sersic"], [4]]]}
+        fitting_list = [
+            ["PSO", kwargs_pso],
+            ["update_settings", kwargs_update],
+            ["PSO", kwargs_pso],
+        ]
+        chain_list = fittingSequence.fit_sequence(fitting_list)
+        assert len(chain_list) == 2
+        # the workers are re-used and only the Param() instance is updated
+        pool = fittingSequence._pool
+        assert pool.num_full_updates == 1
+        kwargs_result = fittingSequence.best_fit(bijective=False)
+        assert kwargs_result["kwargs_lens_light"][0]["n_sersic"] == 4
+
+        # a different number of threads re-spawns the workers
+        fittingSequence.pso(n_particles=2, n_iterations=2, threadCount=3)
+        assert fittingSequence._pool is not pool
+        fittingSequence.close_pool()
+        assert fittingSequence._pool is None
+
+        # by default, no workers are kept alive after the fitting sequence
+        fittingSequence = FittingSequence(
+            self.kwargs_data_joint,
+            self.kwargs_model,
+            self.kwargs_constraints,
+            self.kwargs_likelihood,
+            self.kwargs_params,
+        )
+        fittingSequence.fit_sequence(fitting_list)
+        assert fittingSequence._pool is None
+
+    def test_checkpoint(self, tmp_path):
+        filename = str(tmp_path / "fitting_sequence.h5")
+        kwargs_pso = {"sigma_scale": 1, "n_particles": 2, "n_iterations": 2}
+        kwargs_update = {"lens_light_add_fixed": [[0, ["n_sersic"], [4]]]}
+        fitting_list = [
+            ["PSO", kwargs_pso],
+            ["update_settings", kwargs_update],
+            ["PSO", kwargs_pso],
+        ]
+        fittingSequence = FittingSequence(
+            self.kwargs_data_joint,
+            self.kwargs_model,
+            self.kwargs_constraints,
+            self.kwargs_likelihood,
+            self.kwargs_params,
+        )
+        # interrupted after the first two steps
+        chain_list = fittingSequence.fit_sequence(
+            fitting_list[:2], checkpoint_filename=filename
+        )
+        assert len(chain_list) == 1
+
+        fittingSequence = FittingSequence(
+            self.kwargs_data_joint,
+            self.kwargs_model,
+            self.kwargs_constraints,
+            self.kwargs_likelihood,
+            self.kwargs_params,
+        )
+        chain_list_resume = fittingSequence.fit_sequence(
+            fitting_list, checkpoint_filename=filename, resume=True
+        )
+        assert len(chain_list_resume) == 2
+        npt.assert_almost_equal(chain_list_resume[0][1][0], chain_list[0][1][0])
+        # the settings of the completed update are restored
+        kwargs_result_resume = fittingSequence.best_fit(bijective=False)
+        assert kwargs_result_resume["kwargs_lens_light"][0]["n_sersic"] == 4
+
+        # the completed steps need to match
+        fittingSequence = FittingSequence(
+            self.kwargs_data_joint,
+            self.kwargs_model,
+            self.kwargs_constraints,
+            self.kwargs_likelihood,
+            self.kwargs_params,
+        )
+        with pytest.raises(ValueError):
+            fittingSequence.fit_sequence(
+                [["update_settings", kwargs_update]] + fitting_list,
+                checkpoint_filename=filename,
+                resume=True,
+            )
+
+    def test_sample_sink(self, tmp_path):
+        from lenstronomy.Sampling.sample_sink import HDF5SampleSink, open_samples
+
+        fittingSequence = FittingSequence(
+            self.kwargs_data_joint,
+            self.kwargs_model,
+            self.kwargs_constraints,
+            self.kwargs_likelihood,
+            self.kwargs_params,
+        )
+        filename = str(tmp_path / "mcmc.h5")
+        param_class = fittingSequence.param_class
+        mean = param_class.kwargs2args(**fittingSequence.best_fit(bijective=True))
+        samples = mean + np.random.normal(0, 0.01, (1000, len(mean)))
+        log_prob = np.random.normal(size=1000)
+        sink = HDF5SampleSink(filename, chunk_size=100)
+        for i in range(10):
+            sink.append(
+                samples[i * 100 : (i + 1) * 100], log_prob[i * 100 : (i + 1) * 100]
+            )
+        sink.close()
+        # the best fit is read from the lazy arrays
+        samples_read, log_prob_read = open_samples(filename)
+        kwargs_best = fittingSequence.best_fit_from_samples(samples_read, log_prob_read)
+        kwargs_best_ref = fittingSequence.best_fit_from_samples(samples, log_prob)
+        npt.assert_almost_equal(
+            param_class.kwargs2args(**kwargs_best),
+            param_class.kwargs2args(**kwargs_best_ref),
+        )
+
+    def test_levenberg_marquardt(self):
+        fittingSequence = FittingSequence(
+            self.kwargs_data_joint,
+            self.kwargs_model,
+            self.kwargs_constraints,
+            self.kwargs_likelihood,
+            self.kwargs_params,
+        )
+        likelihood = fittingSequence.likelihood_class
+        args_init = fittingSequence.param_class.kwargs2args(
+            **fittingSequence.best_fit(bijective=True)
+        )
+        logL_init = likelihood.logL(args_init)
+        chain_list = fittingSequence.fit_sequence([["LM", {"n_iterations": 3}]])
+        assert chain_list[0][0] == "LM"
+        args = fittingSequence.param_class.kwargs2args(**chain_list[0][1])
+        logL = likelihood.logL(args)
+        assert logL > logL_init
+
+        # finite differences evaluated on the persistent pool
+        kwargs_result = fittingSequence.levenberg_marquardt(
+            n_iterations=1, threadCount=2
+        )
+        args = fittingSequence.param_class.kwargs2args(**kwargs_result)
+        assert likelihood.logL(args) >= logL
+        fittingSequence.close_pool()
+
     def test_cobaya(self):
         np.random.seed(42)
 